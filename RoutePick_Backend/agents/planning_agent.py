@@ -11,13 +11,18 @@ from tools.course_creation_tool import CourseCreationTool
 class PlanningAgent(BaseAgent):
     """계획 Agent - 코스 제작 Tool을 사용하여 최적 코스 생성"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        course_tool: Optional[CourseCreationTool] = None
+    ):
         """
         Args:
             config: Agent 설정
+            course_tool: 공유할 CourseCreationTool (None이면 새로 생성)
         """
         super().__init__(name="PlanningAgent", config=config)
-        self.course_tool = CourseCreationTool(config=config)
+        self.course_tool = course_tool or CourseCreationTool(config=config)
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -27,7 +32,8 @@ class PlanningAgent(BaseAgent):
             input_data: {
                 "places": List[Dict],  # 검색된 장소 리스트
                 "user_preferences": Dict,  # 사용자 선호도
-                "time_constraints": Optional[Dict]  # 시간 제약
+                "time_constraints": Optional[Dict],  # 시간 제약
+                "on_description": Optional[Callable[[str], None]]  # 생성 중인 코스 설명 조각 콜백
             }
             
         Returns:
@@ -56,7 +62,8 @@ class PlanningAgent(BaseAgent):
         result = await self.course_tool.execute(
             places=places,
             user_preferences=user_preferences,
-            time_constraints=time_constraints
+            time_constraints=time_constraints,
+            on_description=input_data.get("on_description")
         )
         
         return {
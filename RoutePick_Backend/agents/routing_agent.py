@@ -8,19 +8,36 @@ from typing import Any, Dict, List, Optional
 from .base_agent import BaseAgent
 from tools.google_maps_tool import GoogleMapsTool
 from tools.tmap_tool import TMapTool
+from tools.offline_routing_tool import OfflineRoutingTool
+from utils.hedged_routing import get_hedged_router, route_course_hedged
+from utils.provider_health import get_provider_health
 
 
 class RoutingAgent(BaseAgent):
     """경로 최적화 Agent - Google Maps Tool과 T Map Tool을 사용하여 동선 최적화"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        maps_tool: Optional[GoogleMapsTool] = None,
+        tmap_tool: Optional[TMapTool] = None,
+        offline_tool: Optional[OfflineRoutingTool] = None
+    ):
         """
         Args:
             config: Agent 설정
+            maps_tool, tmap_tool, offline_tool: 공유할 Tool (None이면 새로 생성)
         """
         super().__init__(name="RoutingAgent", config=config)
-        self.maps_tool = GoogleMapsTool(config=config)
-        self.tmap_tool = TMapTool(config=config)
+        self.maps_tool = maps_tool or GoogleMapsTool(config=config)
+        self.tmap_tool = tmap_tool or TMapTool(config=config)
+        # 오프라인 OSM 그래프 (OFFLINE_GRAPH_PATH 설정 시, T Map/Google 모두 실패할 때 폴백)
+        self.offline_tool = offline_tool or OfflineRoutingTool(config=config)
+        
+        # 구간별 헤지 라우팅 사용 여부 (T Map 지연/실패 구간만 Google로 재요청)
+        from config.config import Config
+        self.hedged_routing = bool(self.config.get("hedged_routing", Config.HEDGED_ROUTING))
+        self._health = get_provider_health()
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -77,7 +94,11 @@ class RoutingAgent(BaseAgent):
         if mode in ["walking", "driving"] and not has_transit:
             # 장소 좌표가 한국 영역 내에 있는지 확인
             is_korea = self._is_in_korea(places)
-            if is_korea:
+            tmap_endpoint = self.tmap_tool.endpoint_for_mode("walking" if mode == "walking" else "driving")
+            if is_korea and self._health.is_open("tmap", tmap_endpoint):
+                # 인증 실패/연속 장애로 서킷이 열려 있으면 타임아웃을 기다리지 않고 바로 Google 사용
+                print(f"⏭️ T Map 서킷 open ({tmap_endpoint}): Google Maps API 사용 ({mode})")
+            elif is_korea:
                 use_tmap = True
                 print(f"🗺️ 한국 내 경로 감지: T Map API 사용 ({mode})")
             else:
@@ -85,7 +106,18 @@ class RoutingAgent(BaseAgent):
         elif has_transit:
             print(f"🚇 대중교통 포함: Google Maps API 사용 (T Map API는 대중교통 미지원)")
         
-        if use_tmap:
+        if use_tmap and self.hedged_routing:
+            # 구간별 헤지 라우팅: T Map 우선, p90 지연 초과/실패 구간만 Google 요청 (코스 전체 재계산 없음)
+            tmap_mode = "walking" if mode == "walking" else "driving"
+            result = await route_course_hedged(
+                get_hedged_router(),
+                self.tmap_tool,
+                self.maps_tool,
+                places,
+                tmap_mode,
+                preferred_modes=preferred_modes
+            )
+        elif use_tmap:
             # T Map API 사용 (도보/자동차만 지원)
             tmap_mode = "walking" if mode == "walking" else "driving"
             try:
@@ -104,7 +136,10 @@ class RoutingAgent(BaseAgent):
                     
                     # T Map API 키가 없거나 서비스 구독이 안 된 경우
                     # 또는 모든 구간이 실패한 경우 Google Maps로 폴백
-                    if "API 키" in error_msg or "키가 설정되지 않았습니다" in error_msg:
+                    if self._health.is_open("tmap", tmap_endpoint):
+                        print(f"⚠️ T Map 서킷 open 감지, Google Maps API로 폴백합니다.")
+                        use_tmap = False
+                    elif "API 키" in error_msg or "키가 설정되지 않았습니다" in error_msg:
                         # API 키 문제는 Google Maps로 폴백 (무한 루프 방지)
                         print(f"⚠️ T Map API 키 문제 감지, Google Maps API로 폴백합니다.")
                         use_tmap = False
@@ -132,7 +167,11 @@ class RoutingAgent(BaseAgent):
                 print(f"⚠️ T Map API 예외 발생, Google Maps API로 폴백합니다.")
                 use_tmap = False
         
-        if not use_tmap:
+        if not use_tmap and self._health.is_open("google", "directions") and self.offline_tool.is_available(mode):
+            # T Map / Google 모두 사용할 수 없으면 오프라인 그래프로 바로 계산
+            print(f"🧭 Google Directions 서킷 open: 오프라인 그래프 사용 ({mode})")
+            result = await self.offline_tool.execute(places=places, mode=mode)
+        elif not use_tmap:
             # Google Maps API 사용 (대중교통 또는 한국 외 지역 또는 T Map 실패 시)
             print(f"🗺️ Google Maps API 사용 ({mode})")
             result = await self.maps_tool.execute(
@@ -151,6 +190,16 @@ class RoutingAgent(BaseAgent):
         
         # 결과 검증: 모든 구간이 실패했는지 확인
         directions = result.get("directions", [])
+        if directions and self.offline_tool.is_available(mode) and all(
+            d.get("error") or (not d.get("steps") and d.get("duration", 0) == 0)
+            for d in directions
+        ):
+            # 외부 provider가 모두 실패한 경우 오프라인 그래프로 폴백
+            print(f"🧭 모든 구간 실패, 오프라인 그래프로 폴백합니다. ({mode})")
+            offline_result = await self.offline_tool.execute(places=result.get("optimized_route") or places, mode=mode)
+            if offline_result.get("success"):
+                result = offline_result
+                directions = result.get("directions", [])
         if directions:
             all_failed = all(
                 d.get("error") or (not d.get("steps") and d.get("duration", 0) == 0)
@@ -2,14 +2,19 @@ import json
 import asyncio
 import os
 import random 
+import time
 from typing import Any, Dict, Optional, List, Tuple
-from openai import AsyncOpenAI
-import googlemaps
 from .base_agent import BaseAgent
 from tools.tavily_search_tool import TavilySearchTool
+from utils.extraction_batcher import get_extraction_batcher
+from utils.http_client import get_http_registry
+from utils.llm_cache import cached_chat_completion
+from utils.prompt_templates import SEARCH_BATCH_SYSTEM, SEARCH_STRATEGY_SYSTEM, prefixed_messages
+from utils.provider_health import ProviderUnavailableError, get_provider_health
+from utils.shortlist import category_quotas
+from config.config import Config
 
 import numpy as np
-from sklearn.cluster import DBSCAN
 
 class SearchAgent(BaseAgent):
     """
@@ -17,9 +22,20 @@ class SearchAgent(BaseAgent):
     그 설계를 채울 최적의 장소를 발굴 및 검증하는 전략가 에이전트.
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        search_tool: Optional[TavilySearchTool] = None,
+        gmaps: Any = None
+    ):
+        """
+        Args:
+            config: Agent 설정
+            search_tool: 공유할 TavilySearchTool (None이면 새로 생성)
+            gmaps: 공유할 googlemaps.Client (None이면 새로 생성)
+        """
         super().__init__(name="SearchAgent", config=config)
-        self.search_tool = TavilySearchTool(config=config)
+        self.search_tool = search_tool or TavilySearchTool(config=config)
         
         # 1. config에서 먼저 찾고, 없으면 os.environ에서 직접 찾음
         self.openai_api_key = self.config.get("openai_api_key") or os.getenv("OPENAI_API_KEY")
@@ -30,8 +46,17 @@ class SearchAgent(BaseAgent):
         if not self.google_maps_api_key:
             raise ValueError("GOOGLE_MAPS_API_KEY가 설정되지 않았습니다. .env 파일이나 환경변수를 확인하세요.")
         
-        self.client = AsyncOpenAI(api_key=self.openai_api_key)
-        self.gmaps = googlemaps.Client(key=self.google_maps_api_key)
+        if gmaps is None:
+            import googlemaps
+            gmaps = googlemaps.Client(key=self.google_maps_api_key)
+        self.gmaps = gmaps
+        # provider 상태 레지스트리 (Tavily/Google 장애 시 타임아웃을 기다리지 않고 건너뜀)
+        self._health = get_provider_health()
+
+    @property
+    def client(self):
+        """현재 이벤트 루프의 공용 AsyncOpenAI 클라이언트 (Agent를 여러 요청/루프에서 공유하므로 루프별로 조회)"""
+        return get_http_registry().get_openai_client(self.openai_api_key)
 
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """전략 수립 -> 행동 분해 -> 검색 -> 구글 검증 -> 후보 풀 반환"""
@@ -41,6 +66,12 @@ class SearchAgent(BaseAgent):
         theme = input_data.get("theme")
         location = input_data.get("location")
         
+        # 장소 후보 수집 provider가 모두 차단된 상태면 LLM 호출 전에 바로 실패 반환
+        if self._health.is_open("tavily", "search"):
+            return {"success": False, "error": "Tavily 검색 서비스를 일시적으로 사용할 수 없습니다. 잠시 후 다시 시도해주세요."}
+        if self._health.is_open("google", "places"):
+            return {"success": False, "error": "Google Places 서비스를 일시적으로 사용할 수 없습니다. 잠시 후 다시 시도해주세요."}
+        
         # [수정] 사용자 요청 지역의 행정구역 정보 미리 분석
         print(f"\n📍 [Step 1-1] 사용자 요청 지역 분석: '{location}'")
         target_city, target_gu = self._get_target_admin_areas(location)
@@ -184,7 +215,7 @@ class SearchAgent(BaseAgent):
                 seen_names.add(g_name)
 
 
-        print(f"\n🧠 [Step 3-4] 최적의 20개 장소 선별 중... (이동수단: {input_data.get('transportation')})")
+        print(f"\n🧠 [Step 3-4] 최적의 {Config.SEARCH_CANDIDATE_POOL_SIZE}개 장소 선별 중... (이동수단: {input_data.get('transportation')})")
         final_pool = self.select_best_20_candidates(candidate_pool_raw, input_data.get('transportation'))
         print(f"✅ 최종 선별 완료: {len(final_pool)}개 장소를 PlanningAgent로 전달합니다.") 
 
@@ -221,28 +252,38 @@ class SearchAgent(BaseAgent):
         if not raw_data: return []
         
         # 1. 배치 크기 설정 (속도 최적화: 6 -> 8로 증가, 정확도 유지)
-        BATCH_SIZE = 8
-        batches = [raw_data[i:i + BATCH_SIZE] for i in range(0, len(raw_data), BATCH_SIZE)]
-        total_batches = len(batches)
-        
-        print(f"   🚀 총 {len(raw_data)}개 데이터를 {total_batches}개 배치로 '병렬' 마이닝 시작...")
-        
-        # 2. [핵심] 비동기 태스크 리스트 생성
-        # 각 배치를 처리하는 함수를 실행 예약(Task) 상태로 만듭니다.
-        tasks = [
-            self._process_batch(batch_data, location, i + 1, total_batches)
-            for i, batch_data in enumerate(batches)
-        ]
-        
-        # 3. [핵심] 동시에 실행 및 결과 수집
-        # asyncio.gather는 모든 태스크가 끝날 때까지 기다렸다가 결과 리스트를 반환합니다.
-        batch_results_list = await asyncio.gather(*tasks)
-        
-        # 4. 결과 통합
-        all_results = []
-        for batch_results in batch_results_list:
-            if batch_results:
-                all_results.extend(batch_results)
+        BATCH_SIZE = Config.EXTRACTION_BATCH_SIZE
+        
+        if Config.EXTRACTION_BATCHING:
+            # 동시에 검색 중인 다른 요청(같은 지역)의 데이터와 묶어 꽉 찬 배치로 처리
+            print(f"   🚀 총 {len(raw_data)}개 데이터를 추출 배처로 전달 (다른 요청과 함께 '병렬' 마이닝)...")
+            all_results = await get_extraction_batcher().submit(
+                location,
+                raw_data,
+                lambda batch_data, batch_num, total_batches: self._process_batch(batch_data, location, batch_num, total_batches)
+            )
+        else:
+            batches = [raw_data[i:i + BATCH_SIZE] for i in range(0, len(raw_data), BATCH_SIZE)]
+            total_batches = len(batches)
+            
+            print(f"   🚀 총 {len(raw_data)}개 데이터를 {total_batches}개 배치로 '병렬' 마이닝 시작...")
+            
+            # 2. [핵심] 비동기 태스크 리스트 생성
+            # 각 배치를 처리하는 함수를 실행 예약(Task) 상태로 만듭니다.
+            tasks = [
+                self._process_batch(batch_data, location, i + 1, total_batches)
+                for i, batch_data in enumerate(batches)
+            ]
+            
+            # 3. [핵심] 동시에 실행 및 결과 수집
+            # asyncio.gather는 모든 태스크가 끝날 때까지 기다렸다가 결과 리스트를 반환합니다.
+            batch_results_list = await asyncio.gather(*tasks)
+            
+            # 4. 결과 통합
+            all_results = []
+            for batch_results in batch_results_list:
+                if batch_results:
+                    all_results.extend(batch_results)
         
         # 5. 중복 제거 (이름과 URL 기준)
         unique_results = []
@@ -258,66 +299,18 @@ class SearchAgent(BaseAgent):
     
     async def _process_batch(self, batch_data: List[Dict], location: str, batch_num: int, total_batches: int) -> List[Dict]:
         """배치 데이터 처리"""
-        prompt = f"""
-        당신은 방대한 웹 데이터를 분석하여 가치 있는 장소 정보만 골라내는 '여행 정보 마이닝 전문가'입니다. 
-        제공된 {len(batch_data)}개의 검색 결과(배치 {batch_num}/{total_batches})에서 {location} 지역의 진짜 '장소명'을 추출하고 분류하세요.
-
-        [임무 1: 데이터 정제 및 중복 제거 (필수)]
-        - 동일한 장소가 여러 검색 결과에 나타날 경우, 가장 정보가 알찬 하나의 결과로 통합하세요.
-        - 수식어와 일반 명사를 제거한 '순수 상호명'만 남기세요. (예: '성수동 핫플 카페 어니언' -> '어니언')
-        - 한 포스팅/기사에 여러 장소(예: 혜화 맛집 5곳 리스트)가 있다면 **반드시 모든 장소를 개별적으로 추출**하세요.
-
-        [임무 2: 엄격한 필터링]
-        - '맛집', '코스', '여행지', '데이트 장소'와 같은 일반 명칭은 장소명에서 제외하세요.
-        - 구글 지도에서 검색했을 때 정확히 위치가 나올 법한 고유 명사여야 합니다.
-        - '관광객이 직접 방문하여 시간을 보낼 수 있는 실체가 있는 장소'만 추출하세요.
-        - 제외 대상: 부동산, 추진위원회, 아파트 단지명, 단순 지역명, 공공기관, 기업 사무실.
-
-        [임무 3: 카테고리 분류 지침 (범용)]
-        아래 리스트 중 가장 적합한 하나를 선택하세요: [식당, 카페, 활동, 쇼핑, 숙소, 관광지, 기타]
-        - 식당: 밥집, 레스토랑, 주점, 요리 중심 공간
-        - 카페: 커피, 디저트, 베이커리, 찻집
-        - 활동: 연극, 뮤지컬, 소극장, 방탈출, 공방, 전시회, 원데이클래스, 팝업스토어, 스크린스포츠 등 '체험' 중심 공간.
-        - 관광지: 공원, 해수욕장, 유적지, 랜드마크 등 '관람/풍경' 중심 공간.
-        - 쇼핑: 편집샵, 소품샵, 백화점 등 물건 구매 공간.
-        - 출처: 해당 장소가 언급된 데이터의 'url' 필드 값을 정확히 매칭하세요.
-
-        [임무 4: 전수 조사 명령 (중요)]
-        - 제공된 데이터를 절대로 대충 훑지 마세요. 
-        - 각 본문 텍스트를 끝까지 읽고 숨겨진 장소명을 모두 찾아내세요.
-        - 결과가 많아도 좋으니 누락되는 장소가 없게 하는 것이 최우선입니다.
-
-        [분석할 데이터]
-        각 데이터는 다음 형식입니다:
-        - url: 출처 URL
-        - title: 제목 (최대 120자)
-        - snippet: 본문 요약 (최대 900자)
-        
-        {batch_data}
-
-        [응답 형식]
-        **반드시 다음의 JSON 형식만** 출력하세요. 다른 설명이나 텍스트는 포함하지 마세요.
-        
-        ```json
-        {{
-          "results": [
-            {{
-              "name": "장소명",
-              "category": "카테고리",
-              "source_url": "데이터에 제공된 실제 url"
-            }}
-          ]
-        }}
-        ```
-        
-        **중요: JSON 형식만 출력하고, 다른 텍스트는 포함하지 마세요.**
-        """
+        # 고정 규칙/스키마는 system 템플릿(프롬프트 캐싱 대상), 요청별 지역/데이터는 user 메시지
+        prompt = f"""[대상 지역] {location}
+[배치] {batch_num}/{total_batches} (검색 결과 {len(batch_data)}개)
+
+[분석할 데이터]
+{batch_data}"""
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await cached_chat_completion(
+                self.client, "search.batch", priority="background",
                 model=self.llm_model,
-                messages=[{"role": "system", "content": "You are a professional travel data miner who never skips info. Output only JSON."},
-                          {"role": "user", "content": prompt}],
+                messages=prefixed_messages(SEARCH_BATCH_SYSTEM, prompt),
                 max_tokens=1500,  # 장소명 리스트 추출에는 1500 토큰으로 충분 (입력 토큰 여유 확보)
                 temperature=0.3  # 일관된 JSON 형식 유지
             )
@@ -457,47 +450,7 @@ class SearchAgent(BaseAgent):
                     print(f"      ⚠️  배치 {batch_num}가 너무 작아도 실패. 건너뜁니다.")
                     return []
             
-            # Rate limit 오류 처리
-            elif "rate_limit" in error_msg.lower() or "429" in error_msg:
-                print(f"      ⚠️  배치 {batch_num} 처리 중 토큰 제한 초과. 잠시 대기 후 재시도...")
-                import asyncio
-                await asyncio.sleep(3)  # 3초 대기
-                # 재시도
-                try:
-                    response = await self.client.chat.completions.create(
-                        model=self.llm_model,
-                        messages=[{"role": "system", "content": "You are a professional travel data miner who never skips info. Output only JSON."},
-                                  {"role": "user", "content": prompt}],
-                        max_tokens=1500,
-                        temperature=0.3
-                    )
-                    response_content = response.choices[0].message.content.strip()
-                    
-                    if "```json" in response_content:
-                        json_start = response_content.find("```json") + 7
-                        json_end = response_content.find("```", json_start)
-                        if json_end == -1:
-                            json_end = len(response_content)
-                        response_content = response_content[json_start:json_end].strip()
-                    elif "```" in response_content:
-                        json_start = response_content.find("```") + 3
-                        json_end = response_content.find("```", json_start)
-                        if json_end == -1:
-                            json_end = len(response_content)
-                        response_content = response_content[json_start:json_end].strip()
-                    
-                    json_start_idx = response_content.find("{")
-                    json_end_idx = response_content.rfind("}") + 1
-                    if json_start_idx != -1 and json_end_idx > json_start_idx:
-                        response_content = response_content[json_start_idx:json_end_idx]
-                    
-                    data = json.loads(response_content)
-                    results = data.get("results", [])
-                    print(f"      ✅ 배치 {batch_num} 재시도 성공: {len(results)}개 장소 추출")
-                    return results
-                except Exception as retry_e:
-                    print(f"      ⚠️  배치 {batch_num} 재시도 실패: {str(retry_e)[:100]}")
-                    return []
+            # 그 외 오류는 건너뜀 (429는 LLM 스케줄러가 Retry-After만큼 전체 호출을 멈추고 재시도한 뒤의 실패)
             else:
                 print(f"      ⚠️  배치 {batch_num} 처리 중 오류: {error_msg[:150]}")
                 return []  
@@ -509,59 +462,16 @@ class SearchAgent(BaseAgent):
         """
         [최종 고도화] 시스템 표준 카테고리와 전략을 일치시켜 데이터 유실을 방지함.
         """
-        # 시스템에서 정의한 7개 표준 카테고리 (Step 3의 분류와 일치시켜야 함)
-        valid_categories = ["식당", "카페", "활동", "쇼핑", "숙소", "관광지", "기타"]
-
-        prompt = f"""
-        당신은 베테랑 여행 설계자입니다. 사용자의 테마를 분석하여 최적의 '코스 구조'를 설계하고, 각 구조를 채울 검색 전략을 수립하세요.
-
-        [사용자 입력]
-        - 테마: {theme}
-        - 지역: {location}
-
-        [임무]
-        1. 이 테마에 필요한 '행동 타입(Action Types)'을 3가지 분석하세요. 
-        2. 각 행동을 만족하기 위해 아래 [표준 카테고리 리스트] 중 가장 적합한 카테고리를 하나씩 매칭하세요.
-           - 표준 카테고리: {valid_categories}
-        
-        3. 각 단계별로 Tavily 검색을 위한 '최적화된 검색 쿼리'와 그 쿼리를 선정한 '판단 근거(reasoning)'를 생성하세요.
-           (팁: '추천', '리스트', '리뷰', '베스트' 같은 단어를 섞어야 구체적인 가게 이름이 잘 나옵니다.)
-
-        [응답 형식]
-        **반드시 다음의 JSON 형식만** 출력하세요. 다른 설명이나 텍스트는 포함하지 마세요.
-        
-        ```json
-        {{
-          "action_analysis": "행동 타입 분석 요약",
-          "course_structure": [
-            {{
-              "step": 1, 
-              "category": "위 표준 리스트 중 하나", 
-              "search_query": "파워 키워드가 포함된 검색어", 
-              "reasoning": "이 쿼리를 선정한 이유"
-            }},
-            {{
-              "step": 2, 
-              "category": "위 표준 리스트 중 하나", 
-              "search_query": "파워 키워드가 포함된 검색어", 
-              "reasoning": "이 쿼리를 선정한 이유"
-            }},
-            {{
-              "step": 3, 
-              "category": "위 표준 리스트 중 하나", 
-              "search_query": "파워 키워드가 포함된 검색어", 
-              "reasoning": "이 쿼리를 선정한 이유"
-            }}
-          ]
-        }}
-        ```
-        
-        **중요: JSON 형식만 출력하고, 다른 텍스트는 포함하지 마세요.**
-        """
+        # 표준 카테고리(식당, 카페, 활동, 쇼핑, 숙소, 관광지, 기타)와 규칙은 고정 템플릿에 포함 (Step 3의 분류와 일치)
+        prompt = f"""[사용자 입력]
+- 테마: {theme}
+- 지역: {location}"""
         try:
-            response = await self.client.chat.completions.create(
+            # 같은 테마/지역이면 같은 전략을 재사용 (기본 온도지만 결정적으로 취급)
+            response = await cached_chat_completion(
+                self.client, "search.strategy", force=True,
                 model=self.llm_model,
-                messages=[{"role": "user", "content": prompt}]
+                messages=prefixed_messages(SEARCH_STRATEGY_SYSTEM, prompt)
             )
             
             # 응답에서 JSON 추출
@@ -659,6 +569,19 @@ class SearchAgent(BaseAgent):
             
         return clean_name
     
+    def _call_gmaps(self, endpoint: str, func, *args, **kwargs) -> Any:
+        """Google Maps 클라이언트 동기 호출 + 상태 레지스트리 기록 (서킷 open이면 ProviderUnavailableError)"""
+        if not self._health.allow("google", endpoint):
+            raise ProviderUnavailableError(f"Google {endpoint} 서킷 open")
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._health.record_failure("google", endpoint, time.monotonic() - started, error=e)
+            raise
+        self._health.record_success("google", endpoint, time.monotonic() - started)
+        return result
+
     def _get_google_data(self, name: str, location: str) -> Optional[Dict]:
         """Google Places API 검증 - 기존 코드 기반에 address_components, types, geometry 추가"""
         
@@ -666,7 +589,7 @@ class SearchAgent(BaseAgent):
             search_name = self._clean_place_name(name)
             query = f"{location} {search_name}"
             
-            res = self.gmaps.places(query=query)
+            res = self._call_gmaps("places", self.gmaps.places, query=query)
             if not res.get('results'):
                 return None
 
@@ -698,7 +621,7 @@ class SearchAgent(BaseAgent):
                 'name', 'rating', 'user_ratings_total', 'formatted_address', 
                 'photo', 'type', 'address_component', 'geometry/location'
             ]
-            details_result = self.gmaps.place(place_id, fields=fields)
+            details_result = self._call_gmaps("places", self.gmaps.place, place_id, fields=fields)
             
             if not details_result or not details_result.get('result'):
                 return None
@@ -736,7 +659,7 @@ class SearchAgent(BaseAgent):
         """[FINAL v4] Geocode 실패 시 LLM으로 상위 지역을 추론합니다."""
         try:
             # 1. Geocoding 우선 시도
-            geocode_result = self.gmaps.geocode(location_name)
+            geocode_result = self._call_gmaps("geocode", self.gmaps.geocode, location_name)
             if geocode_result:
                 # _parse_admin_areas_from_components는 별도 헬퍼 함수로 존재해야 함
                 city, gu = self._parse_admin_areas_from_components(geocode_result[0]['address_components'])
@@ -858,11 +781,12 @@ class SearchAgent(BaseAgent):
         """
         [최종 로직] 40개 후보 -> 최적의 20개 정제
         프론트엔드 다중 선택(도보, 지하철, 기타 등) 완벽 호환 버전
+        (후보 수는 SEARCH_CANDIDATE_POOL_SIZE로 조정, 넓은 검색은 PlanningAgent가 다시 1차 선별)
         """
-        TARGET_COUNT = 20
+        TARGET_COUNT = Config.SEARCH_CANDIDATE_POOL_SIZE
         
-        # 쿼터제 설정 (쇼핑 포함)
-        QUOTAS = {"식당": 5, "카페": 5, "활동": 4, "관광지": 4, "쇼핑": 2}
+        # 쿼터제 설정 (쇼핑 포함, 20개 기준 식당 5 / 카페 5 / 활동 4 / 관광지 4 / 쇼핑 2를 후보 수에 비례 조정)
+        QUOTAS = category_quotas(TARGET_COUNT)
         
         # ---------------------------------------------------------
         # 1. 이동수단 판단 로직 (프론트엔드 호환 강화)
@@ -892,6 +816,8 @@ class SearchAgent(BaseAgent):
         if len(coords) < 10:
             return self._apply_quota_and_score(candidates, TARGET_COUNT, QUOTAS)
 
+        from sklearn.cluster import DBSCAN # 지역 import
+        
         # DBSCAN 설정 (도보: 1.2km / 자전거 포함 시 약간 더 넓혀도 되지만 안전하게 1.5km 유지)
         kms_per_radian = 6371.0088
         epsilon = 1.5 / kms_per_radian 
@@ -1,35 +1,52 @@
 import asyncio
+import atexit
 import threading
 import json
 import os
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file, Response, stream_with_context
 from flask_cors import CORS
 from chatbot import get_chatbot_response, clear_chat_history, parse_course_update  # chatbot.py가 course 객체를 인자로 받도록 수정 필요
-from agents import SearchAgent, PlanningAgent
 from config.config import Config
+from utils.http_client import get_http_registry, run_async
+from utils.services import get_services
 import uuid
-import googlemaps
-    
-from PIL import Image, ImageDraw, ImageFont
 import io # 메모리 상에서 이미지를 다루기 위함
+# PIL은 사용하는 라우트 안에서 import (서버 시작 시간 단축)
 
 app = Flask(__name__)
 app.secret_key = 'string_secret_key'
 CORS(app)
 
+# 프로세스 종료 시 남아 있는 공용 HTTP 세션 정리
+atexit.register(get_http_registry().close_all)
+
 # 여러 사용자의 작업 상태와 결과를 저장하는 '개인 사물함'
 agent_tasks = {}
+# 작업 상태가 바뀌면 이벤트 스트림(/events/<task_id>)을 깨우기 위한 조건 변수
+task_events = threading.Condition()
+
+def notify_task_event():
+    """이벤트 스트림 대기 중인 요청 깨우기"""
+    with task_events:
+        task_events.notify_all()
+
+def append_description(task_id, text):
+    """생성 중인 코스 설명 조각을 작업 상태에 이어 붙이고 이벤트 스트림에 알림"""
+    task = agent_tasks.get(task_id)
+    if task is not None:
+        task["description_preview"] = task.get("description_preview", "") + text
+        notify_task_event()
 
 async def execute_Agents(task_id, input_data):
     global agent_tasks
-    config = Config.get_agent_config()
 
     try:
         # 1. 검색 단계 시작 알림
         agent_tasks[task_id]["message"] = f"🔍 '{input_data['location']}' 지역의 '{input_data['theme']}' 테마를 분석 중입니다..."
         print(f"[{task_id}] 검색 시작")
 
-        search_agent = SearchAgent(config=config)
+        # Agent/Tool은 프로세스 전역 서비스 컨테이너에서 재사용 (연결 풀/캐시 유지)
+        search_agent = get_services().search_agent()
         search_input = {
             "theme": input_data["theme"],
             "location": input_data["location"]
@@ -220,7 +237,7 @@ async def execute_Agents(task_id, input_data):
         print("🧠 [Step 2] PlanningAgent: 코스 제작 중...")
         print()
         
-        planning_agent = PlanningAgent(config=config)
+        planning_agent = get_services().planning_agent()
         
         # 사용자 선호도 구성
         user_preferences = {
@@ -241,11 +258,15 @@ async def execute_Agents(task_id, input_data):
                 "end_time": "20:00",
                 "total_duration": 360  # 6시간
             }
+        # 완료 후 경로 검증(prefetch_post_planning)에서 가용 시간 판단에 사용
+        agent_tasks[task_id]["time_constraints"] = time_constraints
         
         planning_input = {
             "places": places,
             "user_preferences": user_preferences,
-            "time_constraints": time_constraints
+            "time_constraints": time_constraints,
+            # 코스 설명이 생성되는 동안 조각 단위로 이벤트 스트림에 전달
+            "on_description": lambda text: append_description(task_id, text)
         }
         
         # PlanningAgent 입력 검증 및 누락 정보 확인
@@ -349,15 +370,153 @@ async def execute_Agents(task_id, input_data):
 
         # 최종 결과를 사용자 사물함에 저장
         agent_tasks[task_id].update({"done": True, "success": True, "course": final_course, "message": "완료되었습니다."})
+        notify_task_event()
+        
+        # 사용자에게 코스를 먼저 보여주고, 다음 화면(경로 안내 / 여행 카드)은 미리 준비
+        await prefetch_post_planning(task_id)
 
     except Exception as e:
         print(f"\n❌ [{task_id}] 에이전트 실행 중 오류 발생: {str(e)}")
         import traceback
         traceback.print_exc()
         agent_tasks[task_id].update({"done": True, "success": False, "error": str(e), "message": f"오류 발생: {str(e)}"})
+        notify_task_event()
         
+def build_routing_input(task, course):
+    """
+    코스 순서대로 RoutingAgent 입력 생성 (경로 안내 API와 완료 후 미리 계산에서 공용)
+    
+    Returns:
+        routing_input 딕셔너리 (places, mode, optimize_waypoints, preferred_modes, user_transportation, departure_time)
+    """
+    import re
+    
+    places = course.get('places', [])
+    sequence = course.get('sequence', [])
+    transportation = course.get('transportation', '도보')
+    visit_date = course.get('visit_date') or task.get('visit_date')
+    visit_time_segment = task.get('visit_time') or '오후'
+    
+    # transportation 문자열에서 이동 수단 추출 (우선순위: 대중교통 > 자동차 > 도보)
+    # 사용자가 입력한 교통수단을 우선적으로 사용 (자전거는 완전히 제외)
+    transport_mode = 'walking'  # 기본값
+    preferred_modes = []
+    transit_keywords = ['지하철', '버스', '대중교통', '대중 교통']
+    
+    # 사용자가 입력한 교통수단 우선순위대로 추출 (자전거 제외)
+    if any(keyword in transportation for keyword in transit_keywords):
+        preferred_modes.append('transit')
+    if '자동차' in transportation:
+        preferred_modes.append('driving')
+    if '도보' in transportation:
+        preferred_modes.append('walking')
+    # 자전거는 완전히 제외됨
+    
+    # 사용자가 입력한 교통수단이 있으면 첫 번째 것을 사용
+    # 단, 대중교통(transit)이 포함되어 있으면 무조건 transit을 primary로 설정
+    if preferred_modes:
+        # transit이 포함되어 있으면 transit을 우선 사용 (T Map API는 대중교통 미지원)
+        if 'transit' in preferred_modes:
+            transport_mode = 'transit'
+            print(f"🚇 대중교통 포함 감지: transit 모드로 설정 (T Map API는 대중교통 미지원)")
+        else:
+            transport_mode = preferred_modes[0]
+    
+    # sequence 순서대로 장소 재배열
+    ordered_places = []
+    for place_idx in sequence:
+        if place_idx < len(places):
+            ordered_places.append(places[place_idx])
+    
+    # 사용자가 입력한 시작일/시간을 기반으로 출발 일시(대중교통 기준)를 계산
+    # visit_date 예시: "2026-02-01" 또는 "2026-02-01 ~ 2026-02-02"
+    # visit_time_segment 예시: "오전", "오후", "저녁", "하루종일", "기타(08:00 - 12:00)"
+    departure_time_str = None
+    try:
+        if visit_date:
+            # 날짜 범위인 경우 첫 번째 날짜 사용
+            first_date = visit_date.split("~")[0].strip()
+            # 시간대에 따른 기본 시작 시간 설정
+            if "기타" in str(visit_time_segment):
+                # "기타(08:00 - 12:00)" 형식에서 첫 번째 시각 추출
+                m = re.search(r"(\d{2}:\d{2})", str(visit_time_segment))
+                start_hm = m.group(1) if m else "10:00"
+            elif "오전" in str(visit_time_segment):
+                start_hm = "10:00"
+            elif "저녁" in str(visit_time_segment):
+                start_hm = "18:00"
+            elif "하루종일" in str(visit_time_segment):
+                start_hm = "09:00"
+            else:  # 기본: 오후
+                start_hm = "14:00"
+            departure_time_str = f"{first_date} {start_hm}"
+    except Exception:
+        departure_time_str = None
+    
+    # 사용자가 입력한 교통수단 리스트 (우선순위 순서, 자전거 완전히 제외)
+    user_transport_modes = [m for m in (preferred_modes or [transport_mode]) if m != 'bicycling']
+    
+    return {
+        "places": ordered_places,
+        "mode": user_transport_modes[0] if user_transport_modes else 'walking',  # 첫 번째 우선 교통수단
+        "optimize_waypoints": False,  # sequence 순서 유지
+        "preferred_modes": user_transport_modes,  # 대안 교통수단 리스트
+        "user_transportation": transportation,  # 원본 입력값
+        "departure_time": departure_time_str,  # 사용자가 입력한 시작일/시간 기반 출발 일시
+    }
+
+def card_cache_key(course_data):
+    """여행 카드 이미지에 그려지는 내용 (지역, 테마, 순서대로의 장소 이름)"""
+    places = course_data.get('places', [])
+    names = tuple(places[i].get('name', '') for i in course_data.get('sequence', []) if i < len(places))
+    return (course_data.get("location", ""), course_data.get("theme", "추천 코스"), names)
+
+async def prefetch_post_planning(task_id):
+    """
+    코스 완료(done) 이후 경로 안내 Directions와 여행 카드 이미지를 동시에 미리 준비
+    결과는 만들 때의 입력과 함께 저장하고, 코스가 수정되어 입력이 달라지면 각 API가 새로 계산합니다.
+    미리 계산한 경로 안내로 course["route_validation"](최종 코스 실측 경로 검증)도 채웁니다.
+    실패해도 코스 결과에는 영향이 없습니다.
+    """
+    import copy
+    
+    if not Config.POST_PLANNING_PREFETCH:
+        return
+    task = agent_tasks.get(task_id) or {}
+    course = task.get('course') or {}
+    
+    async def prefetch_route():
+        if not Config.get_agent_config().get("google_maps_api_key"):
+            return
+        routing_input = build_routing_input(task, course)
+        if len(routing_input["places"]) < 2:
+            return
+        snapshot = copy.deepcopy(routing_input)
+        route_result = await get_services().routing_agent().execute(routing_input)
+        if route_result.get("success"):
+            task["prefetched_route"] = {"input": snapshot, "result": route_result}
+        # 미리 계산한 경로 안내가 곧 최종 코스의 실측 경로 검증 (구간 이동 시간 상한/가용 시간 초과 표시)
+        course["route_validation"] = get_services().course_tool().summarize_route_validation(
+            route_result, snapshot["mode"], course.get("estimated_duration"), task.get("time_constraints")
+        )
+        for warning in course["route_validation"]["warnings"]:
+            print(f"🚧 [{task_id}] 경로 검증 경고: {warning}")
+    
+    async def prefetch_card():
+        key = card_cache_key(course)
+        png = await asyncio.get_running_loop().run_in_executor(None, render_travel_card, course)
+        task["prefetched_card"] = {"key": key, "png": png}
+    
+    results = await asyncio.gather(prefetch_route(), prefetch_card(), return_exceptions=True)
+    for name, result in zip(("경로 안내", "여행 카드"), results):
+        if isinstance(result, Exception):
+            print(f"⚠️ [{task_id}] {name} 미리 준비 실패 (요청 시 새로 계산): {result}")
+    print(f"📦 [{task_id}] 완료 후 미리 준비: 경로 안내 {'O' if task.get('prefetched_route') else 'X'}, "
+          f"여행 카드 {'O' if task.get('prefetched_card') else 'X'}")
+
 def run_agent_task_with_id(task_id, input_data):
-    asyncio.run(execute_Agents(task_id, input_data))
+    # 파이프라인 종료 시 해당 이벤트 루프의 공용 HTTP 세션까지 정리
+    run_async(execute_Agents(task_id, input_data))
 
 @app.route('/api/create-trip', methods=['POST'])
 def create_trip():
@@ -378,6 +537,7 @@ def create_trip():
         "success": False,
         "course": None,
         "message": "🚀 여행 생성 작업을 시작합니다...",
+        "description_preview": "",  # 스트리밍으로 생성 중인 코스 설명
         # 나중에 경로 계산 시 사용할 방문 일시 정보도 함께 저장
         "visit_date": input_data_from_react.get("visit_date"),
         "visit_time": input_data_from_react.get("visit_time"),
@@ -398,6 +558,55 @@ def status(task_id):
         "message": task_status.get("message", "로딩 중...") # 현재 진행 상황 메시지
     })
 
+@app.route("/events/<task_id>")
+def task_event_stream(task_id):
+    """
+    여행 생성 이벤트 스트림 (Server-Sent Events)
+    - status: 진행 메시지가 바뀌거나 완료되면 /status와 같은 내용
+    - description: 생성 중인 코스 설명 조각 {"delta": ...}, 완료 시 최종 설명 {"text": ..., "final": true}
+    """
+    if task_id not in agent_tasks:
+        return jsonify({"error": "유효하지 않은 taskId입니다."}), 404
+    
+    def sse(event, data):
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    def generate():
+        last_message = None
+        sent = 0
+        while True:
+            task_status = agent_tasks.get(task_id, {})
+            done = task_status.get("done", False)
+            preview = task_status.get("description_preview", "")
+            if len(preview) > sent:
+                yield sse("description", {"delta": preview[sent:]})
+                sent = len(preview)
+            if done and task_status.get("success"):
+                course = task_status.get("course") or {}
+                yield sse("description", {"text": course.get("course_description", preview), "final": True})
+            message = task_status.get("message", "로딩 중...")
+            if message != last_message or done:
+                last_message = message
+                yield sse("status", {
+                    "done": done,
+                    "success": task_status.get("success", False),
+                    "error": task_status.get("error"),
+                    "message": message
+                })
+            if done:
+                break
+            with task_events:
+                # 확인한 뒤 바뀐 내용이 없을 때만 대기 (알림은 락 안에서 보내므로 놓치지 않음)
+                task_status = agent_tasks.get(task_id, {})
+                if len(task_status.get("description_preview", "")) == sent and not task_status.get("done"):
+                    task_events.wait(timeout=0.5)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route('/chat-map/<task_id>')
 def chat_page(task_id):
     task = agent_tasks.get(task_id)
@@ -440,8 +649,10 @@ def chat():
             place_name = update_info.get('place_name')
             if place_name:
                 try:
-                    # Google Maps API로 장소 검색
-                    gmaps = googlemaps.Client(key=Config.GOOGLE_MAPS_API_KEY)
+                    # Google Maps API로 장소 검색 (프로세스 전역 클라이언트 재사용)
+                    gmaps = get_services().gmaps_client()
+                    if gmaps is None:
+                        raise ValueError("Google Maps API 키가 설정되지 않았습니다.")
                     location = current_course.get('location', '서울')
                     query = f"{location} {place_name}"
                     
@@ -612,8 +823,22 @@ def get_route_guide(task_id):
     """경로 안내 생성 API"""
     import asyncio
     import re
-    from agents import RoutingAgent
     from config.config import Config
+    from utils import geometry
+    
+    # 경로 좌표 단순화 수준 (full / high / medium / low)
+    request_options = request.get_json(silent=True) or {}
+    simplify_level = str(request_options.get("simplify") or request.args.get("simplify") or geometry.DEFAULT_SIMPLIFY_LEVEL).lower()
+    if simplify_level not in geometry.SIMPLIFY_LEVELS:
+        simplify_level = geometry.DEFAULT_SIMPLIFY_LEVEL
+    simplify_tolerance = geometry.resolve_simplify_tolerance(simplify_level)
+    
+    def encode_path(path=None, encoded=None):
+        """경로 좌표(dict 리스트 또는 인코딩 polyline)를 단순화된 인코딩 polyline으로 변환"""
+        coords = geometry.decode_polyline(encoded) if encoded else geometry.from_latlng_dicts(path)
+        if coords.shape[0] == 0:
+            return ""
+        return geometry.encode_polyline(geometry.simplify(coords, simplify_tolerance))
     
     def clean_html_tags(text):
         """HTML 태그 제거"""
@@ -691,83 +916,18 @@ def get_route_guide(task_id):
     places = course.get('places', [])
     sequence = course.get('sequence', [])
     transportation = course.get('transportation', '도보')
-    visit_date = course.get('visit_date') or task.get('visit_date')
-    visit_time_segment = task.get('visit_time') or '오후'
     
     if not places or not sequence:
         return jsonify({"error": "코스 정보가 없습니다."}), 400
     
-    # 이동 수단을 Google Maps API 모드로 변환 (자전거 제외)
-    mode_mapping = {
-        '도보': 'walking',
-        '자동차': 'driving',
-        '지하철': 'transit',
-        '버스': 'transit'
-    }
-    
-    # transportation 문자열에서 이동 수단 추출 (우선순위: 대중교통 > 자동차 > 도보)
-    # 사용자가 입력한 교통수단을 우선적으로 사용 (자전거는 완전히 제외)
-    transport_mode = 'walking'  # 기본값
-    preferred_modes = []
-    transit_keywords = ['지하철', '버스', '대중교통', '대중 교통']
-    
-    # 사용자가 입력한 교통수단 우선순위대로 추출 (자전거 제외)
-    if any(keyword in transportation for keyword in transit_keywords):
-        preferred_modes.append('transit')
-    if '자동차' in transportation:
-        preferred_modes.append('driving')
-    if '도보' in transportation:
-        preferred_modes.append('walking')
-    # 자전거는 완전히 제외됨
-    
-    # 사용자가 입력한 교통수단이 있으면 첫 번째 것을 사용
-    # 단, 대중교통(transit)이 포함되어 있으면 무조건 transit을 primary로 설정
-    if preferred_modes:
-        # transit이 포함되어 있으면 transit을 우선 사용 (T Map API는 대중교통 미지원)
-        if 'transit' in preferred_modes:
-            transport_mode = 'transit'
-            print(f"🚇 대중교통 포함 감지: transit 모드로 설정 (T Map API는 대중교통 미지원)")
-        else:
-            transport_mode = preferred_modes[0]
-    else:
-        # 입력이 없으면 기본값 사용 (자전거는 제외)
-        transport_mode = 'walking'
-    
-    # sequence 순서대로 장소 재배열
-    ordered_places = []
-    for place_idx in sequence:
-        if place_idx < len(places):
-            ordered_places.append(places[place_idx])
+    # 경로 안내 입력 (이동 수단, sequence 순서의 장소, 출발 일시)
+    routing_input = build_routing_input(task, course)
+    ordered_places = routing_input["places"]
+    transport_mode = routing_input["mode"]
     
     if len(ordered_places) < 2:
         return jsonify({"error": "경로 안내를 생성할 장소가 부족합니다."}), 400
     
-    # 사용자가 입력한 시작일/시간을 기반으로 출발 일시(대중교통 기준)를 계산
-    # visit_date 예시: "2026-02-01" 또는 "2026-02-01 ~ 2026-02-02"
-    # visit_time_segment 예시: "오전", "오후", "저녁", "하루종일", "기타(08:00 - 12:00)"
-    departure_time_str = None
-    try:
-        if visit_date:
-            # 날짜 범위인 경우 첫 번째 날짜 사용
-            first_date = visit_date.split("~")[0].strip()
-            # 시간대에 따른 기본 시작 시간 설정
-            if "기타" in str(visit_time_segment):
-                # "기타(08:00 - 12:00)" 형식에서 첫 번째 시각 추출
-                import re
-                m = re.search(r"(\d{2}:\d{2})", str(visit_time_segment))
-                start_hm = m.group(1) if m else "10:00"
-            elif "오전" in str(visit_time_segment):
-                start_hm = "10:00"
-            elif "저녁" in str(visit_time_segment):
-                start_hm = "18:00"
-            elif "하루종일" in str(visit_time_segment):
-                start_hm = "09:00"
-            else:  # 기본: 오후
-                start_hm = "14:00"
-            departure_time_str = f"{first_date} {start_hm}"
-    except Exception:
-        departure_time_str = None
-
     # 기본 경로 안내 메시지 및 직선 경로 좌표 생성 함수 (API 실패 시에도 사용)
     def create_basic_guide():
         """
@@ -881,11 +1041,13 @@ def get_route_guide(task_id):
             
             guide_text += "\n"
             
-            # 직선 경로 좌표가 있다면 route_paths에 추가
+            # 직선 경로 좌표가 있다면 route_paths에 추가 (인코딩 polyline)
             if path_coords:
                 route_paths.append([
                     {
-                        "path": path_coords
+                        "polyline": encode_path(path_coords),
+                        "travel_mode": "FALLBACK",
+                        "transit_details": None
                     }
                 ])
         
@@ -902,33 +1064,25 @@ def get_route_guide(task_id):
                 basic_guide, basic_paths = create_basic_guide()
                 return jsonify({"guide": basic_guide, "route_paths": basic_paths})
             
-            routing_agent = RoutingAgent(config=config)
-            
-            # 사용자가 입력한 교통수단 리스트 (우선순위 순서, 자전거 완전히 제외)
-            user_transport_modes = preferred_modes if preferred_modes else [transport_mode]
-            # 자전거 완전히 제외
-            user_transport_modes = [m for m in user_transport_modes if m != 'bicycling']
-            
-            # 첫 번째 우선 교통수단 사용
-            primary_mode = user_transport_modes[0] if user_transport_modes else 'walking'
-            
-            routing_input = {
-                "places": ordered_places,
-                "mode": primary_mode,
-                "optimize_waypoints": False,  # sequence 순서 유지
-                "preferred_modes": user_transport_modes,  # 대안 교통수단 리스트
-                "user_transportation": transportation,  # 원본 입력값
-                "departure_time": departure_time_str,  # 사용자가 입력한 시작일/시간 기반 출발 일시
-            }
+            routing_agent = get_services().routing_agent()
             
             # 비동기 실행
             async def run_routing():
                 return await routing_agent.execute(routing_input)
             
+            # 코스 완료 직후 같은 입력으로 미리 계산해 둔 결과가 있으면 재사용
+            prefetched = task.get("prefetched_route")
+            if prefetched and prefetched.get("input") == routing_input:
+                print("📦 미리 계산된 경로 안내 사용")
+                route_result = prefetched["result"]
+            else:
+                route_result = None
+            
             # 이벤트 루프 처리
             try:
-                # 새 이벤트 루프 생성 시도
-                route_result = asyncio.run(run_routing())
+                # 새 이벤트 루프 생성 시도 (종료 시 공용 HTTP 세션 정리)
+                if route_result is None:
+                    route_result = run_async(run_routing())
             except RuntimeError as e:
                 if "asyncio.run() cannot be called from a running event loop" in str(e):
                     # 기존 이벤트 루프 사용
@@ -1071,34 +1225,36 @@ def get_route_guide(task_id):
                 actual_mode = mode_display.get(mode, f"이동 수단: {mode}")
                 guide_text += f"   {actual_mode}\n"
                 
-                # 각 구간별 경로 좌표 정보 수집
+                # 각 구간별 경로 좌표 정보 수집 (step별 인코딩 polyline)
+                # 원본 해상도의 step polyline이 있으면 우선 사용하고, 없으면 path 좌표를 인코딩
                 segment_paths = []
                 for step in steps:
-                    step_path = step.get("path", [])
-                    if step_path and len(step_path) > 0:  # path가 있고 비어있지 않은 경우만
+                    step_polyline = encode_path(step.get("path", []), step.get("polyline"))
+                    if step_polyline:  # 경로가 있는 경우만
                         step_travel_mode = step.get("travel_mode", mode).upper()
                         step_transit_details = step.get("transit_details")
                         segment_paths.append({
-                            "path": step_path,
+                            "polyline": step_polyline,
                             "travel_mode": step_travel_mode,
                             "transit_details": step_transit_details
                         })
                 
-                # T Map API에서 반환한 route_coordinates가 있으면 우선 사용 (더 상세한 경로)
+                # T Map API에서 반환한 구간 전체 polyline이 있으면 추가 (더 상세한 경로)
                 route_coordinates = direction.get("route_coordinates", [])
-                if route_coordinates and len(route_coordinates) > 0:
-                    # route_coordinates를 하나의 경로로 추가
+                route_polyline = direction.get("route_polyline")
+                if route_polyline or route_coordinates:
+                    # 구간 전체 경로를 하나의 경로로 추가
                     segment_paths.append({
-                        "path": route_coordinates,
+                        "polyline": encode_path(route_coordinates, route_polyline),
                         "travel_mode": mode.upper(),
                         "transit_details": None
                     })
                 
                 route_paths.append(segment_paths)
                 
-                # 디버깅: 경로 좌표 정보 로그
-                total_coords_in_segment = sum(len(sp.get("path", [])) for sp in segment_paths)
-                print(f"구간 {i} 경로 좌표 수집: {len(segment_paths)}개 step, 총 {total_coords_in_segment}개 좌표")
+                # 디버깅: 경로 polyline 정보 로그
+                total_chars_in_segment = sum(len(sp.get("polyline", "")) for sp in segment_paths)
+                print(f"구간 {i} 경로 polyline 수집: {len(segment_paths)}개 step, 총 {total_chars_in_segment}자")
                 
                 # 이동 수단별 상세 안내
                 # 원본 directions JSON(raw_steps)을 우선적으로 사용
@@ -1504,17 +1660,18 @@ def get_route_guide(task_id):
                 
                 guide_text += "\n"
             
-            # 경로 좌표 정보와 함께 반환
+            # 경로 polyline 정보와 함께 반환
             total_paths = sum(len(segment) for segment in route_paths)
-            total_coords = sum(
-                sum(len(step.get("path", [])) for step in segment)
+            total_chars = sum(
+                sum(len(step.get("polyline", "")) for step in segment)
                 for segment in route_paths
             )
-            print(f"✅ 경로 안내 생성 완료: {len(route_paths)}개 구간, {total_paths}개 step, 총 {total_coords}개 좌표")
+            print(f"✅ 경로 안내 생성 완료: {len(route_paths)}개 구간, {total_paths}개 step, polyline 총 {total_chars}자 (단순화: {simplify_level})")
             
             return jsonify({
                 "guide": guide_text,
-                "route_paths": route_paths  # 각 구간별 step 경로 좌표 정보
+                "route_paths": route_paths,  # 각 구간별 step 인코딩 polyline 정보
+                "simplify": simplify_level
             })
             
         except Exception as api_error:
@@ -1602,8 +1759,10 @@ def search_place():
         if not query:
             return jsonify({'error': '검색어를 입력해주세요.'}), 400
         
-        # Google Maps API 클라이언트 초기화
-        gmaps = googlemaps.Client(key=Config.GOOGLE_MAPS_API_KEY)
+        # Google Maps API 클라이언트 (프로세스 전역 클라이언트 재사용)
+        gmaps = get_services().gmaps_client()
+        if gmaps is None:
+            return jsonify({'error': 'Google Maps API 키가 설정되지 않았습니다.'}), 500
         
         # Places API로 검색 (텍스트 검색)
         # find_place 또는 places 메서드 사용
@@ -1768,90 +1927,103 @@ def text_wrap(text, font, max_width, draw):
     return lines
 
 
-@app.route('/api/generate-card/<task_id>')
-def generate_travel_card(task_id):
-    course_data = agent_tasks.get(task_id, {}).get('course')
-    if not course_data:
-        return "코스 정보를 찾을 수 없습니다.", 404
+def render_travel_card(course_data):
+    """여행 카드 이미지(PNG 바이트) 생성 (템플릿이 없으면 FileNotFoundError)"""
+    from PIL import Image, ImageDraw, ImageFont
+    
+    # --- [수정] 템플릿 맞춤 설정 (공격적 재조정) ---
+    template = Image.open("static/images/card_template_horizontal.png")
+    IMG_WIDTH, IMG_HEIGHT = template.size
+    PADDING = 90
+    
+    draw = ImageDraw.Draw(template)
+    font_path = "static/fonts/GowunDodum-Regular.ttf"
 
-    try:
-        # --- [수정] 템플릿 맞춤 설정 (공격적 재조정) ---
-        template = Image.open("static/images/card_template_horizontal.png")
-        IMG_WIDTH, IMG_HEIGHT = template.size
-        PADDING = 90
-        
-        draw = ImageDraw.Draw(template)
-        font_path = "static/fonts/GowunDodum-Regular.ttf"
+    # [수정] 폰트 사이즈 대폭 축소
+    title_font = ImageFont.truetype(font_path, size=60)
+    subtitle_font = ImageFont.truetype(font_path, size=34)
+    place_font = ImageFont.truetype(font_path, size=20) # <<< 훨씬 작게
+    
+    # [수정] 간격 대폭 축소
+    line_height = place_font.getbbox("A")[3] * 1.3 # 줄 간격
+    item_gap = 20 # 장소와 장소 사이 간격
 
-        # [수정] 폰트 사이즈 대폭 축소
-        title_font = ImageFont.truetype(font_path, size=60)
-        subtitle_font = ImageFont.truetype(font_path, size=34)
-        place_font = ImageFont.truetype(font_path, size=20) # <<< 훨씬 작게
-        
-        # [수정] 간격 대폭 축소
-        line_height = place_font.getbbox("A")[3] * 1.3 # 줄 간격
-        item_gap = 20 # 장소와 장소 사이 간격
+    # --- 텍스트 그리기 ---
+    
+    # 1. 타이틀 (확 올렸습니다)
+    draw.text((PADDING, 100), course_data.get("location", ""), font=title_font, fill="#333333")
+    draw.text((PADDING, 200), course_data.get("theme", "추천 코스"), font=subtitle_font, fill="#555555")
 
-        # --- 텍스트 그리기 ---
-        
-        # 1. 타이틀 (확 올렸습니다)
-        draw.text((PADDING, 100), course_data.get("location", ""), font=title_font, fill="#333333")
-        draw.text((PADDING, 200), course_data.get("theme", "추천 코스"), font=subtitle_font, fill="#555555")
+    # 2. 2단 목록 로직 (시작 위치 확 올렸습니다)
+    y_start_position = 300 # <<< Y 좌표 대폭 상향
+    y_position = y_start_position
+    
+    sequence = course_data.get('sequence', [])
+    places = course_data.get('places', [])
+    
+    col1_x = PADDING
+    col2_x = IMG_WIDTH / 2 + 40
+    column_break_y = IMG_HEIGHT - 180 # 하단 로고 영역 확보
+    
+    current_column = 1
 
-        # 2. 2단 목록 로직 (시작 위치 확 올렸습니다)
-        y_start_position = 300 # <<< Y 좌표 대폭 상향
-        y_position = y_start_position
-        
-        sequence = course_data.get('sequence', [])
-        places = course_data.get('places', [])
-        
-        col1_x = PADDING
-        col2_x = IMG_WIDTH / 2 + 40
-        column_break_y = IMG_HEIGHT - 180 # 하단 로고 영역 확보
+    for i, place_idx in enumerate(sequence):
+        # 2열로 전환
+        if y_position + line_height > column_break_y and current_column == 1:
+            y_position = y_start_position
+            current_column = 2
+
+        if current_column == 1:
+            number_x = col1_x
+            max_width = col2_x - col1_x - PADDING
+        else:
+            number_x = col2_x
+            max_width = IMG_WIDTH - col2_x - PADDING
         
-        current_column = 1
+        text_x = number_x + 55
 
-        for i, place_idx in enumerate(sequence):
-            # 2열로 전환
-            if y_position + line_height > column_break_y and current_column == 1:
-                y_position = y_start_position
-                current_column = 2
+        # 2열도 꽉 차면 종료
+        if y_position + line_height > column_break_y:
+             draw.text((number_x, y_position), "...", font=place_font, fill="#888888")
+             break
 
-            if current_column == 1:
-                number_x = col1_x
-                max_width = col2_x - col1_x - PADDING
-            else:
-                number_x = col2_x
-                max_width = IMG_WIDTH - col2_x - PADDING
+        if place_idx < len(places):
+            place_name = places[place_idx]['name']
+            draw.text((number_x, y_position), f"{i+1}.", font=place_font, fill="#111111")
+            
+            wrapped_lines = text_wrap(place_name, place_font, max_width, draw)
+            
+            temp_y = y_position
+            for line in wrapped_lines:
+                draw.text((text_x, temp_y), line, font=place_font, fill="#111111")
+                temp_y += line_height
             
-            text_x = number_x + 55
+            y_position = temp_y + item_gap
 
-            # 2열도 꽉 차면 종료
-            if y_position + line_height > column_break_y:
-                 draw.text((number_x, y_position), "...", font=place_font, fill="#888888")
-                 break
 
-            if place_idx < len(places):
-                place_name = places[place_idx]['name']
-                draw.text((number_x, y_position), f"{i+1}.", font=place_font, fill="#111111")
-                
-                wrapped_lines = text_wrap(place_name, place_font, max_width, draw)
-                
-                temp_y = y_position
-                for line in wrapped_lines:
-                    draw.text((text_x, temp_y), line, font=place_font, fill="#111111")
-                    temp_y += line_height
-                
-                y_position = temp_y + item_gap
+    # --- 이미지 파일로 변환 ---
+    img_io = io.BytesIO()
+    template.save(img_io, 'PNG', quality=95)
+    return img_io.getvalue()
 
 
-        # --- 이미지 파일로 변환 및 전송 ---
-        img_io = io.BytesIO()
-        template.save(img_io, 'PNG', quality=95)
-        img_io.seek(0)
+@app.route('/api/generate-card/<task_id>')
+def generate_travel_card(task_id):
+    course_data = agent_tasks.get(task_id, {}).get('course')
+    if not course_data:
+        return "코스 정보를 찾을 수 없습니다.", 404
 
+    try:
+        # 코스 완료 직후 미리 그려 둔 카드가 현재 코스와 같으면 재사용
+        prefetched = agent_tasks.get(task_id, {}).get("prefetched_card")
+        if prefetched and prefetched.get("key") == card_cache_key(course_data):
+            png = prefetched["png"]
+        else:
+            png = render_travel_card(course_data)
+        
+        # --- 이미지 전송 ---
         return send_file(
-            img_io,
+            io.BytesIO(png),
             mimetype='image/png',
             as_attachment=True,
             download_name=f'RoutePick_{course_data.get("location", "")}.png'
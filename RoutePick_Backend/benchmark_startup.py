@@ -0,0 +1,95 @@
+"""
+서버 시작 비용 벤치마크
+새 파이썬 프로세스에서 모듈 import 시간, import 후 RSS, 첫 요청 응답까지 걸린 시간을 측정합니다.
+import 시점에 함께 로드된 무거운 라이브러리(langchain, sklearn, PIL, googlemaps, openai)도 표시합니다.
+
+사용법:
+    python benchmark_startup.py                               # app 모듈 + /api/saved-places 첫 요청
+    python benchmark_startup.py --module tools.course_creation_tool --path ""
+    # 변경 전후 비교 (이전 커밋을 별도 작업 트리로 체크아웃)
+    git worktree add /tmp/routepick-before HEAD~1
+    python benchmark_startup.py --compare /tmp/routepick-before/RoutePick_Backend
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+HEAVY_MODULES = ("langchain", "langchain_openai", "sklearn", "PIL", "googlemaps", "openai")
+
+# 측정용 자식 프로세스 코드 (인자: 모듈 이름, 첫 요청 경로)
+CHILD_CODE = """
+import json, resource, sys, time
+started = time.perf_counter()
+module_name, path = sys.argv[1], sys.argv[2]
+module = __import__(module_name, fromlist=["_"])
+imported = time.perf_counter()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+first_request = None
+status = None
+if path and hasattr(module, "app"):
+    response = module.app.test_client().get(path)
+    status = response.status_code
+    first_request = time.perf_counter() - started
+heavy = sorted(name for name in {heavy} if name in sys.modules)
+print(json.dumps({{"import_s": imported - started, "rss_mb": rss_kb / 1024,
+                  "first_request_s": first_request, "status": status, "heavy": heavy}}))
+"""
+
+
+def measure(directory: str, module: str, path: str) -> dict:
+    """새 프로세스 한 번 실행 결과 (프로세스 시작~첫 응답 wall-clock 포함)"""
+    code = CHILD_CODE.format(heavy=repr(HEAVY_MODULES))
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", code, module, path],
+        cwd=directory, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(f"{directory}: 측정 실패\n{completed.stderr[-2000:]}")
+    result = json.loads(lines[-1])
+    result["process_s"] = wall
+    return result
+
+
+def summarize(label: str, runs: list) -> None:
+    def median(key):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        return statistics.median(values) if values else None
+
+    first_request = median("first_request_s")
+    print(f"\n📊 {label} ({len(runs)}회 중앙값)")
+    print(f"   import 시간:        {median('import_s') * 1000:8.0f} ms")
+    print(f"   import 후 RSS:      {median('rss_mb'):8.1f} MB")
+    if first_request is not None:
+        print(f"   첫 요청까지(모듈):  {first_request * 1000:8.0f} ms (status {runs[-1]['status']})")
+    print(f"   프로세스 전체:      {median('process_s') * 1000:8.0f} ms")
+    print(f"   import 시 로드된 무거운 모듈: {', '.join(runs[-1]['heavy']) or '없음'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import / 첫 요청 시작 비용 측정")
+    parser.add_argument("--module", default="app", help="import할 모듈 (기본: app)")
+    parser.add_argument("--path", default="/api/saved-places", help="첫 요청 경로 (빈 문자열이면 요청 생략)")
+    parser.add_argument("--runs", type=int, default=3, help="반복 횟수")
+    parser.add_argument("--compare", help="비교할 다른 작업 트리의 RoutePick_Backend 경로 (변경 전)")
+    args = parser.parse_args()
+
+    targets = [("현재", os.path.dirname(os.path.abspath(__file__)))]
+    if args.compare:
+        targets.insert(0, ("비교 대상", os.path.abspath(args.compare)))
+
+    for label, directory in targets:
+        runs = [measure(directory, args.module, args.path) for _ in range(args.runs)]
+        summarize(f"{label}: {directory}", runs)
+
+
+if __name__ == "__main__":
+    main()
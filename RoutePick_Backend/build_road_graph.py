@@ -0,0 +1,161 @@
+"""
+오프라인 도로 그래프 전처리 스크립트
+OSM XML 추출본(.osm / .osm.bz2)에서 도보/자동차 도로망을 읽어
+utils.road_graph.RoadGraph용 CSR 그래프(.npz, ALT 랜드마크 포함)를 만듭니다.
+
+사용법:
+    python build_road_graph.py seoul.osm data/seoul_graph.npz --landmarks 8
+
+.osm.pbf 파일은 먼저 XML로 변환합니다:
+    osmium cat seoul.osm.pbf -o seoul.osm
+
+생성한 파일 경로를 환경 변수 OFFLINE_GRAPH_PATH에 지정하면 오프라인 라우팅이 활성화됩니다.
+"""
+
+import argparse
+import bz2
+import re
+import time
+import xml.etree.ElementTree as ET
+
+from utils.road_graph import DRIVE, WALK, RoadGraph
+
+
+# highway 종류별 기본 차량 속도 (km/h, maxspeed 태그가 없을 때)
+DRIVE_SPEED_KMH = {
+    "motorway": 100, "motorway_link": 60,
+    "trunk": 80, "trunk_link": 50,
+    "primary": 60, "primary_link": 40,
+    "secondary": 50, "secondary_link": 40,
+    "tertiary": 40, "tertiary_link": 30,
+    "unclassified": 30, "residential": 30,
+    "living_street": 10, "service": 20,
+}
+# 보행자 통행 불가 highway
+NO_WALK_HIGHWAYS = {"motorway", "motorway_link", "trunk", "trunk_link"}
+# 도보 전용 highway (차량 통행 불가)
+WALK_ONLY_HIGHWAYS = {
+    "footway", "pedestrian", "path", "steps", "track", "cycleway",
+    "bridleway", "corridor", "platform",
+}
+NO_ACCESS = {"no", "private"}
+
+
+def _parse_maxspeed(value: str):
+    match = re.match(r"\s*(\d+(?:\.\d+)?)\s*(mph)?", value or "")
+    if not match:
+        return None
+    speed = float(match.group(1))
+    return speed * 1.609 if match.group(2) else speed
+
+
+def _way_attributes(tags):
+    """way 태그에서 (도보 허용, 차량 허용, 차량 정방향, 차량 역방향, 차량 속도 km/h) 계산"""
+    highway = tags.get("highway")
+    if not highway or tags.get("area") == "yes":
+        return None
+
+    walk = highway not in NO_WALK_HIGHWAYS and tags.get("foot") not in NO_ACCESS
+    if tags.get("access") in NO_ACCESS and tags.get("foot") not in ("yes", "designated", "permissive"):
+        walk = False
+    drive = (
+        highway in DRIVE_SPEED_KMH
+        and tags.get("access") not in NO_ACCESS
+        and tags.get("motor_vehicle") not in NO_ACCESS
+        and tags.get("motorcar") not in NO_ACCESS
+    )
+    if not walk and not drive:
+        return None
+    if highway in WALK_ONLY_HIGHWAYS:
+        drive = False
+
+    oneway = tags.get("oneway", "")
+    if oneway in ("yes", "true", "1") or highway in ("motorway", "motorway_link") or tags.get("junction") == "roundabout":
+        drive_forward, drive_backward = True, False
+    elif oneway == "-1":
+        drive_forward, drive_backward = False, True
+    else:
+        drive_forward, drive_backward = True, True
+
+    speed = _parse_maxspeed(tags.get("maxspeed")) or DRIVE_SPEED_KMH.get(highway, 30)
+    return walk, drive, drive_forward, drive_backward, speed
+
+
+def read_osm(path: str):
+    """OSM XML에서 노드 좌표와 도로 way 목록 읽기"""
+    opener = bz2.open if path.endswith(".bz2") else open
+    node_coords = {}
+    ways = []
+    with opener(path, "rb") as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == "node":
+                node_coords[int(elem.get("id"))] = (float(elem.get("lat")), float(elem.get("lon")))
+                elem.clear()
+            elif elem.tag == "way":
+                tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag")}
+                attributes = _way_attributes(tags)
+                if attributes is not None:
+                    refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+                    ways.append((refs, attributes))
+                elem.clear()
+            elif elem.tag == "relation":
+                elem.clear()
+    return node_coords, ways
+
+
+def build_graph(node_coords, ways) -> RoadGraph:
+    """way 목록을 방향 간선으로 펼쳐 RoadGraph 생성 (사용하는 노드만 남김)"""
+    node_ids = {}
+    lat, lng = [], []
+    edge_u, edge_v, flags, speeds = [], [], [], []
+
+    def node_index(osm_id):
+        index = node_ids.get(osm_id)
+        if index is None:
+            index = len(lat)
+            node_ids[osm_id] = index
+            lat.append(node_coords[osm_id][0])
+            lng.append(node_coords[osm_id][1])
+        return index
+
+    for refs, (walk, drive, drive_forward, drive_backward, speed) in ways:
+        refs = [ref for ref in refs if ref in node_coords]
+        for a, b in zip(refs, refs[1:]):
+            u, v = node_index(a), node_index(b)
+            forward = (WALK if walk else 0) | (DRIVE if drive and drive_forward else 0)
+            backward = (WALK if walk else 0) | (DRIVE if drive and drive_backward else 0)
+            for src, dst, flag in ((u, v, forward), (v, u, backward)):
+                if flag:
+                    edge_u.append(src)
+                    edge_v.append(dst)
+                    flags.append(flag)
+                    speeds.append(speed / 3.6)
+
+    return RoadGraph.from_edges(lat, lng, edge_u, edge_v, flags, drive_speed=speeds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSM XML → 오프라인 라우팅 그래프(.npz)")
+    parser.add_argument("input", help="OSM XML 파일 (.osm 또는 .osm.bz2)")
+    parser.add_argument("output", help="출력 .npz 파일")
+    parser.add_argument("--landmarks", type=int, default=8, help="ALT 랜드마크 수 (0이면 생성 안 함)")
+    args = parser.parse_args()
+
+    started = time.time()
+    print(f"📖 OSM 읽는 중: {args.input}")
+    node_coords, ways = read_osm(args.input)
+    print(f"   노드 {len(node_coords):,}개, 도로 way {len(ways):,}개")
+
+    graph = build_graph(node_coords, ways)
+    print(f"🧱 CSR 그래프: 노드 {graph.num_nodes:,}개, 간선 {graph.num_edges:,}개")
+
+    if args.landmarks > 0:
+        print(f"📍 랜드마크 {args.landmarks}개 계산 중...")
+        graph.build_landmarks(args.landmarks)
+
+    graph.save(args.output)
+    print(f"✅ 저장 완료: {args.output} ({time.time() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,14 @@ import os
 import json
 from openai import OpenAI
 from config.config import Config
+from utils.llm_cache import cached_chat_completion_sync
+from utils.prompt_templates import CHATBOT_SYSTEM
 from typing import List, Dict, Optional
 # from langchain.prompts import PromptTemplate
 
 # OpenAI 클라이언트 초기화 (Config에서 API 키 가져오기)
-client = OpenAI(api_key=Config.OPENAI_API_KEY)
+# 429 재시도는 LLM 스케줄러가 전담하므로 SDK 자체 재시도는 끔
+client = OpenAI(api_key=Config.OPENAI_API_KEY, max_retries=0)
 
 # 대화 히스토리 저장 (task_id별로 관리)
 chat_histories: Dict[str, List[Dict[str, str]]] = {}
@@ -65,64 +68,15 @@ def get_chatbot_response(user_message: str, course: Dict, task_id: str = None) -
     # 코스 정보 포맷팅
     course_info = format_course_info(course)
     
-    # 시스템 프롬프트
-    system_prompt = f"""
-    # 페르소나
-    당신은 현지 지리에 능통한 전문 여행 가이드입니다.
-    
-    # 말투 및 스타일
-    - 친절하고 따뜻한 말투를 사용하세요. "~해요", "~입니다" 같은 존댓말을 사용하세요.
-    - 사용자의 질문에 대해 적극적으로 도와주는 태도를 보이세요.
-    - 적절한 이모지를 사용하여 친근함을 표현하세요 (예: 😊, 🗺️, ⭐, 📍, 🍽️ 등).
-    - 긴 답변은 문단을 나누어 읽기 쉽게 작성하세요.
-    - 절대로 마크다운 볼드 표시(**)를 사용하지 마세요. 강조가 필요할 때는 자연스러운 한국어 표현을 사용하세요.
-    - 모든 답변은 한국어로 작성하세요. 영어 단어는 최대한 피하고, 꼭 필요한 경우에만 사용하세요.
-    - 자연스럽고 구어체에 가까운 한국어를 사용하여 대화하세요.
-    
-    # 전문성
-    - 제공된 코스 정보를 바탕으로 정확한 정보만 답변하세요.
-    - 정확하지 않은 정보에 대해서는 솔직하게 모른다고 답변하세요.
-    - 코스 정보에 없는 내용은 추측하지 마세요.
-    
-    # 대화 방식
-    - 사용자의 이전 질문과 맥락을 고려하여 자연스러운 대화를 이어가세요.
-    - 사용자가 코스에 대해 궁금해하는 부분을 예상하고 도움이 되는 정보를 제공하세요.
-    - 질문이 모호할 경우, 명확히 하기 위한 질문을 던질 수 있습니다.
-    - 대화 중간에 볼드 표시나 특수 기호를 사용하지 말고, 자연스러운 문장으로 작성하세요.
-    
-    # 코스 정보
-    {course_info}
-    
-    # 주의사항
-    - 항상 제공된 코스 정보를 우선적으로 참고하세요.
-    - 사용자가 코스를 수정하거나 변경을 요청하면, 현재 코스 정보를 바탕으로 답변하세요.
-    - 코스에 포함된 장소에 대한 구체적인 정보(주소, 평점, 체류 시간 등)를 제공할 수 있습니다.
-    
-    # 장소 업데이트 기능
-    사용자가 장소를 추가하거나 제거하고 싶어할 때, 응답 끝에 특별한 형식으로 표시하세요:
-    
-    - 장소 추가 요청: 사용자가 "OO 장소 추가해줘", "OO도 포함시켜줘" 같은 요청을 할 때
-    - 장소 제거 요청: 사용자가 "OO 장소 빼줘", "OO 제거해줘" 같은 요청을 할 때
-    
-    장소 변경이 필요한 경우, 응답 끝에 다음 형식으로 추가하세요:
-    
-    [COURSE_UPDATE]
-    {{
-        "action": "add" 또는 "remove",
-        "place_name": "장소 이름",
-        "index": 제거할 경우 순서 번호 (0부터 시작)
-    }}
-    [/COURSE_UPDATE]
-    
-    예시:
-    - "경복궁 추가해줘" → [COURSE_UPDATE]{{"action": "add", "place_name": "경복궁"}}[/COURSE_UPDATE]
-    - "첫 번째 장소 빼줘" → [COURSE_UPDATE]{{"action": "remove", "index": 0}}[/COURSE_UPDATE]
-    
-    주의: 장소 추가 시에는 장소 이름만 제공하면 됩니다. 시스템이 자동으로 검색하여 추가합니다.
-    """
+    # 시스템 프롬프트: 고정 템플릿(프롬프트 캐싱 대상) 뒤에 요청별 코스 정보
+    course_prompt = f"""# 코스 정보
+{course_info}"""
     
     # 대화 히스토리 구성
-    messages = [{"role": "system", "content": system_prompt}]
+    messages = [
+        {"role": "system", "content": CHATBOT_SYSTEM},
+        {"role": "system", "content": course_prompt}
+    ]
     
     # 이전 대화 히스토리 추가 (최근 10개만)
     if task_id and task_id in chat_histories:
@@ -134,7 +88,9 @@ def get_chatbot_response(user_message: str, course: Dict, task_id: str = None) -
     messages.append({"role": "user", "content": user_message})
     
     try:
-        response = client.chat.completions.create(
+        # 온도가 높아 기본적으로 캐시하지 않음 (호출 위치 통계만 집계)
+        response = cached_chat_completion_sync(
+            client, "chatbot", priority="interactive",
             model="gpt-4o-mini",
             messages=messages,
             max_tokens=800,  # 더 긴 답변 허용
@@ -23,14 +23,139 @@ class Config:
 
     # LLM 설정
     LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+    # 호출 위치별 모델 (비어 있으면 LLM_MODEL 또는 Agent 설정의 llm_model)
+    LLM_CALL_SITE_MODELS = {
+        "search.strategy": os.getenv("LLM_MODEL_SEARCH_STRATEGY", ""),
+        "search.batch": os.getenv("LLM_MODEL_SEARCH_BATCH", ""),
+        "course.single_call": os.getenv("LLM_MODEL_COURSE_PLANNING", ""),
+        "course.agent": os.getenv("LLM_MODEL_COURSE_PLANNING", ""),
+        "course.description": os.getenv("LLM_MODEL_COURSE_DESCRIPTION", ""),
+        "chatbot": os.getenv("LLM_MODEL_CHATBOT", ""),
+    }
+    # 지연 SLA 헤지: 호출 위치별 주 모델 지연 p95(상한: SLA 초)를 넘기면 보조 모델로 같은 요청 추가
+    # 보조 모델을 설정해야 켜짐 (주 모델과 같은 모델이면 헤지하지 않음)
+    LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+    LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "")
+    LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_CALL_SITE_SLA_SECONDS = {
+        "search.strategy": float(os.getenv("LLM_SLA_SEARCH_STRATEGY", "10")),
+        "search.batch": float(os.getenv("LLM_SLA_SEARCH_BATCH", "20")),
+        "course.single_call": float(os.getenv("LLM_SLA_COURSE_PLANNING", "30")),
+        "course.description": float(os.getenv("LLM_SLA_COURSE_DESCRIPTION", "25")),
+    }
+    
+    # LLM 응답 캐시 (같은 모델/메시지/파라미터 호출 재사용, 빈 경로면 메모리에만 저장)
+    # LLM_CACHE_MAX_TEMPERATURE보다 온도가 높은 호출은 호출 위치에서 강제하지 않으면 캐시하지 않음
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+    LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))
+    
+    # LLM 호출 스케줄러 (OpenAI 계정 한도: 분당 요청 수 / 분당 토큰 수)
+    LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+    LLM_TPM = float(os.getenv("LLM_TPM", "200000"))
+    LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3"))
+    LLM_DEFAULT_RETRY_AFTER_SECONDS = float(os.getenv("LLM_DEFAULT_RETRY_AFTER_SECONDS", "5"))
+    # LangChain Agent 호출 1회당 추정 토큰 수 (요청 내용을 알 수 없어 고정값으로 차감)
+    LLM_AGENT_TOKEN_ESTIMATE = int(os.getenv("LLM_AGENT_TOKEN_ESTIMATE", "4000"))
     
     # 검색 설정
     DEFAULT_MAX_RESULTS = int(os.getenv("DEFAULT_MAX_RESULTS", "20"))
     DEFAULT_MIN_RATING = float(os.getenv("DEFAULT_MIN_RATING", "4.0"))
+    # 장소 추출 LLM 배치 (동시에 검색 중인 요청의 데이터를 창 시간 동안 모아 배치 크기만큼 묶음)
+    EXTRACTION_BATCHING = os.getenv("EXTRACTION_BATCHING", "true").lower() == "true"
+    EXTRACTION_BATCH_SIZE = int(os.getenv("EXTRACTION_BATCH_SIZE", "8"))
+    EXTRACTION_BATCH_WINDOW_MS = float(os.getenv("EXTRACTION_BATCH_WINDOW_MS", "300"))
+    # 배치 결과를 기다리는 최대 시간 (리더 요청이 중단돼도 다른 요청이 무한정 기다리지 않도록)
+    EXTRACTION_BATCH_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_BATCH_TIMEOUT_SECONDS", "120"))
     
     # Google Maps 설정
     DEFAULT_TRANSPORT_MODE = os.getenv("DEFAULT_TRANSPORT_MODE", "transit")
     
+    # 경로 캐시 설정 (구간 단위 Distance Matrix / Directions 캐시)
+    ROUTE_CACHE_MAX_ENTRIES = int(os.getenv("ROUTE_CACHE_MAX_ENTRIES", "5000"))
+    ROUTE_CACHE_TTL_SECONDS = float(os.getenv("ROUTE_CACHE_TTL_SECONDS", "21600"))
+    # check_routing 구간 캐시 (추정 메모리 상한, 실패 구간 유지 시간)
+    PLANNING_LEG_CACHE_MAX_ENTRIES = int(os.getenv("PLANNING_LEG_CACHE_MAX_ENTRIES", "20000"))
+    PLANNING_LEG_CACHE_MAX_BYTES = int(os.getenv("PLANNING_LEG_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    PLANNING_LEG_CACHE_ERROR_TTL_SECONDS = float(os.getenv("PLANNING_LEG_CACHE_ERROR_TTL_SECONDS", "300"))
+    
+    # 날씨 캐시 설정 (격자 셀 단위 OpenWeather 응답 캐시)
+    WEATHER_GRID_KM = float(os.getenv("WEATHER_GRID_KM", "5"))
+    WEATHER_FORECAST_TTL_SECONDS = float(os.getenv("WEATHER_FORECAST_TTL_SECONDS", "1800"))
+    WEATHER_CURRENT_TTL_SECONDS = float(os.getenv("WEATHER_CURRENT_TTL_SECONDS", "600"))
+    
+    # 공용 HTTP 세션 설정 (aiohttp keep-alive 커넥터)
+    HTTP_TOTAL_TIMEOUT = float(os.getenv("HTTP_TOTAL_TIMEOUT", "30"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    HTTP_CONNECTION_LIMIT = int(os.getenv("HTTP_CONNECTION_LIMIT", "100"))
+    HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "10"))
+    HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    
+    # T Map 요청 설정 (구간 동시 요청 수, 앱 키 QPS 제한)
+    TMAP_MAX_CONCURRENT_LEGS = int(os.getenv("TMAP_MAX_CONCURRENT_LEGS", "4"))
+    TMAP_QPS = float(os.getenv("TMAP_QPS", "5"))
+    TMAP_BURST = float(os.getenv("TMAP_BURST", "5"))
+    # 코스 전체를 passList 경유지로 한 번에 요청 (경유지는 요청당 최대 5개)
+    TMAP_WHOLE_COURSE = os.getenv("TMAP_WHOLE_COURSE", "true").lower() == "true"
+    TMAP_MAX_PASS_POINTS = int(os.getenv("TMAP_MAX_PASS_POINTS", "5"))
+    
+    # 헤지 라우팅 설정 (T Map 구간이 p90 지연을 넘기거나 실패하면 해당 구간만 Google 요청)
+    HEDGED_ROUTING = os.getenv("HEDGED_ROUTING", "true").lower() == "true"
+    HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.9"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "3"))
+    HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.5"))
+    HEDGE_MAX_DELAY_SECONDS = float(os.getenv("HEDGE_MAX_DELAY_SECONDS", "10"))
+    
+    # provider 서킷 브레이커 설정 (T Map / Google / Tavily 장애 시 호출 건너뛰기)
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_ERROR_RATE_THRESHOLD = float(os.getenv("CIRCUIT_ERROR_RATE_THRESHOLD", "0.5"))
+    CIRCUIT_MIN_REQUESTS = int(os.getenv("CIRCUIT_MIN_REQUESTS", "10"))
+    CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "30"))
+    CIRCUIT_AUTH_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_AUTH_COOLDOWN_SECONDS", "600"))
+    
+    # 오프라인 OSM 그래프 라우팅 설정 (build_road_graph.py로 만든 .npz 경로, 비어 있으면 사용 안 함)
+    OFFLINE_GRAPH_PATH = os.getenv("OFFLINE_GRAPH_PATH", "")
+    OFFLINE_MAX_SNAP_METERS = float(os.getenv("OFFLINE_MAX_SNAP_METERS", "300"))
+    OFFLINE_WALK_SPEED_KMH = float(os.getenv("OFFLINE_WALK_SPEED_KMH", "4.5"))
+    # check_routing(코스 계획 중 경로 확인)과 Distance Matrix에 오프라인 그래프를 먼저 사용
+    OFFLINE_ROUTING_FOR_PLANNING = os.getenv("OFFLINE_ROUTING_FOR_PLANNING", "true").lower() == "true"
+    
+    # 학습형 구간 소요 시간 모델 설정
+    # TRAVEL_SAMPLE_LOG_PATH: 실제 Matrix/Directions 응답 구간을 JSONL로 기록 (train_travel_time_model.py 학습 데이터)
+    # TRAVEL_TIME_MODEL_PATH: 학습된 모델(.npz) 경로, 설정되면 check_routing이 API 대신 추정값 사용
+    TRAVEL_SAMPLE_LOG_PATH = os.getenv("TRAVEL_SAMPLE_LOG_PATH", "")
+    TRAVEL_TIME_MODEL_PATH = os.getenv("TRAVEL_TIME_MODEL_PATH", "")
+    TRAVEL_TIME_ESTIMATES_FOR_PLANNING = os.getenv("TRAVEL_TIME_ESTIMATES_FOR_PLANNING", "true").lower() == "true"
+    
+    # 코스 계획 방식
+    # single_call: 후보 전체 이동 시간 행렬을 프롬프트에 넣고 LLM 1회 호출 (최종 순서만 경로 검증)
+    # agent: LangChain Agent가 check_routing을 반복 호출하며 계획 (기존 방식)
+    # solver: 빔 서치 플래너가 장소/순서를 결정하고 LLM은 코스 설명만 작성
+    # fast: 빔 서치 플래너만 사용 (LLM 호출 없음, 템플릿 코스 설명)
+    PLANNING_MODE = os.getenv("PLANNING_MODE", "single_call")
+    PLANNER_BEAM_WIDTH = int(os.getenv("PLANNER_BEAM_WIDTH", "32"))
+    PLANNER_MAX_PLACES = int(os.getenv("PLANNER_MAX_PLACES", "6"))
+    PLANNER_MAX_LEG_MINUTES = float(os.getenv("PLANNER_MAX_LEG_MINUTES", "30"))
+    
+    # 후보 선별 크기 (계층형 계획)
+    # SEARCH_CANDIDATE_POOL_SIZE: SearchAgent가 PlanningAgent로 넘기는 후보 수
+    # SHORTLIST_PROMPT_SIZE: LLM 프롬프트에 넣을 후보 수 (single_call / agent)
+    # SHORTLIST_SOLVER_SIZE: 빔 서치 플래너에 넣을 후보 수 (solver / fast)
+    SEARCH_CANDIDATE_POOL_SIZE = int(os.getenv("SEARCH_CANDIDATE_POOL_SIZE", "20"))
+    SHORTLIST_PROMPT_SIZE = int(os.getenv("SHORTLIST_PROMPT_SIZE", "20"))
+    SHORTLIST_SOLVER_SIZE = int(os.getenv("SHORTLIST_SOLVER_SIZE", "60"))
+    
+    # 코스 설명을 스트리밍으로 생성해 생성 중인 텍스트를 여행 이벤트 스트림(/events/<task_id>)으로 전달
+    COURSE_DESCRIPTION_STREAMING = os.getenv("COURSE_DESCRIPTION_STREAMING", "true").lower() == "true"
+    
+    # 코스 완료 후 경로 안내(Directions)와 여행 카드 이미지를 미리 준비 (done 응답 이후 백그라운드)
+    POST_PLANNING_PREFETCH = os.getenv("POST_PLANNING_PREFETCH", "true").lower() == "true"
+    
     @classmethod
     def get_agent_config(cls) -> Dict[str, Any]:
         """Agent 설정 딕셔너리 반환"""
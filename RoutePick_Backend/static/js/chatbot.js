@@ -94,9 +94,9 @@ document.addEventListener('DOMContentLoaded', () => {
                     appendMessage('bot', courseMessage, true);
                 }
                 
-                // 선정 이유 표시
+                // 선정 이유 표시 (이벤트 스트림으로 생성되는 대로 표시)
                 if (data.reasoning) {
-                    appendMessage('bot', `<div style="margin-bottom: 12px;"><strong style="font-size: 1.15em; color: #C5A683; display: block; margin-bottom: 8px;">💡 코스 설명</strong></div>${data.course_description}`, true);
+                    streamCourseDescription(taskId, data.course_description || '');
                 }
                 
                 // 초기 빠른 질문 버튼 표시
@@ -109,6 +109,40 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // 코스 설명을 여행 이벤트 스트림(/events/<task_id>)으로 받아 조각 단위로 표시
+    // 이미 완료된 코스는 최종 설명을 바로 받고, 스트림을 쓸 수 없으면 코스 정보의 설명을 표시
+    function streamCourseDescription(taskId, fallbackText) {
+        appendMessage('bot', `<div style="margin-bottom: 12px;"><strong style="font-size: 1.15em; color: #C5A683; display: block; margin-bottom: 8px;">💡 코스 설명</strong></div><span class="course-description-text"></span>`, true);
+        const textElement = chatWindow.lastElementChild.querySelector('.course-description-text');
+        let text = '';
+        const render = () => {
+            textElement.innerHTML = text.replace(/\n/g, '<br>');
+        };
+        
+        if (!window.EventSource) {
+            text = fallbackText;
+            render();
+            return;
+        }
+        
+        const events = new EventSource(`/events/${taskId}`);
+        events.addEventListener('description', (event) => {
+            const data = JSON.parse(event.data);
+            text = data.final ? (data.text || text) : text + (data.delta || '');
+            render();
+        });
+        events.addEventListener('status', (event) => {
+            if (JSON.parse(event.data).done) events.close();
+        });
+        events.onerror = () => {
+            events.close();
+            if (!text) {
+                text = fallbackText;
+                render();
+            }
+        };
+    }
+
     async function sendMessage(messageText = null) {
         const message = messageText || chatInput.value.trim();
         if (!message) return;
@@ -401,24 +435,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 const travelMode = window.getTravelModeFromTransportation
                     ? window.getTravelModeFromTransportation(updatedCourse.transportation)
                     : google.maps.TravelMode.WALKING;
-                const hasTransit = routePaths
-                    ? routePaths.some(segment =>
-                        (segment || []).some(step => (step.travel_mode || '').toUpperCase() === 'TRANSIT')
-                    )
-                    : false;
-                
-                if (travelMode === google.maps.TravelMode.TRANSIT || hasTransit) {
-                    if (routePaths && routePaths.length > 0 && typeof window.drawRouteFromServerData === 'function') {
-                        window.drawRouteFromServerData(routePaths);
-                    }
+                if (routePaths && routePaths.length > 0 && typeof window.drawRouteFromServerData === 'function') {
+                    // 서버에서 받은 인코딩 polyline으로 바로 경로 그리기
+                    window.drawRouteFromServerData(routePaths);
                 } else {
-                    const drew = await window.drawActualRoute(validCoords, validPlaces, updatedCourse, {
-                        travelMode,
-                        allowStraightFallback: false
-                    });
-                    if (!drew && routePaths && routePaths.length > 0 && typeof window.drawRouteFromServerData === 'function') {
-                        window.drawRouteFromServerData(routePaths);
-                    }
+                    // 폴백: 서버 경로가 없을 때만 DirectionsService 사용
+                    await window.drawActualRoute(validCoords, validPlaces, updatedCourse, { travelMode });
                 }
                 
                 // 화면 자동 맞춤
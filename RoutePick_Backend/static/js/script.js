@@ -213,19 +213,12 @@ window.processLocations = async function(AdvancedMarkerElement, PinElement) {
     if (validCoords.length > 1) {
         const routePaths = await fetchRouteGuidePaths(taskId);
         const travelMode = getTravelModeFromTransportation(data.transportation);
-        if (travelMode === google.maps.TravelMode.TRANSIT) {
-            if (routePaths && routePaths.length > 0) {
-                drawRouteFromServerData(routePaths);
-            } else {
-                // 폴백: 서버 경로가 없으면 기존 방식 사용
-                await drawActualRoute(validCoords, validPlaces, data, { travelMode });
-            }
+        if (routePaths && routePaths.length > 0) {
+            // 서버에서 받은 인코딩 polyline을 바로 그림 (브라우저 DirectionsService 재호출 없음)
+            drawRouteFromServerData(routePaths);
         } else {
-            // 도보/자동차는 DirectionsService 경로 우선 사용
-            const drew = await drawActualRoute(validCoords, validPlaces, data, { travelMode, allowStraightFallback: false });
-            if (!drew && routePaths && routePaths.length > 0) {
-                drawRouteFromServerData(routePaths);
-            }
+            // 폴백: 서버 경로가 없을 때만 DirectionsService 사용
+            await drawActualRoute(validCoords, validPlaces, data, { travelMode });
         }
         const bounds = new google.maps.LatLngBounds();
         validCoords.forEach(c => bounds.extend(c));
@@ -483,15 +476,34 @@ window.drawActualRoute = async function(coords, places, courseData, options = {}
     }
 };
 
-// 서버에서 받은 경로 좌표 정보로 지도에 경로 그리기
+// 서버 step 데이터의 경로 좌표 추출 (인코딩 polyline 우선, 구버전 path 배열 호환)
+function getStepPathCoordinates(stepData) {
+    if (stepData.polyline) {
+        if (google.maps.geometry && google.maps.geometry.encoding) {
+            return google.maps.geometry.encoding.decodePath(stepData.polyline);
+        }
+        console.warn('geometry 라이브러리가 로드되지 않아 polyline을 디코딩할 수 없습니다.');
+        return [];
+    }
+    const path = stepData.path || [];
+    return path.map(coord => {
+        if (!coord || typeof coord.lat !== 'number' || typeof coord.lng !== 'number') {
+            console.warn('잘못된 좌표:', coord);
+            return null;
+        }
+        return new google.maps.LatLng(coord.lat, coord.lng);
+    }).filter(coord => coord !== null);
+}
+
+// 서버에서 받은 경로 polyline 정보로 지도에 경로 그리기
 function drawRouteFromServerData(routePaths) {
     // 경로 정보 출력 (요약 + 전체 데이터)
     const totalSegments = routePaths ? routePaths.length : 0;
     const totalSteps = routePaths ? routePaths.reduce((sum, seg) => sum + (seg ? seg.length : 0), 0) : 0;
-    const totalCoords = routePaths ? routePaths.reduce((sum, seg) => {
-        return sum + (seg ? seg.reduce((s, step) => s + (step.path ? step.path.length : 0), 0) : 0);
+    const totalChars = routePaths ? routePaths.reduce((sum, seg) => {
+        return sum + (seg ? seg.reduce((s, step) => s + (step.polyline ? step.polyline.length : 0), 0) : 0);
     }, 0) : 0;
-    console.log(`drawRouteFromServerData 호출: 지도=${!!window.map}, ${totalSegments}개 구간, ${totalSteps}개 step, 총 ${totalCoords}개 좌표`);
+    console.log(`drawRouteFromServerData 호출: 지도=${!!window.map}, ${totalSegments}개 구간, ${totalSteps}개 step, polyline 총 ${totalChars}자`);
     console.log('routePaths:', routePaths);
     
     if (!window.map) {
@@ -522,24 +534,17 @@ function drawRouteFromServerData(routePaths) {
         
         // 각 step별로 경로 그리기
         segmentPaths.forEach((stepData, stepIndex) => {
-            const path = stepData.path || [];
             const travelMode = stepData.travel_mode || 'WALKING';
             const transitDetails = stepData.transit_details;
             
-            if (path.length === 0) {
+            if (!stepData.polyline && (!stepData.path || stepData.path.length === 0)) {
                 console.warn(`구간 ${segmentIndex}, step ${stepIndex}: 경로 좌표가 없습니다.`);
                 return;
             }
             
             try {
-                // 경로 좌표를 Google Maps LatLng 객체로 변환
-                const pathCoordinates = path.map(coord => {
-                    if (!coord || typeof coord.lat !== 'number' || typeof coord.lng !== 'number') {
-                        console.warn('잘못된 좌표:', coord);
-                        return null;
-                    }
-                    return new google.maps.LatLng(coord.lat, coord.lng);
-                }).filter(coord => coord !== null);
+                // 인코딩 polyline을 Google Maps LatLng 배열로 디코딩
+                const pathCoordinates = getStepPathCoordinates(stepData);
                 
                 if (pathCoordinates.length === 0) {
                     console.warn(`구간 ${segmentIndex}, step ${stepIndex}: 유효한 좌표가 없습니다.`);
@@ -923,16 +928,13 @@ document.addEventListener('DOMContentLoaded', () => {
                     }
                 }
                 
-                // 서버에서 받은 경로 좌표 정보로 지도에 경로 그리기
+                // 서버에서 받은 경로 polyline 정보로 지도에 경로 그리기
                 if (data.route_paths && window.map) {
-                    // 경로 좌표 정보 출력 (요약 + 전체 데이터)
+                    // 경로 정보 출력 (요약 + 전체 데이터)
                     const totalSegments = data.route_paths ? data.route_paths.length : 0;
                     const totalSteps = data.route_paths ? data.route_paths.reduce((sum, seg) => sum + (seg ? seg.length : 0), 0) : 0;
-                    const totalCoords = data.route_paths ? data.route_paths.reduce((sum, seg) => {
-                        return sum + (seg ? seg.reduce((s, step) => s + (step.path ? step.path.length : 0), 0) : 0);
-                    }, 0) : 0;
-                    console.log(`경로 좌표 정보 수신: ${totalSegments}개 구간, ${totalSteps}개 step, 총 ${totalCoords}개 좌표`);
-                    console.log('경로 좌표 정보:', data.route_paths);
+                    console.log(`경로 polyline 정보 수신: ${totalSegments}개 구간, ${totalSteps}개 step (단순화: ${data.simplify || '-'})`);
+                    console.log('경로 polyline 정보:', data.route_paths);
                     
                     // window.polylines 초기화 (없으면 생성)
                     if (!window.polylines) {
@@ -950,24 +952,14 @@ document.addEventListener('DOMContentLoaded', () => {
                     }
                     
                     const routePaths = data.route_paths;
-                    const hasTransit = routePaths.some(segment =>
-                        (segment || []).some(step => (step.travel_mode || '').toUpperCase() === 'TRANSIT')
-                    );
-                    
-                    if (!hasTransit && window.routeCoords && window.routePlaces && window.courseData) {
-                        // 도보/자동차는 DirectionsService 경로 우선 사용
-                        (async () => {
-                            const drew = await drawActualRoute(window.routeCoords, window.routePlaces, window.courseData, {
-                                travelMode: getTravelModeFromTransportation(window.courseData.transportation),
-                                allowStraightFallback: false
-                            });
-                            if (!drew && routePaths && routePaths.length > 0) {
-                                drawRouteFromServerData(routePaths);
-                            }
-                        })();
-                    } else {
-                        // 서버에서 받은 경로 좌표 정보로 경로 그리기
+                    if (routePaths.length > 0) {
+                        // 서버에서 받은 인코딩 polyline으로 바로 경로 그리기
                         drawRouteFromServerData(routePaths);
+                    } else if (window.routeCoords && window.routePlaces && window.courseData) {
+                        // 폴백: 서버 경로가 없을 때만 DirectionsService 사용
+                        drawActualRoute(window.routeCoords, window.routePlaces, window.courseData, {
+                            travelMode: getTravelModeFromTransportation(window.courseData.transportation)
+                        });
                     }
                 } else {
                     console.warn('경로 그리기 조건 불만족:', {
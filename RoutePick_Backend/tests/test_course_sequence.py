@@ -0,0 +1,55 @@
+"""
+코스 결과의 sequence가 원본 places 인덱스인지 확인
+(app / 챗봇 / 카드 / 경로 안내는 모두 course["places"][i] for i in course["sequence"]로 읽음)
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("tavily")  # tools 패키지 import에 필요
+
+from tools.course_creation_tool import CourseCreationTool
+
+
+CATEGORIES = ["식당", "카페", "활동", "관광지", "쇼핑"]
+
+
+def make_places(count=12):
+    # 뒤쪽 후보의 신뢰도를 높여 플래너가 앞쪽이 아닌 장소를 고르도록 함
+    return [
+        {
+            "name": f"P{i}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "trust_score": 10 if i >= 8 else 1,
+            "coordinates": {"lat": 37.55 + 0.001 * i, "lng": 126.97 + 0.001 * i},
+        }
+        for i in range(count)
+    ]
+
+
+def test_fast_mode_sequence_resolves_to_planner_path():
+    tool = CourseCreationTool({"planning_mode": "fast"})
+    plans = []
+    original_plan = tool.course_planner.plan
+
+    def recording_plan(*args, **kwargs):
+        plan = original_plan(*args, **kwargs)
+        plans.append(plan)
+        return plan
+
+    tool.course_planner.plan = recording_plan
+    places = make_places()
+    result = asyncio.run(tool.execute(
+        places=places,
+        user_preferences={"theme": "데이트", "transportation": "도보"},
+        time_constraints={"total_duration": 300},
+    ))
+
+    assert result["success"], result.get("error")
+    course = result["course"]
+    planned = [places[i]["name"] for i in plans[0]["selected_places"]]
+    assert any(index >= 8 for index in plans[0]["selected_places"])
+    assert [course["places"][i]["name"] for i in course["sequence"]] == planned
+    # 체류 시간도 원본 인덱스 키
+    assert set(course["estimated_duration"]) == {str(i) for i in course["sequence"]}
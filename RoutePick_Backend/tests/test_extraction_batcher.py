@@ -0,0 +1,62 @@
+"""
+장소 추출 배처(utils.extraction_batcher) 확인
+- 리더 요청이 창을 기다리는 중에 취소되어도 함께 모인 요청은 오류를 받고 끝나야 함
+"""
+
+import asyncio
+
+import pytest
+
+from utils.extraction_batcher import ExtractionBatcher
+
+
+async def extract(batch, batch_num, total_batches):
+    return [{"name": item["title"], "source_url": item["url"]} for item in batch]
+
+
+def test_follower_gets_results_from_leader():
+    batcher = ExtractionBatcher(window_seconds=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit("서울", [{"url": "a", "title": "A", "snippet": ""}], extract),
+            batcher.submit("서울", [{"url": "b", "title": "B", "snippet": ""}], extract),
+        )
+
+    first, second = asyncio.run(main())
+
+    assert [place["name"] for place in first] == ["A"]
+    assert [place["name"] for place in second] == ["B"]
+    assert batcher.get_stats()["llm_calls"] == 1
+
+
+def test_cancelled_leader_releases_followers():
+    batcher = ExtractionBatcher(window_seconds=0.2, result_timeout=5.0)
+
+    async def main():
+        leader = asyncio.ensure_future(batcher.submit("서울", [{"url": "a", "title": "A", "snippet": ""}], extract))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(batcher.submit("서울", [{"url": "b", "title": "B", "snippet": ""}], extract))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(follower, timeout=1.0)
+        assert "서울" not in batcher._pending
+
+    asyncio.run(main())
+
+
+def test_result_wait_is_bounded():
+    batcher = ExtractionBatcher(window_seconds=0.01, result_timeout=0.1)
+
+    async def stuck(batch, batch_num, total_batches):
+        await asyncio.sleep(10)
+        return []
+
+    async def main():
+        # 다른 스레드의 리더가 멈춘 상황: 이미 모이고 있는 키에 합류한 요청
+        batcher._pending["서울"] = []
+        with pytest.raises(RuntimeError):
+            await batcher.submit("서울", [{"url": "b", "title": "B", "snippet": ""}], stuck)
+
+    asyncio.run(main())
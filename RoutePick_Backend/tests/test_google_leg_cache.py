@@ -0,0 +1,32 @@
+"""
+Google Directions 구간 캐시 키 확인
+Google이 도로에 맞춰 보정한 leg 좌표가 아니라 요청 좌표로 저장해야
+같은 좌표로 조회하는 Distance Matrix 요청에서 적중함
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("tavily")  # tools 패키지 import에 필요
+
+from tools.google_maps_tool import GoogleMapsTool
+
+
+def test_directions_leg_is_cached_under_request_coordinates():
+    tool = GoogleMapsTool({})
+    leg = {
+        # 요청 좌표에서 수십 미터 떨어진 도로 위 좌표
+        "start_location": {"lat": 37.50041, "lng": 127.00052},
+        "end_location": {"lat": 37.51037, "lng": 126.99961},
+        "duration": {"value": 600, "text": "10분"},
+        "distance": {"value": 800, "text": "0.8km"},
+    }
+    tool._store_leg_in_cache((37.5, 127.0), (37.51, 127.0), leg, "walking")
+
+    tool.client = object()  # 모든 셀이 캐시에 있으면 API를 호출하지 않음
+    matrix = asyncio.run(tool._fetch_distance_matrix_chunk(["37.5,127.0"], ["37.51,127.0"], "walking"))
+
+    element = matrix["rows"][0]["elements"][0]
+    assert element["status"] == "OK"
+    assert element["duration"]["value"] == 600
@@ -0,0 +1,45 @@
+"""
+헤지 구간 라우팅(utils.hedged_routing) 확인
+- 보조 provider가 이겨 주 provider 요청이 취소돼도 주 provider 지연 시간이 기록되어야 함
+- 서킷 거부 같은 즉시 실패는 지연 샘플로 기록하지 않음
+"""
+
+import asyncio
+
+from utils.hedged_routing import HedgedLegRouter
+
+
+def direction(provider):
+    return {"steps": [{"instruction": provider}], "duration": 600}
+
+
+def test_cancelled_primary_latency_is_recorded():
+    router = HedgedLegRouter(default_delay=0.05, min_delay=0.05)
+
+    async def slow_primary():
+        await asyncio.sleep(1.0)
+        return direction("tmap")
+
+    async def fast_secondary():
+        return direction("google")
+
+    result = asyncio.run(router.route_leg(slow_primary, fast_secondary, "walking"))
+
+    assert result["provider"] == "google"
+    assert router.latency.count("tmap:walking") == 1
+    assert router.latency.quantile("tmap:walking", 0.9) >= 0.05
+
+
+def test_fast_primary_failure_is_not_sampled():
+    router = HedgedLegRouter(default_delay=0.5, min_delay=0.05)
+
+    async def rejected_primary():
+        return {"error": "서킷 open"}
+
+    async def secondary():
+        return direction("google")
+
+    result = asyncio.run(router.route_leg(rejected_primary, secondary, "walking"))
+
+    assert result["provider"] == "google"
+    assert router.latency.count("tmap:walking") == 0
@@ -0,0 +1,86 @@
+"""
+LLM 호출 래퍼(utils.llm_cache) 확인
+- 보조 모델이 주 모델과 같으면 헤지하지 않음
+- 잘린 응답(finish_reason != "stop")과 빈 응답은 캐시하지 않음
+- 프롬프트 캐싱 가능 여부는 전체 프롬프트 길이로, 캐시 가능한 고정 앞부분은 128토큰 단위로 집계
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.config import Config
+from utils import llm_cache, llm_tiering
+
+
+def make_response(content="답변", finish_reason="stop", model="gpt-4o-mini"):
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        usage=None,
+    )
+
+
+class FailingHedger:
+    async def run(self, call_site, primary_call, fallback_call):
+        raise AssertionError("헤지하면 안 됨")
+
+
+def test_same_fallback_model_skips_hedging(monkeypatch):
+    calls = []
+
+    async def fake_scheduled(client, priority, params):
+        calls.append(params["model"])
+        return make_response()
+
+    monkeypatch.setattr(Config, "LLM_FALLBACK_MODEL", "gpt-4o-mini")
+    monkeypatch.setattr(llm_tiering, "_llm_hedger", FailingHedger())
+    monkeypatch.setattr(llm_cache, "_scheduled", fake_scheduled)
+
+    params = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "안녕"}]}
+    response, cacheable = asyncio.run(llm_cache._create(None, "search.strategy", "normal", params))
+
+    assert calls == ["gpt-4o-mini"]
+    assert cacheable
+    assert response.choices[0].message.content == "답변"
+
+
+@pytest.mark.parametrize("content, finish_reason, cached", [
+    ("답변", "stop", True),
+    ("잘린 답", "length", False),
+    ("", "stop", False),
+    ("차단", "content_filter", False),
+])
+def test_only_complete_responses_are_cached(monkeypatch, content, finish_reason, cached):
+    async def fake_scheduled(client, priority, params):
+        return make_response(content, finish_reason)
+
+    cache = llm_cache.LLMResponseCache()
+    monkeypatch.setattr(llm_cache, "_llm_cache", cache)
+    monkeypatch.setattr(llm_tiering, "_llm_hedger", None)
+    monkeypatch.setattr(Config, "LLM_FALLBACK_MODEL", "")
+    monkeypatch.setattr(llm_cache, "_scheduled", fake_scheduled)
+
+    messages = [{"role": "user", "content": "안녕"}]
+    asyncio.run(llm_cache.cached_chat_completion(
+        None, "search.strategy", model="gpt-4o-mini", messages=messages, temperature=0
+    ))
+    key = llm_cache.make_key("gpt-4o-mini", messages, {"temperature": 0})
+
+    assert (cache.get(key, "search.strategy") is not None) == cached
+
+
+def test_prefix_eligibility_uses_total_prompt_length():
+    cache = llm_cache.LLMResponseCache()
+    static = "가" * 600  # 고정 템플릿만으로는 1024토큰 미만
+    messages = [{"role": "system", "content": static}, {"role": "user", "content": "나" * 500}]
+    usage = SimpleNamespace(prompt_tokens=1100, prompt_tokens_details=SimpleNamespace(cached_tokens=512))
+
+    cache.record_usage("search.batch", messages, SimpleNamespace(usage=usage))
+    cache.record_usage("search.batch", messages[:1], SimpleNamespace(usage=SimpleNamespace(prompt_tokens=600)))
+
+    site = cache.get_stats()["call_sites"]["search.batch"]
+    assert site["api_calls"] == 2
+    assert site["prefix_eligible_calls"] == 1
+    assert site["cacheable_prefix_tokens"] == 512  # 600 → 128토큰 단위 내림
@@ -0,0 +1,93 @@
+"""
+오프라인 그래프 탐색(A* / ALT / one-to-many Dijkstra)을 단순 Dijkstra와 비교
+"""
+
+import heapq
+
+import numpy as np
+import pytest
+
+from utils.road_graph import DRIVE, WALK, RoadGraph
+
+
+def random_graph(seed, nodes=60, edges=240, parallel=60):
+    """평행 간선(같은 u, v에 길이/플래그가 다른 간선)이 섞인 무작위 그래프"""
+    rng = np.random.default_rng(seed)
+    lat = 37.55 + rng.random(nodes) * 0.02
+    lng = 126.97 + rng.random(nodes) * 0.02
+    u = rng.integers(0, nodes, edges)
+    v = rng.integers(0, nodes, edges)
+    pick = rng.integers(0, edges, parallel)
+    u = np.concatenate([u, u[pick]])
+    v = np.concatenate([v, v[pick]])
+    keep = u != v
+    u, v = u[keep], v[keep]
+    straight = np.hypot(lat[u] - lat[v], lng[u] - lng[v]) * 111000.0
+    length = straight * (1.0 + rng.random(u.shape[0]) * 2.0)
+    flags = rng.choice([WALK, DRIVE, WALK | DRIVE], u.shape[0])
+    speed = 5.0 + rng.random(u.shape[0]) * 15.0
+    return lat, lng, u, v, flags, speed, length
+
+
+def reference_times(source, u, v, cost, nodes):
+    """간선 리스트 위의 단순 Dijkstra (초)"""
+    adjacency = [[] for _ in range(nodes)]
+    for a, b, c in zip(u.tolist(), v.tolist(), cost.tolist()):
+        if np.isfinite(c):
+            adjacency[a].append((b, c))
+    best = np.full(nodes, np.inf)
+    best[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        t, node = heapq.heappop(heap)
+        if t > best[node]:
+            continue
+        for nxt, c in adjacency[node]:
+            if t + c < best[nxt]:
+                best[nxt] = t + c
+                heapq.heappush(heap, (t + c, nxt))
+    return best
+
+
+def edge_costs(graph, mode, u, v, flags, speed, length):
+    flag = WALK if mode == "walking" else DRIVE
+    edge_speed = np.full(u.shape[0], graph.walk_speed) if mode == "walking" else speed
+    return np.where((flags & flag) != 0, length / edge_speed, np.inf)
+
+
+@pytest.mark.parametrize("landmarks", [0, 4])
+@pytest.mark.parametrize("mode", ["walking", "driving"])
+def test_search_matches_dijkstra_with_parallel_edges(landmarks, mode):
+    for seed in range(5):
+        lat, lng, u, v, flags, speed, length = random_graph(seed)
+        graph = RoadGraph.from_edges(lat, lng, u, v, flags, drive_speed=speed, length_m=length)
+        if landmarks:
+            graph.build_landmarks(landmarks)
+        cost = edge_costs(graph, mode, u, v, flags, speed, length)
+        for source in range(0, graph.num_nodes, 7):
+            expected = reference_times(source, u, v, cost, graph.num_nodes)
+            full, _, _ = graph._search(source, mode)
+            np.testing.assert_allclose(full, expected, rtol=1e-6)
+            for target in range(0, graph.num_nodes, 5):
+                time_to, _, _ = graph._search(source, mode, target=target)
+                assert time_to[target] == pytest.approx(expected[target], rel=1e-4) or (
+                    np.isinf(expected[target]) and np.isinf(time_to[target])
+                )
+
+
+def test_loaded_landmarks_scale_with_walk_speed(tmp_path):
+    lat, lng, u, v, flags, speed, length = random_graph(7)
+    graph = RoadGraph.from_edges(lat, lng, u, v, flags, drive_speed=speed, length_m=length)
+    graph.build_landmarks(4)
+    path = str(tmp_path / "graph.npz")
+    graph.save(path)
+
+    faster = RoadGraph.load(path, walk_speed=graph.walk_speed * 2.5)
+    cost = edge_costs(faster, "walking", u, v, flags, speed, length)
+    for source in range(0, faster.num_nodes, 9):
+        expected = reference_times(source, u, v, cost, faster.num_nodes)
+        for target in range(faster.num_nodes):
+            if not np.isfinite(expected[target]):
+                continue
+            time_to, _, _ = faster._search(source, "walking", target=target)
+            assert time_to[target] == pytest.approx(expected[target], rel=1e-4)
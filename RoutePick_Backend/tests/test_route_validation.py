@@ -0,0 +1,47 @@
+"""
+최종 코스 경로 검증 요약 확인
+(완료 후 미리 계산한 경로 안내 결과로 구간 이동 시간 상한 초과, 가용 시간 초과를 표시)
+"""
+
+import pytest
+
+pytest.importorskip("tavily")  # tools 패키지 import에 필요
+
+from tools.course_creation_tool import CourseCreationTool
+
+
+def routing_result(minutes):
+    return {
+        "success": True,
+        "total_duration": minutes * 60,
+        "total_distance": 1000,
+        "directions": [{"from": "A", "to": "B", "duration": minutes * 60}],
+    }
+
+
+def test_summary_flags_long_legs_and_over_budget():
+    tool = CourseCreationTool({"planning_mode": "fast"})
+    summary = tool.summarize_route_validation(
+        routing_result(45), "walking",
+        estimated_duration={"0": 60, "1": 60},
+        time_constraints={"total_duration": 120}
+    )
+
+    assert summary["success"]
+    assert summary["long_legs"] == [{"from": "A", "to": "B", "minutes": 45}]
+    assert summary["total_minutes"] == 165
+    assert summary["over_budget"]
+    assert len(summary["warnings"]) == 2
+
+
+def test_summary_within_limits_has_no_warnings():
+    tool = CourseCreationTool({"planning_mode": "fast"})
+    summary = tool.summarize_route_validation(
+        routing_result(15), "walking",
+        estimated_duration={"0": 60, "1": 60},
+        time_constraints={"total_duration": 360}
+    )
+
+    assert not summary["long_legs"]
+    assert not summary["over_budget"]
+    assert summary["warnings"] == []
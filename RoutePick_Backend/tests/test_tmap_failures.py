@@ -0,0 +1,104 @@
+"""
+T Map 구간 실패 분류 확인
+타임아웃/429/5xx 같은 일시적 실패는 해당 구간에만 기록하고,
+API 키 문제(401/403, 키 미설정)만 코스 전체 실패로 처리해야 함
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("tavily")  # tools 패키지 import에 필요
+
+from tools.tmap_tool import TMapTool
+
+
+def make_places(count=4):
+    return [
+        {"name": f"P{i}", "coordinates": {"lat": round(37.5 + 0.01 * i, 2), "lng": 127.0}}
+        for i in range(count)
+    ]
+
+
+def route_response(data):
+    start = [data["startX"], data["startY"]]
+    end = [data["endX"], data["endY"]]
+    return {
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": start},
+                "properties": {"pointType": "SP", "totalDistance": 1000, "totalTime": 600},
+            },
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": [start, end]},
+                "properties": {"distance": 1000, "time": 600, "description": "직진"},
+            },
+        ]
+    }
+
+
+def make_tool(failing_start_lat, auth_failed):
+    tool = TMapTool({"t_map_api_key": "x" * 20})
+
+    async def fake_request(url, data, version=1):
+        if data["startY"] == failing_start_lat:
+            return None, auth_failed
+        return route_response(data), False
+
+    tool._make_request = fake_request
+    return tool
+
+
+def test_transient_leg_failure_keeps_other_legs():
+    tool = make_tool(failing_start_lat=37.51, auth_failed=False)
+    result = asyncio.run(tool.execute(make_places(), mode="walking", whole_course=False))
+
+    assert result["success"]
+    assert len(result["directions"]) == 3
+    assert result["directions"][1].get("error")
+    assert not result["directions"][0].get("error")
+    assert not result["directions"][2].get("error")
+
+
+def test_auth_failure_aborts_course():
+    tool = make_tool(failing_start_lat=37.51, auth_failed=True)
+    result = asyncio.run(tool.execute(make_places(), mode="walking", whole_course=False))
+
+    assert not result["success"]
+    assert "API 키" in result["error"]
+
+
+def test_transient_chunk_failure_falls_back_to_legs():
+    tool = TMapTool({"t_map_api_key": "x" * 20})
+    requests = []
+
+    async def fake_request(url, data, version=1):
+        requests.append(data.get("passList"))
+        if data.get("passList"):
+            return None, False  # 일괄 요청 타임아웃
+        return route_response(data), False
+
+    tool._make_request = fake_request
+    result = asyncio.run(tool.execute(make_places(), mode="walking", whole_course=True))
+
+    assert result["success"]
+    assert len(requests) == 4  # 일괄 1회 + 구간별 3회
+    assert not any(direction.get("error") for direction in result["directions"])
+
+
+def test_auth_chunk_failure_aborts_without_leg_retries():
+    tool = TMapTool({"t_map_api_key": "x" * 20})
+    requests = []
+
+    async def fake_request(url, data, version=1):
+        requests.append(data.get("passList"))
+        return None, True
+
+    tool._make_request = fake_request
+    result = asyncio.run(tool.execute(make_places(), mode="walking", whole_course=True))
+
+    assert not result["success"]
+    assert "API 키" in result["error"]
+    assert len(requests) == 1
@@ -3,32 +3,64 @@
 검색된 장소들을 바탕으로 최적의 코스를 생성합니다.
 """
 
+import asyncio
 import json
 import os
 import re
-import openai
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain_core.tools import tool
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from .base_tool import BaseTool
 from .google_maps_tool import GoogleMapsTool
 from .tmap_tool import TMapTool
+from .offline_routing_tool import OfflineRoutingTool
 from config.config import Config
+from utils.hedged_routing import get_hedged_router, route_course_hedged
+from utils.http_client import get_http_registry
+from utils.json_stream import JSONStringFieldStreamer
+from utils.llm_cache import cached_chat_completion, streamed_chat_completion
+from utils.llm_scheduler import langchain_rate_limiter
+from utils.llm_tiering import model_for
+from utils.prompt_templates import COURSE_DESCRIPTION_SYSTEM, prefixed_messages
+from utils.services import get_services
+from utils.provider_health import get_provider_health
+from utils.route_cache import get_leg_cache, get_planning_leg_cache
+from utils.travel_time_model import estimate_course, get_travel_time_model
+from utils.cost_matrix import build_cost_matrix, format_duration_table
+from utils.course_planner import CoursePlanner, describe_course
+from utils.shortlist import shortlist_places
 
-load_dotenv()
+# check_routing LangChain Tool (agent 모드에서 처음 사용할 때 생성)
+_check_routing_tool = None
+_tools_lock = threading.Lock()
 
-config = Config.get_agent_config()
-config["api_key"] = os.getenv("GOOGLE_MAPS_API_KEY") 
-maptool = GoogleMapsTool(config=config)
-tmaptool = TMapTool(config=config)
 
-# check_routing 결과 캐시 (같은 장소 조합에 대한 중복 호출 방지)
-_routing_cache = {}
+# 경로 계산 Tool은 서비스 컨테이너의 프로세스 전역 인스턴스 사용 (RoutingAgent와 캐시 공유)
+def get_maptool() -> GoogleMapsTool:
+    """프로세스 전역 GoogleMapsTool"""
+    return get_services().maps_tool()
+
+
+def get_tmaptool() -> TMapTool:
+    """프로세스 전역 TMapTool"""
+    return get_services().tmap_tool()
+
+
+def get_offlinetool() -> OfflineRoutingTool:
+    """프로세스 전역 OfflineRoutingTool"""
+    return get_services().offline_tool()
+
+
+def get_check_routing_tool():
+    """check_routing을 감싼 LangChain Tool (agent 모드에서만 langchain import)"""
+    global _check_routing_tool
+    if _check_routing_tool is None:
+        from langchain_core.tools import tool
+        with _tools_lock:
+            if _check_routing_tool is None:
+                _check_routing_tool = tool(check_routing)
+    return _check_routing_tool
+
 
-@tool
 async def check_routing(
         places: List[Dict[str, Any]],  # 필수 파라미터로 명시 (기본값 제거)
         origin: Optional[Dict[str, Any]] = None,
@@ -62,7 +94,11 @@ async def check_routing(
             "error": "places 파라미터가 필수입니다."
         }
     
-    # 좌표가 동일하거나 매우 가까운 장소 사전 필터링
+    if origin is not None or destination is not None or len(places) < 2:
+        # 출발/도착지를 따로 지정하면 구간 구성이 달라지므로 구간 캐시 없이 전체 경로 계산
+        result = await _route_places(places, mode, origin, destination)
+        return _summarize_routing(result, mode)
+    
     import math
     def haversine_distance(lat1, lon1, lat2, lon2):
         """두 지점 간 거리 계산 (미터)"""
@@ -75,75 +111,204 @@ async def check_routing(
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
         return R * c
     
-    # 장소가 2개이고 매우 가까운 경우 (10m 이내) 직접 경로 반환
-    if len(places) == 2:
-        coords1 = places[0].get("coordinates", {})
-        coords2 = places[1].get("coordinates", {})
-        if coords1.get("lat") and coords1.get("lng") and coords2.get("lat") and coords2.get("lng"):
-            try:
-                lat1, lng1 = float(coords1["lat"]), float(coords1["lng"])
-                lat2, lng2 = float(coords2["lat"]), float(coords2["lng"])
-                distance_m = haversine_distance(lat1, lng1, lat2, lng2)
-                if distance_m < 10:
-                    print(f"✅ [check_routing] 두 지점이 매우 가까움 ({distance_m:.1f}m), 직접 경로 반환 (API 호출 생략)")
-                    return {
-                        "success": True,
-                        "total_duration": 0,
-                        "total_distance": int(distance_m),
-                        "directions": [{
-                            "from": places[0].get("name", "Unknown"),
-                            "to": places[1].get("name", "Unknown"),
-                            "duration_text": "즉시",
-                            "distance_text": f"{int(distance_m)}m",
-                            "mode": mode,
-                            "error": None
-                        }],
-                        "mode": mode,
-                        "error": None
-                    }
-            except (ValueError, TypeError):
-                pass
+    # 구간 단위 캐시: 후보 코스끼리 겹치는 구간은 재사용하고 없는 구간만 계산
+    # 키는 (출발 좌표, 도착 좌표, 이동 수단, 시간 버킷)이므로 순서가 다르면 다른 구간으로 취급
+    cache = get_planning_leg_cache()
+    provider_cache = get_leg_cache()
+    coords = [_place_coordinates(place) for place in places]
+    legs: List[Optional[Dict[str, Any]]] = [None] * (len(places) - 1)
+    for i in range(len(legs)):
+        start, end = coords[i], coords[i + 1]
+        if start is None or end is None:
+            continue
+        distance_m = haversine_distance(start[0], start[1], end[0], end[1])
+        if distance_m < 10:
+            # 좌표가 동일하거나 매우 가까운 구간 (10m 이내)은 직접 이동으로 처리
+            legs[i] = {
+                "duration": 0,
+                "distance": int(distance_m),
+                "duration_text": "즉시",
+                "distance_text": f"{int(distance_m)}m",
+                "mode": mode,
+                "error": None
+            }
+            continue
+        leg = cache.get(start, end, mode)
+        if leg is None:
+            # GoogleMapsTool이 저장한 실제 provider 응답 구간
+            leg = provider_cache.get(start, end, mode)
+        legs[i] = leg
     
-    # 캐시 키 생성 (장소 이름과 좌표, mode 기반)
-    import hashlib
-    places_key = []
-    for place in places:
-        coords = place.get("coordinates", {})
-        lat = coords.get('lat', '')
-        lng = coords.get('lng', '')
-        # 좌표를 소수점 4자리로 반올림하여 캐시 키 생성 (약 11m 정밀도)
-        try:
-            if lat and lng:
-                lat = round(float(lat), 4)
-                lng = round(float(lng), 4)
-        except (ValueError, TypeError):
-            pass
-        places_key.append(f"{place.get('name', '')}:{lat}:{lng}")
+    missing = [i for i, leg in enumerate(legs) if leg is None]
+    if not missing:
+        print(f"✅ [check_routing] 모든 구간 캐시 사용 ({len(legs)}개 구간, API 호출 생략)")
+        return _assemble_routing(places, legs, mode)
+    print(f"🔁 [check_routing] 구간 캐시 {len(legs) - len(missing)}/{len(legs)}개 재사용, {len(missing)}개 구간 계산 ({mode})")
+    
+    # 연속된 미계산 구간을 하나의 부분 경로로 묶어 계산 (T Map 경유지 요청 등 일괄 호출 유지)
+    runs = []
+    for i in missing:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    results = await asyncio.gather(*(_route_places(places[a:b + 2], mode) for a, b in runs))
+    
+    for (a, b), result in zip(runs, results):
+        directions = result.get("directions", [])
+        for k, i in enumerate(range(a, b + 1)):
+            if k < len(directions):
+                d = directions[k]
+            else:
+                d = {"error": result.get("error") or "구간 경로 정보가 없습니다."}
+            leg = {
+                "duration": int(d.get("duration", 0) or 0),
+                "distance": int(d.get("distance", 0) or 0),
+                "duration_text": d.get("duration_text", ""),
+                "distance_text": d.get("distance_text", ""),
+                "mode": d.get("mode") or mode,
+                "error": d.get("error"),
+                "estimated": bool(result.get("estimated"))
+            }
+            legs[i] = leg
+            if coords[i] is not None and coords[i + 1] is not None:
+                cache.put(
+                    coords[i], coords[i + 1], mode,
+                    leg["duration"], leg["distance"],
+                    duration_text=leg["duration_text"],
+                    distance_text=leg["distance_text"],
+                    error=leg["error"],
+                    extra={"mode": leg["mode"], "estimated": leg["estimated"]}
+                )
     
-    # 장소 순서도 고려하여 캐시 키 생성
-    places_sorted_key = sorted(places_key)  # 순서 무관하게 같은 조합이면 같은 캐시 사용
-    cache_key_str = f"{mode}:{':'.join(places_sorted_key)}"
-    cache_key = hashlib.md5(cache_key_str.encode()).hexdigest()
+    return _assemble_routing(places, legs, mode)
+
+
+def _place_coordinates(place: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """장소 좌표 (lat, lng), 없으면 None"""
+    coords = place.get("coordinates") or {}
+    try:
+        if coords.get("lat") and coords.get("lng"):
+            return float(coords["lat"]), float(coords["lng"])
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def _assemble_routing(
+    places: List[Dict[str, Any]],
+    legs: List[Dict[str, Any]],
+    mode: str
+) -> Dict[str, Any]:
+    """구간 결과를 check_routing 응답 형식으로 조립"""
+    directions = []
+    for i, leg in enumerate(legs[:10]):  # 최대 10구간만
+        directions.append({
+            "from": places[i].get("name", "Unknown"),
+            "to": places[i + 1].get("name", "Unknown"),
+            "duration_text": leg.get("duration_text"),
+            "distance_text": leg.get("distance_text"),
+            "mode": leg.get("mode") or mode,
+            "error": leg.get("error")
+        })
+    valid_legs = [leg for leg in legs if not leg.get("error")]
+    errors = [leg["error"] for leg in legs if leg.get("error")]
+    final_result = {
+        "success": bool(valid_legs),
+        "total_duration": sum(leg.get("duration", 0) for leg in valid_legs),
+        "total_distance": sum(leg.get("distance", 0) for leg in valid_legs),
+        "directions": directions,
+        "mode": mode,
+        "error": None if valid_legs else f"모든 구간의 경로 계산에 실패했습니다. {'; '.join(errors[:3])}"
+    }
+    if any(leg.get("estimated") for leg in valid_legs):
+        # 추정값임을 표시 (후보 간 상대 비교용)
+        final_result["estimated"] = True
+    return final_result
+
+
+def _summarize_routing(result: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """provider 결과에서 step/path/raw 데이터를 제거한 check_routing 응답"""
+    # directions에서 step/path/raw 데이터 제거, 핵심 요약만 반환
+    slim_directions = []
+    for d in result.get("directions", [])[:10]:  # 최대 10구간만
+        slim_directions.append({
+            "from": d.get("from"),
+            "to": d.get("to"),
+            "duration_text": d.get("duration_text"),
+            "distance_text": d.get("distance_text"),
+            "mode": d.get("mode"),
+            "error": d.get("error")
+        })
     
-    # 캐시 확인
-    if cache_key in _routing_cache:
-        cached_result = _routing_cache[cache_key]
-        print(f"✅ [check_routing] 캐시된 결과 사용 (동일한 장소 조합, 중복 호출 방지)")
-        return cached_result
+    final_result = {
+        "success": result.get("success", False),
+        "total_duration": result.get("total_duration", 0),
+        "total_distance": result.get("total_distance", 0),
+        "directions": slim_directions,
+        "mode": mode,
+        "error": result.get("error")
+    }
+    if result.get("estimated"):
+        # 추정값임을 표시 (후보 간 상대 비교용)
+        final_result["estimated"] = True
+    return final_result
 
+
+async def _route_places(
+    places: List[Dict[str, Any]],
+    mode: str,
+    origin: Optional[Dict[str, Any]] = None,
+    destination: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    장소 순서대로 경로 계산 (오프라인 그래프 → 학습 모델 → T Map/Google → 오프라인 폴백)
+    
+    Returns:
+        provider 결과 딕셔너리 (directions는 구간 순서대로)
+    """
+    maptool, tmaptool, offlinetool = get_maptool(), get_tmaptool(), get_offlinetool()
+    
+    # 오프라인 OSM 그래프가 있으면 도보/자동차 경로는 API 호출 없이 먼저 계산
+    # (계획 단계에서는 구간 소요 시간 요약만 필요, 최종 경로 안내는 RoutingAgent가 T Map/Google로 계산)
+    result = None
+    if Config.OFFLINE_ROUTING_FOR_PLANNING and offlinetool.is_available(mode):
+        offline_result = await offlinetool.execute(places=places, mode=mode)
+        if offline_result.get("success") and not any(d.get("error") for d in offline_result.get("directions", [])):
+            print(f"🧭 [check_routing] 오프라인 그래프 사용 ({mode}, API 호출 생략)")
+            result = offline_result
+    
+    # 학습된 소요 시간 모델이 있으면 추정값으로 후보 순서를 비교 (API 호출 없음)
+    # 최종 선택된 코스의 구간은 경로 안내 단계(RoutingAgent)에서 실제 provider로 다시 계산됨
+    if result is None and Config.TRAVEL_TIME_ESTIMATES_FOR_PLANNING:
+        model = get_travel_time_model()
+        if model is not None:
+            from datetime import datetime
+            estimated = estimate_course(model, places, mode, hour=datetime.now().hour)
+            if estimated is not None:
+                print(f"⏱️ [check_routing] 학습 모델 추정값 사용 ({mode}, API 호출 생략)")
+                result = estimated
+    
     # 한국 내에서 도보/자동차 경로인 경우 T Map API 우선 사용
     # 단, mode가 transit이면 T Map API 사용 안 함 (T Map은 대중교통 미지원)
     use_tmap = False
-    if mode in ["walking", "driving"]:
+    if result is None and mode in ["walking", "driving"]:
         # 장소 좌표가 한국 영역 내에 있는지 확인
         is_korea = _is_in_korea(places)
-        if is_korea:
+        if is_korea and get_provider_health().is_open("tmap", tmaptool.endpoint_for_mode(mode)):
+            # 서킷이 열려 있으면 T Map 타임아웃을 기다리지 않고 바로 Google 사용
+            print(f"⏭️ [check_routing] T Map 서킷 open: Google Maps API 사용 ({mode})")
+        elif is_korea:
             use_tmap = True
             print(f"🗺️ [check_routing] 한국 내 경로 감지: T Map API 사용 ({mode})")
-    elif mode == "transit":
+    elif result is None and mode == "transit":
         print(f"🚇 [check_routing] 대중교통 모드: Google Maps API 사용 (T Map API는 대중교통 미지원)")
     
-    if use_tmap:
+    if use_tmap and Config.HEDGED_ROUTING:
+        # 구간별 헤지 라우팅: T Map 우선, p90 지연 초과/실패 구간만 Google 요청
+        tmap_mode = "walking" if mode == "walking" else "driving"
+        result = await route_course_hedged(get_hedged_router(), tmaptool, maptool, places, tmap_mode)
+    elif use_tmap:
         # T Map API 사용
         tmap_mode = "walking" if mode == "walking" else "driving"
         try:
@@ -167,7 +332,8 @@ async def check_routing(
                     for d in directions
                 )
                 
-                if all_failed or "API 키" in error_msg or "서비스 제공 지역" in error_msg:
+                tmap_down = get_provider_health().is_open("tmap", tmaptool.endpoint_for_mode(tmap_mode))
+                if all_failed or tmap_down or "API 키" in error_msg or "서비스 제공 지역" in error_msg:
                     print(f"⚠️ [check_routing] T Map API 실패, Google Maps API로 폴백합니다.")
                     use_tmap = False
         except Exception as e:
@@ -175,45 +341,27 @@ async def check_routing(
             print(f"⚠️ [check_routing] T Map API 예외 발생, Google Maps API로 폴백합니다.")
             use_tmap = False
     
-    if not use_tmap:
+    if not use_tmap and (result is None or not result.get("success")):
         # Google Maps API 사용 (대중교통 또는 한국 외 지역 또는 T Map 실패 시)
+        # T Map 폴백이면 result에 실패한 T Map 결과가 남아 있으므로 성공 여부로 판단
         print(f"🗺️ [check_routing] Google Maps API 사용 ({mode})")
+        # 후보 순서를 평가하는 단계이므로 주어진 순서 그대로 계산 (재정렬하면 구간이 다른 장소 쌍으로 캐시됨)
         result = await maptool.execute(
             places=places,
             origin=origin,
             destination=destination,
-            mode=mode
+            mode=mode,
+            optimize_waypoints=False
         )
     
-    # directions에서 step/path/raw 데이터 제거, 핵심 요약만 반환
-    slim_directions = []
-    for d in result.get("directions", [])[:10]:  # 최대 10구간만
-        slim_directions.append({
-            "from": d.get("from"),
-            "to": d.get("to"),
-            "duration_text": d.get("duration_text"),
-            "distance_text": d.get("distance_text"),
-            "mode": d.get("mode"),
-            "error": d.get("error")
-        })
-    
-    final_result = {
-        "success": result.get("success", False),
-        "total_duration": result.get("total_duration", 0),
-        "total_distance": result.get("total_distance", 0),
-        "directions": slim_directions,
-        "mode": mode,
-        "error": result.get("error")
-    }
-    
-    # 결과를 캐시에 저장 (최대 100개까지만 캐시 유지)
-    if len(_routing_cache) >= 100:
-        # 가장 오래된 항목 제거 (FIFO)
-        oldest_key = next(iter(_routing_cache))
-        del _routing_cache[oldest_key]
-    _routing_cache[cache_key] = final_result
+    if not result.get("success") and offlinetool.is_available(mode):
+        # T Map / Google이 모두 실패하면 오프라인 그래프로 폴백 (일부 구간만 성공해도 사용)
+        offline_result = await offlinetool.execute(places=places, mode=mode)
+        if offline_result.get("success"):
+            print(f"🧭 [check_routing] 외부 API 실패, 오프라인 그래프로 폴백 ({mode})")
+            result = offline_result
     
-    return final_result
+    return result
 
 def _is_in_korea(places: List[Dict[str, Any]]) -> bool:
     """
@@ -294,19 +442,25 @@ class CourseCreationTool(BaseTool):
             self.config.get("api_key") or 
             os.getenv("OPENAI_API_KEY")
         )
-        if self.api_key:
-            self.client = openai.AsyncOpenAI(api_key=self.api_key)
-        else:
-            # 환경 변수에서 직접 로드
-            self.client = openai.AsyncOpenAI()
-        # LLM 클라이언트 초기화 (실제 구현 시 사용)
-        # 예: OpenAI, Anthropic, 등
-        # self.client = OpenAI(api_key=self.api_key)
-        self.tools = [check_routing]
+        # LLM 클라이언트는 이벤트 루프별 공용 인스턴스를 사용 (self.client 참고)
+        
+        # 코스 계획 방식: "single_call"(비용 행렬 + LLM 1회 호출), "agent"(check_routing 반복 호출),
+        # "solver"(빔 서치 플래너 + LLM 코스 설명), "fast"(빔 서치 플래너만, LLM 호출 없음)
+        self.planning_mode = self.config.get("planning_mode", Config.PLANNING_MODE)
+        self.course_planner = CoursePlanner(
+            beam_width=Config.PLANNER_BEAM_WIDTH,
+            max_places=Config.PLANNER_MAX_PLACES,
+            max_leg_minutes=Config.PLANNER_MAX_LEG_MINUTES
+        )
         
         # 경고 로그 출력 여부 (기본: 경고 표시)
         self.suppress_llm_warnings = self._resolve_warning_suppression()
     
+    @property
+    def client(self):
+        """현재 이벤트 루프의 공용 AsyncOpenAI 클라이언트 (API 키가 없으면 환경 변수에서 로드)"""
+        return get_http_registry().get_openai_client(self.api_key)
+    
     def _parse_visit_date(self, visit_date: str) -> Optional[str]:
         """
         방문 날짜 문자열을 YYYY-MM-DD 형식으로 파싱
@@ -401,27 +555,6 @@ class CourseCreationTool(BaseTool):
         """
         코스 제작 실행
         
-        Args:
-            places: 검색된 장소 리스트
-            user_preferences: 사용자 선호도
-            time_constraints: 시간 제약
-            
-        Returns:
-            코스 생성 결과
-        """
-        # 장소 개수 사전 제한 (컨텍스트 길이 초과 방지) - 더 엄격하게 제한
-        MAX_PLACES = 20  # 30 -> 20으로 감소 (토큰 길이 초과 방지)
-        if len(places) > MAX_PLACES:
-            print(f"⚠️ 장소가 {len(places)}개로 너무 많아 {MAX_PLACES}개로 제한합니다.")
-            # 저장된 장소는 우선 보존
-            saved_places = [p for p in places if p.get('is_saved_place')]
-            other_places = [p for p in places if not p.get('is_saved_place')]
-            # 저장된 장소 + 나머지 장소 (신뢰도 순으로 정렬)
-            other_places.sort(key=lambda x: x.get('trust_score', 0), reverse=True)
-            places = saved_places + other_places[:MAX_PLACES - len(saved_places)]
-        """
-        코스 제작 실행
-        
         Args:
             places: 검색된 장소 리스트
             user_preferences: 사용자 선호도 {
@@ -436,19 +569,39 @@ class CourseCreationTool(BaseTool):
                 "end_time": str,  # 종료 시간
                 "total_duration": int  # 총 소요 시간 (분)
             }
+            on_description: (kwargs) 생성 중인 코스 설명 텍스트 조각을 받을 콜백
             
         Returns:
             {
                 "success": bool,
                 "course": {
-                    "places": List[Dict],  # 선정된 장소 리스트
-                    "estimated_duration": Dict[str, int],  # 각 장소별 예상 체류 시간
-                    "course_description": str  # 코스 설명
+                    "places": List[Dict],  # 선별된 후보 장소 리스트
+                    "sequence": List[int],  # 방문 순서 (places 인덱스)
+                    "estimated_duration": Dict[str, int],  # 각 장소별 예상 체류 시간 (분)
+                    "course_description": str,  # 코스 설명
+                    "weather_info": Dict[int, Dict],  # 장소별 날씨
+                    "visit_date": str,  # 방문 일자
+                    "route_validation": None  # 완료 후 경로 안내 미리 계산에서 채움
                 },
                 "reasoning": str,  # 코스 선정 이유
                 "error": Optional[str]
             }
         """
+        # 장소 개수 사전 제한 (컨텍스트 길이 초과 방지)
+        # 공간 군집/이동 시간/카테고리 커버리지로 1차 선별한 뒤 LLM 또는 플래너가 그 안에서 계획
+        if self.planning_mode in ("solver", "fast"):
+            max_places = Config.SHORTLIST_SOLVER_SIZE
+        else:
+            max_places = Config.SHORTLIST_PROMPT_SIZE
+        if places and len(places) > max_places:
+            preferences = user_preferences or {}
+            places = shortlist_places(
+                places,
+                max_places,
+                mode=self._routing_mode_from_transportation(preferences.get("transportation")),
+                hour=self._planning_hour(preferences, time_constraints)
+            )
+        
         try:
             if not self.validate_params(places=places, user_preferences=user_preferences):
                 return {
@@ -487,7 +640,7 @@ class CourseCreationTool(BaseTool):
                                 lat = float(coords.get("lat"))
                                 lng = float(coords.get("lng"))
                                 # 지역 날씨 한 번만 조회 (사용자가 설정한 날짜 기준)
-                                single_weather = await maptool.get_weather_info(lat, lng, date_str)
+                                single_weather = await get_maptool().get_weather_info(lat, lng, date_str)
                                 # 모든 장소에 동일한 날씨 정보 적용
                                 for idx in range(len(places)):
                                     weather_info[idx] = single_weather
@@ -510,7 +663,8 @@ class CourseCreationTool(BaseTool):
             
             # LLM을 사용하여 코스 생성
             course_result = await self._generate_course_with_llm(
-                places, user_preferences, time_constraints, weather_info
+                places, user_preferences, time_constraints, weather_info,
+                on_description=kwargs.get("on_description")
             )
             
             return {
@@ -585,6 +739,7 @@ class CourseCreationTool(BaseTool):
         user_preferences: Dict[str, Any],
         time_constraints: Optional[Dict[str, Any]],
         weather_info: Optional[Dict[int, Dict[str, Any]]] = None,
+        on_description: Optional[Callable[[str], None]] = None,
     ) -> Dict[str, Any]:
         """
         LLM을 사용하여 코스 생성
@@ -593,6 +748,7 @@ class CourseCreationTool(BaseTool):
             places: 장소 리스트
             user_preferences: 사용자 선호도
             time_constraints: 시간 제약
+            on_description: 생성 중인 코스 설명 텍스트 조각 콜백
             
         Returns:
             코스 생성 결과
@@ -600,327 +756,67 @@ class CourseCreationTool(BaseTool):
         for i, place in enumerate(places):
             place['original_index'] = i
         
-        system_instruction = """
-# Role
-여행 가이드. 제공된 장소 리스트에서 최적의 코스를 선택하고 JSON으로 반환.
-
-# Input
-- 장소 리스트: {places} (형식: [인덱스]이름|카테고리|⭐|좌표|평점)
-- 허용 인덱스 목록: {allowed_indices}
-- 사용자 선호: {user_preferences}
-- 시간 제약: {time_constraints}
-**중요**: 각 장소의 original_index를 기준으로 인덱스 참조.
-
-# Constraints
-1. 저장된 장소(⭐ 표시) 최우선 포함
-2. check_routing tool로 거리/시간 계산 (coordinates 필수: {{"lat":숫자,"lng":숫자}})
-   **중요: 같은 장소 조합에 대해서는 한 번만 check_routing을 호출하세요. 이미 검증한 경로는 다시 확인하지 마세요.**
-   **중요: 좌표가 동일하거나 매우 가까운 장소(10m 이내)는 check_routing을 호출하지 말고 직접 경로로 처리하세요.**
-3. 좌표 기반으로 가까운 장소 우선 그룹화
-4. 이동 시간 30분 이내
-5. 도보 우선 (차이 20분 이내면 도보)
-6. 식당/카페 연속 방문 금지
-
-# Workflow
-1. 저장된 장소(⭐) 선정
-2. 테마에 맞는 추가 장소 선정
-3. 식당/카페 연속 방문 체크 및 재배치
-4. 거리 최소화 순서로 배열
-5. check_routing으로 경로 검증 (중요: 같은 장소 조합은 한 번만 검증하세요. 이미 검증한 경로는 다시 확인하지 마세요.)
-6. JSON 출력
-
-# Output (JSON만)
-{{
-  "selected_places": [장소 리스트],
-  "sequence": [선택된 장소 내 순서 인덱스],
-  "estimated_duration": {{"선택된 장소 인덱스": 분}},
-  "course_description": "코스 설명",
-  "reasoning": "선정 이유"
-}}
-
-# Rules
-- selected_places: 반드시 허용 인덱스 목록 안의 정수만 사용
-- sequence: selected_places 기준 0..N-1 인덱스 (예: selected_places가 3개면 sequence는 0~2만)
-- reasoning: "1. [original_index] 장소이름: 설명" 형식, 모든 인덱스 포함
-- JSON 마지막 쉼표 금지
-- 인덱스 연산 금지 (+1/-1 등)
-"""
+        result = None
+        if self.planning_mode in ("solver", "fast"):
+            # 빔 서치 플래너가 장소 선택/순서/체류 시간을 결정 (LLM 호출 없음)
+            result = await self._plan_course_with_solver(
+                places, user_preferences, time_constraints, weather_info
+            )
+        elif self.planning_mode == "single_call":
+            # 후보 전체 이동 비용 행렬을 프롬프트에 넣고 LLM 1회 호출로 장소 선택/순서 결정
+            response_content = await self._plan_course_single_call(
+                places, user_preferences, time_constraints, weather_info
+            )
+        else:
+            # LangChain Agent가 check_routing으로 후보 조합을 반복 검증
+            response_content = await self._plan_course_with_agent(
+                places, user_preferences, time_constraints, weather_info
+            )
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_instruction),
-            MessagesPlaceholder(variable_name="chat_history", optional=True),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
-
-        # prompt = f"""
-        # # Role
-        # 당신은 현지 지리에 능통하고 모든 장소를 방문해본 여행 가이드입니다. 당신은 효율적인 경로 설계에 능통합니다.
-        # **당신의 임무는 제공된 장소 리스트에서 최적의 코스를 선택하고 JSON 형식으로 반환하는 것입니다.**
+        if result is None:
+            # 빈 응답 체크
+            if not response_content:
+                raise ValueError("LLM이 빈 응답을 반환했습니다. Agent가 작업을 완료하지 못했을 수 있습니다.")
         
-        # Input Data
-        # - 장소 리스트 : {self._format_places_for_prompt(places)}
-        # - 사용자 선호 조건{{
-        #     "theme": {user_preferences['theme']},
-        #     "group_size": {user_preferences['group_size']},
-        #     "visit_date": {user_preferences['visit_date']},
-        #     "visit_time": {user_preferences['visit_time']},
-        #     "transportation": {user_preferences['transportation']},
-        #     "budget": {user_preferences.get('budget', '없음')}원
-        # }}
-
-        # # Constraints
-        # 1. **최우선 규칙: 사용자가 저장한 장소(⭐ [사용자가 저장한 장소 - 최우선 고려] 표시가 있는 장소)는 반드시 최우선적으로 고려해야 합니다.**
-        #    - 저장된 장소는 이미 테마와 위치 필터링을 통과했으므로, 사용자의 의도에 부합하는 장소입니다.
-        #    - 저장된 장소가 사용자의 테마와 위치 조건에 부합한다면, 반드시 코스에 포함시켜야 합니다.
-        #    - 저장된 장소를 포함하는 것이 다른 제약 조건(거리, 시간 등)과 충돌하더라도, 가능한 한 포함하도록 노력하세요.
-        # 2. **예산 제약: 사용자가 예산을 입력한 경우(예산이 "없음"이 아닌 경우), 반드시 예산 내에서 코스를 설계해야 합니다.**
-        #    - 예산이 입력된 경우에만 이 제약을 적용합니다. 예산이 "없음"이거나 입력되지 않은 경우에는 예산 제약을 무시합니다.
-        #    - 예산이 입력된 경우, 각 장소의 예상 비용(입장료, 식사비, 교통비 등)을 고려하여 총 예산을 초과하지 않도록 해야 합니다.
-        #    - 장소별 예상 비용은 카테고리와 평점을 기반으로 추정하세요 (예: 관광지 입장료 5,000-20,000원, 식당 식사비 10,000-50,000원, 카페 음료 5,000-15,000원).
-        #    - 교통비도 예산에 포함시켜야 합니다 (지하철 1,250원, 버스 1,300원, 택시 기본요금 3,800원 등).
-        #    - 예산이 부족할 경우, 무료 또는 저렴한 장소를 우선적으로 선택하거나, 비용이 많이 드는 장소를 제외해야 합니다.
-        #    - 예산이 충분한 경우에도, 불필요하게 비싼 장소만 선택하지 말고 다양한 가격대의 장소를 균형있게 선택하세요.
-        # 3. 제공된 [위치 좌표(위도, 경도)] 데이터를 기반으로 장소 간의 실제 물리적 거리를 계산하여 코스를 짤 것.
-        # 4. 당신의 배경지식보다 입력된 좌표 정보가 서로 가까운 장소들을 우선적으로 그룹화할 것.
-        # 5. 추천 신뢰도(Trust Score)가 높은 장소를 우선적으로 고려하되, 지리적 동선 효율성을 해치지 않는 범위 내에서 선택할 것.
-        # 6. 각 코스 간 이동 거리는 30분 이내일 것. (좌표 데이터를 참고하여 보수적으로 판단)
-        # 7. 도보 외의 교통 수단의 사용 빈도를 최소화할 것. 단, 환승은 사용 빈도 계산에서 제외한다. 도보와 교통 수단의 이동 시간 차이가 20분 이내이면 도보를 선택한다.
-        # 8. 이전에 방문한 장소를 다시 지나지 않을 것.
-        # 9. 장소에 현재 인원이 모두 수용 가능할 것.
-        # 10. 장소가 방문 일자에 운영중임을 확인할 것. 입력된 정보가 없을 시 보수적으로 판단한다.
-        # 11. 음식점, 카페 등을 코스 중간마다 배치할 것.
-
-        # # Task Workflow
-        # 1. **최우선 단계: 사용자가 저장한 장소(⭐ [사용자가 저장한 장소 - 최우선 고려] 표시)를 먼저 선정합니다.**
-        #    - 저장된 장소는 이미 테마와 위치 필터링을 통과했으므로, 가능한 한 모두 포함하도록 노력하세요.
-        #    - 저장된 장소가 여러 개인 경우, 모두 포함하거나 최대한 많이 포함하세요.
-        # 2. **예산 확인 단계: 예산이 입력된 경우(예산이 "없음"이 아닌 경우)에만, 각 장소의 예상 비용을 계산합니다.**
-        #    - 예산이 입력된 경우에만 이 단계를 수행합니다.
-        #    - 저장된 장소와 새로 선정할 장소의 예상 비용을 합산하여 예산을 초과하지 않는지 확인합니다.
-        #    - 예산을 초과할 경우, 비용이 적은 장소를 우선적으로 선택하거나 비싼 장소를 제외합니다.
-        #    - 예산 내에서 최대한 많은 장소를 포함하도록 노력하세요.
-        # 3. 저장된 장소를 포함한 상태에서, 사용자의 테마와 장소의 특징을 대조하여 추가로 적합한 장소들을 선정합니다. (예산 제약 고려)
-        # 4. 이동 거리를 최소화하는 순서로 배열합니다. (저장된 장소를 포함한 전체 코스 기준)
-        # 5. 선정된 순서가 실제 방문 가능 시간(영업시간) 내에 있는지 검증합니다.
-        # 6. 예산이 입력된 경우, 최종 코스의 총 예상 비용이 예산을 초과하지 않는지 최종 확인합니다.
-        # 7. 모든 논리적 검증이 끝나면 최종 JSON을 출력합니다.
-        # 
-        # **중요: 저장된 장소를 코스에 포함시키는 것이 최우선 목표이며, 예산이 입력된 경우 예산 제약도 반드시 준수해야 합니다.**
-
-        # # Task Workflow
-        # 1. 사용자의 테마와 장소의 특징을 대조하여 적합한 장소들을 선정합니다.
-        # 2. 이동 거리를 최소화하는 순서로 배열합니다.
-        # 3. 선정된 순서가 실제 방문 가능 시간(영업시간) 내에 있는지 검증합니다.
-        # 4. 모든 논리적 검증이 끝나면 최종 JSON을 출력합니다.
-
-        # # IMPORTANT: Output Format
-        # **당신은 반드시 이 작업을 수행해야 합니다. 작업을 거부하거나 설명을 제공하지 마세요.**
-        # **오직 JSON 형식만 출력하세요. 다른 텍스트, 설명, 마크다운 헤더는 절대 포함하지 마세요.**
-
-        # ---
-
-        # ## Return Value
-        # 코스 설계 완료 후, **반드시 다음의 JSON 형식만** 출력하세요. 다른 설명이나 텍스트는 포함하지 마세요.
-        # 
-        # ```json
-        # {{
-        #     "selected_places": [장소 인덱스 리스트],
-        #     "sequence": [방문 순서],
-        #     "estimated_duration": {{장소별 체류 시간 (분)}},
-        #     "course_description": "코스 설명",
-        #     "reasoning": "선정 이유"
-        # }}
-        # ```
-
-        # ### OUTPUT Rules
-        # - "selected_places"는 0부터 시작하는 장소 인덱스 리스트입니다 (예: [0, 2, 4])
-        # - **중요: 저장된 장소(⭐ [사용자가 저장한 장소 - 최우선 고려] 표시)의 인덱스는 반드시 selected_places에 포함되어야 합니다.**
-        # - "sequence"는 선택된 장소들의 방문 순서를 인덱스로 나타냅니다 (예: [0, 1, 2]는 첫 번째, 두 번째, 세 번째로 선택된 장소의 순서)
-        # - **중요: 저장된 장소는 sequence에도 반드시 포함되어야 하며, 가능하면 앞쪽 순서에 배치하세요.**
-        # - "estimated_duration"은 장소 인덱스를 키로 하고 체류 시간(분)을 값으로 하는 객체입니다 (예: {{"0": 60, "2": 90, "4": 45}})
-        # - "course_description"에는 방문하는 각각의 장소에 대한 간단한 설명들을 첨부합니다.
-        # - **중요: course_description에 언급한 모든 장소는 반드시 selected_places에도 포함되어야 합니다.**
-        # - "reasoning"에는 인덱스를 **장소이름(인덱스)** 형태로 언급하고, 인덱스에 해당하는 장소에 대한 설명을 바탕으로 사용자 선호 조건 중 만족시킨 사항들을 설명합니다.
-        # - "reasoning"을 생성할 때, 방문하는 장소들의 순서 및 이동수단 설계 과정에 대해 설명하세요.
-        # - 예산이 입력된 경우, "reasoning"에 예산이 어떻게 고려되었는지, 각 장소의 예상 비용과 총 예상 비용을 포함하여 설명하세요.
-        # 
-        # # 설명 예시:
-        # # - 장소 A와 장소 C 사이에 장소 B가 있고, 다시 장소 A 주변 지역을 가지 않을 예정이기에 A-B-C 순서로 일정을 설계하였습니다.
-        # # - 방문 기간이 오후이기 때문에, 잠시 쉬어가기 위해 장소 A와 장소 C 사이에 **카페** B를 먼저 방문합니다.
-        # # - 장소 A와 장소 B 사이에 오르막길이 길게 있고 도보 시간이 15분 이상 걸리기 때문에, 이동수단으로 **버스**를 선택했습니다.
-        # 
-        # **중요: JSON 형식만 출력하고, 다른 텍스트는 포함하지 마세요.**
-        # """
-
-        llm = ChatOpenAI(model=self.llm_model, temperature=0)
-        planner = create_openai_tools_agent(llm, self.tools, prompt)
-        # AgentExecutor에 에러 핸들러 추가
-        def handle_tool_error(error: Exception) -> str:
-            """Tool 호출 오류 처리"""
-            error_msg = str(error)
-            if "Field required" in error_msg and "places" in error_msg:
-                return "오류: check_routing tool을 호출할 때는 반드시 'places' 파라미터를 전달해야 합니다. 예: check_routing(places=[장소리스트], mode='transit')"
-            return f"Tool 오류: {error_msg}"
-        
-        planner_executer = AgentExecutor(
-            agent=planner, 
-            tools=self.tools, 
-            verbose=True,
-            handle_parsing_errors=handle_tool_error,
-            max_iterations=10,  # 최대 반복 횟수 (불필요한 반복 방지)
-            return_intermediate_steps=True,  # 중간 단계 반환 (디버깅용)
-            max_execution_time=300  # 최대 실행 시간 5분
-        )
-
-        # 날씨 정보 포맷팅 (지역 기준 단일 날씨 정보)
-        weather_info_str = ""
-        if weather_info:
-            # 첫 번째 날씨 정보만 사용 (모든 장소가 같은 지역이므로 동일한 날씨)
-            first_weather = next(iter(weather_info.values())) if weather_info else None
-            if first_weather:
-                temp = first_weather.get('temperature', 'N/A')
-                condition = first_weather.get('condition', '정보없음')
-                # 날씨 정보를 더 상세하게 제공하여 LLM이 판단하기 쉽게 함
-                weather_info_str = f"지역날씨: {temp}°C, {condition}. 날씨에 따라 야외/실내 활동을 적절히 선택하고, 날씨가 나쁘면 이동 경로를 최소화하세요."
-        
-        # check_routing 사용 예시를 input에 포함
-        check_routing_example = """
-중요: check_routing tool을 사용할 때는 반드시 다음과 같이 호출하세요:
-check_routing(places=[장소리스트], mode="transit")
-- places 파라미터는 반드시 포함해야 합니다.
-- 각 장소는 coordinates 필드를 포함해야 합니다: {"name":"장소명","coordinates":{"lat":위도,"lng":경도}}
-- **중요: 같은 장소 조합에 대해서는 한 번만 check_routing을 호출하세요. 이미 검증한 경로는 다시 확인하지 마세요.**
-- **중요: 좌표가 동일하거나 매우 가까운 장소(10m 이내)는 check_routing을 호출하지 말고 직접 경로로 처리하세요.**
-"""
-        
-        allowed_indices = list(range(len(places)))
-        try:
-            planning_result = await planner_executer.ainvoke({
-                'input': f"""{user_preferences['theme']}에 맞는 여행 코스를 제작해 주세요. {'날씨 정보를 반드시 고려하여 실내/야외 장소를 적절히 선택하고, 날씨가 나쁘면 이동 경로를 최소화하세요.' if weather_info else ''}
-
-{check_routing_example}""",
-                "places": self._format_places_for_prompt(places),
-                "user_preferences": json.dumps(user_preferences, ensure_ascii=False),
-                "time_constraints": json.dumps(time_constraints, ensure_ascii=False),
-                "weather_info": weather_info_str,
-                "allowed_indices": json.dumps(allowed_indices, ensure_ascii=False)
-                })
-        except Exception as e:
-            error_msg = str(e)
-            print(f"⚠️ AgentExecutor 실행 중 오류: {error_msg}")
-            
-            # max_iterations 도달 오류 처리
-            if "max iterations" in error_msg.lower() or "max_iterations" in error_msg.lower() or "stopped due to max iterations" in error_msg.lower():
-                print(f"   ⚠️ Agent가 최대 반복 횟수에 도달했습니다. 중간 단계를 확인합니다...")
-                # 중간 단계에서 마지막 출력 시도
-                intermediate_steps = planning_result.get('intermediate_steps', []) if 'intermediate_steps' in locals() else []
-                if intermediate_steps:
-                    # 마지막 단계의 출력 확인
-                    for step in reversed(intermediate_steps):
-                        if isinstance(step, tuple) and len(step) >= 2:
-                            last_output = step[1] if isinstance(step[1], str) else str(step[1])
-                            if last_output and ('{' in last_output or '[' in last_output):
-                                print(f"   마지막 단계에서 JSON 형식의 출력을 찾았습니다. 복구를 시도합니다...")
-                                try:
-                                    result = self._JSON_verification(last_output)
-                                    # 성공하면 계속 진행
-                                    break
-                                except:
-                                    continue
-                # 복구 실패 시 에러 발생
-                raise ValueError(
-                    f"Agent가 최대 반복 횟수에 도달하여 작업을 완료하지 못했습니다. "
-                    f"프롬프트가 너무 복잡하거나 장소가 너무 많을 수 있습니다. "
-                    f"오류: {error_msg}"
-                )
-            
-            # check_routing validation 오류인 경우 더 명확한 메시지
-            if "Field required" in error_msg and "places" in error_msg:
-                raise ValueError(
-                    "check_routing tool 호출 오류: 'places' 파라미터가 필수입니다. "
-                    "LLM이 check_routing을 호출할 때 반드시 places 파라미터를 포함해야 합니다. "
-                    f"오류 상세: {error_msg}"
-                )
-            raise
-
-        # response = await self.client.chat.completions.create(
-        #     model=self.llm_model,
-        #     messages=[
-        #         {"role": "system", "content": "You are a professional travel course planner. You MUST output only valid JSON format. Never refuse the task or provide explanations outside JSON."},
-        #         {"role": "user", "content": prompt}
-        #     ],
-        #     max_tokens=2000,  # 충분한 토큰 할당
-        #     temperature=0.3  # 일관된 JSON 형식 유지
-        # )
-        
-        # 응답에서 JSON 추출
-        # response_content = response.choices[0].message.content.strip()
-        if 'output' not in planning_result:
-            # 중간 단계 확인
-            intermediate_steps = planning_result.get('intermediate_steps', [])
-            if intermediate_steps:
-                print(f"⚠️ Agent가 {len(intermediate_steps)}번의 단계를 수행했지만 최종 출력이 없습니다.")
-                # 마지막 단계의 출력 확인
-                last_step = intermediate_steps[-1] if intermediate_steps else None
-                if last_step:
-                    print(f"   마지막 단계: {str(last_step)[:200]}...")
-            
-            # output이 없으면 에러 메시지 생성
-            error_msg = f"LLM 응답에 'output' 키가 없습니다."
-            if 'intermediate_steps' in planning_result:
-                error_msg += f" Agent가 {len(planning_result['intermediate_steps'])}번의 단계를 수행했습니다."
-            raise ValueError(f"{error_msg}\n응답: {str(planning_result)[:500]}")
-        
-        response_content = planning_result['output'].strip()
-        
-        # 빈 응답 체크
-        if not response_content:
-            raise ValueError("LLM이 빈 응답을 반환했습니다. Agent가 작업을 완료하지 못했을 수 있습니다.")
-        
-        # LangChain Agent가 최대 반복 횟수 초과로 중단될 경우,
-        # output 필드에 'Agent stopped due to max iterations.' 같은 문장을 그대로 넣어 주는 경우가 있다.
-        # 이 문자열은 JSON이 아니므로, JSON 파싱을 시도하기 전에 특별 처리하여
-        # 불필요한 JSON 파싱 에러를 피하고, 사용자에게는 완만한 폴백 코스를 제공한다.
-        lower_output = response_content.lower()
-        if (
-            "max iterations" in lower_output
-            or "max_iterations" in lower_output
-            or "agent stopped" in lower_output
-        ):
-            print("⚠️ Agent가 최대 반복 횟수로 인해 중단되었습니다. 기본 코스 구조를 반환합니다.")
-            result = {
-                "selected_places": [],
-                "sequence": [],
-                "estimated_duration": {},
-                "course_description": "코스 생성 중 Agent가 최대 반복 횟수에 도달하여 기본 코스를 반환했습니다.",
-                "reasoning": "Agent stopped due to max iterations.",
-            }
-        else:
-            try:
-                result = self._JSON_verification(response_content)
-            except ValueError as json_error:
-                # JSON 파싱 실패 시 더 자세한 정보 제공
-                error_msg = str(json_error)
-                print(f"❌ JSON 파싱 실패: {error_msg}")
-                
-                # 중간 단계 정보 출력
-                if 'intermediate_steps' in planning_result:
-                    print(f"   Agent 실행 단계: {len(planning_result.get('intermediate_steps', []))}개")
-                
-                # 응답 내용 일부 출력
-                print(f"   응답 내용 (처음 500자): {response_content[:500]}")
-                
-                # 폴백: 최소한의 JSON 구조라도 생성 시도
-                print(f"   ⚠️ JSON 파싱 실패로 인해 기본 코스 구조를 생성합니다...")
-                # 빈 코스 구조 반환 (나중에 검증 로직에서 처리)
-                result = {
-                    "selected_places": [],
-                    "sequence": [],
-                    "estimated_duration": {},
-                    "course_description": "코스 생성 중 오류가 발생했습니다.",
-                    "reasoning": f"JSON 파싱 오류: {error_msg}"
-                }
+            # LangChain Agent가 최대 반복 횟수 초과로 중단될 경우,
+            # output 필드에 'Agent stopped due to max iterations.' 같은 문장을 그대로 넣어 주는 경우가 있다.
+            # 이 문자열은 JSON이 아니므로, JSON 파싱을 시도하기 전에 특별 처리하여
+            # 불필요한 JSON 파싱 에러를 피하고, 사용자에게는 완만한 폴백 코스를 제공한다.
+            lower_output = response_content.lower()
+            if (
+                "max iterations" in lower_output
+                or "max_iterations" in lower_output
+                or "agent stopped" in lower_output
+            ):
+                print("⚠️ Agent가 최대 반복 횟수로 인해 중단되었습니다. 기본 코스 구조를 반환합니다.")
+                result = {
+                    "selected_places": [],
+                    "sequence": [],
+                    "estimated_duration": {},
+                    "course_description": "코스 생성 중 Agent가 최대 반복 횟수에 도달하여 기본 코스를 반환했습니다.",
+                    "reasoning": "Agent stopped due to max iterations.",
+                }
+            else:
+                try:
+                    result = self._JSON_verification(response_content)
+                except ValueError as json_error:
+                    # JSON 파싱 실패 시 더 자세한 정보 제공
+                    error_msg = str(json_error)
+                    print(f"❌ JSON 파싱 실패: {error_msg}")
+                
+                    # 응답 내용 일부 출력
+                    print(f"   응답 내용 (처음 500자): {response_content[:500]}")
+                
+                    # 폴백: 최소한의 JSON 구조라도 생성 시도
+                    print(f"   ⚠️ JSON 파싱 실패로 인해 기본 코스 구조를 생성합니다...")
+                    # 빈 코스 구조 반환 (나중에 검증 로직에서 처리)
+                    result = {
+                        "selected_places": [],
+                        "sequence": [],
+                        "estimated_duration": {},
+                        "course_description": "코스 생성 중 오류가 발생했습니다.",
+                        "reasoning": f"JSON 파싱 오류: {error_msg}"
+                    }
 
         # ============================================================
         # [최종 버그 수정] LLM이 반환한 인덱스 유효성 검증
@@ -1073,18 +969,43 @@ check_routing(places=[장소리스트], mode="transit")
             marker = "⭐" if is_saved else "  "
             print(f"   {marker} [{i}] {place.get('name')} (인덱스: {idx})")
         
+        # sequence/estimated_duration은 selected_places 내 위치 기준이지만
+        # 코스 결과는 전체 places와 함께 반환되고 모든 소비자가 places[sequence[i]]로 읽으므로 원본 인덱스로 변환
+        course_sequence = [valid_selected_indices[pos] for pos in valid_sequence]
+        course_duration = {str(valid_selected_indices[int(pos)]): value for pos, value in valid_duration.items()}
+        
+        # 계획 이후 단계는 서로 독립적이므로 동시에 실행 (코스 설명 LLM 호출 / 선택된 장소 날씨)
+        # 최종 순서의 실측 경로 검증은 완료 후 경로 안내 미리 계산(RoutingAgent) 결과로 대신함
+        # (app.prefetch_post_planning → summarize_route_validation)
+        async def no_result():
+            return None
+        
+        description_task = no_result()
+        if self.planning_mode != "fast":
+            description_task = self._generate_course_descriptions(
+                places=places,
+                sequence=course_sequence,
+                user_preferences=user_preferences,
+                time_constraints=time_constraints,
+                estimated_duration=course_duration,
+                on_description=on_description)
+        raw_course_description, course_weather_info = await asyncio.gather(
+            description_task,
+            self._weather_for_selected_places(places, valid_selected_indices, user_preferences, weather_info)
+        )
+        
         # course_description과 reasoning 안전하게 추출
         course_description = ""
-        raw_course_description = await self._generate_course_descriptions(
-            places=places,
-            sequence=valid_sequence,
-            user_preferences=user_preferences,
-            time_constraints=time_constraints,
-            estimated_duration=result["estimated_duration"])
-        if isinstance(raw_course_description, dict):
-            course_description = raw_course_description.get("course_description", "")
-            if not isinstance(course_description, str):
-                course_description = str(course_description) if course_description else ""
+        if self.planning_mode == "fast":
+            # LLM 호출 없이 플래너 결과로 템플릿 설명 생성
+            course_description = result.get("course_description", "")
+            if on_description and course_description:
+                on_description(course_description)
+        else:
+            if isinstance(raw_course_description, dict):
+                course_description = raw_course_description.get("course_description", "")
+                if not isinstance(course_description, str):
+                    course_description = str(course_description) if course_description else ""
         
         reasoning = ""
         if isinstance(result, dict):
@@ -1092,114 +1013,614 @@ check_routing(places=[장소리스트], mode="transit")
             if not isinstance(reasoning, str):
                 reasoning = str(reasoning) if reasoning else ""
         
-        # 날씨 정보를 코스 결과에 포함 (지역 기준 단일 날씨 정보)
-        course_weather_info = {}
-        if weather_info:
-            # 첫 번째 날씨 정보를 모든 장소에 적용 (같은 지역이므로 동일한 날씨)
-            first_weather = next(iter(weather_info.values())) if weather_info else None
-            if first_weather:
-                # 선택된 모든 장소에 동일한 날씨 정보 적용
-                for idx in valid_selected_indices:
-                    course_weather_info[idx] = first_weather
-        
         return {
             "course": {
                 "places": places,
-                "sequence": valid_sequence,
-                "estimated_duration": valid_duration,
+                "sequence": course_sequence,
+                "estimated_duration": course_duration,
                 "course_description": course_description,
                 "weather_info": course_weather_info,
-                "visit_date": user_preferences.get("visit_date")
+                "visit_date": user_preferences.get("visit_date"),
+                "route_validation": None  # 완료 후 경로 안내 미리 계산에서 채움
             },
             "reasoning": reasoning
         }
     
-    async def _generate_course_descriptions(
-            self,
-            sequence: List[int],
-            places: List[Dict[str, Any]],
-            user_preferences: Dict[str, Any],
-            time_constraints: Optional[Dict[str, Any]],
-            estimated_duration,
-    ):
+    @staticmethod
+    def _routing_mode_from_transportation(transportation: Optional[str]) -> str:
+        """사용자 이동 수단 문자열을 경로 모드로 변환 (우선순위: 대중교통 > 자동차 > 도보)"""
+        transportation = transportation or ""
+        if any(keyword in transportation for keyword in ['지하철', '버스', '대중교통', '대중 교통']):
+            return "transit"
+        if '자동차' in transportation:
+            return "driving"
+        return "walking"
+    
+    @staticmethod
+    def _planning_hour(
+        user_preferences: Dict[str, Any],
+        time_constraints: Optional[Dict[str, Any]]
+    ) -> Optional[int]:
+        """시작 시각(HH:MM)의 시 (없으면 None)"""
+        candidates = [(time_constraints or {}).get("start_time"), user_preferences.get("visit_time")]
+        for value in candidates:
+            match = re.search(r"(\d{1,2}):(\d{2})", str(value or ""))
+            if match and 0 <= int(match.group(1)) < 24:
+                return int(match.group(1))
+        return None
+    
+    async def _plan_course_single_call(
+        self,
+        places: List[Dict[str, Any]],
+        user_preferences: Dict[str, Any],
+        time_constraints: Optional[Dict[str, Any]],
+        weather_info: Optional[Dict[int, Dict[str, Any]]] = None,
+    ) -> str:
         """
-        선별된 장소 기반 코스 설명
-        Args:
-            sequence: 선별된 장소 인덱스 리스트
-            places: 장소 리스트
-            user_preferences: 사용자 선호 조건
-            time_constraints: 시간 제약 조건
-            estimated_duration: 코스 장소 별 체류 시간
+        후보 전체 이동 시간 행렬 + LLM 1회 호출로 코스 계획
+        
+        check_routing을 반복 호출하는 대신, 구간 캐시/오프라인 그래프/학습 모델/직선 거리로
+        후보 간 소요 시간 표를 한 번 만들어 프롬프트에 넣고 장소 선택과 순서를 한 번에 받습니다.
         
         Returns:
-            장소에 대한 설명
+            LLM 응답 문자열 (JSON)
         """
-        selected_places = []
-        selected_duration = {}
-        for i in sequence:
-            selected_places.append(places[i])
-            # selected_duration[places[i].get("name")] = estimated_duration[f"{i}"]
-
+        mode = self._routing_mode_from_transportation(user_preferences.get("transportation"))
+        hour = self._planning_hour(user_preferences, time_constraints)
+        loop = asyncio.get_running_loop()
+        matrix = await loop.run_in_executor(None, build_cost_matrix, places, mode, hour)
+        sources = ", ".join(f"{name} {count}" for name, count in matrix["sources"].items() if count)
+        print(f"🧮 이동 시간 행렬 생성: {len(places)}x{len(places)} ({mode}, {sources or '계산 불가'})")
         
-        system_prompt = f"""
-            # Role
-            당신은 현지 지리에 능통하고 모든 장소를 방문해본 베테랑 여행 가이드입니다.
-            **당신의 절대적인 임무는 제공된 '장소 리스트'의 모든 항목을 단 하나도 빠짐없이 순서대로 포함하여 코스 설명을 작성하는 것입니다.**
-
-            # Context
-            설계된 코스와 사용자 선호 조건을 바탕으로 코스 설명을 제공합니다.
-            제공된 코스는 최적화된 순서로 배열되어 있습니다. 당신은 가이드로서 첫 번째 장소부터 마지막 장소까지 사용자를 인솔하듯 '순차적으로' 설명해야 합니다.
-
-            # Input Data
-            - 장소 리스트 : {selected_places}
-            - 사용자 선호 조건 : {user_preferences}
-            - 활동 시간 제약 : {time_constraints}
-            - 장소 별 체류 시간 : {estimated_duration}
-
-            # Constraints (엄수 사항)
-            1. **전수 포함 원칙 (Zero Omission):** 장소 리스트에 포함된 장소의 총 개수가 N개라면, 설명 내에도 반드시 N개의 장소가 모두 등장해야 합니다. 임의로 생략하거나 묶어서 설명하지 마세요.
-            2. **순차 기술 원칙:** 리스트의 0번 인덱스부터 마지막 인덱스까지 물리적 이동 순서에 따라 작성하세요.
-            3. **상세 정보 결합:** 각 장소의 별점, 카테고리, 그리고 '장소 별 체류 시간' 데이터를 활용하여 해당 장소에서 무엇을 할지 구체적으로 제안하세요.
-            4. **연결성 강화:** 장소와 장소 사이의 '이동 수단'과 '선택 이유'를 설명하여 흐름이 끊기지 않게 하세요.
+        weather_info_str = self._format_weather_for_prompt(weather_info)
+        allowed_indices = list(range(len(places)))
+        prompt = f"""
+# Role
+여행 가이드. 제공된 장소 리스트에서 최적의 코스를 선택하고 JSON으로 반환.
 
-            # Task Workflow
-            1. **리스트 스캔:** 입력된 '장소 리스트'의 총 개수를 먼저 확인합니다.
-            2. **순차적 설명 작성:** - [장소 정보]: 이름, 별점, 카테고리 언급 및 방문 목적 기술.
-            - [활동]: 해당 장소에서의 추천 활동 및 예상 체류 시간 언급.
-            - [이동]: 다음 장소로 이동하는 방법과 소요 시간/이유 기술 (마지막 장소 제외).
-            3. **전체 요약:** 모든 장소 기술이 끝난 후, 사용자 선호 조건이 어떻게 반영되었는지 요약하며 마무리합니다.
-            4. **자가 검증:** 작성된 설명 속에 포함된 장소의 개수가 입력 데이터의 개수와 일치하는지 확인합니다.
+# Input
+- 장소 리스트 (형식: [인덱스]이름|카테고리|⭐|좌표|평점):
+{self._format_places_for_prompt(places)}
+- 이동 시간 표 ({mode}, 분, 행: 출발 인덱스, 열: 도착 인덱스, "-"는 계산 불가):
+{format_duration_table(matrix["durations"])}
+- 허용 인덱스 목록: {json.dumps(allowed_indices, ensure_ascii=False)}
+- 사용자 선호: {json.dumps(user_preferences, ensure_ascii=False)}
+- 시간 제약: {json.dumps(time_constraints, ensure_ascii=False)}
+{f"- 날씨: {weather_info_str}" if weather_info_str else ""}
 
-            # IMPORTANT: Output Format
-            - **오직 JSON 형식만 출력하세요.** - **마크다운 코드 블록(```json)을 사용하지 말고 순수 JSON만 반환하세요.**
+# Constraints
+1. 저장된 장소(⭐ 표시) 최우선 포함
+2. 이동 시간은 반드시 위 이동 시간 표의 값을 사용 (별도 경로 계산 없음)
+3. 구간 이동 시간 30분 이내, 총 이동 시간 최소화
+4. 식당/카페 연속 방문 금지
+5. 체류 시간 + 이동 시간 합이 시간 제약을 넘지 않도록 장소 수 조절
 
-            ---
+# Output (JSON만)
+{{
+  "selected_places": [장소 리스트],
+  "sequence": [선택된 장소 내 순서 인덱스],
+  "estimated_duration": {{"선택된 장소 인덱스": 분}},
+  "course_description": "코스 설명",
+  "reasoning": "선정 이유"
+}}
 
-            ## Return Value
-            ```json
-            {{
-                "course_description": "여기에 전체 설명을 작성하세요."
-            }}
-            
-            ### OUTPUT Rules
-            "course_description" 작성 규칙:
-            - [필수 엄수]: 장소 리스트에 나열된 인덱스 순서대로 각 장소의 설명을 작성하세요.
-            - [구조적 서술]: 설명을 작성할 때 각 장소의 시작 부분에 [번호. 장소이름] 형식을 사용하여 모델이 스스로 순서를 인지하게 하세요. (예: "1. 카페 A에서 시작합니다... 이후 2. 식당 B로 이동하여...")
-            - [순차적 논리]: 장소 리스트의 인덱스 순서에 따라 장소 방문 목적과 사용자 선호 조건 만족 여부를 설명하세요.
-            - [누락 방지 로직]: "장소 리스트의 모든 장소(총 N개)를 순서대로 전부 설명함"이라는 전제를 머릿속에 두고 작성하세요.
-            - [언어]: 장소 이름과 모든 설명은 한국어로 작성하세요.
-            - [이동 수단]: 각 장소 사이(인덱스 간 이동)의 이동 수단 선택 이유와 경로 설계 과정을 상세히 포함하세요.
-            - [흐름의 완결성]: 첫 번째 장소부터 마지막 장소까지, 장소 리스트의 인덱스 이동 경로를 따라가며 전체 코스를 설명하세요. 각 장소 사이의 연결 고리(이동 수단, 소요 시간, 선택 이유)를 빠짐없이 서술해야 합니다.
-            """
-        response = await self.client.chat.completions.create(
+# Rules
+- selected_places: 반드시 허용 인덱스 목록 안의 정수만 사용
+- sequence: selected_places 기준 0..N-1 인덱스 (예: selected_places가 3개면 sequence는 0~2만)
+- reasoning: "1. [original_index] 장소이름: 설명" 형식, 모든 인덱스 포함
+- JSON 마지막 쉼표 금지
+- 인덱스 연산 금지 (+1/-1 등)
+"""
+        response = await cached_chat_completion(
+            self.client, "course.single_call",
             model=self.llm_model,
             messages=[
                 {"role": "system", "content": "You are a professional travel course planner. You MUST output only valid JSON format. Never refuse the task or provide explanations outside JSON."},
-                {"role": "user", "content": system_prompt}
+                {"role": "user", "content": prompt}
             ],
-            max_tokens=2000,  # 충분한 토큰 할당
-            temperature=0.3  # 일관된 JSON 형식 유지
+            max_tokens=2000,
+            temperature=0
         )
+        return (response.choices[0].message.content or "").strip()
+    
+    async def _plan_course_with_solver(
+        self,
+        places: List[Dict[str, Any]],
+        user_preferences: Dict[str, Any],
+        time_constraints: Optional[Dict[str, Any]],
+        weather_info: Optional[Dict[int, Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        제약 기반 빔 서치 플래너로 코스 계획 (LLM 호출 없음)
+        
+        후보 전체 이동 시간 행렬 위에서 trust_score + 저장된 장소 우선순위를 최대화하며
+        시간 제약, 카테고리 개수 제한, 식당/카페 연속 방문 금지, 날씨 기반 실내 선호, 예산을 지킵니다.
+        
+        Returns:
+            LLM 응답 JSON과 같은 형식의 딕셔너리 (selected_places, sequence, estimated_duration,
+            course_description, reasoning)
+        """
+        mode = self._routing_mode_from_transportation(user_preferences.get("transportation"))
+        hour = self._planning_hour(user_preferences, time_constraints)
+        weather = next(iter(weather_info.values()), None) if weather_info else None
+        
+        def solve() -> Dict[str, Any]:
+            matrix = build_cost_matrix(places, mode, hour)
+            return self.course_planner.plan(
+                places, matrix["durations"], user_preferences, time_constraints, weather
+            )
+        
+        loop = asyncio.get_running_loop()
+        plan = await loop.run_in_executor(None, solve)
+        print(f"🧩 빔 서치 코스 계획: {len(plan['selected_places'])}개 장소, "
+              f"총 {int(plan['total_minutes'])}분, 점수 {plan['score']:.2f} ({plan['elapsed_ms']:.1f}ms)")
+        
+        return {
+            "selected_places": plan["selected_places"],
+            "sequence": plan["sequence"],
+            "estimated_duration": plan["estimated_duration"],
+            "course_description": describe_course(places, plan, user_preferences.get("transportation")),
+            "reasoning": plan["reasoning"]
+        }
+    
+    async def _weather_for_selected_places(
+        self,
+        places: List[Dict[str, Any]],
+        selected_indices: List[int],
+        user_preferences: Dict[str, Any],
+        weather_info: Optional[Dict[int, Dict[str, Any]]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        선택된 장소별 날씨 (계획 전 조회한 지역 날씨가 있을 때만, 격자 셀 캐시 공유)
+        
+        Returns:
+            {장소 인덱스: 날씨 정보}, 조회 실패한 장소는 지역 날씨 사용
+        """
+        if not weather_info:
+            return {}
+        region_weather = next(iter(weather_info.values()), None)
+        course_weather_info = {idx: region_weather for idx in selected_indices if region_weather}
+        date_str = self._parse_visit_date(user_preferences.get("visit_date"))
+        if not date_str:
+            return course_weather_info
+        try:
+            selected_places = [places[idx] for idx in selected_indices]
+            place_weather = await get_maptool().get_weather_for_places(selected_places, date_str)
+        except Exception as e:
+            print(f"⚠️ 선택된 장소 날씨 조회 실패 (지역 날씨 사용): {e}")
+            return course_weather_info
+        for position, weather in place_weather.items():
+            if weather and weather.get("temperature") is not None:
+                course_weather_info[selected_indices[position]] = weather
+        return course_weather_info
+    
+    def summarize_route_validation(
+        self,
+        routing: Dict[str, Any],
+        mode: str,
+        estimated_duration: Optional[Dict[str, Any]],
+        time_constraints: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        최종 코스 경로 결과로 검증 요약 생성
+        구간 이동 시간 상한(PLANNER_MAX_LEG_MINUTES)을 넘는 구간과
+        이동 + 체류 시간이 가용 시간을 넘는지를 표시합니다.
+        
+        Args:
+            routing: 경로 안내(RoutingAgent) 결과 (total_duration, total_distance, directions)
+            mode: 이동 수단
+            estimated_duration: {장소 인덱스: 체류 시간(분)}
+            time_constraints: 시간 제약 (없으면 플래너 기본 가용 시간)
+        
+        Returns:
+            {"success", "total_duration", "total_distance", "mode", "long_legs",
+             "total_minutes", "budget_minutes", "over_budget", "warnings", "error"}
+        """
+        if not routing.get("success"):
+            print(f"⚠️ 최종 코스 경로 검증 실패 (계속 진행): {routing.get('error')}")
+            return {
+                "success": False, "total_duration": 0, "total_distance": 0, "mode": mode,
+                "long_legs": [], "total_minutes": 0, "budget_minutes": 0, "over_budget": False,
+                "warnings": [], "error": routing.get("error")
+            }
+        
+        max_leg_minutes = self.course_planner.max_leg_minutes
+        long_legs = []
+        for direction in routing.get("directions", []):
+            minutes = (direction.get("duration") or 0) / 60
+            if not direction.get("error") and minutes > max_leg_minutes:
+                long_legs.append({"from": direction.get("from"), "to": direction.get("to"), "minutes": int(round(minutes))})
+        
+        stay_minutes = 0.0
+        for value in (estimated_duration or {}).values():
+            try:
+                stay_minutes += float(value)
+            except (TypeError, ValueError):
+                continue
+        total_minutes = routing.get("total_duration", 0) / 60 + stay_minutes
+        budget_minutes, _ = self.course_planner.time_budget(time_constraints)
+        
+        warnings = [f"{leg['from']} → {leg['to']} 이동 {leg['minutes']}분 (상한 {int(max_leg_minutes)}분 초과)" for leg in long_legs]
+        if total_minutes > budget_minutes:
+            warnings.append(f"이동 + 체류 {int(round(total_minutes))}분이 가용 시간 {int(budget_minutes)}분을 넘습니다")
+        
+        print(f"✅ 최종 코스 경로 검증: {routing.get('total_duration', 0) // 60}분, {routing.get('total_distance', 0)}m ({mode})")
+        for warning in warnings:
+            print(f"   ⚠️ {warning}")
+        return {
+            "success": True,
+            "total_duration": routing.get("total_duration", 0),
+            "total_distance": routing.get("total_distance", 0),
+            "mode": mode,
+            "long_legs": long_legs,
+            "total_minutes": int(round(total_minutes)),
+            "budget_minutes": int(budget_minutes),
+            "over_budget": total_minutes > budget_minutes,
+            "warnings": warnings,
+            "error": None
+        }
+    
+    def _format_weather_for_prompt(self, weather_info: Optional[Dict[int, Dict[str, Any]]]) -> str:
+        """프롬프트용 날씨 정보 (지역 기준 단일 날씨 정보)"""
+        if not weather_info:
+            return ""
+        # 첫 번째 날씨 정보만 사용 (모든 장소가 같은 지역이므로 동일한 날씨)
+        first_weather = next(iter(weather_info.values()), None)
+        if not first_weather:
+            return ""
+        temp = first_weather.get('temperature', 'N/A')
+        condition = first_weather.get('condition', '정보없음')
+        # 날씨 정보를 더 상세하게 제공하여 LLM이 판단하기 쉽게 함
+        return f"지역날씨: {temp}°C, {condition}. 날씨에 따라 야외/실내 활동을 적절히 선택하고, 날씨가 나쁘면 이동 경로를 최소화하세요."
+    
+    async def _plan_course_with_agent(
+        self,
+        places: List[Dict[str, Any]],
+        user_preferences: Dict[str, Any],
+        time_constraints: Optional[Dict[str, Any]],
+        weather_info: Optional[Dict[int, Dict[str, Any]]] = None,
+    ) -> str:
+        """
+        LangChain Agent(check_routing 반복 호출)로 코스 계획
+        
+        Returns:
+            LLM 최종 응답 문자열 (JSON)
+        """
+        # LangChain은 agent 모드에서만 import (모듈 import 비용 절감)
+        from langchain_openai import ChatOpenAI
+        from langchain.agents import AgentExecutor, create_openai_tools_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+        tools = [get_check_routing_tool()]
+        
+        system_instruction = """
+# Role
+여행 가이드. 제공된 장소 리스트에서 최적의 코스를 선택하고 JSON으로 반환.
+
+# Input
+- 장소 리스트: {places} (형식: [인덱스]이름|카테고리|⭐|좌표|평점)
+- 허용 인덱스 목록: {allowed_indices}
+- 사용자 선호: {user_preferences}
+- 시간 제약: {time_constraints}
+**중요**: 각 장소의 original_index를 기준으로 인덱스 참조.
+
+# Constraints
+1. 저장된 장소(⭐ 표시) 최우선 포함
+2. check_routing tool로 거리/시간 계산 (coordinates 필수: {{"lat":숫자,"lng":숫자}})
+   **중요: 같은 장소 조합에 대해서는 한 번만 check_routing을 호출하세요. 이미 검증한 경로는 다시 확인하지 마세요.**
+   **중요: 좌표가 동일하거나 매우 가까운 장소(10m 이내)는 check_routing을 호출하지 말고 직접 경로로 처리하세요.**
+3. 좌표 기반으로 가까운 장소 우선 그룹화
+4. 이동 시간 30분 이내
+5. 도보 우선 (차이 20분 이내면 도보)
+6. 식당/카페 연속 방문 금지
+
+# Workflow
+1. 저장된 장소(⭐) 선정
+2. 테마에 맞는 추가 장소 선정
+3. 식당/카페 연속 방문 체크 및 재배치
+4. 거리 최소화 순서로 배열
+5. check_routing으로 경로 검증 (중요: 같은 장소 조합은 한 번만 검증하세요. 이미 검증한 경로는 다시 확인하지 마세요.)
+6. JSON 출력
+
+# Output (JSON만)
+{{
+  "selected_places": [장소 리스트],
+  "sequence": [선택된 장소 내 순서 인덱스],
+  "estimated_duration": {{"선택된 장소 인덱스": 분}},
+  "course_description": "코스 설명",
+  "reasoning": "선정 이유"
+}}
+
+# Rules
+- selected_places: 반드시 허용 인덱스 목록 안의 정수만 사용
+- sequence: selected_places 기준 0..N-1 인덱스 (예: selected_places가 3개면 sequence는 0~2만)
+- reasoning: "1. [original_index] 장소이름: 설명" 형식, 모든 인덱스 포함
+- JSON 마지막 쉼표 금지
+- 인덱스 연산 금지 (+1/-1 등)
+"""
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_instruction),
+            MessagesPlaceholder(variable_name="chat_history", optional=True),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+
+        # prompt = f"""
+        # # Role
+        # 당신은 현지 지리에 능통하고 모든 장소를 방문해본 여행 가이드입니다. 당신은 효율적인 경로 설계에 능통합니다.
+        # **당신의 임무는 제공된 장소 리스트에서 최적의 코스를 선택하고 JSON 형식으로 반환하는 것입니다.**
+        
+        # Input Data
+        # - 장소 리스트 : {self._format_places_for_prompt(places)}
+        # - 사용자 선호 조건{{
+        #     "theme": {user_preferences['theme']},
+        #     "group_size": {user_preferences['group_size']},
+        #     "visit_date": {user_preferences['visit_date']},
+        #     "visit_time": {user_preferences['visit_time']},
+        #     "transportation": {user_preferences['transportation']},
+        #     "budget": {user_preferences.get('budget', '없음')}원
+        # }}
+
+        # # Constraints
+        # 1. **최우선 규칙: 사용자가 저장한 장소(⭐ [사용자가 저장한 장소 - 최우선 고려] 표시가 있는 장소)는 반드시 최우선적으로 고려해야 합니다.**
+        #    - 저장된 장소는 이미 테마와 위치 필터링을 통과했으므로, 사용자의 의도에 부합하는 장소입니다.
+        #    - 저장된 장소가 사용자의 테마와 위치 조건에 부합한다면, 반드시 코스에 포함시켜야 합니다.
+        #    - 저장된 장소를 포함하는 것이 다른 제약 조건(거리, 시간 등)과 충돌하더라도, 가능한 한 포함하도록 노력하세요.
+        # 2. **예산 제약: 사용자가 예산을 입력한 경우(예산이 "없음"이 아닌 경우), 반드시 예산 내에서 코스를 설계해야 합니다.**
+        #    - 예산이 입력된 경우에만 이 제약을 적용합니다. 예산이 "없음"이거나 입력되지 않은 경우에는 예산 제약을 무시합니다.
+        #    - 예산이 입력된 경우, 각 장소의 예상 비용(입장료, 식사비, 교통비 등)을 고려하여 총 예산을 초과하지 않도록 해야 합니다.
+        #    - 장소별 예상 비용은 카테고리와 평점을 기반으로 추정하세요 (예: 관광지 입장료 5,000-20,000원, 식당 식사비 10,000-50,000원, 카페 음료 5,000-15,000원).
+        #    - 교통비도 예산에 포함시켜야 합니다 (지하철 1,250원, 버스 1,300원, 택시 기본요금 3,800원 등).
+        #    - 예산이 부족할 경우, 무료 또는 저렴한 장소를 우선적으로 선택하거나, 비용이 많이 드는 장소를 제외해야 합니다.
+        #    - 예산이 충분한 경우에도, 불필요하게 비싼 장소만 선택하지 말고 다양한 가격대의 장소를 균형있게 선택하세요.
+        # 3. 제공된 [위치 좌표(위도, 경도)] 데이터를 기반으로 장소 간의 실제 물리적 거리를 계산하여 코스를 짤 것.
+        # 4. 당신의 배경지식보다 입력된 좌표 정보가 서로 가까운 장소들을 우선적으로 그룹화할 것.
+        # 5. 추천 신뢰도(Trust Score)가 높은 장소를 우선적으로 고려하되, 지리적 동선 효율성을 해치지 않는 범위 내에서 선택할 것.
+        # 6. 각 코스 간 이동 거리는 30분 이내일 것. (좌표 데이터를 참고하여 보수적으로 판단)
+        # 7. 도보 외의 교통 수단의 사용 빈도를 최소화할 것. 단, 환승은 사용 빈도 계산에서 제외한다. 도보와 교통 수단의 이동 시간 차이가 20분 이내이면 도보를 선택한다.
+        # 8. 이전에 방문한 장소를 다시 지나지 않을 것.
+        # 9. 장소에 현재 인원이 모두 수용 가능할 것.
+        # 10. 장소가 방문 일자에 운영중임을 확인할 것. 입력된 정보가 없을 시 보수적으로 판단한다.
+        # 11. 음식점, 카페 등을 코스 중간마다 배치할 것.
+
+        # # Task Workflow
+        # 1. **최우선 단계: 사용자가 저장한 장소(⭐ [사용자가 저장한 장소 - 최우선 고려] 표시)를 먼저 선정합니다.**
+        #    - 저장된 장소는 이미 테마와 위치 필터링을 통과했으므로, 가능한 한 모두 포함하도록 노력하세요.
+        #    - 저장된 장소가 여러 개인 경우, 모두 포함하거나 최대한 많이 포함하세요.
+        # 2. **예산 확인 단계: 예산이 입력된 경우(예산이 "없음"이 아닌 경우)에만, 각 장소의 예상 비용을 계산합니다.**
+        #    - 예산이 입력된 경우에만 이 단계를 수행합니다.
+        #    - 저장된 장소와 새로 선정할 장소의 예상 비용을 합산하여 예산을 초과하지 않는지 확인합니다.
+        #    - 예산을 초과할 경우, 비용이 적은 장소를 우선적으로 선택하거나 비싼 장소를 제외합니다.
+        #    - 예산 내에서 최대한 많은 장소를 포함하도록 노력하세요.
+        # 3. 저장된 장소를 포함한 상태에서, 사용자의 테마와 장소의 특징을 대조하여 추가로 적합한 장소들을 선정합니다. (예산 제약 고려)
+        # 4. 이동 거리를 최소화하는 순서로 배열합니다. (저장된 장소를 포함한 전체 코스 기준)
+        # 5. 선정된 순서가 실제 방문 가능 시간(영업시간) 내에 있는지 검증합니다.
+        # 6. 예산이 입력된 경우, 최종 코스의 총 예상 비용이 예산을 초과하지 않는지 최종 확인합니다.
+        # 7. 모든 논리적 검증이 끝나면 최종 JSON을 출력합니다.
+        # 
+        # **중요: 저장된 장소를 코스에 포함시키는 것이 최우선 목표이며, 예산이 입력된 경우 예산 제약도 반드시 준수해야 합니다.**
+
+        # # Task Workflow
+        # 1. 사용자의 테마와 장소의 특징을 대조하여 적합한 장소들을 선정합니다.
+        # 2. 이동 거리를 최소화하는 순서로 배열합니다.
+        # 3. 선정된 순서가 실제 방문 가능 시간(영업시간) 내에 있는지 검증합니다.
+        # 4. 모든 논리적 검증이 끝나면 최종 JSON을 출력합니다.
+
+        # # IMPORTANT: Output Format
+        # **당신은 반드시 이 작업을 수행해야 합니다. 작업을 거부하거나 설명을 제공하지 마세요.**
+        # **오직 JSON 형식만 출력하세요. 다른 텍스트, 설명, 마크다운 헤더는 절대 포함하지 마세요.**
+
+        # ---
+
+        # ## Return Value
+        # 코스 설계 완료 후, **반드시 다음의 JSON 형식만** 출력하세요. 다른 설명이나 텍스트는 포함하지 마세요.
+        # 
+        # ```json
+        # {{
+        #     "selected_places": [장소 인덱스 리스트],
+        #     "sequence": [방문 순서],
+        #     "estimated_duration": {{장소별 체류 시간 (분)}},
+        #     "course_description": "코스 설명",
+        #     "reasoning": "선정 이유"
+        # }}
+        # ```
+
+        # ### OUTPUT Rules
+        # - "selected_places"는 0부터 시작하는 장소 인덱스 리스트입니다 (예: [0, 2, 4])
+        # - **중요: 저장된 장소(⭐ [사용자가 저장한 장소 - 최우선 고려] 표시)의 인덱스는 반드시 selected_places에 포함되어야 합니다.**
+        # - "sequence"는 선택된 장소들의 방문 순서를 인덱스로 나타냅니다 (예: [0, 1, 2]는 첫 번째, 두 번째, 세 번째로 선택된 장소의 순서)
+        # - **중요: 저장된 장소는 sequence에도 반드시 포함되어야 하며, 가능하면 앞쪽 순서에 배치하세요.**
+        # - "estimated_duration"은 장소 인덱스를 키로 하고 체류 시간(분)을 값으로 하는 객체입니다 (예: {{"0": 60, "2": 90, "4": 45}})
+        # - "course_description"에는 방문하는 각각의 장소에 대한 간단한 설명들을 첨부합니다.
+        # - **중요: course_description에 언급한 모든 장소는 반드시 selected_places에도 포함되어야 합니다.**
+        # - "reasoning"에는 인덱스를 **장소이름(인덱스)** 형태로 언급하고, 인덱스에 해당하는 장소에 대한 설명을 바탕으로 사용자 선호 조건 중 만족시킨 사항들을 설명합니다.
+        # - "reasoning"을 생성할 때, 방문하는 장소들의 순서 및 이동수단 설계 과정에 대해 설명하세요.
+        # - 예산이 입력된 경우, "reasoning"에 예산이 어떻게 고려되었는지, 각 장소의 예상 비용과 총 예상 비용을 포함하여 설명하세요.
+        # 
+        # # 설명 예시:
+        # # - 장소 A와 장소 C 사이에 장소 B가 있고, 다시 장소 A 주변 지역을 가지 않을 예정이기에 A-B-C 순서로 일정을 설계하였습니다.
+        # # - 방문 기간이 오후이기 때문에, 잠시 쉬어가기 위해 장소 A와 장소 C 사이에 **카페** B를 먼저 방문합니다.
+        # # - 장소 A와 장소 B 사이에 오르막길이 길게 있고 도보 시간이 15분 이상 걸리기 때문에, 이동수단으로 **버스**를 선택했습니다.
+        # 
+        # **중요: JSON 형식만 출력하고, 다른 텍스트는 포함하지 마세요.**
+        # """
+
+        # 다른 LLM 호출과 같은 RPM/TPM 스케줄러를 거침 (SDK 자체 429 재시도는 버킷을 우회하므로 끔)
+        llm = ChatOpenAI(
+            model=model_for("course.agent", self.llm_model),
+            temperature=0,
+            max_retries=0,
+            rate_limiter=langchain_rate_limiter()
+        )
+        planner = create_openai_tools_agent(llm, tools, prompt)
+        # AgentExecutor에 에러 핸들러 추가
+        def handle_tool_error(error: Exception) -> str:
+            """Tool 호출 오류 처리"""
+            error_msg = str(error)
+            if "Field required" in error_msg and "places" in error_msg:
+                return "오류: check_routing tool을 호출할 때는 반드시 'places' 파라미터를 전달해야 합니다. 예: check_routing(places=[장소리스트], mode='transit')"
+            return f"Tool 오류: {error_msg}"
+        
+        planner_executer = AgentExecutor(
+            agent=planner, 
+            tools=tools, 
+            verbose=True,
+            handle_parsing_errors=handle_tool_error,
+            max_iterations=10,  # 최대 반복 횟수 (불필요한 반복 방지)
+            return_intermediate_steps=True,  # 중간 단계 반환 (디버깅용)
+            max_execution_time=300  # 최대 실행 시간 5분
+        )
+
+        # 날씨 정보 포맷팅 (지역 기준 단일 날씨 정보)
+        weather_info_str = self._format_weather_for_prompt(weather_info)
+
+        # check_routing 사용 예시를 input에 포함
+        check_routing_example = """
+중요: check_routing tool을 사용할 때는 반드시 다음과 같이 호출하세요:
+check_routing(places=[장소리스트], mode="transit")
+- places 파라미터는 반드시 포함해야 합니다.
+- 각 장소는 coordinates 필드를 포함해야 합니다: {"name":"장소명","coordinates":{"lat":위도,"lng":경도}}
+- **중요: 같은 장소 조합에 대해서는 한 번만 check_routing을 호출하세요. 이미 검증한 경로는 다시 확인하지 마세요.**
+- **중요: 좌표가 동일하거나 매우 가까운 장소(10m 이내)는 check_routing을 호출하지 말고 직접 경로로 처리하세요.**
+"""
+        
+        allowed_indices = list(range(len(places)))
+        try:
+            planning_result = await planner_executer.ainvoke({
+                'input': f"""{user_preferences['theme']}에 맞는 여행 코스를 제작해 주세요. {'날씨 정보를 반드시 고려하여 실내/야외 장소를 적절히 선택하고, 날씨가 나쁘면 이동 경로를 최소화하세요.' if weather_info else ''}
+
+{check_routing_example}""",
+                "places": self._format_places_for_prompt(places),
+                "user_preferences": json.dumps(user_preferences, ensure_ascii=False),
+                "time_constraints": json.dumps(time_constraints, ensure_ascii=False),
+                "weather_info": weather_info_str,
+                "allowed_indices": json.dumps(allowed_indices, ensure_ascii=False)
+                })
+        except Exception as e:
+            error_msg = str(e)
+            print(f"⚠️ AgentExecutor 실행 중 오류: {error_msg}")
+            
+            # max_iterations 도달 오류 처리
+            if "max iterations" in error_msg.lower() or "max_iterations" in error_msg.lower() or "stopped due to max iterations" in error_msg.lower():
+                print(f"   ⚠️ Agent가 최대 반복 횟수에 도달했습니다. 중간 단계를 확인합니다...")
+                # 중간 단계에서 마지막 출력 시도
+                intermediate_steps = planning_result.get('intermediate_steps', []) if 'intermediate_steps' in locals() else []
+                if intermediate_steps:
+                    # 마지막 단계의 출력 확인
+                    for step in reversed(intermediate_steps):
+                        if isinstance(step, tuple) and len(step) >= 2:
+                            last_output = step[1] if isinstance(step[1], str) else str(step[1])
+                            if last_output and ('{' in last_output or '[' in last_output):
+                                print(f"   마지막 단계에서 JSON 형식의 출력을 찾았습니다. 복구를 시도합니다...")
+                                try:
+                                    result = self._JSON_verification(last_output)
+                                    # 성공하면 계속 진행
+                                    break
+                                except:
+                                    continue
+                # 복구 실패 시 에러 발생
+                raise ValueError(
+                    f"Agent가 최대 반복 횟수에 도달하여 작업을 완료하지 못했습니다. "
+                    f"프롬프트가 너무 복잡하거나 장소가 너무 많을 수 있습니다. "
+                    f"오류: {error_msg}"
+                )
+            
+            # check_routing validation 오류인 경우 더 명확한 메시지
+            if "Field required" in error_msg and "places" in error_msg:
+                raise ValueError(
+                    "check_routing tool 호출 오류: 'places' 파라미터가 필수입니다. "
+                    "LLM이 check_routing을 호출할 때 반드시 places 파라미터를 포함해야 합니다. "
+                    f"오류 상세: {error_msg}"
+                )
+            raise
+
+        # response = await self.client.chat.completions.create(
+        #     model=self.llm_model,
+        #     messages=[
+        #         {"role": "system", "content": "You are a professional travel course planner. You MUST output only valid JSON format. Never refuse the task or provide explanations outside JSON."},
+        #         {"role": "user", "content": prompt}
+        #     ],
+        #     max_tokens=2000,  # 충분한 토큰 할당
+        #     temperature=0.3  # 일관된 JSON 형식 유지
+        # )
+        
+        # 응답에서 JSON 추출
+        # response_content = response.choices[0].message.content.strip()
+        if 'output' not in planning_result:
+            # 중간 단계 확인
+            intermediate_steps = planning_result.get('intermediate_steps', [])
+            if intermediate_steps:
+                print(f"⚠️ Agent가 {len(intermediate_steps)}번의 단계를 수행했지만 최종 출력이 없습니다.")
+                # 마지막 단계의 출력 확인
+                last_step = intermediate_steps[-1] if intermediate_steps else None
+                if last_step:
+                    print(f"   마지막 단계: {str(last_step)[:200]}...")
+            
+            # output이 없으면 에러 메시지 생성
+            error_msg = f"LLM 응답에 'output' 키가 없습니다."
+            if 'intermediate_steps' in planning_result:
+                error_msg += f" Agent가 {len(planning_result['intermediate_steps'])}번의 단계를 수행했습니다."
+            raise ValueError(f"{error_msg}\n응답: {str(planning_result)[:500]}")
+        
+        response_content = planning_result['output'].strip()
+        return response_content
+    
+    async def _generate_course_descriptions(
+            self,
+            sequence: List[int],
+            places: List[Dict[str, Any]],
+            user_preferences: Dict[str, Any],
+            time_constraints: Optional[Dict[str, Any]],
+            estimated_duration,
+            on_description: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        선별된 장소 기반 코스 설명
+        Args:
+            sequence: 선별된 장소 인덱스 리스트
+            places: 장소 리스트
+            user_preferences: 사용자 선호 조건
+            time_constraints: 시간 제약 조건
+            estimated_duration: 코스 장소 별 체류 시간
+            on_description: 콜백이 있으면 스트리밍으로 생성하며 course_description 값을 조각마다 전달
+        
+        Returns:
+            장소에 대한 설명
+        """
+        selected_places = []
+        selected_duration = {}
+        for i in sequence:
+            selected_places.append(places[i])
+            # selected_duration[places[i].get("name")] = estimated_duration[f"{i}"]
+
+        
+        # 역할/규칙/응답 형식은 고정 템플릿(프롬프트 캐싱 대상), 코스 데이터만 user 메시지로 전달
+        course_prompt = f"""# Input Data
+- 장소 리스트 : {selected_places}
+- 사용자 선호 조건 : {user_preferences}
+- 활동 시간 제약 : {time_constraints}
+- 장소 별 체류 시간 : {estimated_duration}"""
+        params = {
+            "model": self.llm_model,
+            "messages": prefixed_messages(COURSE_DESCRIPTION_SYSTEM, course_prompt),
+            "max_tokens": 2000,  # 충분한 토큰 할당
+            "temperature": 0.3  # 일관된 JSON 형식 유지
+        }
+        if on_description and Config.COURSE_DESCRIPTION_STREAMING:
+            # 응답 JSON이 다 오기 전에 course_description 값만 조각 단위로 사용자에게 전달
+            streamer = JSONStringFieldStreamer("course_description")
+            
+            def on_text(chunk: str) -> None:
+                text = streamer.feed(chunk)
+                if text:
+                    try:
+                        on_description(text)
+                    except Exception as e:
+                        print(f"⚠️ 코스 설명 스트리밍 전달 실패 (생성은 계속): {e}")
+            
+            response = await streamed_chat_completion(self.client, "course.description", on_text, **params)
+        else:
+            response = await cached_chat_completion(self.client, "course.description", **params)
         response_content = response.choices[0].message.content.strip()
         result = self._JSON_verification(response_content)
         return result
@@ -1322,8 +1743,8 @@ check_routing(places=[장소리스트], mode="transit")
         Returns:
             포맷팅된 문자열
         """
-        # 장소 개수 제한 (너무 많으면 토큰 초과) - 더 엄격하게 제한
-        MAX_PLACES = 20  # 30 -> 20으로 감소 (토큰 길이 초과 방지)
+        # 장소 개수 제한 (너무 많으면 토큰 초과, 보통 execute에서 이미 선별됨)
+        MAX_PLACES = Config.SHORTLIST_PROMPT_SIZE
         if len(places) > MAX_PLACES:
             print(f"⚠️ 장소가 {len(places)}개로 너무 많아 {MAX_PLACES}개로 제한합니다.")
             places = places[:MAX_PLACES]
@@ -7,10 +7,14 @@ from typing import Any, Dict, List, Optional, Tuple
 import os
 import asyncio
 import re
-import googlemaps
-import aiohttp
+import time
 from datetime import datetime
 from .base_tool import BaseTool
+from .offline_routing_tool import OfflineRoutingTool
+from utils.route_cache import get_leg_cache, parse_coord_string
+from utils import geometry
+from utils.weather_service import get_weather_service
+from utils.provider_health import ProviderUnavailableError, get_provider_health, is_auth_error
 
 
 class GoogleMapsTool(BaseTool):
@@ -71,6 +75,7 @@ class GoogleMapsTool(BaseTool):
         self.client = None
         if self.api_key:
             try:
+                import googlemaps
                 # googlemaps.Client는 초기화 시점에 API 키를 검증하지 않음
                 # 실제 API 호출 시점에 검증됨
                 self.client = googlemaps.Client(key=self.api_key)
@@ -85,11 +90,25 @@ class GoogleMapsTool(BaseTool):
         # Directions API 재시도 설정
         self._max_retries = 3
         self._retry_delay = 1.0  # 초
+        # provider 상태 레지스트리 (REQUEST_DENIED 등 장애 시 서킷을 열어 재시도/대기 생략)
+        self._health = get_provider_health()
         
         # Distance Matrix API 요청 청크 크기 (요소 100개 제한 회피)
         # origins * destinations <= 100 을 보장하기 위해 10으로 제한
         self._distance_matrix_chunk_size = 10
         
+        # 구간 단위 경로 캐시 (좌표 약 10m 반올림 + 이동 수단 + 출발 시간 버킷)
+        # check_routing과 /api/route-guide가 같은 캐시를 공유
+        self._leg_cache = get_leg_cache()
+        
+        # 오프라인 OSM 그래프 (설정된 경우 도보/자동차 Distance Matrix 셀을 API 호출 없이 채움)
+        from config.config import Config
+        self._offline = OfflineRoutingTool(config=self.config)
+        self._offline_matrix = Config.OFFLINE_ROUTING_FOR_PLANNING
+        
+        # 경로 좌표 단순화 허용 오차 (미터, Douglas-Peucker)
+        self._path_simplify_tolerance_m = 5.0
+        
         # 호환성용 플래그 (한국 제한 파라미터는 제거됨)
         self._enforce_korea_bounds = False
         
@@ -106,6 +125,9 @@ class GoogleMapsTool(BaseTool):
         # 하위 호환용 필드 (기존 코드에서 weather_api_key 접근 가능)
         self.weather_api_key = self.openweather_api_key
         
+        # 격자 셀 단위 캐시를 공유하는 날씨 서비스
+        self._weather_service = get_weather_service(self.openweather_api_key)
+        
         if self.openweather_api_key:
             api_key_preview = f"{self.openweather_api_key[:6]}...{self.openweather_api_key[-4:]}" if len(self.openweather_api_key) > 12 else "***"
             print(f"🌤️ OpenWeather API 키 로드됨: {api_key_preview}")
@@ -115,6 +137,30 @@ class GoogleMapsTool(BaseTool):
             print(f"   - 환경변수 OPENWEATHER_API_KEY: {_mask_key(os.getenv('OPENWEATHER_API_KEY'))}")
             print(f"   - 환경변수 WEATHER_API_KEY: {_mask_key(os.getenv('WEATHER_API_KEY'))}")
     
+    async def _call_google(self, endpoint: str, func, *args) -> Any:
+        """
+        Google Maps 클라이언트 호출 (executor 실행 + 상태 레지스트리 기록)
+        
+        Raises:
+            ProviderUnavailableError: 서킷이 열려 있어 호출을 건너뛴 경우
+        """
+        if not self._health.allow("google", endpoint):
+            raise ProviderUnavailableError(f"Google {endpoint} 서킷이 열려 있어 요청을 건너뜁니다.")
+        
+        loop = asyncio.get_event_loop()
+        started = time.monotonic()
+        try:
+            result = await loop.run_in_executor(None, func, *args)
+        except Exception as e:
+            self._health.record_failure("google", endpoint, time.monotonic() - started, error=e)
+            raise
+        self._health.record_success("google", endpoint, time.monotonic() - started)
+        return result
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """재시도해도 결과가 같은 오류(서킷 open, 인증 실패)가 아닌지 판단"""
+        return not isinstance(error, ProviderUnavailableError) and not is_auth_error(error)
+    
     def _clean_html_tags(self, text: str) -> str:
         """HTML 태그 제거"""
         if not text:
@@ -195,79 +241,36 @@ class GoogleMapsTool(BaseTool):
         Returns:
             [{"lat": float, "lng": float}, ...] 형식의 좌표 리스트
         """
-        if not encoded:
-            return []
-        
-        coordinates = []
-        index = 0
-        lat = 0
-        lng = 0
-        
-        while index < len(encoded):
-            # 위도 디코딩
-            shift = 0
-            result = 0
-            while True:
-                b = ord(encoded[index]) - 63
-                index += 1
-                result |= (b & 0x1f) << shift
-                shift += 5
-                if b < 0x20:
-                    break
-            dlat = ~(result >> 1) if (result & 1) else (result >> 1)
-            lat += dlat
-            
-            # 경도 디코딩
-            shift = 0
-            result = 0
-            while True:
-                b = ord(encoded[index]) - 63
-                index += 1
-                result |= (b & 0x1f) << shift
-                shift += 5
-                if b < 0x20:
-                    break
-            dlng = ~(result >> 1) if (result & 1) else (result >> 1)
-            lng += dlng
-            
-            coordinates.append({"lat": lat / 1e5, "lng": lng / 1e5})
-        
-        return coordinates
+        return geometry.to_latlng_dicts(geometry.decode_polyline(encoded))
     
-    def _sample_path_coordinates(self, coordinates: List[Dict[str, float]], max_points: int = 20) -> List[Dict[str, float]]:
+    def _build_step_path(self, step: Dict[str, Any], max_points: int = 20) -> List[Dict[str, float]]:
         """
-        경로 좌표를 샘플링하여 좌표 수를 줄입니다 (토큰 제한 방지)
-        경로의 모양은 유지하면서 좌표 수를 최적화합니다.
+        Directions step의 polyline을 디코딩하고 Douglas-Peucker로 단순화한 경로 좌표 생성
+        균등 간격 샘플링과 달리 코너 등 경로 형태를 결정하는 점은 유지합니다.
         
         Args:
-            coordinates: 원본 좌표 리스트
-            max_points: 최대 좌표 수 (기본값: 100)
+            step: Directions API step
+            max_points: 최대 좌표 수 (토큰/응답 크기 제한)
             
         Returns:
-            샘플링된 좌표 리스트
+            [{"lat": float, "lng": float}, ...] 형식의 좌표 리스트
         """
-        if not coordinates or len(coordinates) <= max_points:
-            return coordinates
-        
-        # 항상 첫 번째와 마지막 좌표는 포함
-        if len(coordinates) <= 2:
-            return coordinates
-        
-        # 샘플링 간격 계산
-        total_points = len(coordinates)
-        sample_interval = max(1, total_points // max_points)
-        
-        sampled = [coordinates[0]]  # 첫 번째 좌표
-        
-        # 중간 좌표 샘플링
-        for i in range(sample_interval, total_points - 1, sample_interval):
-            sampled.append(coordinates[i])
-        
-        # 마지막 좌표 추가 (아직 포함되지 않았다면)
-        if sampled[-1] != coordinates[-1]:
-            sampled.append(coordinates[-1])
+        encoded = (step.get("polyline") or {}).get("points", "")
+        coords = geometry.decode_polyline(encoded)
+        
+        # polyline이 없거나 비어있으면 start_location과 end_location으로 최소 경로 생성
+        if coords.shape[0] == 0:
+            start_loc = step.get("start_location", {}) or {}
+            end_loc = step.get("end_location", {}) or {}
+            if start_loc.get("lat") and start_loc.get("lng") and end_loc.get("lat") and end_loc.get("lng"):
+                return [
+                    {"lat": start_loc["lat"], "lng": start_loc["lng"]},
+                    {"lat": end_loc["lat"], "lng": end_loc["lng"]}
+                ]
+            return []
         
-        return sampled
+        simplified = geometry.simplify(coords, self._path_simplify_tolerance_m, max_points=max_points)
+        return geometry.to_latlng_dicts(simplified)
     
     def _format_transit_instruction(self, step: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -459,9 +462,6 @@ class GoogleMapsTool(BaseTool):
             }
         """
         try:
-            # 사용자가 지정한 출발 일시(문자열)를 받아 Distance Matrix 등에 활용할 수 있도록 저장
-            # 형식 예시: "2026-01-30T10:00:00"
-            self._departure_time_str = kwargs.get("departure_time")
             if not self.validate_params(places=places):
                 return {
                     "success": False,
@@ -498,8 +498,11 @@ class GoogleMapsTool(BaseTool):
             
             if optimize_waypoints and len(coordinates) > 2:
                 # 경유지 최적화 (TSP 알고리즘 또는 Google Directions API 사용)
+                # 사용자가 지정한 출발 일시(문자열, 예: "2026-01-30T10:00:00")는 인자로 전달
+                # (Tool 인스턴스는 여러 요청이 공유하므로 요청별 값을 저장하지 않음)
                 optimized_order = await self._optimize_waypoint_order(
-                    coordinates, origin, destination, mode
+                    coordinates, origin, destination, mode,
+                    departure_time=kwargs.get("departure_time")
                 )
             else:
                 optimized_order = list(range(len(places)))
@@ -636,7 +639,6 @@ class GoogleMapsTool(BaseTool):
         if not self.client:
             return None
         
-        loop = asyncio.get_event_loop()
         try:
             requests = [{"address": normalized_address}]
             
@@ -644,7 +646,7 @@ class GoogleMapsTool(BaseTool):
                 def call_geocode():
                     return self.client.geocode(**req)
                 
-                geocode_result = await loop.run_in_executor(None, call_geocode)
+                geocode_result = await self._call_google("geocode", call_geocode)
                 if not geocode_result:
                     continue
                 
@@ -741,7 +743,8 @@ class GoogleMapsTool(BaseTool):
         coordinates: List[Tuple[float, float]],
         origin: Optional[Dict[str, Any]],
         destination: Optional[Dict[str, Any]],
-        mode: str
+        mode: str,
+        departure_time: Optional[str] = None
     ) -> List[int]:
         """
         경유지 순서 최적화 (TSP 문제 해결)
@@ -751,6 +754,7 @@ class GoogleMapsTool(BaseTool):
             origin: 출발지
             destination: 도착지
             mode: 이동 수단
+            departure_time: 사용자 지정 출발 일시 문자열 (대중교통 소요 시간 행렬에 사용)
             
         Returns:
             최적화된 순서의 인덱스 리스트
@@ -763,7 +767,7 @@ class GoogleMapsTool(BaseTool):
             try:
                 # 1. Distance Matrix API로 모든 쌍의 대중교통 소요 시간 획득
                 duration_matrix = await self._get_transit_duration_matrix(
-                    coordinates, origin, destination
+                    coordinates, origin, destination, departure_time=departure_time
                 )
                 
                 if duration_matrix:
@@ -816,9 +820,8 @@ class GoogleMapsTool(BaseTool):
                 if origin.get("coordinates"):
                     origin_coords = (origin["coordinates"]["lat"], origin["coordinates"]["lng"])
                 elif origin.get("address"):
-                    loop = asyncio.get_event_loop()
-                    geocode_result = await loop.run_in_executor(
-                        None,
+                    geocode_result = await self._call_google(
+                        "geocode",
                         self.client.geocode,
                         origin["address"]
                     )
@@ -840,9 +843,8 @@ class GoogleMapsTool(BaseTool):
                 if destination.get("coordinates"):
                     dest_coords = (destination["coordinates"]["lat"], destination["coordinates"]["lng"])
                 elif destination.get("address"):
-                    loop = asyncio.get_event_loop()
-                    geocode_result = await loop.run_in_executor(
-                        None,
+                    geocode_result = await self._call_google(
+                        "geocode",
                         self.client.geocode,
                         destination["address"]
                     )
@@ -977,8 +979,6 @@ class GoogleMapsTool(BaseTool):
                     [start_idx, end_idx], full_locations, location_roles, coord_offset, coordinates
                 )
             
-            loop = asyncio.get_event_loop()
-            
             # lambda 대신 함수 정의로 변경 (클로저 문제 방지)
             origin_str = f"{full_locations[start_idx][0]},{full_locations[start_idx][1]}"
             dest_str = f"{full_locations[end_idx][0]},{full_locations[end_idx][1]}"
@@ -993,7 +993,7 @@ class GoogleMapsTool(BaseTool):
                     language='ko'
                 )
             
-            directions_result = await loop.run_in_executor(None, call_directions)
+            directions_result = await self._call_google("directions", call_directions)
             
             if not directions_result or len(directions_result) == 0:
                 # API 호출 실패 시 Nearest Neighbor 알고리즘 사용
@@ -1317,7 +1317,8 @@ class GoogleMapsTool(BaseTool):
         self,
         coordinates: List[Tuple[float, float]],
         origin: Optional[Dict[str, Any]],
-        destination: Optional[Dict[str, Any]]
+        destination: Optional[Dict[str, Any]],
+        departure_time: Optional[str] = None
     ) -> Optional[Dict[Tuple[int, int], int]]:
         """
         대중교통 모드를 위한 소요 시간 행렬 구축 (Distance Matrix API 사용)
@@ -1326,6 +1327,7 @@ class GoogleMapsTool(BaseTool):
             coordinates: 좌표 리스트
             origin: 출발지
             destination: 도착지
+            departure_time: 사용자 지정 출발 일시 문자열 ("2026-01-30T10:00:00" 또는 "YYYY-MM-DD HH:MM")
             
         Returns:
             {(from_idx, to_idx): duration_seconds} 딕셔너리 또는 None
@@ -1338,8 +1340,8 @@ class GoogleMapsTool(BaseTool):
             # - 프론트에서 전달된 사용자 시작일/시간(departure_time)을 우선 사용
             # - 없으면 현재 시간을 사용
             import datetime
+            dt_raw = departure_time
             departure_time = None
-            dt_raw = getattr(self, "_departure_time_str", None)
             if isinstance(dt_raw, str) and dt_raw:
                 try:
                     # ISO 형식 또는 "YYYY-MM-DD HH:MM" 형식 처리
@@ -1393,6 +1395,43 @@ class GoogleMapsTool(BaseTool):
             print(f"⚠️  Transit duration matrix 구축 중 오류: {e}")
             return None
 
+    def _store_leg_in_cache(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        leg: Dict[str, Any],
+        mode: str,
+        departure_time: Optional[datetime] = None,
+        polyline: Optional[str] = None
+    ) -> None:
+        """
+        Directions API leg 결과를 구간 캐시에 저장
+        (이후 Distance Matrix 요청에서 같은 구간은 API 호출 없이 재사용)
+
+        캐시 키는 요청에 사용한 출발/도착 좌표 (조회도 요청 좌표로 하므로,
+        Google이 도로에 맞춰 보정한 leg.start_location/end_location을 쓰면 적중하지 않음)
+        """
+        try:
+            if not origin or not destination:
+                return
+            duration_obj = leg.get("duration", {}) or {}
+            distance_obj = leg.get("distance", {}) or {}
+            if "value" not in duration_obj:
+                return
+            self._leg_cache.put(
+                (origin[0], origin[1]),
+                (destination[0], destination[1]),
+                mode,
+                duration_obj.get("value", 0),
+                distance_obj.get("value", 0),
+                departure_time=departure_time,
+                duration_text=duration_obj.get("text", ""),
+                distance_text=distance_obj.get("text", ""),
+                polyline=polyline
+            )
+        except Exception as e:
+            print(f"⚠️  구간 캐시 저장 실패: {e}")
+    
     async def _fetch_distance_matrix_chunk(
         self,
         origins: List[str],
@@ -1402,27 +1441,159 @@ class GoogleMapsTool(BaseTool):
     ) -> Optional[Dict[str, Any]]:
         """
         Distance Matrix API를 청크 단위로 호출
+        
+        구간 캐시에 없는 셀만 요청합니다. 캐시에 없는 셀이 포함된 출발지 행과
+        도착지 열만 모아 한 번 호출하고, 결과를 캐시와 합쳐 원래 청크 모양의
+        Distance Matrix 응답으로 돌려줍니다.
         """
         if not self.client or not origins or not destinations:
             return None
         
-        loop = asyncio.get_event_loop()
+        origin_coords = [parse_coord_string(o) for o in origins]
+        dest_coords = [parse_coord_string(d) for d in destinations]
+        cacheable = all(origin_coords) and all(dest_coords)
+        
+        # 캐시 조회 (좌표 문자열이 아닌 주소가 섞여 있으면 캐시를 사용하지 않음)
+        cached_cells: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        if cacheable:
+            for oi, o_coord in enumerate(origin_coords):
+                for di, d_coord in enumerate(dest_coords):
+                    hit = self._leg_cache.get(o_coord, d_coord, mode, departure_time)
+                    if hit is not None:
+                        cached_cells[(oi, di)] = hit
+        
+        missing_cells = [
+            (oi, di)
+            for oi in range(len(origins))
+            for di in range(len(destinations))
+            if (oi, di) not in cached_cells
+        ]
         
-        def call_distance_matrix():
-            params = {
-                "origins": origins,
-                "destinations": destinations,
-                "mode": mode
-            }
-            if departure_time is not None:
-                params["departure_time"] = departure_time
-            return self.client.distance_matrix(**params)
+        # 캐시에 없는 도보/자동차 셀은 오프라인 그래프로 먼저 계산 (비용 없음)
+        if cacheable and missing_cells and self._offline_matrix and self._offline.is_available(mode):
+            offline_cells = self._offline_matrix_cells(origin_coords, dest_coords, missing_cells, mode)
+            if offline_cells:
+                cached_cells.update(offline_cells)
+                missing_cells = [cell for cell in missing_cells if cell not in offline_cells]
+                print(f"🧭 Distance Matrix 오프라인 그래프 사용: {len(offline_cells)}개 셀 (mode={mode})")
+        
+        missing_rows = sorted({oi for oi, _ in missing_cells})
+        missing_cols = sorted({di for _, di in missing_cells})
+        
+        fetched = None
+        if missing_rows and missing_cols:
+            request_origins = [origins[oi] for oi in missing_rows]
+            request_destinations = [destinations[di] for di in missing_cols]
+            
+            def call_distance_matrix():
+                params = {
+                    "origins": request_origins,
+                    "destinations": request_destinations,
+                    "mode": mode
+                }
+                if departure_time is not None:
+                    params["departure_time"] = departure_time
+                return self.client.distance_matrix(**params)
+            
+            try:
+                fetched = await self._call_google("distance_matrix", call_distance_matrix)
+            except Exception as e:
+                print(f"⚠️  Distance Matrix API 청크 호출 실패: {e}")
+                fetched = None
+            
+            if not cacheable:
+                return fetched
+            
+            if fetched and fetched.get("status") == "OK":
+                for r_idx, row in enumerate(fetched.get("rows", [])):
+                    if r_idx >= len(missing_rows):
+                        break
+                    for c_idx, element in enumerate(row.get("elements", [])):
+                        if c_idx >= len(missing_cols) or element.get("status") != "OK":
+                            continue
+                        oi, di = missing_rows[r_idx], missing_cols[c_idx]
+                        duration_obj = element.get("duration", {}) or {}
+                        distance_obj = element.get("distance", {}) or {}
+                        if "value" not in duration_obj:
+                            continue
+                        cell = {
+                            "duration": duration_obj.get("value", 0),
+                            "distance": distance_obj.get("value", 0),
+                            "duration_text": duration_obj.get("text", ""),
+                            "distance_text": distance_obj.get("text", ""),
+                        }
+                        cached_cells[(oi, di)] = cell
+                        self._leg_cache.put(
+                            origin_coords[oi], dest_coords[di], mode,
+                            cell["duration"], cell["distance"],
+                            departure_time=departure_time,
+                            duration_text=cell["duration_text"],
+                            distance_text=cell["distance_text"]
+                        )
+            elif not cached_cells:
+                return fetched
+        else:
+            print(f"💾 Distance Matrix 캐시 적중: {len(origins)}x{len(destinations)} 셀 모두 캐시 사용 (mode={mode})")
+        
+        # 캐시 + 신규 응답을 원래 청크 모양의 응답으로 합치기
+        rows = []
+        for oi in range(len(origins)):
+            elements = []
+            for di in range(len(destinations)):
+                cell = cached_cells.get((oi, di))
+                if cell is None:
+                    elements.append({"status": "NOT_FOUND"})
+                    continue
+                elements.append({
+                    "status": "OK",
+                    "duration": {"value": cell["duration"], "text": cell.get("duration_text", "")},
+                    "distance": {"value": cell["distance"], "text": cell.get("distance_text", "")},
+                })
+            rows.append({"elements": elements})
         
+        return {
+            "status": "OK",
+            "origin_addresses": list(origins),
+            "destination_addresses": list(destinations),
+            "rows": rows
+        }
+    
+    def _offline_matrix_cells(
+        self,
+        origin_coords: List[Tuple[float, float]],
+        dest_coords: List[Tuple[float, float]],
+        missing_cells: List[Tuple[int, int]],
+        mode: str
+    ) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """오프라인 그래프로 Distance Matrix 셀 계산 (경로가 없는 셀은 제외)"""
+        rows = sorted({oi for oi, _ in missing_cells})
+        cols = sorted({di for _, di in missing_cells})
         try:
-            return await loop.run_in_executor(None, call_distance_matrix)
+            matrix = self._offline.duration_matrix(
+                [origin_coords[oi] for oi in rows], [dest_coords[di] for di in cols], mode
+            )
         except Exception as e:
-            print(f"⚠️  Distance Matrix API 청크 호출 실패: {e}")
-            return None
+            print(f"⚠️  오프라인 그래프 행렬 계산 실패: {e}")
+            return {}
+        if matrix is None:
+            return {}
+        
+        durations, distances = matrix
+        row_pos = {oi: r for r, oi in enumerate(rows)}
+        col_pos = {di: c for c, di in enumerate(cols)}
+        cells = {}
+        for oi, di in missing_cells:
+            duration = durations[row_pos[oi], col_pos[di]]
+            distance = distances[row_pos[oi], col_pos[di]]
+            if duration != duration:  # nan: 경로 없음
+                continue
+            cells[(oi, di)] = {
+                "duration": int(round(duration)),
+                "distance": int(round(distance)),
+                "duration_text": self._offline.format_duration(int(round(duration))),
+                "distance_text": self._offline.format_distance(int(round(distance))),
+            }
+        return cells
     
     def _solve_tsp_locally(
         self,
@@ -1708,7 +1879,6 @@ class GoogleMapsTool(BaseTool):
             return await self._calculate_directions(places, origin, destination, mode, preferred_modes, user_transportation)
         
         # Waypoints가 있고, 대중교통이 아니고, 10개 이하인 경우만 일괄 요청 시도
-        loop = asyncio.get_event_loop()
         # Directions API에는 문자열이 아닌 (lat, lng) 튜플을 그대로 전달하여
         # 좌표가 문자열 포맷 과정에서 잘리는 일을 방지한다.
         origin_tuple = (origin_coord[0], origin_coord[1])
@@ -1737,7 +1907,7 @@ class GoogleMapsTool(BaseTool):
                             language='ko' 
                         )
                 
-                directions_result = await loop.run_in_executor(None, call_directions)
+                directions_result = await self._call_google("directions", call_directions)
                 
                 if directions_result and len(directions_result) > 0:
                     route = directions_result[0]
@@ -1747,6 +1917,8 @@ class GoogleMapsTool(BaseTool):
                         directions = []
                         total_duration = 0
                         total_distance = 0
+                        # 구간 캐시 키로 쓸 요청 좌표 (출발지 → 경유지 → 도착지 순서)
+                        request_points = [origin_tuple] + [item["coord"] for item in waypoint_places] + [dest_tuple]
                         
                         # 각 leg를 directions 형식으로 변환
                         for i, leg in enumerate(legs):
@@ -1754,6 +1926,8 @@ class GoogleMapsTool(BaseTool):
                             distance = leg.get("distance", {}).get("value", 0)
                             total_duration += duration
                             total_distance += distance
+                            if len(request_points) == len(legs) + 1:
+                                self._store_leg_in_cache(request_points[i], request_points[i + 1], leg, primary_mode)
                             
                             # 장소 정보 매칭
                             from_place = places[i] if i < len(places) else {"name": "Unknown"}
@@ -1765,27 +1939,10 @@ class GoogleMapsTool(BaseTool):
                                 # 포맷팅된 step 정보 생성
                                 formatted_step = self._format_transit_instruction(step)
                                 
-                                # 경로 좌표 정보 추가 (polyline 디코딩)
-                                polyline_points = []
-                                if step.get("polyline"):
-                                    polyline_encoded = step["polyline"].get("points", "")
-                                    if polyline_encoded:
-                                        polyline_points = self._decode_polyline(polyline_encoded)
-                                
-                                # polyline이 없거나 비어있으면 start_location과 end_location으로 최소 경로 생성
-                                if not polyline_points or len(polyline_points) == 0:
-                                    start_loc = step.get("start_location", {})
-                                    end_loc = step.get("end_location", {})
-                                    if start_loc.get("lat") and start_loc.get("lng") and end_loc.get("lat") and end_loc.get("lng"):
-                                        polyline_points = [
-                                            {"lat": start_loc["lat"], "lng": start_loc["lng"]},
-                                            {"lat": end_loc["lat"], "lng": end_loc["lng"]}
-                                        ]
-                                
-                                # 좌표 수가 너무 많으면 샘플링 (토큰 제한 방지)
-                                polyline_points = self._sample_path_coordinates(polyline_points, max_points=20)
-                                
-                                formatted_step["path"] = polyline_points
+                                # 경로 좌표 정보 추가 (polyline 디코딩 + Douglas-Peucker 단순화)
+                                formatted_step["path"] = self._build_step_path(step, max_points=20)
+                                # 원본 해상도의 인코딩 polyline (프론트 전송 시 단순화 수준에 맞춰 재인코딩)
+                                formatted_step["polyline"] = (step.get("polyline") or {}).get("points", "")
                                 
                                 steps.append(formatted_step)
                             
@@ -1819,7 +1976,8 @@ class GoogleMapsTool(BaseTool):
                 break
                 
             except Exception as e:
-                if attempt < self._max_retries - 1:
+                # 서킷 open/인증 실패는 재시도해도 같으므로 바로 폴백
+                if attempt < self._max_retries - 1 and self._is_retryable(e):
                     await asyncio.sleep(self._retry_delay * (attempt + 1))  # 지수 백오프
                     continue
                 else:
@@ -1858,8 +2016,6 @@ class GoogleMapsTool(BaseTool):
         if len(places) < 2:
             return directions, 0, 0
         
-        loop = asyncio.get_event_loop()
-        
         # 좌표 추출 (병렬 처리)
         coordinates_with_places = []
         geocode_tasks = []
@@ -1962,7 +2118,7 @@ class GoogleMapsTool(BaseTool):
                                 language='ko'  # 한국어 설정
                             )
                         
-                        directions_result = await loop.run_in_executor(None, call_directions)
+                        directions_result = await self._call_google("directions", call_directions)
                     
                         if directions_result and len(directions_result) > 0:
                             route = directions_result[0]
@@ -1972,32 +2128,21 @@ class GoogleMapsTool(BaseTool):
                                 duration = leg.get("duration", {}).get("value", 0)
                                 distance = leg.get("distance", {}).get("value", 0)
                                 
+                                # 단일 구간 요청이므로 overview_polyline이 곧 구간 polyline
+                                self._store_leg_in_cache(
+                                    from_coord, to_coord, leg, try_mode,
+                                    polyline=(route.get("overview_polyline") or {}).get("points")
+                                )
+                                
                                 steps = []
                                 for step in leg.get("steps", []):
                                     # 포맷팅된 step 정보 생성
                                     formatted_step = self._format_transit_instruction(step)
                                     
-                                    # 경로 좌표 정보 추가 (polyline 디코딩)
-                                    polyline_points = []
-                                    if step.get("polyline"):
-                                        polyline_encoded = step["polyline"].get("points", "")
-                                        if polyline_encoded:
-                                            polyline_points = self._decode_polyline(polyline_encoded)
-                                    
-                                    # polyline이 없거나 비어있으면 start_location과 end_location으로 최소 경로 생성
-                                    if not polyline_points or len(polyline_points) == 0:
-                                        start_loc = step.get("start_location", {})
-                                        end_loc = step.get("end_location", {})
-                                        if start_loc.get("lat") and start_loc.get("lng") and end_loc.get("lat") and end_loc.get("lng"):
-                                            polyline_points = [
-                                                {"lat": start_loc["lat"], "lng": start_loc["lng"]},
-                                                {"lat": end_loc["lat"], "lng": end_loc["lng"]}
-                                            ]
-                                    
-                                    # 좌표 수가 너무 많으면 샘플링 (토큰 제한 방지)
-                                    polyline_points = self._sample_path_coordinates(polyline_points, max_points=100)
-                                    
-                                    formatted_step["path"] = polyline_points
+                                    # 경로 좌표 정보 추가 (polyline 디코딩 + Douglas-Peucker 단순화)
+                                    formatted_step["path"] = self._build_step_path(step, max_points=100)
+                                    # 원본 해상도의 인코딩 polyline (프론트 전송 시 단순화 수준에 맞춰 재인코딩)
+                                    formatted_step["polyline"] = (step.get("polyline") or {}).get("points", "")
                                     
                                     steps.append(formatted_step)
                                 
@@ -2032,7 +2177,7 @@ class GoogleMapsTool(BaseTool):
                     
                     except Exception as e:
                         last_error = str(e)
-                        if attempt < self._max_retries - 1:
+                        if attempt < self._max_retries - 1 and self._is_retryable(e):
                             await asyncio.sleep(self._retry_delay * (attempt + 1))
                             continue
                         # 이 모드로 실패했으면 다음 모드 시도
@@ -2099,6 +2244,40 @@ class GoogleMapsTool(BaseTool):
         
         return valid_directions, total_duration, total_distance
     
+    async def get_leg_direction(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        mode: str = "walking",
+        preferred_modes: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        단일 구간 Directions 정보 (헤지 라우팅 등 구간 단위 호출용)
+        
+        Args:
+            from_place: 출발 장소
+            to_place: 도착 장소
+            mode: 이동 수단
+            preferred_modes: 시도할 교통수단 우선순위
+            
+        Returns:
+            direction 딕셔너리 (실패 시 "error" 포함)
+        """
+        directions, _, _ = await self._calculate_directions(
+            [from_place, to_place], None, None, mode, preferred_modes=preferred_modes
+        )
+        if directions:
+            return directions[0]
+        return {
+            "from": from_place.get("name", "Unknown"),
+            "to": to_place.get("name", "Unknown"),
+            "duration": 0,
+            "distance": 0,
+            "steps": [],
+            "mode": mode,
+            "error": "구간 좌표를 확인할 수 없습니다."
+        }
+    
     async def get_weather_info(
         self,
         lat: float,
@@ -2124,244 +2303,8 @@ class GoogleMapsTool(BaseTool):
                 "date": str  # 날짜
             }
         """
-        if not self.openweather_api_key:
-            print("⚠️ OpenWeather API 키가 설정되지 않았습니다.")
-            return {
-                "temperature": None,
-                "condition": "정보 없음",
-                "description": "날씨 정보를 가져올 수 없습니다.",
-                "humidity": None,
-                "wind_speed": None,
-                "icon": None,
-                "icon_type": None,  # 아이콘 타입 필드 추가
-                "date": date or datetime.now().strftime("%Y-%m-%d")
-            }
-
-        async def fetch_openweather_current(session: aiohttp.ClientSession, target_date: datetime) -> Optional[Dict[str, Any]]:
-            """현재 날씨 정보 가져오기 (오늘 날짜인 경우)"""
-            try:
-                url = "https://api.openweathermap.org/data/2.5/weather"
-                params = {
-                    "lat": float(lat),
-                    "lon": float(lng),
-                    "appid": self.openweather_api_key,
-                    "units": "metric",
-                    "lang": "kr"
-                }
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        return None
-                    data = await response.json()
-
-                    weather_list = data.get("weather", []) or []
-                    first_weather = weather_list[0] if weather_list else {}
-                    temp = (data.get("main", {}) or {}).get("temp")
-                    humidity = (data.get("main", {}) or {}).get("humidity")
-                    wind_speed = (data.get("wind", {}) or {}).get("speed")
-                    description = first_weather.get("description", "")
-                    condition = first_weather.get("main", "")
-                    icon = first_weather.get("icon", "")
-
-                    return {
-                        "temperature": round(float(temp), 1) if temp is not None else None,
-                        "condition": condition or "정보 없음",
-                        "description": description or condition or "정보 없음",
-                        "humidity": int(humidity) if humidity is not None else None,
-                        "wind_speed": round(float(wind_speed), 1) if wind_speed is not None else None,
-                        "icon": icon,
-                        "icon_type": "openweather",
-                        "date": target_date.strftime("%Y-%m-%d")
-                    }
-            except Exception:
-                return None
-        
-        async def fetch_openweather_forecast(session: aiohttp.ClientSession, target_date: datetime) -> Optional[Dict[str, Any]]:
-            """5일/3시간 예보에서 특정 날짜의 날씨 정보 가져오기"""
-            try:
-                url = "https://api.openweathermap.org/data/2.5/forecast"
-                params = {
-                    "lat": float(lat),
-                    "lon": float(lng),
-                    "appid": self.openweather_api_key,
-                    "units": "metric",
-                    "lang": "kr"
-                }
-                async with session.get(url, params=params) as response:
-                    if response.status != 200:
-                        return None
-                    data = await response.json()
-                    
-                    forecast_list = data.get("list", [])
-                    if not forecast_list:
-                        return None
-                    
-                    # 목표 날짜의 날짜 부분만 추출 (시간 제외)
-                    target_date_only = target_date.date()
-                    
-                    # 해당 날짜의 예보 중 가장 가까운 시간대 찾기 (오후 시간대 우선)
-                    best_match = None
-                    min_time_diff = None
-                    
-                    # 먼저 정확히 일치하는 날짜의 예보 찾기
-                    for forecast_item in forecast_list:
-                        # 예보 시간 파싱
-                        dt_txt = forecast_item.get("dt_txt", "")
-                        if not dt_txt:
-                            continue
-                        
-                        try:
-                            forecast_datetime = datetime.strptime(dt_txt, "%Y-%m-%d %H:%M:%S")
-                            forecast_date = forecast_datetime.date()
-                            
-                            # 날짜가 일치하는 경우
-                            if forecast_date == target_date_only:
-                                # 오후 시간대(12시~18시) 우선 선택, 없으면 가장 가까운 시간대
-                                forecast_hour = forecast_datetime.hour
-                                time_diff = abs((forecast_datetime - target_date).total_seconds())
-                                
-                                # 오후 시간대(12~18시)에 가중치 부여
-                                if 12 <= forecast_hour <= 18:
-                                    time_diff = time_diff * 0.5  # 오후 시간대 우선
-                                
-                                if min_time_diff is None or time_diff < min_time_diff:
-                                    min_time_diff = time_diff
-                                    best_match = forecast_item
-                        except ValueError:
-                            continue
-                    
-                    # 해당 날짜의 예보가 없으면 가장 가까운 날짜 찾기
-                    if best_match is None:
-                        for forecast_item in forecast_list:
-                            dt_txt = forecast_item.get("dt_txt", "")
-                            if not dt_txt:
-                                continue
-                            
-                            try:
-                                forecast_datetime = datetime.strptime(dt_txt, "%Y-%m-%d %H:%M:%S")
-                                forecast_date = forecast_datetime.date()
-                                
-                                # 날짜 차이 계산
-                                date_diff = abs((forecast_date - target_date_only).days)
-                                
-                                if date_diff <= 5:  # 5일 이내
-                                    # 날짜 차이를 초 단위로 변환하여 비교
-                                    date_diff_seconds = date_diff * 86400  # 하루 = 86400초
-                                    if min_time_diff is None or date_diff_seconds < min_time_diff:
-                                        min_time_diff = date_diff_seconds
-                                        best_match = forecast_item
-                            except ValueError:
-                                continue
-                    
-                    if best_match is None:
-                        return None
-                    
-                    # 예보 데이터 파싱
-                    weather_list = best_match.get("weather", []) or []
-                    first_weather = weather_list[0] if weather_list else {}
-                    main_data = best_match.get("main", {}) or {}
-                    temp = main_data.get("temp")
-                    humidity = main_data.get("humidity")
-                    wind_data = best_match.get("wind", {}) or {}
-                    wind_speed = wind_data.get("speed")
-                    description = first_weather.get("description", "")
-                    condition = first_weather.get("main", "")
-                    icon = first_weather.get("icon", "")
-                    
-                    return {
-                        "temperature": round(float(temp), 1) if temp is not None else None,
-                        "condition": condition or "정보 없음",
-                        "description": description or condition or "정보 없음",
-                        "humidity": int(humidity) if humidity is not None else None,
-                        "wind_speed": round(float(wind_speed), 1) if wind_speed is not None else None,
-                        "icon": icon,
-                        "icon_type": "openweather",
-                        "date": target_date.strftime("%Y-%m-%d")
-                    }
-            except Exception as e:
-                print(f"⚠️ 예보 API 호출 중 오류: {e}")
-                return None
-
-        try:
-            if lat is None or lng is None:
-                error_msg = f"위도/경도 값이 없습니다. lat={lat}, lng={lng}"
-                print(f"❌ {error_msg}")
-                return {
-                    "temperature": None,
-                    "condition": "정보 없음",
-                    "description": f"날씨 정보를 가져올 수 없습니다: {error_msg}",
-                    "humidity": None,
-                    "wind_speed": None,
-                    "icon": None,
-                    "icon_type": None,
-                    "date": date or datetime.now().strftime("%Y-%m-%d")
-                }
-
-            # 날짜 파싱
-            if date:
-                try:
-                    target_date = datetime.strptime(date, "%Y-%m-%d")
-                    # 날짜만 있고 시간이 없으므로 오후 시간(14시)으로 설정 (일반적인 여행 시간)
-                    target_date = target_date.replace(hour=14, minute=0, second=0)
-                except:
-                    try:
-                        target_date = datetime.strptime(date.split()[0], "%Y-%m-%d")
-                        target_date = target_date.replace(hour=14, minute=0, second=0)
-                    except:
-                        target_date = datetime.now()
-            else:
-                target_date = datetime.now()
-            
-            # 오늘 날짜인지 확인 (날짜만 비교)
-            today = datetime.now().date()
-            target_date_only = target_date.date()
-            is_today = target_date_only == today
-            
-            print(f"🌤️ 날씨 조회 요청: 날짜={target_date.strftime('%Y-%m-%d')}, 오늘 여부={is_today}")
-            
-            # OpenWeather 호출
-            async with aiohttp.ClientSession() as session:
-                # 오늘 날짜면 현재 날씨 API 사용, 미래 날짜면 예보 API 사용
-                if is_today:
-                    result = await fetch_openweather_current(session, target_date)
-                    if result:
-                        print(f"🌤️ 현재 날씨 정보 조회 완료: {target_date.strftime('%Y-%m-%d')}")
-                        return result
-                else:
-                    # 미래 날짜면 예보 API 사용
-                    result = await fetch_openweather_forecast(session, target_date)
-                    if result:
-                        print(f"🌤️ 예보 날씨 정보 조회 완료: {target_date.strftime('%Y-%m-%d')}")
-                        return result
-                    else:
-                        # 예보가 없으면 현재 날씨로 폴백
-                        print(f"⚠️ {target_date.strftime('%Y-%m-%d')} 예보 정보가 없어 현재 날씨로 폴백합니다.")
-                        result = await fetch_openweather_current(session, target_date)
-                        if result:
-                            return result
-
-            return {
-                "temperature": None,
-                "condition": "정보 없음",
-                "description": "날씨 정보를 가져올 수 없습니다.",
-                "humidity": None,
-                "wind_speed": None,
-                "icon": None,
-                "icon_type": None,
-                "date": target_date.strftime("%Y-%m-%d")
-            }
-        except Exception as e:
-            print(f"⚠️ 날씨 정보 가져오기 실패: {e}")
-            return {
-                "temperature": None,
-                "condition": "정보 없음",
-                "description": "날씨 정보를 가져올 수 없습니다.",
-                "humidity": None,
-                "wind_speed": None,
-                "icon": None,
-                "icon_type": None,
-                "date": date or datetime.now().strftime("%Y-%m-%d")
-            }
-    
+        # 약 5km 격자 셀 단위로 예보 응답을 캐시하는 공용 날씨 서비스에 위임
+        return await self._weather_service.get_weather(lat, lng, date)
     
     async def get_weather_for_places(
         self,
@@ -2392,7 +2335,7 @@ class GoogleMapsTool(BaseTool):
         if not weather_tasks:
             return {}
         
-        # 병렬로 날씨 정보 가져오기
+        # 병렬로 날씨 정보 가져오기 (같은 격자 셀의 장소들은 하나의 API 호출/캐시를 공유)
         weather_results = await asyncio.gather(*weather_tasks, return_exceptions=True)
         
         weather_dict = {}
@@ -0,0 +1,251 @@
+"""
+오프라인 경로 안내 Tool
+전처리된 OSM 그래프(utils.road_graph)로 도보/자동차 경로를 계산합니다.
+외부 API 호출이 없어 비용이 들지 않으며, T Map / Google이 느리거나 장애일 때 폴백으로 사용합니다.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import numpy as np
+from .base_tool import BaseTool
+from utils import geometry
+from utils.road_graph import MODE_FLAGS, RoadGraph, get_road_graph
+
+
+class OfflineRoutingTool(BaseTool):
+    """로컬 OSM 그래프를 사용한 경로 안내 Tool"""
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        graph: Optional[RoadGraph] = None
+    ):
+        """
+        Args:
+            config: Tool 설정
+            graph: 사용할 그래프 (None이면 Config.OFFLINE_GRAPH_PATH의 프로세스 전역 그래프)
+        """
+        super().__init__(
+            name="offline_routing",
+            description="로컬 OSM 그래프로 도보 및 자동차 경로를 계산합니다.",
+            config=config or {}
+        )
+        self._graph = graph
+
+    @property
+    def graph(self) -> Optional[RoadGraph]:
+        """그래프 (처음 접근할 때 로드)"""
+        if self._graph is None:
+            self._graph = get_road_graph()
+        return self._graph
+
+    def is_available(self, mode: Optional[str] = None) -> bool:
+        """그래프가 로드되어 있고 해당 모드를 지원하는지 확인"""
+        if mode is not None and mode not in MODE_FLAGS:
+            return False
+        return self.graph is not None
+
+    def get_schema(self) -> Dict[str, Any]:
+        """Tool 입력 스키마 반환"""
+        return {
+            "type": "object",
+            "properties": {
+                "places": {
+                    "type": "array",
+                    "description": "경로에 포함할 장소 리스트 (coordinates 필수)"
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["walking", "driving"],
+                    "description": "이동 수단"
+                }
+            },
+            "required": ["places"]
+        }
+
+    @staticmethod
+    def _place_coordinates(place: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        coords = place.get("coordinates") or {}
+        try:
+            if coords.get("lat") and coords.get("lng"):
+                return float(coords["lat"]), float(coords["lng"])
+        except (ValueError, TypeError):
+            pass
+        return None
+
+    @staticmethod
+    def format_distance(distance: int) -> str:
+        return f"{distance}m" if distance < 1000 else f"{distance/1000:.1f}km"
+
+    @staticmethod
+    def format_duration(duration: int) -> str:
+        if duration < 60:
+            return f"{duration}초"
+        if duration < 3600:
+            return f"{duration//60}분"
+        return f"{duration // 3600}시간 {(duration % 3600) // 60}분"
+
+    def _error_direction(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        mode: str,
+        error: str
+    ) -> Dict[str, Any]:
+        """경로 계산에 실패한 구간의 direction 항목 생성"""
+        return {
+            "from": from_place.get("name", "Unknown"),
+            "to": to_place.get("name", "Unknown"),
+            "from_address": from_place.get("address", ""),
+            "to_address": to_place.get("address", ""),
+            "duration": 0,
+            "distance": 0,
+            "duration_text": "",
+            "distance_text": "",
+            "steps": [],
+            "mode": mode,
+            "error": error
+        }
+
+    def _route_leg(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        mode: str
+    ) -> Dict[str, Any]:
+        """단일 구간 경로 계산 (동기, 그래프 탐색)"""
+        start = self._place_coordinates(from_place)
+        end = self._place_coordinates(to_place)
+        for place, coords in ((from_place, start), (to_place, end)):
+            if coords is None:
+                return self._error_direction(
+                    from_place, to_place, mode, f"장소 '{place.get('name', 'Unknown')}'의 좌표가 없습니다."
+                )
+
+        route = self.graph.route(start, end, mode)
+        if route is None:
+            return self._error_direction(
+                from_place, to_place, mode, "오프라인 그래프에서 경로를 찾을 수 없습니다."
+            )
+
+        coords = route["coords"]
+        duration = route["duration"]
+        distance = route["distance"]
+        duration_text = self.format_duration(duration)
+        distance_text = self.format_distance(distance)
+        step = {
+            "instruction": f"{to_place.get('name', '목적지')}까지 이동",
+            "distance": distance,
+            "distance_text": distance_text,
+            "duration": duration,
+            "duration_text": duration_text,
+            "travel_mode": mode.upper(),
+            "polyline": geometry.encode_polyline(coords),
+            "path": geometry.to_latlng_dicts(geometry.simplify(coords, 5.0, max_points=20))
+        }
+        return {
+            "from": from_place.get("name", "Unknown"),
+            "to": to_place.get("name", "Unknown"),
+            "from_address": from_place.get("address", ""),
+            "to_address": to_place.get("address", ""),
+            "duration": duration,
+            "distance": distance,
+            "duration_text": duration_text,
+            "distance_text": distance_text,
+            "steps": [step],
+            "mode": mode,
+            "start_location": {"lat": start[0], "lng": start[1]},
+            "end_location": {"lat": end[0], "lng": end[1]},
+            "route_polyline": geometry.encode_polyline(coords),
+            "provider": "offline"
+        }
+
+    async def get_leg_direction(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        mode: str = "walking"
+    ) -> Dict[str, Any]:
+        """
+        단일 구간 경로 안내 (헤지 라우팅 등 구간 단위 호출용)
+
+        Returns:
+            direction 딕셔너리 (실패 시 "error" 포함)
+        """
+        if not self.is_available(mode):
+            return self._error_direction(from_place, to_place, mode, "오프라인 그래프를 사용할 수 없습니다.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._route_leg, from_place, to_place, mode)
+
+    async def execute(
+        self,
+        places: List[Dict[str, Any]],
+        mode: str = "walking",
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        장소 순서대로 구간별 경로 계산
+
+        Args:
+            places: 순서대로 정렬된 장소 리스트
+            mode: 'walking' 또는 'driving'
+
+        Returns:
+            TMapTool.execute와 같은 형식의 결과 딕셔너리
+        """
+        if not self.is_available(mode):
+            return {
+                "success": False,
+                "optimized_route": places,
+                "total_duration": 0,
+                "total_distance": 0,
+                "directions": [],
+                "error": "오프라인 그래프를 사용할 수 없습니다."
+            }
+        if len(places) < 2:
+            return {
+                "success": False,
+                "optimized_route": places,
+                "total_duration": 0,
+                "total_distance": 0,
+                "directions": [],
+                "error": "경로 안내를 위해 최소 2개의 장소가 필요합니다."
+            }
+
+        def route_all() -> List[Dict[str, Any]]:
+            return [self._route_leg(places[i], places[i + 1], mode) for i in range(len(places) - 1)]
+
+        loop = asyncio.get_running_loop()
+        directions = await loop.run_in_executor(None, route_all)
+
+        has_valid_directions = any(not d.get("error") for d in directions)
+        error = None
+        if not has_valid_directions:
+            error_messages = [d.get("error", "알 수 없는 오류") for d in directions if d.get("error")]
+            error = f"모든 구간의 경로 계산에 실패했습니다. {'; '.join(error_messages[:3])}"
+        print(f"🧭 오프라인 그래프 경로 계산: {sum(1 for d in directions if not d.get('error'))}/{len(directions)}개 구간 성공 ({mode})")
+
+        return {
+            "success": has_valid_directions,
+            "optimized_route": places,
+            "total_duration": sum(d.get("duration", 0) for d in directions),
+            "total_distance": sum(d.get("distance", 0) for d in directions),
+            "directions": directions,
+            "error": error
+        }
+
+    def duration_matrix(
+        self,
+        origins: List[Tuple[float, float]],
+        destinations: List[Tuple[float, float]],
+        mode: str = "walking"
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        소요 시간/거리 행렬 (초, 미터, 경로 없는 셀은 nan)
+
+        Returns:
+            (durations, distances) 또는 None (그래프 없음 / 지원하지 않는 모드)
+        """
+        if not self.is_available(mode):
+            return None
+        return self.graph.matrix(origins, destinations, mode)
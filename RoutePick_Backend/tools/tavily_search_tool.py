@@ -1,7 +1,9 @@
 import os
+import time
 from typing import Any, Dict, Optional
 from tavily import TavilyClient
 from .base_tool import BaseTool
+from utils.provider_health import get_provider_health
 
 class TavilySearchTool(BaseTool):
     """Tavily API를 사용한 실시간 검색 Tool"""
@@ -17,9 +19,14 @@ class TavilySearchTool(BaseTool):
             raise ValueError("TAVILY_API_KEY가 설정되지 않았습니다.")
         
         self.client = TavilyClient(api_key=self.api_key)
+        self._health = get_provider_health()
 
     async def execute(self, query: str, max_results: int = 20, **kwargs) -> Dict[str, Any]:
         """Tavily 검색 실행"""
+        if not self._health.allow("tavily", "search"):
+            return {"success": False, "places": [], "error": "Tavily 검색 서킷이 열려 있어 요청을 건너뜁니다."}
+        
+        started = time.monotonic()
         try:
             # 고급 검색(advanced)으로 본문 텍스트를 풍부하게 가져옴
             response = self.client.search(
@@ -27,6 +34,7 @@ class TavilySearchTool(BaseTool):
                 max_results=max_results, 
                 search_depth="advanced"
             )
+            self._health.record_success("tavily", "search", time.monotonic() - started)
             
             raw_results = response.get("results", [])
             places = []
@@ -40,6 +48,7 @@ class TavilySearchTool(BaseTool):
                 
             return {"success": True, "places": places}
         except Exception as e:
+            self._health.record_failure("tavily", "search", time.monotonic() - started, error=e)
             return {"success": False, "places": [], "error": str(e)}
 
     def get_schema(self) -> Dict[str, Any]:
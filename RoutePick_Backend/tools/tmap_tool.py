@@ -6,20 +6,50 @@ T Map API 경로 안내 Tool
 from typing import Any, Dict, List, Optional, Tuple
 import os
 import asyncio
-import aiohttp
 import urllib.parse
 import json
 import math
+import time
+import numpy as np
 from .base_tool import BaseTool
+from utils import geometry
+from utils.http_client import HttpClientRegistry, get_http_registry
+from utils.provider_health import get_provider_health
+from utils.rate_limiter import get_rate_limiter
+
+
+# 파싱된 안내 지점 구조체 (segment_index: 이 지점 앞까지 나온 LineString 개수)
+INSTRUCTION_DTYPE = np.dtype([
+    ("type", "U4"),
+    ("lat", "f8"),
+    ("lng", "f8"),
+    ("turn_type", "i4"),
+    ("segment_index", "i4"),
+    ("name", object),
+    ("description", object),
+    ("direction", object),
+    ("intersection_name", object),
+])
 
 
 class TMapTool(BaseTool):
     """T Map API를 사용한 경로 안내 Tool"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    # 경유지(passList) 도착 지점을 나타내는 pointType (보행자: PP1~PP5, 자동차: B1~B5)
+    WAYPOINT_POINT_TYPES = {
+        "walking": ("PP", "PP1", "PP2", "PP3", "PP4", "PP5"),
+        "driving": ("B1", "B2", "B3", "B4", "B5"),
+    }
+    
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        http_registry: Optional[HttpClientRegistry] = None
+    ):
         """
         Args:
             config: Tool 설정 (api_key 등)
+            http_registry: 공용 HTTP 세션 레지스트리 (None이면 프로세스 전역 레지스트리 사용)
         """
         super().__init__(
             name="tmap_routing",
@@ -44,6 +74,29 @@ class TMapTool(BaseTool):
         self.base_url = "https://apis.openapi.sk.com"
         self.pedestrian_url = f"{self.base_url}/tmap/routes/pedestrian"
         self.car_url = f"{self.base_url}/tmap/routes"
+        
+        # 공용 keep-alive 세션 (요청마다 TCP+TLS 핸드셰이크를 반복하지 않도록)
+        self._http = http_registry or get_http_registry()
+        
+        # 구간 동시 요청 수 제한 및 앱 키 단위 QPS 페이싱 (같은 키를 쓰는 모든 요청이 버킷 공유)
+        from config.config import Config
+        self.max_concurrent_legs = max(1, int(self.config.get("tmap_max_concurrent_legs", Config.TMAP_MAX_CONCURRENT_LEGS)))
+        self._rate_limiter = get_rate_limiter(
+            f"tmap:{self.api_key}",
+            float(self.config.get("tmap_qps", Config.TMAP_QPS)),
+            float(self.config.get("tmap_burst", Config.TMAP_BURST))
+        )
+        
+        # 코스 전체를 passList 경유지로 한 번에 요청하는 모드 (실패 시 구간별 요청으로 폴백)
+        self.whole_course = bool(self.config.get("tmap_whole_course", Config.TMAP_WHOLE_COURSE))
+        self.max_pass_points = max(1, int(self.config.get("tmap_max_pass_points", Config.TMAP_MAX_PASS_POINTS)))
+        
+        # provider 상태 레지스트리 (인증 실패/연속 장애 시 서킷을 열어 호출 생략)
+        self._health = get_provider_health()
+    
+    def endpoint_for_mode(self, mode: str) -> str:
+        """이동 수단에 해당하는 상태 레지스트리 엔드포인트 이름"""
+        return "pedestrian" if mode == "walking" else "car"
     
     def _url_encode(self, text: str) -> str:
         """UTF-8 기반 URL 인코딩"""
@@ -56,11 +109,18 @@ class TMapTool(BaseTool):
         url: str,
         data: Dict[str, Any],
         version: int = 1
-    ) -> Optional[Dict[str, Any]]:
-        """T Map API 요청"""
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        T Map API 요청
+
+        Returns:
+            (응답 JSON 또는 None, 인증 실패 여부)
+            인증 실패는 API 키 미설정 또는 HTTP 401/403일 때만 True
+            (타임아웃, 429, 5xx, 서킷 open 등은 구간 단위 실패로 처리되도록 False)
+        """
         if not self.api_key:
             print("❌ T Map API 키가 설정되지 않았습니다.")
-            return None
+            return None, True
         
         headers = {
             "appKey": self.api_key,
@@ -70,77 +130,114 @@ class TMapTool(BaseTool):
         
         params = {"version": str(version)}
         
+        endpoint = "pedestrian" if url == self.pedestrian_url else "car"
+        if not self._health.allow("tmap", endpoint):
+            print(f"⏭️ T Map {endpoint} 서킷이 열려 있어 요청을 건너뜁니다.")
+            return None, False
+        
+        # 앱 키 QPS 제한을 넘지 않도록 토큰 획득 후 요청
+        await self._rate_limiter.acquire()
+        
+        started = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=data, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        try:
-                            result = await response.json()
-                            # 응답이 비어있는지 확인
-                            if not result or (isinstance(result, dict) and not result.get("features")):
-                                response_text = await response.text()
-                                print(f"⚠️ T Map API 응답이 비어있습니다. 응답 내용: {response_text[:500]}")
-                                return None
-                            return result
-                        except Exception as e:
-                            try:
-                                response_text = await response.text()
-                                print(f"❌ T Map API JSON 파싱 실패: {e}")
-                                print(f"   응답 내용: {response_text[:500]}")
-                            except:
-                                print(f"❌ T Map API JSON 파싱 실패: {e}")
-                            return None
-                    else:
-                        # 에러 응답 상세 로깅
-                        response_text = await response.text()
-                        print(f"❌ T Map API 요청 실패 ({response.status})")
-                        print(f"   요청 URL: {url}")
-                        print(f"   요청 데이터: {data}")
-                        print(f"   응답 내용: {response_text[:500]}")
-                        
-                        # JSON 형식의 에러 응답 파싱 시도
-                        error_msg = None
+            # 타임아웃은 공용 세션 설정(HTTP_TOTAL_TIMEOUT / HTTP_CONNECT_TIMEOUT)을 따름
+            session = self._http.get_session()
+            async with session.post(url, headers=headers, json=data, params=params) as response:
+                # 상태 레지스트리 기록: 인증(401/403), 한도 초과(429), 서버 오류(5xx)만 provider 장애로 집계
+                latency = time.monotonic() - started
+                if response.status in (401, 403):
+                    self._health.record_failure("tmap", endpoint, latency, error=f"HTTP {response.status}", auth=True)
+                elif response.status == 429 or response.status >= 500:
+                    self._health.record_failure("tmap", endpoint, latency, error=f"HTTP {response.status}", auth=False)
+                elif response.status == 200:
+                    self._health.record_success("tmap", endpoint, latency)
+                
+                if response.status == 200:
+                    try:
+                        result = await response.json()
+                        # 응답이 비어있는지 확인
+                        if not result or (isinstance(result, dict) and not result.get("features")):
+                            response_text = await response.text()
+                            print(f"⚠️ T Map API 응답이 비어있습니다. 응답 내용: {response_text[:500]}")
+                            return None, False
+                        return result, False
+                    except Exception as e:
                         try:
-                            if response_text:
-                                error_json = json.loads(response_text)
-                                error_msg = (
-                                    error_json.get("errorMessage") or 
-                                    error_json.get("message") or 
-                                    error_json.get("error") or 
-                                    error_json.get("statusMessage") or
-                                    str(error_json)
-                                )
-                                print(f"   에러 메시지: {error_msg}")
+                            response_text = await response.text()
+                            print(f"❌ T Map API JSON 파싱 실패: {e}")
+                            print(f"   응답 내용: {response_text[:500]}")
                         except:
-                            # JSON 파싱 실패 시 원문 출력
-                            print(f"   에러 메시지 (원문): {response_text[:500]}")
-                            error_msg = response_text[:200] if response_text else "알 수 없는 오류"
-                        
-                        # 401, 403 에러는 API 키 문제
-                        if response.status in [401, 403]:
-                            print(f"   → API 키 인증 문제일 수 있습니다. T Map API 키를 확인해주세요.")
-                        elif response.status == 400:
-                            print(f"   → 잘못된 요청입니다. 요청 파라미터를 확인해주세요.")
-                            # 400 에러의 경우 특정 에러 메시지 확인
-                            if error_msg and ("too near" in error_msg.lower() or "너무 가깝" in error_msg):
-                                print(f"   → 두 지점이 너무 가까워 경로를 계산할 수 없습니다.")
-                        elif response.status == 404:
-                            print(f"   → API 엔드포인트를 찾을 수 없습니다.")
-                        elif response.status == 500:
-                            print(f"   → 서버 내부 오류입니다.")
-                        
-                        return None
+                            print(f"❌ T Map API JSON 파싱 실패: {e}")
+                        return None, False
+                else:
+                    # 에러 응답 상세 로깅
+                    response_text = await response.text()
+                    print(f"❌ T Map API 요청 실패 ({response.status})")
+                    print(f"   요청 URL: {url}")
+                    print(f"   요청 데이터: {data}")
+                    print(f"   응답 내용: {response_text[:500]}")
+                    
+                    # JSON 형식의 에러 응답 파싱 시도
+                    error_msg = None
+                    try:
+                        if response_text:
+                            error_json = json.loads(response_text)
+                            error_msg = (
+                                error_json.get("errorMessage") or 
+                                error_json.get("message") or 
+                                error_json.get("error") or 
+                                error_json.get("statusMessage") or
+                                str(error_json)
+                            )
+                            print(f"   에러 메시지: {error_msg}")
+                    except:
+                        # JSON 파싱 실패 시 원문 출력
+                        print(f"   에러 메시지 (원문): {response_text[:500]}")
+                        error_msg = response_text[:200] if response_text else "알 수 없는 오류"
+                    
+                    # 401, 403 에러는 API 키 문제
+                    if response.status in [401, 403]:
+                        print(f"   → API 키 인증 문제일 수 있습니다. T Map API 키를 확인해주세요.")
+                    elif response.status == 400:
+                        print(f"   → 잘못된 요청입니다. 요청 파라미터를 확인해주세요.")
+                        # 400 에러의 경우 특정 에러 메시지 확인
+                        if error_msg and ("too near" in error_msg.lower() or "너무 가깝" in error_msg):
+                            print(f"   → 두 지점이 너무 가까워 경로를 계산할 수 없습니다.")
+                    elif response.status == 404:
+                        print(f"   → API 엔드포인트를 찾을 수 없습니다.")
+                    elif response.status == 500:
+                        print(f"   → 서버 내부 오류입니다.")
+                    
+                    return None, response.status in (401, 403)
         except asyncio.TimeoutError:
-            print(f"❌ T Map API 요청 타임아웃 (30초 초과)")
-            return None
+            print(f"❌ T Map API 요청 타임아웃 ({self._http.total_timeout:.0f}초 초과)")
+            self._health.record_failure("tmap", endpoint, time.monotonic() - started, error="timeout", auth=False)
+            return None, False
         except Exception as e:
+            self._health.record_failure("tmap", endpoint, time.monotonic() - started, error=e, auth=False)
             print(f"❌ T Map API 요청 중 오류: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return None, False
     
     def _parse_geojson_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
-        """GeoJSON 형식 응답 파싱"""
+        """
+        GeoJSON 형식 응답을 열 지향(columnar) 구조로 파싱
+        
+        꼭짓점마다 {"lat", "lng"} 딕셔너리를 만들지 않고, 모든 LineString 좌표를
+        하나의 NumPy 배열에 이어 붙인 뒤 구간(segment) 경계를 오프셋으로 기록합니다.
+        딕셔너리/polyline 변환은 direction을 만들 때(JSON 경계)에서만 수행합니다.
+        
+        Returns:
+            {
+                "total_distance": int,
+                "total_time": int,
+                "coords": (N, 2) [lat, lng] 배열,
+                "segment_offsets": (S+1,) int 배열 (segment i = coords[offsets[i]:offsets[i+1]]),
+                "segments": segment별 메타데이터 리스트 (distance, time, name, description, ...),
+                "instructions": INSTRUCTION_DTYPE 구조체 배열
+            }
+        """
         if not response or not isinstance(response, dict):
             raise ValueError("응답이 유효하지 않습니다.")
         
@@ -153,24 +250,23 @@ class TMapTool(BaseTool):
         total_distance = 0
         total_time = 0
         
-        # 경로 좌표 수집
-        route_coordinates = []
-        route_segments = []
-        instructions = []
+        # 경로 좌표 수집 (segment별 배열을 모아 마지막에 한 번만 이어 붙임)
+        segment_arrays = []
+        segments = []
+        instruction_rows = []
         
         for feature in features:
             if not isinstance(feature, dict):
                 continue
-                
-            feature_type = feature.get("type")
-            geometry = feature.get("geometry", {})
+            
+            geom = feature.get("geometry", {})
             properties = feature.get("properties", {})
             
-            if not isinstance(geometry, dict) or not isinstance(properties, dict):
+            if not isinstance(geom, dict) or not isinstance(properties, dict):
                 continue
             
-            geom_type = geometry.get("type")
-            coordinates = geometry.get("coordinates", [])
+            geom_type = geom.get("type")
+            coordinates = geom.get("coordinates", [])
             
             # 출발지에서 총 거리/시간 추출
             point_type = properties.get("pointType", "")
@@ -184,19 +280,10 @@ class TMapTool(BaseTool):
             # LineString: 경로 구간
             if geom_type == "LineString":
                 if coordinates:
-                    # 좌표 형식 변환: [lng, lat] -> [lat, lng]
-                    path_coords = []
-                    for coord in coordinates:
-                        if isinstance(coord, list) and len(coord) >= 2:
-                            try:
-                                lng, lat = float(coord[0]), float(coord[1])
-                                path_coords.append({"lat": lat, "lng": lng})
-                            except (ValueError, TypeError, IndexError):
-                                continue
-                    
-                    if path_coords:
-                        route_segments.append({
-                            "path": path_coords,
+                    path_array = self._linestring_to_array(coordinates)
+                    if path_array.shape[0]:
+                        segment_arrays.append(path_array)
+                        segments.append({
                             "distance": properties.get("distance", 0) or 0,
                             "time": properties.get("time", 0) or 0,
                             "name": properties.get("name", ""),
@@ -204,7 +291,6 @@ class TMapTool(BaseTool):
                             "roadType": properties.get("roadType"),
                             "facilityType": properties.get("facilityType")
                         })
-                        route_coordinates.extend(path_coords)
             
             # Point: 안내 지점
             elif geom_type == "Point" and coordinates:
@@ -215,32 +301,63 @@ class TMapTool(BaseTool):
                         continue
                 except (ValueError, TypeError, IndexError):
                     continue
-                    
-                point_type = properties.get("pointType", "")
-                turn_type = properties.get("turnType", 0)
-                name = properties.get("name", "")
-                description = properties.get("description", "")
                 
                 # 안내 지점 정보 수집
-                if point_type in ["SP", "EP", "PP", "PP1", "PP2", "PP3", "PP4", "PP5", "GP", "S", "E", "B1", "B2", "B3", "N"]:
-                    instructions.append({
-                        "type": point_type,
-                        "coordinates": {"lat": lat, "lng": lng},
-                        "name": name,
-                        "description": description,
-                        "turnType": turn_type,
-                        "direction": properties.get("direction", ""),
-                        "intersectionName": properties.get("intersectionName", "")
-                    })
+                if point_type in ["SP", "EP", "PP", "PP1", "PP2", "PP3", "PP4", "PP5", "GP", "S", "E", "B1", "B2", "B3", "B4", "B5", "N"]:
+                    try:
+                        turn_type = int(properties.get("turnType", 0) or 0)
+                    except (ValueError, TypeError):
+                        turn_type = 0
+                    instruction_rows.append((
+                        point_type,
+                        lat,
+                        lng,
+                        turn_type,
+                        len(segments),
+                        properties.get("name", ""),
+                        properties.get("description", ""),
+                        properties.get("direction", ""),
+                        properties.get("intersectionName", "")
+                    ))
+        
+        if segment_arrays:
+            coords = np.concatenate(segment_arrays)
+            segment_offsets = np.concatenate(([0], np.cumsum([a.shape[0] for a in segment_arrays]))).astype(np.int64)
+        else:
+            coords = np.empty((0, 2), dtype=np.float64)
+            segment_offsets = np.zeros(1, dtype=np.int64)
         
         return {
             "total_distance": total_distance,
             "total_time": total_time,
-            "route_coordinates": route_coordinates,
-            "route_segments": route_segments,
-            "instructions": instructions
+            "coords": coords,
+            "segment_offsets": segment_offsets,
+            "segments": segments,
+            "instructions": np.array(instruction_rows, dtype=INSTRUCTION_DTYPE)
         }
     
+    @staticmethod
+    def _linestring_to_array(coordinates: List[Any]) -> np.ndarray:
+        """GeoJSON LineString 좌표([lng, lat] 리스트)를 (N, 2) [lat, lng] 배열로 변환"""
+        try:
+            arr = np.asarray(coordinates, dtype=np.float64)
+            if arr.ndim == 2 and arr.shape[1] >= 2:
+                return arr[:, 1::-1].copy()
+        except (ValueError, TypeError):
+            pass
+        
+        # 형식이 섞인 좌표는 유효한 점만 골라서 변환
+        pairs = []
+        for coord in coordinates:
+            if isinstance(coord, list) and len(coord) >= 2:
+                try:
+                    pairs.append((float(coord[1]), float(coord[0])))
+                except (ValueError, TypeError):
+                    continue
+        if not pairs:
+            return np.empty((0, 2), dtype=np.float64)
+        return np.asarray(pairs, dtype=np.float64)
+    
     async def get_pedestrian_route(
         self,
         start_x: float,
@@ -288,12 +405,18 @@ class TMapTool(BaseTool):
         if pass_list:
             data["passList"] = pass_list
         
-        response = await self._make_request(self.pedestrian_url, data)
+        response, auth_failed = await self._make_request(self.pedestrian_url, data)
         
         if not response:
+            if auth_failed:
+                return {
+                    "success": False,
+                    "auth_error": True,
+                    "error": "T Map 보행자 경로 API 요청 실패. API 키 또는 서비스 구독 상태를 확인해주세요."
+                }
             return {
                 "success": False,
-                "error": "T Map 보행자 경로 API 요청 실패. API 키 또는 서비스 구독 상태를 확인해주세요."
+                "error": "T Map 보행자 경로 API 요청 실패. 시간 초과, 요청 한도 초과 또는 서버 오류일 수 있습니다."
             }
         
         # GeoJSON 응답 파싱
@@ -307,20 +430,16 @@ class TMapTool(BaseTool):
             }
         
         # 경로 정보가 없는 경우
-        if not parsed.get("route_coordinates") and not parsed.get("route_segments"):
+        if parsed["coords"].shape[0] == 0:
             return {
                 "success": False,
                 "error": "T Map API에서 경로 정보를 찾을 수 없습니다. 출발지와 목적지가 T Map 서비스 제공 지역인지 확인해주세요."
             }
         
+        # 원본 GeoJSON은 보관하지 않음 (긴 경로의 메모리 사용량 절감)
         return {
             "success": True,
-            "total_distance": parsed["total_distance"],
-            "total_time": parsed["total_time"],
-            "route_coordinates": parsed["route_coordinates"],
-            "route_segments": parsed["route_segments"],
-            "instructions": parsed["instructions"],
-            "raw_response": response
+            **parsed
         }
     
     async def get_car_route(
@@ -379,12 +498,18 @@ class TMapTool(BaseTool):
         if pass_list:
             data["passList"] = pass_list
         
-        response = await self._make_request(self.car_url, data)
+        response, auth_failed = await self._make_request(self.car_url, data)
         
         if not response:
+            if auth_failed:
+                return {
+                    "success": False,
+                    "auth_error": True,
+                    "error": "T Map 자동차 경로 API 요청 실패. API 키 또는 서비스 구독 상태를 확인해주세요."
+                }
             return {
                 "success": False,
-                "error": "T Map 자동차 경로 API 요청 실패. API 키 또는 서비스 구독 상태를 확인해주세요."
+                "error": "T Map 자동차 경로 API 요청 실패. 시간 초과, 요청 한도 초과 또는 서버 오류일 수 있습니다."
             }
         
         # GeoJSON 응답 파싱
@@ -398,7 +523,7 @@ class TMapTool(BaseTool):
             }
         
         # 경로 정보가 없는 경우
-        if not parsed.get("route_coordinates") and not parsed.get("route_segments"):
+        if parsed["coords"].shape[0] == 0:
             return {
                 "success": False,
                 "error": "T Map API에서 경로 정보를 찾을 수 없습니다. 출발지와 목적지가 T Map 서비스 제공 지역인지 확인해주세요."
@@ -419,16 +544,405 @@ class TMapTool(BaseTool):
         
         return {
             "success": True,
-            "total_distance": parsed["total_distance"],
-            "total_time": parsed["total_time"],
             "total_fare": total_fare,
             "taxi_fare": taxi_fare,
-            "route_coordinates": parsed["route_coordinates"],
-            "route_segments": parsed["route_segments"],
-            "instructions": parsed["instructions"],
-            "raw_response": response
+            **parsed
+        }
+    
+    @staticmethod
+    def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """두 지점 간 거리 계산 (미터)"""
+        R = 6371000  # 지구 반지름 (미터)
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        delta_phi = math.radians(lat2 - lat1)
+        delta_lambda = math.radians(lon2 - lon1)
+        
+        a = math.sin(delta_phi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2
+        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        
+        return R * c
+    
+    def _error_direction(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        mode: str,
+        error: str
+    ) -> Dict[str, Any]:
+        """경로 계산에 실패한 구간의 direction 항목 생성"""
+        return {
+            "from": from_place.get("name", "Unknown"),
+            "to": to_place.get("name", "Unknown"),
+            "from_address": from_place.get("address", ""),
+            "to_address": to_place.get("address", ""),
+            "duration": 0,
+            "distance": 0,
+            "duration_text": "",
+            "distance_text": "",
+            "steps": [],
+            "mode": mode,
+            "error": error
         }
     
+    async def _route_leg(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        start: Tuple[float, float],
+        end: Tuple[float, float],
+        mode: str
+    ) -> Dict[str, Any]:
+        """
+        한 구간의 경로 안내 요청 및 direction 항목 변환
+        
+        Args:
+            from_place: 출발 장소
+            to_place: 도착 장소
+            start: 출발 좌표 (lat, lng)
+            end: 도착 좌표 (lat, lng)
+            mode: 이동 수단 ('walking' 또는 'driving')
+            
+        Returns:
+            direction 딕셔너리 (실패 시 "error" 포함, API 키 문제면 "auth_error": True)
+        """
+        start_lat, start_lng = start
+        end_lat, end_lng = end
+        
+        # T Map API는 경도, 위도 순서로 받음
+        start_x = start_lng  # 경도
+        start_y = start_lat  # 위도
+        end_x = end_lng
+        end_y = end_lat
+        
+        # 두 지점 간 거리 확인 (너무 가까우면 경로 계산 불필요)
+        distance_m = self._haversine_distance(start_lat, start_lng, end_lat, end_lng)
+        
+        # 거리가 너무 가까우면 (10미터 이하) 직접 경로로 처리
+        if distance_m < 10:
+            print(f"⚠️ 두 지점이 너무 가깝습니다 ({distance_m:.1f}m). 직접 경로로 처리합니다.")
+            return {
+                "from": from_place.get("name", "Unknown"),
+                "to": to_place.get("name", "Unknown"),
+                "from_address": from_place.get("address", ""),
+                "to_address": to_place.get("address", ""),
+                "duration": 0,
+                "distance": int(distance_m),
+                "duration_text": "즉시",
+                "distance_text": f"{int(distance_m)}m",
+                "steps": [{
+                    "instruction": f"{from_place.get('name', '출발지')}에서 {to_place.get('name', '목적지')}까지 도보로 이동",
+                    "distance": int(distance_m),
+                    "distance_text": f"{int(distance_m)}m",
+                    "duration": 0,
+                    "duration_text": "즉시",
+                    "travel_mode": mode.upper(),
+                    "path": [
+                        {"lat": start_lat, "lng": start_lng},
+                        {"lat": end_lat, "lng": end_lng}
+                    ]
+                }],
+                "mode": mode,
+                "start_location": {"lat": start_lat, "lng": start_lng},
+                "end_location": {"lat": end_lat, "lng": end_lng},
+                "route_polyline": geometry.encode_polyline([start, end])
+            }
+        
+        start_name = from_place.get("name", "")
+        end_name = to_place.get("name", "")
+        
+        # 이동 수단에 따라 다른 API 호출
+        if mode == "walking":
+            print(f"🚶 보행자 경로 요청: {start_name} ({start_lat:.6f}, {start_lng:.6f}) → {end_name} ({end_lat:.6f}, {end_lng:.6f})")
+            route_result = await self.get_pedestrian_route(
+                start_x=start_x,
+                start_y=start_y,
+                end_x=end_x,
+                end_y=end_y,
+                start_name=start_name,
+                end_name=end_name,
+                search_option=10  # 최단거리
+            )
+        else:  # driving
+            route_result = await self.get_car_route(
+                start_x=start_x,
+                start_y=start_y,
+                end_x=end_x,
+                end_y=end_y,
+                start_name=start_name,
+                end_name=end_name,
+                search_option=0  # 교통최적+추천
+            )
+        
+        if not route_result.get("success"):
+            error_msg = route_result.get("error", "알 수 없는 오류")
+            print(f"⚠️ T Map API 경로 계산 실패 ({from_place.get('name', 'Unknown')} → {to_place.get('name', 'Unknown')}): {error_msg}")
+            
+            # API 키 문제(401/403, 키 미설정)는 execute에서 전체 실패로 처리
+            if route_result.get("auth_error"):
+                direction = self._error_direction(from_place, to_place, mode, error_msg)
+                direction["auth_error"] = True
+                return direction
+            
+            # 서비스 제공 지역이 아닌 경우도 명확히 표시
+            if "서비스 제공 지역" in error_msg or "경로 정보를 찾을 수 없습니다" in error_msg:
+                return self._error_direction(
+                    from_place, to_place, mode, f"T Map 서비스 제공 지역이 아닙니다: {error_msg}"
+                )
+            
+            # 기타 오류는 그대로 전달
+            return self._error_direction(from_place, to_place, mode, error_msg)
+        
+        return self._build_direction(from_place, to_place, start, end, mode, route_result)
+    
+    def _build_direction(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        start: Tuple[float, float],
+        end: Tuple[float, float],
+        mode: str,
+        route_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """성공한 구간 경로 결과를 direction 딕셔너리로 변환"""
+        start_lat, start_lng = start
+        end_lat, end_lng = end
+        
+        # 경로 정보 변환 (columnar → JSON 경계에서 인코딩 polyline으로 변환)
+        coords = route_result["coords"]
+        offsets = route_result["segment_offsets"]
+        instructions = route_result["instructions"]
+        
+        # Steps 생성
+        steps = []
+        for index, segment in enumerate(route_result["segments"]):
+            segment_coords = coords[offsets[index]:offsets[index + 1]]
+            step = {
+                "instruction": segment.get("description", ""),
+                "distance": segment.get("distance", 0),
+                "distance_text": f"{segment.get('distance', 0)}m",
+                "duration": segment.get("time", 0),
+                "duration_text": f"{segment.get('time', 0)}초",
+                "travel_mode": mode.upper(),
+                "polyline": geometry.encode_polyline(segment_coords),
+                "path": geometry.to_latlng_dicts(geometry.simplify(segment_coords, 5.0, max_points=20))
+            }
+            steps.append(step)
+        
+        # 안내 지점을 steps에 추가
+        guide_mask = np.isin(instructions["type"], ["GP", "PP", "PP1", "PP2", "PP3", "PP4", "PP5"])
+        for inst in instructions[guide_mask]:
+            step = {
+                "instruction": inst["description"],
+                "distance": 0,
+                "distance_text": "",
+                "duration": 0,
+                "duration_text": "",
+                "travel_mode": mode.upper(),
+                "path": [{"lat": float(inst["lat"]), "lng": float(inst["lng"])}],
+                "turnType": int(inst["turn_type"]),
+                "direction": inst["direction"],
+                "intersectionName": inst["intersection_name"]
+            }
+            steps.append(step)
+        
+        # 거리/시간 변환
+        seg_distance = route_result.get("total_distance", 0)
+        seg_duration = route_result.get("total_time", 0)
+        
+        # 거리 텍스트 변환
+        if seg_distance < 1000:
+            distance_text = f"{seg_distance}m"
+        else:
+            distance_text = f"{seg_distance/1000:.1f}km"
+        
+        # 시간 텍스트 변환
+        if seg_duration < 60:
+            duration_text = f"{seg_duration}초"
+        elif seg_duration < 3600:
+            duration_text = f"{seg_duration//60}분"
+        else:
+            hours = seg_duration // 3600
+            minutes = (seg_duration % 3600) // 60
+            duration_text = f"{hours}시간 {minutes}분"
+        
+        direction = {
+            "from": from_place.get("name", "Unknown"),
+            "to": to_place.get("name", "Unknown"),
+            "from_address": from_place.get("address", ""),
+            "to_address": to_place.get("address", ""),
+            "duration": seg_duration,
+            "distance": seg_distance,
+            "duration_text": duration_text,
+            "distance_text": distance_text,
+            "steps": steps,
+            "mode": mode,
+            "start_location": {"lat": start_lat, "lng": start_lng},
+            "end_location": {"lat": end_lat, "lng": end_lng},
+            "route_polyline": geometry.encode_polyline(coords)
+        }
+        
+        # 자동차 경로인 경우 요금 정보 추가
+        if mode == "driving":
+            direction["total_fare"] = route_result.get("total_fare", 0)
+            direction["taxi_fare"] = route_result.get("taxi_fare", 0)
+        
+        return direction
+    
+    async def get_leg_direction(
+        self,
+        from_place: Dict[str, Any],
+        to_place: Dict[str, Any],
+        mode: str = "walking"
+    ) -> Dict[str, Any]:
+        """
+        단일 구간 경로 안내 (헤지 라우팅 등 구간 단위 호출용)
+        
+        Returns:
+            direction 딕셔너리 (실패 시 "error" 포함)
+        """
+        coordinates = []
+        for place in (from_place, to_place):
+            coords = place.get("coordinates") or {}
+            if not (coords.get("lat") and coords.get("lng")):
+                return self._error_direction(
+                    from_place, to_place, mode, f"장소 '{place.get('name', 'Unknown')}'의 좌표가 없습니다."
+                )
+            coordinates.append((float(coords["lat"]), float(coords["lng"])))
+        
+        direction = await self._route_leg(from_place, to_place, coordinates[0], coordinates[1], mode)
+        direction.pop("auth_error", None)
+        return direction
+    
+    def _split_legs_by_waypoints(
+        self,
+        parsed: Dict[str, Any],
+        mode: str
+    ) -> List[Dict[str, Any]]:
+        """
+        passList 경로의 파싱 결과를 경유지 지점 기준으로 구간별 columnar 결과로 분리
+        (경유지 안내 지점은 도착 구간의 마지막 안내 지점으로 포함)
+        """
+        waypoint_types = self.WAYPOINT_POINT_TYPES.get(mode, self.WAYPOINT_POINT_TYPES["walking"])
+        instructions = parsed["instructions"]
+        offsets = parsed["segment_offsets"]
+        segment_count = len(parsed["segments"])
+        
+        # 구간 경계: 경유지 지점 앞까지의 segment 수 / 안내 지점 인덱스
+        markers = np.flatnonzero(np.isin(instructions["type"], waypoint_types))
+        segment_bounds = [0] + [int(instructions["segment_index"][m]) for m in markers] + [segment_count]
+        instruction_bounds = [0] + [int(m) + 1 for m in markers] + [len(instructions)]
+        
+        legs = []
+        for leg in range(len(segment_bounds) - 1):
+            first, last = segment_bounds[leg], segment_bounds[leg + 1]
+            # 마지막 경유지 뒤에 경로가 없으면 빈 구간 제외
+            if leg == len(segment_bounds) - 2 and leg > 0 and first == last:
+                continue
+            leg_instructions = instructions[instruction_bounds[leg]:instruction_bounds[leg + 1]].copy()
+            leg_instructions["segment_index"] -= first
+            leg_segments = parsed["segments"][first:last]
+            legs.append({
+                "success": True,
+                # 구간 거리/시간은 출발지(SP/S)에만 총합이 있으므로 LineString 값을 합산
+                "total_distance": sum(seg.get("distance", 0) for seg in leg_segments),
+                "total_time": sum(seg.get("time", 0) for seg in leg_segments),
+                "coords": parsed["coords"][offsets[first]:offsets[last]],
+                "segment_offsets": offsets[first:last + 1] - offsets[first],
+                "segments": leg_segments,
+                "instructions": leg_instructions,
+            })
+        return legs
+    
+    async def _route_course_chunk(
+        self,
+        chunk_places: List[Dict[str, Any]],
+        chunk_coordinates: List[Tuple[float, float]],
+        mode: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        여러 장소를 passList 경유지로 묶어 한 번에 경로 요청 후 구간별 direction으로 분리
+        
+        Args:
+            chunk_places: 순서대로 정렬된 장소 (출발지, 경유지..., 도착지)
+            chunk_coordinates: 장소 좌표 (lat, lng)
+            mode: 이동 수단 ('walking' 또는 'driving')
+            
+        Returns:
+            구간별 direction 리스트 (구간별 요청으로 폴백해야 하면 None)
+        """
+        # 너무 가까운 구간이 있으면 경유지 요청이 실패하므로 구간별 요청으로 처리
+        for (lat1, lng1), (lat2, lng2) in zip(chunk_coordinates, chunk_coordinates[1:]):
+            if self._haversine_distance(lat1, lng1, lat2, lng2) < 10:
+                return None
+        
+        start_lat, start_lng = chunk_coordinates[0]
+        end_lat, end_lng = chunk_coordinates[-1]
+        # T Map passList 형식: "경도,위도_경도,위도"
+        pass_list = "_".join(f"{lng},{lat}" for lat, lng in chunk_coordinates[1:-1])
+        start_name = chunk_places[0].get("name", "")
+        end_name = chunk_places[-1].get("name", "")
+        
+        print(f"🗺️ T Map 코스 일괄 경로 요청: {start_name} → {end_name} (경유지 {len(chunk_coordinates) - 2}개)")
+        if mode == "walking":
+            route_result = await self.get_pedestrian_route(
+                start_x=start_lng,
+                start_y=start_lat,
+                end_x=end_lng,
+                end_y=end_lat,
+                start_name=start_name,
+                end_name=end_name,
+                pass_list=pass_list,
+                search_option=10  # 최단거리
+            )
+        else:  # driving
+            route_result = await self.get_car_route(
+                start_x=start_lng,
+                start_y=start_lat,
+                end_x=end_lng,
+                end_y=end_lat,
+                start_name=start_name,
+                end_name=end_name,
+                pass_list=pass_list,
+                search_option=0  # 교통최적+추천
+            )
+        
+        if not route_result.get("success"):
+            error_msg = route_result.get("error", "알 수 없는 오류")
+            print(f"⚠️ T Map 코스 일괄 경로 계산 실패: {error_msg}")
+            # API 키 문제(401/403, 키 미설정)는 구간별로 재시도해도 같으므로 바로 실패 처리
+            # 그 외 실패(타임아웃, 429, 5xx 등)는 None을 반환해 구간별 요청으로 폴백
+            if route_result.get("auth_error"):
+                failed = []
+                for i in range(len(chunk_places) - 1):
+                    direction = self._error_direction(chunk_places[i], chunk_places[i + 1], mode, error_msg)
+                    direction["auth_error"] = True
+                    failed.append(direction)
+                return failed
+            return None
+        
+        leg_results = self._split_legs_by_waypoints(route_result, mode)
+        if len(leg_results) != len(chunk_places) - 1:
+            print(f"⚠️ T Map 경유지 분리 결과 불일치 (구간 {len(chunk_places) - 1}개, 분리 {len(leg_results)}개). 구간별 요청으로 전환합니다.")
+            return None
+        
+        directions = []
+        for i, leg_result in enumerate(leg_results):
+            if not leg_result["segments"]:
+                return None
+            
+            # 요금은 코스 전체 값만 제공되므로 첫 구간에만 기록 (합계 유지)
+            if mode == "driving":
+                leg_result["total_fare"] = route_result.get("total_fare", 0) if i == 0 else 0
+                leg_result["taxi_fare"] = route_result.get("taxi_fare", 0) if i == 0 else 0
+            
+            directions.append(self._build_direction(
+                chunk_places[i], chunk_places[i + 1],
+                chunk_coordinates[i], chunk_coordinates[i + 1],
+                mode, leg_result
+            ))
+        return directions
+    
     async def execute(
         self,
         places: List[Dict[str, Any]],
@@ -447,6 +961,7 @@ class TMapTool(BaseTool):
             destination: 도착지 (선택사항)
             mode: 이동 수단 ('walking' 또는 'driving')
             optimize_waypoints: 경유지 순서 최적화 여부
+            whole_course: passList 일괄 요청 사용 여부 (kwargs, 기본값은 설정값)
             
         Returns:
             {
@@ -515,230 +1030,74 @@ class TMapTool(BaseTool):
                     "error": "경로 안내를 위해 최소 2개의 장소가 필요합니다."
                 }
             
-            # 각 구간별로 경로 안내 요청
-            directions = []
-            total_duration = 0
-            total_distance = 0
-            
-            for i in range(len(coordinates) - 1):
-                start_lat, start_lng = coordinates[i]
-                end_lat, end_lng = coordinates[i + 1]
-                
-                from_place = places[i]
-                to_place = places[i + 1]
-                
-                # T Map API는 경도, 위도 순서로 받음
-                start_x = start_lng  # 경도
-                start_y = start_lat  # 위도
-                end_x = end_lng
-                end_y = end_lat
-                
-                # 두 지점 간 거리 확인 (너무 가까우면 경로 계산 불필요)
-                import math
-                def haversine_distance(lat1, lon1, lat2, lon2):
-                    """두 지점 간 거리 계산 (미터)"""
-                    R = 6371000  # 지구 반지름 (미터)
-                    phi1 = math.radians(lat1)
-                    phi2 = math.radians(lat2)
-                    delta_phi = math.radians(lat2 - lat1)
-                    delta_lambda = math.radians(lon2 - lon1)
-                    
-                    a = math.sin(delta_phi/2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2
-                    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-                    
-                    return R * c
-                
-                distance_m = haversine_distance(start_lat, start_lng, end_lat, end_lng)
-                
-                # 거리가 너무 가까우면 (10미터 이하) 직접 경로로 처리
-                if distance_m < 10:
-                    print(f"⚠️ 두 지점이 너무 가깝습니다 ({distance_m:.1f}m). 직접 경로로 처리합니다.")
-                    directions.append({
-                        "from": from_place.get("name", "Unknown"),
-                        "to": to_place.get("name", "Unknown"),
-                        "from_address": from_place.get("address", ""),
-                        "to_address": to_place.get("address", ""),
-                        "duration": 0,
-                        "distance": int(distance_m),
-                        "duration_text": "즉시",
-                        "distance_text": f"{int(distance_m)}m",
-                        "steps": [{
-                            "instruction": f"{from_place.get('name', '출발지')}에서 {to_place.get('name', '목적지')}까지 도보로 이동",
-                            "distance": int(distance_m),
-                            "distance_text": f"{int(distance_m)}m",
-                            "duration": 0,
-                            "duration_text": "즉시",
-                            "travel_mode": mode.upper(),
-                            "path": [
-                                {"lat": start_lat, "lng": start_lng},
-                                {"lat": end_lat, "lng": end_lng}
-                            ]
-                        }],
-                        "mode": mode,
-                        "start_location": {"lat": start_lat, "lng": start_lng},
-                        "end_location": {"lat": end_lat, "lng": end_lng},
-                        "route_coordinates": [
-                            {"lat": start_lat, "lng": start_lng},
-                            {"lat": end_lat, "lng": end_lng}
-                        ]
-                    })
-                    total_distance += int(distance_m)
-                    continue
-                
-                start_name = from_place.get("name", "")
-                end_name = to_place.get("name", "")
-                
-                # 이동 수단에 따라 다른 API 호출
-                if mode == "walking":
-                    print(f"🚶 보행자 경로 요청: {start_name} ({start_lat:.6f}, {start_lng:.6f}) → {end_name} ({end_lat:.6f}, {end_lng:.6f})")
-                    route_result = await self.get_pedestrian_route(
-                        start_x=start_x,
-                        start_y=start_y,
-                        end_x=end_x,
-                        end_y=end_y,
-                        start_name=start_name,
-                        end_name=end_name,
-                        search_option=10  # 최단거리
-                    )
-                else:  # driving
-                    route_result = await self.get_car_route(
-                        start_x=start_x,
-                        start_y=start_y,
-                        end_x=end_x,
-                        end_y=end_y,
-                        start_name=start_name,
-                        end_name=end_name,
-                        search_option=0  # 교통최적+추천
+            # 구간별 경로 안내 요청을 동시에 실행 (동시 요청 수 제한 + 앱 키 QPS 페이싱)
+            # 결과는 구간 순서대로 재조립하고, 한 구간의 실패는 해당 구간에만 기록
+            semaphore = asyncio.Semaphore(self.max_concurrent_legs)
+            leg_count = len(coordinates) - 1
+
+            async def run_leg(i: int) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._route_leg(
+                        places[i], places[i + 1], coordinates[i], coordinates[i + 1], mode
                     )
-                
-                if not route_result.get("success"):
-                    error_msg = route_result.get("error", "알 수 없는 오류")
-                    print(f"⚠️ T Map API 경로 계산 실패 ({from_place.get('name', 'Unknown')} → {to_place.get('name', 'Unknown')}): {error_msg}")
-                    
-                    # API 키 문제인 경우 명확한 에러 반환
-                    if "API 키" in error_msg or "키가 설정되지 않았습니다" in error_msg:
-                        return {
-                            "success": False,
-                            "optimized_route": places,
-                            "total_duration": 0,
-                            "total_distance": 0,
-                            "directions": [],
-                            "error": f"T Map API 키 문제: {error_msg}. 한국 내 도보/자동차 경로 안내를 사용하려면 유효한 T Map API 키가 필요합니다."
-                        }
-                    
-                    # 서비스 제공 지역이 아닌 경우도 명확히 표시
-                    if "서비스 제공 지역" in error_msg or "경로 정보를 찾을 수 없습니다" in error_msg:
-                        directions.append({
-                            "from": from_place.get("name", "Unknown"),
-                            "to": to_place.get("name", "Unknown"),
-                            "from_address": from_place.get("address", ""),
-                            "to_address": to_place.get("address", ""),
-                            "duration": 0,
-                            "distance": 0,
-                            "duration_text": "",
-                            "distance_text": "",
-                            "steps": [],
-                            "mode": mode,
-                            "error": f"T Map 서비스 제공 지역이 아닙니다: {error_msg}"
-                        })
-                        continue
-                    
-                    # 기타 오류는 그대로 전달
-                    directions.append({
-                        "from": from_place.get("name", "Unknown"),
-                        "to": to_place.get("name", "Unknown"),
-                        "from_address": from_place.get("address", ""),
-                        "to_address": to_place.get("address", ""),
-                        "duration": 0,
-                        "distance": 0,
-                        "duration_text": "",
-                        "distance_text": "",
-                        "steps": [],
-                        "mode": mode,
-                        "error": error_msg
-                    })
-                    continue
-                
-                # 경로 정보 변환
-                route_segments = route_result.get("route_segments", [])
-                instructions = route_result.get("instructions", [])
-                
-                # Steps 생성
-                steps = []
-                for segment in route_segments:
-                    step = {
-                        "instruction": segment.get("description", ""),
-                        "distance": segment.get("distance", 0),
-                        "distance_text": f"{segment.get('distance', 0)}m",
-                        "duration": segment.get("time", 0),
-                        "duration_text": f"{segment.get('time', 0)}초",
-                        "travel_mode": mode.upper(),
-                        "path": segment.get("path", [])
+
+            whole_course = kwargs.get("whole_course")
+            if whole_course is None:
+                whole_course = self.whole_course
+
+            if whole_course and leg_count > 1:
+                # 코스 일괄 모드: 경유지 제한 단위로 묶어 청크당 1회 요청 (인접 청크는 경계 장소 공유)
+                results: List[Any] = [None] * leg_count
+                legs_per_chunk = self.max_pass_points + 1
+
+                async def run_chunk(first: int, last: int) -> None:
+                    chunk_directions = None
+                    try:
+                        async with semaphore:
+                            chunk_directions = await self._route_course_chunk(
+                                places[first:last + 1], coordinates[first:last + 1], mode
+                            )
+                    except Exception as e:
+                        print(f"⚠️ T Map 코스 일괄 경로 요청 중 예외: {e}")
+                    if chunk_directions is None:
+                        # 구간별 요청으로 폴백
+                        chunk_directions = await asyncio.gather(
+                            *(run_leg(i) for i in range(first, last)),
+                            return_exceptions=True
+                        )
+                    results[first:last] = chunk_directions
+
+                await asyncio.gather(*(
+                    run_chunk(first, min(first + legs_per_chunk, leg_count))
+                    for first in range(0, leg_count, legs_per_chunk)
+                ))
+            else:
+                results = await asyncio.gather(
+                    *(run_leg(i) for i in range(leg_count)),
+                    return_exceptions=True
+                )
+
+            directions = []
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    print(f"⚠️ T Map 구간 계산 중 예외 ({places[i].get('name', 'Unknown')} → {places[i + 1].get('name', 'Unknown')}): {result}")
+                    result = self._error_direction(places[i], places[i + 1], mode, str(result))
+                directions.append(result)
+
+            # API 키 문제인 경우 명확한 에러 반환
+            for direction in directions:
+                if direction.pop("auth_error", False):
+                    return {
+                        "success": False,
+                        "optimized_route": places,
+                        "total_duration": 0,
+                        "total_distance": 0,
+                        "directions": [],
+                        "error": f"T Map API 키 문제: {direction.get('error')}. 한국 내 도보/자동차 경로 안내를 사용하려면 유효한 T Map API 키가 필요합니다."
                     }
-                    steps.append(step)
-                
-                # 안내 지점을 steps에 추가
-                for inst in instructions:
-                    if inst.get("type") in ["GP", "PP", "PP1", "PP2", "PP3", "PP4", "PP5"]:
-                        step = {
-                            "instruction": inst.get("description", ""),
-                            "distance": 0,
-                            "distance_text": "",
-                            "duration": 0,
-                            "duration_text": "",
-                            "travel_mode": mode.upper(),
-                            "path": [inst.get("coordinates", {})],
-                            "turnType": inst.get("turnType"),
-                            "direction": inst.get("direction"),
-                            "intersectionName": inst.get("intersectionName")
-                        }
-                        steps.append(step)
-                
-                # 거리/시간 변환
-                seg_distance = route_result.get("total_distance", 0)
-                seg_duration = route_result.get("total_time", 0)
-                
-                # 거리 텍스트 변환
-                if seg_distance < 1000:
-                    distance_text = f"{seg_distance}m"
-                else:
-                    distance_text = f"{seg_distance/1000:.1f}km"
-                
-                # 시간 텍스트 변환
-                if seg_duration < 60:
-                    duration_text = f"{seg_duration}초"
-                elif seg_duration < 3600:
-                    duration_text = f"{seg_duration//60}분"
-                else:
-                    hours = seg_duration // 3600
-                    minutes = (seg_duration % 3600) // 60
-                    duration_text = f"{hours}시간 {minutes}분"
-                
-                total_duration += seg_duration
-                total_distance += seg_distance
-                
-                direction = {
-                    "from": from_place.get("name", "Unknown"),
-                    "to": to_place.get("name", "Unknown"),
-                    "from_address": from_place.get("address", ""),
-                    "to_address": to_place.get("address", ""),
-                    "duration": seg_duration,
-                    "distance": seg_distance,
-                    "duration_text": duration_text,
-                    "distance_text": distance_text,
-                    "steps": steps,
-                    "mode": mode,
-                    "start_location": {"lat": start_lat, "lng": start_lng},
-                    "end_location": {"lat": end_lat, "lng": end_lng},
-                    "route_coordinates": route_result.get("route_coordinates", [])
-                }
-                
-                # 자동차 경로인 경우 요금 정보 추가
-                if mode == "driving":
-                    direction["total_fare"] = route_result.get("total_fare", 0)
-                    direction["taxi_fare"] = route_result.get("taxi_fare", 0)
-                
-                directions.append(direction)
+
+            total_duration = sum(d.get("duration", 0) for d in directions)
+            total_distance = sum(d.get("distance", 0) for d in directions)
             
             # 모든 구간이 실패했는지 확인
             all_failed = len(directions) > 0 and all(
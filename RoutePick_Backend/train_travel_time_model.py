@@ -0,0 +1,60 @@
+"""
+구간 소요 시간 모델 학습 스크립트
+TRAVEL_SAMPLE_LOG_PATH로 기록한 실제 Distance Matrix / Directions 응답 샘플(JSONL)로
+utils.travel_time_model.TravelTimeModel을 학습하고 .npz로 저장합니다.
+
+사용법:
+    python train_travel_time_model.py data/leg_samples.jsonl data/travel_time_model.npz
+
+생성한 파일 경로를 환경 변수 TRAVEL_TIME_MODEL_PATH에 지정하면 check_routing이 추정값을 사용합니다.
+"""
+
+import argparse
+
+import numpy as np
+
+from utils.travel_time_model import TravelTimeModel, load_samples
+
+
+def evaluate(model: TravelTimeModel, samples, mode: str) -> float:
+    """모드별 소요 시간 MAPE (평균 절대 백분율 오차)"""
+    rows = [s for s in samples if s.get("mode") == mode and s.get("duration", 0) > 0]
+    if not rows:
+        return float("nan")
+    origins = [s["origin"] for s in rows]
+    destinations = [s["destination"] for s in rows]
+    hours = np.array([s.get("hour", np.nan) for s in rows], dtype=np.float64)
+    actual = np.array([s["duration"] for s in rows], dtype=np.float64)
+    predicted, _ = model.predict(mode, origins, destinations, hours)
+    return float(np.mean(np.abs(predicted - actual) / actual))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구간 샘플 로그 → 소요 시간 모델(.npz)")
+    parser.add_argument("samples", nargs="+", help="샘플 로그 JSONL 파일")
+    parser.add_argument("output", help="출력 .npz 파일")
+    parser.add_argument("--ridge", type=float, default=1.0, help="릿지 정규화 강도")
+    parser.add_argument("--holdout", type=float, default=0.2, help="검증용 샘플 비율")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    print(f"📖 샘플 {len(samples):,}건 로드")
+
+    # 검증용 샘플을 떼어 두고 오차 확인
+    rng = np.random.default_rng(0)
+    mask = rng.random(len(samples)) < args.holdout
+    train = [s for s, held in zip(samples, mask) if not held]
+    test = [s for s, held in zip(samples, mask) if held]
+    model = TravelTimeModel.fit(train, ridge=args.ridge)
+    for mode, params in model.modes.items():
+        print(f"   {mode}: 학습 {params['samples']:,}건, 지역 {params['districts'].size}개, "
+              f"검증 MAPE {evaluate(model, test, mode):.1%}")
+
+    # 전체 샘플로 다시 학습해 저장
+    model = TravelTimeModel.fit(samples, ridge=args.ridge)
+    model.save(args.output)
+    print(f"✅ 저장 완료: {args.output} (모드: {', '.join(model.modes) or '없음'})")
+
+
+if __name__ == "__main__":
+    main()
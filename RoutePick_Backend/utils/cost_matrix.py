@@ -0,0 +1,156 @@
+"""
+후보 장소 이동 비용 행렬
+코스 계획 전에 후보 장소 전체의 구간 소요 시간(분) 행렬을 한 번에 만듭니다.
+LLM이 check_routing을 반복 호출하는 대신 이 표를 보고 장소 선택과 순서를 한 번에 결정합니다.
+
+셀 값의 출처 (우선순위 순):
+1. 구간 캐시(LegCache)에 있는 실제 provider 응답
+2. 오프라인 OSM 그래프 (OFFLINE_GRAPH_PATH)
+3. 학습된 소요 시간 모델 (TRAVEL_TIME_MODEL_PATH)
+4. 직선 거리 × 우회 계수 / 이동 수단별 평균 속도
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.geometry import EARTH_RADIUS_M
+
+
+# 직선 거리 기반 추정 파라미터: (평균 속도 km/h, 도로 우회 계수, 고정 시간 분)
+# 대중교통 고정 시간은 정류장 도보 + 대기 시간
+HAVERSINE_PROFILES = {
+    "walking": (4.5, 1.3, 0.0),
+    "driving": (25.0, 1.4, 3.0),
+    "transit": (18.0, 1.3, 8.0),
+}
+
+
+def haversine_matrix(points: np.ndarray) -> np.ndarray:
+    """(M, 2) [lat, lng] 좌표의 쌍별 haversine 거리 행렬 (미터)"""
+    lat = np.radians(points[:, 0])[:, None]
+    lng = np.radians(points[:, 1])[:, None]
+    a = (
+        np.sin((lat.T - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lat.T) * np.sin((lng.T - lng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def place_points(places: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    장소 리스트의 좌표 배열
+
+    Returns:
+        ((M, 2) 좌표 배열 (좌표 없는 장소는 nan), (M,) 좌표 유무 마스크)
+    """
+    points = np.full((len(places), 2), np.nan)
+    for i, place in enumerate(places):
+        coords = place.get("coordinates") or {}
+        try:
+            points[i] = (float(coords["lat"]), float(coords["lng"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return points, np.isfinite(points).all(axis=1)
+
+
+def build_cost_matrix(
+    places: Sequence[Dict[str, Any]],
+    mode: str,
+    hour: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    후보 장소 전체의 구간 소요 시간 행렬 (초)
+
+    Args:
+        places: 후보 장소 리스트
+        mode: 이동 수단 ('walking', 'driving', 'transit')
+        hour: 출발 시(0~23, 학습 모델 시간대 효과용)
+
+    Returns:
+        {"durations": (M, M) 초 (좌표 없는 장소는 nan), "distances": (M, M) 미터,
+         "sources": {"cache": n, "offline": n, "model": n, "haversine": n}}
+    """
+    points, valid = place_points(places)
+    m = len(places)
+    straight = np.full((m, m), np.nan)
+    if valid.any():
+        idx = np.flatnonzero(valid)
+        straight[np.ix_(idx, idx)] = haversine_matrix(points[idx])
+
+    durations = np.full((m, m), np.nan)
+    distances = np.full((m, m), np.nan)
+    np.fill_diagonal(durations, 0.0)
+    np.fill_diagonal(distances, 0.0)
+    sources = {"cache": 0, "offline": 0, "model": 0, "haversine": 0}
+
+    def missing_mask() -> np.ndarray:
+        mask = np.isnan(durations) & valid[:, None] & valid[None, :]
+        return mask
+
+    # 1. 구간 캐시 (실제 provider 응답)
+    from utils.route_cache import get_leg_cache
+    cache = get_leg_cache()
+    for i, j in zip(*np.nonzero(missing_mask())):
+        hit = cache.get(tuple(points[i]), tuple(points[j]), mode)
+        if hit is not None:
+            durations[i, j] = hit["duration"]
+            distances[i, j] = hit["distance"]
+            sources["cache"] += 1
+
+    # 2. 오프라인 OSM 그래프
+    mask = missing_mask()
+    if mask.any() and mode in ("walking", "driving"):
+        from utils.road_graph import get_road_graph
+        graph = get_road_graph()
+        if graph is not None:
+            rows = np.flatnonzero(mask.any(axis=1))
+            cols = np.flatnonzero(mask.any(axis=0))
+            graph_durations, graph_distances = graph.matrix(
+                [tuple(p) for p in points[rows]], [tuple(p) for p in points[cols]], mode
+            )
+            sub = mask[np.ix_(rows, cols)] & np.isfinite(graph_durations)
+            r, c = np.nonzero(sub)
+            durations[rows[r], cols[c]] = graph_durations[r, c]
+            distances[rows[r], cols[c]] = graph_distances[r, c]
+            sources["offline"] += int(sub.sum())
+
+    # 3. 학습된 소요 시간 모델
+    mask = missing_mask()
+    if mask.any():
+        from utils.travel_time_model import get_travel_time_model
+        model = get_travel_time_model()
+        if model is not None and model.has_mode(mode):
+            i, j = np.nonzero(mask)
+            predicted_durations, predicted_distances = model.predict(mode, points[i], points[j], hour)
+            durations[i, j] = predicted_durations
+            distances[i, j] = predicted_distances
+            sources["model"] += int(i.size)
+
+    # 4. 직선 거리 기반 추정
+    mask = missing_mask()
+    if mask.any():
+        speed_kmh, detour, fixed_minutes = HAVERSINE_PROFILES.get(mode, HAVERSINE_PROFILES["walking"])
+        road = straight[mask] * detour
+        durations[mask] = road / (speed_kmh / 3.6) + fixed_minutes * 60
+        distances[mask] = road
+        sources["haversine"] += int(mask.sum())
+
+    return {"durations": durations, "distances": distances, "sources": sources}
+
+
+def format_duration_table(durations: np.ndarray, indices: Optional[List[int]] = None) -> str:
+    """
+    LLM 프롬프트용 구간 소요 시간 표 (분, 정수)
+
+    첫 줄은 열 인덱스, 이후 각 줄은 "행 인덱스: 분 분 분 ..." 형식이며
+    좌표가 없어 계산할 수 없는 셀은 "-"로 표시합니다.
+    """
+    m = durations.shape[0]
+    indices = list(range(m)) if indices is None else list(indices)
+    minutes = np.round(durations / 60.0)
+    lines = ["→ " + " ".join(str(j) for j in indices)]
+    for row, i in enumerate(indices):
+        cells = ["-" if np.isnan(v) else str(int(v)) for v in minutes[row]]
+        lines.append(f"{i}: " + " ".join(cells))
+    return "\n".join(lines)
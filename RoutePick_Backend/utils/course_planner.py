@@ -0,0 +1,360 @@
+"""
+제약 기반 코스 플래너
+후보 장소(candidate_pool)에서 방문 장소와 순서를 LLM 없이 결정합니다.
+
+시간 창이 있는 오리엔티어링 문제를 빔 서치로 풉니다.
+- 목적: trust_score 합 + 저장된 장소 우선순위 - 이동 시간 페널티
+- 제약: 총 소요 시간(time_constraints), 구간 이동 시간 상한, 카테고리별 개수 제한,
+  식당/카페 연속 방문 금지, 예산
+- 날씨가 나쁘거나 테마가 실내이면 야외 장소에 페널티
+- 식당 도착 시각이 식사 시간대를 벗어나면 페널티 (시작 시각을 아는 경우)
+
+이동 시간은 utils.cost_matrix.build_cost_matrix의 (M, M) 초 단위 행렬을 사용합니다.
+후보 20개, 빔 폭 32 기준 수 ms 안에 끝납니다.
+"""
+
+import re
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from utils.cost_matrix import place_points
+
+
+# 카테고리별 기본 체류 시간 (분)
+CATEGORY_DWELL_MINUTES = {"식당": 70, "카페": 50, "활동": 90, "관광지": 60, "쇼핑": 60}
+DEFAULT_DWELL_MINUTES = 60
+
+# 코스 한 개에 들어갈 수 있는 카테고리별 최대 장소 수
+COURSE_QUOTAS = {"식당": 2, "카페": 2, "활동": 2, "관광지": 3, "쇼핑": 2}
+DEFAULT_QUOTA = 2
+
+# 연속 방문 금지 카테고리 (식당 → 카페, 카페 → 식당도 금지)
+FOOD_CATEGORIES = ("식당", "카페")
+
+# 1인 예상 비용 (원), Google price_level(0~4)이 있으면 배수 적용
+CATEGORY_COST_WON = {"식당": 15000, "카페": 7000, "활동": 20000, "관광지": 5000, "쇼핑": 10000}
+DEFAULT_COST_WON = 10000
+PRICE_LEVEL_MULTIPLIERS = (0.5, 0.7, 1.0, 1.8, 3.0)
+
+# 식당 방문 권장 시간대 (분 단위, 점심 / 저녁)
+MEAL_WINDOWS = ((11 * 60, 14 * 60), (17 * 60, 20 * 60 + 30))
+
+# 날씨/테마 기반 실내 선호 판단
+BAD_WEATHER_KEYWORDS = ("비", "눈", "소나기", "뇌우", "폭우", "rain", "snow", "storm", "drizzle")
+INDOOR_THEME_KEYWORDS = ("실내", "비 오는", "비오는")
+OUTDOOR_TYPES = ("park", "natural_feature", "campground", "beach", "hiking_area", "amusement_park", "zoo")
+INDOOR_TYPES = ("museum", "art_gallery", "aquarium", "shopping_mall", "movie_theater", "library", "bowling_alley")
+OUTDOOR_NAME_KEYWORDS = ("공원", "해변", "해수욕장", "둘레길", "산책로", "숲", "광장", "전망대")
+
+
+def parse_budget_won(budget: Any) -> Optional[float]:
+    """
+    예산 입력을 원 단위 숫자로 변환 (예: "5만원" → 50000, "3~5만원" → 50000, "30000" → 30000)
+
+    범위가 주어지면 상한을 사용하며, 숫자가 없으면 None (예산 제약 없음)
+    """
+    if budget is None:
+        return None
+    if isinstance(budget, (int, float)):
+        return float(budget) if budget > 0 else None
+    text = str(budget).replace(",", "")
+    values = []
+    # "1만 5천원"처럼 한 금액 안의 단위는 더하고, "3~5만원"처럼 범위의 각 끝은 따로 계산
+    for segment in re.split(r"~|-|부터|에서", text):
+        value = 0.0
+        for number, unit in re.findall(r"(\d+(?:\.\d+)?)\s*(만|천)?", segment):
+            if unit == "만" or (not unit and "만" in text and float(number) < 1000):
+                value += float(number) * 10000
+            elif unit == "천":
+                value += float(number) * 1000
+            else:
+                value += float(number)
+        if value > 0:
+            values.append(value)
+    return max(values) if values else None
+
+
+def parse_group_size(group_size: Any) -> int:
+    """인원 입력을 정수로 변환 (예: "2명" → 2, 없으면 1)"""
+    match = re.search(r"\d+", str(group_size or ""))
+    return max(1, int(match.group())) if match else 1
+
+
+def is_bad_weather(weather: Optional[Dict[str, Any]]) -> bool:
+    """날씨 정보의 condition이 비/눈 등인지 확인"""
+    condition = str((weather or {}).get("condition", "")).lower()
+    return any(keyword in condition for keyword in BAD_WEATHER_KEYWORDS)
+
+
+def is_outdoor_place(place: Dict[str, Any]) -> bool:
+    """야외 장소 여부 (Google types → 이름 키워드 → 카테고리 순으로 판단)"""
+    types = place.get("types") or []
+    if any(t in INDOOR_TYPES for t in types):
+        return False
+    if any(t in OUTDOOR_TYPES for t in types):
+        return True
+    name = place.get("name") or ""
+    if any(keyword in name for keyword in OUTDOOR_NAME_KEYWORDS):
+        return True
+    return place.get("category") == "관광지"
+
+
+def _parse_clock(value: Any) -> Optional[int]:
+    """"HH:MM" 문자열을 자정 기준 분으로 변환"""
+    match = re.search(r"(\d{1,2}):(\d{2})", str(value or ""))
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+class CoursePlanner:
+    """빔 서치 기반 결정적 코스 플래너"""
+
+    def __init__(
+        self,
+        beam_width: int = 32,
+        max_places: int = 6,
+        min_places: int = 3,
+        max_leg_minutes: float = 30.0,
+        travel_weight: float = 0.03,
+        saved_bonus: float = 10.0,
+        outdoor_penalty: float = 3.0,
+        meal_penalty: float = 1.0,
+        default_total_minutes: int = 360
+    ):
+        """
+        Args:
+            beam_width: 단계별로 유지할 부분 코스 수
+            max_places: 코스 최대 장소 수
+            min_places: 가능한 경우 채울 최소 장소 수
+            max_leg_minutes: 구간 이동 시간 상한 (분)
+            travel_weight: 이동 1분당 점수 페널티
+            saved_bonus: 저장된 장소 가산점 (다른 장소 몇 개보다 커서 가능하면 항상 포함)
+            outdoor_penalty: 실내 선호 시 야외 장소 페널티
+            meal_penalty: 식당 도착이 식사 시간대를 벗어날 때 페널티
+            default_total_minutes: 시간 제약이 없을 때 총 소요 시간 (분)
+        """
+        self.beam_width = beam_width
+        self.max_places = max_places
+        self.min_places = min_places
+        self.max_leg_minutes = max_leg_minutes
+        self.travel_weight = travel_weight
+        self.saved_bonus = saved_bonus
+        self.outdoor_penalty = outdoor_penalty
+        self.meal_penalty = meal_penalty
+        self.default_total_minutes = default_total_minutes
+
+    def time_budget(self, time_constraints: Optional[Dict[str, Any]]) -> tuple:
+        """(총 가용 시간 분, 시작 시각 분 또는 None)"""
+        time_constraints = time_constraints or {}
+        start = _parse_clock(time_constraints.get("start_time"))
+        end = _parse_clock(time_constraints.get("end_time"))
+        total = time_constraints.get("total_duration")
+        try:
+            total = float(total) if total else float(self.default_total_minutes)
+        except (TypeError, ValueError):
+            total = float(self.default_total_minutes)
+        if start is not None and end is not None and end > start:
+            total = min(total, float(end - start))
+        return total, start
+
+    def _place_values(
+        self,
+        places: Sequence[Dict[str, Any]],
+        prefer_indoor: bool
+    ) -> np.ndarray:
+        """장소별 방문 가치 (trust_score, 없으면 rating + 저장 가산점 - 야외 페널티)"""
+        values = np.zeros(len(places))
+        for i, place in enumerate(places):
+            score = place.get("trust_score") or place.get("rating") or 0.0
+            try:
+                values[i] = float(score)
+            except (TypeError, ValueError):
+                values[i] = 0.0
+            if place.get("is_saved_place"):
+                values[i] += self.saved_bonus
+            if prefer_indoor and is_outdoor_place(place):
+                values[i] -= self.outdoor_penalty
+        return values
+
+    @staticmethod
+    def _place_cost(place: Dict[str, Any]) -> float:
+        """1인 예상 비용 (원)"""
+        cost = CATEGORY_COST_WON.get(place.get("category"), DEFAULT_COST_WON)
+        level = place.get("price_level")
+        if isinstance(level, (int, float)) and 0 <= level < len(PRICE_LEVEL_MULTIPLIERS):
+            cost *= PRICE_LEVEL_MULTIPLIERS[int(level)]
+        return float(cost)
+
+    def _meal_penalty(self, arrival: Optional[float]) -> float:
+        if arrival is None:
+            return 0.0
+        minute_of_day = arrival % (24 * 60)
+        if any(lo <= minute_of_day <= hi for lo, hi in MEAL_WINDOWS):
+            return 0.0
+        return self.meal_penalty
+
+    def plan(
+        self,
+        places: Sequence[Dict[str, Any]],
+        durations: np.ndarray,
+        user_preferences: Optional[Dict[str, Any]] = None,
+        time_constraints: Optional[Dict[str, Any]] = None,
+        weather: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        방문 장소와 순서 결정
+
+        Args:
+            places: 후보 장소 리스트
+            durations: (M, M) 구간 소요 시간 (초, 계산 불가 셀은 nan)
+            user_preferences: 사용자 선호 (theme, budget, group_size, 예산은 일행 전체 기준)
+            time_constraints: 시간 제약 (start_time, end_time, total_duration)
+            weather: 지역 날씨 정보 (condition)
+
+        Returns:
+            {"selected_places": 방문 순서대로의 원본 인덱스, "sequence": 0..N-1,
+             "estimated_duration": {"위치": 체류 분}, "travel_minutes": 구간별 이동 분,
+             "total_minutes", "total_cost", "score", "reasoning", "elapsed_ms"}
+        """
+        started = time.perf_counter()
+        user_preferences = user_preferences or {}
+        m = len(places)
+        total_minutes, start_clock = self.time_budget(time_constraints)
+        theme = str(user_preferences.get("theme") or "")
+        prefer_indoor = is_bad_weather(weather) or any(k in theme for k in INDOOR_THEME_KEYWORDS)
+        group_size = parse_group_size(user_preferences.get("group_size"))
+        budget = parse_budget_won(user_preferences.get("budget"))
+
+        travel = np.asarray(durations, dtype=np.float64) / 60.0
+        reachable = np.isfinite(travel) & (travel <= self.max_leg_minutes)
+        np.fill_diagonal(reachable, False)
+        _, has_coords = place_points(places)
+
+        values = self._place_values(places, prefer_indoor)
+        dwell = np.array([CATEGORY_DWELL_MINUTES.get(p.get("category"), DEFAULT_DWELL_MINUTES) for p in places], dtype=np.float64)
+        costs = np.array([self._place_cost(p) * group_size for p in places], dtype=np.float64)
+        categories = [p.get("category") or "기타" for p in places]
+        food = np.array([c in FOOD_CATEGORIES for c in categories])
+        is_restaurant = np.array([c == "식당" for c in categories])
+        quotas = {c: COURSE_QUOTAS.get(c, DEFAULT_QUOTA) for c in set(categories)}
+
+        def arrival_clock(elapsed: float) -> Optional[float]:
+            return None if start_clock is None else start_clock + elapsed
+
+        # 빔 상태: (점수, 경로, 방문 비트마스크, 경과 분, 누적 비용, 카테고리별 개수)
+        beam = []
+        for i in range(m):
+            if not has_coords[i] or dwell[i] > total_minutes:
+                continue
+            if budget is not None and costs[i] > budget:
+                continue
+            score = values[i]
+            if is_restaurant[i]:
+                score -= self._meal_penalty(arrival_clock(0.0))
+            beam.append((score, (i,), 1 << i, dwell[i], costs[i], {categories[i]: 1}))
+
+        def rank(state) -> tuple:
+            # 장소 수를 채운 코스 우선, 같은 수면 점수, 같은 점수면 짧은 소요 시간
+            return (min(len(state[1]), self.min_places), state[0], -state[3])
+
+        best = max(beam, key=rank) if beam else None
+        beam.sort(key=lambda s: s[0], reverse=True)
+        beam = beam[:self.beam_width]
+
+        for _ in range(self.max_places - 1):
+            expanded = {}
+            for score, path, mask, elapsed, cost, counts in beam:
+                last = path[-1]
+                feasible = reachable[last] & (elapsed + travel[last] + dwell <= total_minutes)
+                if food[last]:
+                    feasible &= ~food
+                if budget is not None:
+                    feasible &= cost + costs <= budget
+                for j in np.flatnonzero(feasible):
+                    if mask >> j & 1 or counts.get(categories[j], 0) >= quotas[categories[j]]:
+                        continue
+                    arrival = elapsed + travel[last, j]
+                    gain = values[j] - self.travel_weight * travel[last, j]
+                    if is_restaurant[j]:
+                        gain -= self._meal_penalty(arrival_clock(arrival))
+                    new_counts = dict(counts)
+                    new_counts[categories[j]] = new_counts.get(categories[j], 0) + 1
+                    state = (score + gain, path + (int(j),), mask | 1 << j, arrival + dwell[j], cost + costs[j], new_counts)
+                    # 같은 장소 집합, 같은 마지막 장소면 점수가 높은 부분 코스만 유지
+                    key = (state[2], int(j))
+                    if key not in expanded or state[0] > expanded[key][0]:
+                        expanded[key] = state
+            if not expanded:
+                break
+            beam = sorted(expanded.values(), key=lambda s: s[0], reverse=True)[:self.beam_width]
+            best = max([best, beam[0]] if best else [beam[0]], key=rank)
+
+        if best is None:
+            return {
+                "selected_places": [],
+                "sequence": [],
+                "estimated_duration": {},
+                "travel_minutes": [],
+                "total_minutes": 0,
+                "total_cost": 0,
+                "score": 0.0,
+                "reasoning": "조건을 만족하는 장소 조합을 찾지 못했습니다.",
+                "elapsed_ms": (time.perf_counter() - started) * 1000
+            }
+
+        score, path, _, elapsed, cost, _ = best
+        legs = [float(travel[a, b]) for a, b in zip(path, path[1:])]
+        reasons = []
+        for i in path:
+            place = places[i]
+            notes = [f"{categories[i]}", f"신뢰도 {float(place.get('trust_score') or place.get('rating') or 0):.2f}"]
+            if place.get("is_saved_place"):
+                notes.append("저장된 장소")
+            if prefer_indoor and not is_outdoor_place(place):
+                notes.append("실내")
+            reasons.append(f"{len(reasons) + 1}. [{i}] {place.get('name', 'Unknown')}: {', '.join(notes)}")
+        summary = f"총 {int(round(elapsed))}분 (이동 {int(round(sum(legs)))}분) / 가용 {int(total_minutes)}분"
+        if budget is not None:
+            summary += f", 예상 비용 {int(cost):,}원 / 예산 {int(budget):,}원"
+        if prefer_indoor:
+            summary += ", 날씨/테마에 따라 실내 장소 우선"
+
+        return {
+            "selected_places": list(path),
+            "sequence": list(range(len(path))),
+            "estimated_duration": {str(pos): int(dwell[i]) for pos, i in enumerate(path)},
+            "travel_minutes": legs,
+            "total_minutes": float(elapsed),
+            "total_cost": float(cost),
+            "score": float(score),
+            "reasoning": "\n".join(reasons + [summary]),
+            "elapsed_ms": (time.perf_counter() - started) * 1000
+        }
+
+
+def describe_course(
+    places: Sequence[Dict[str, Any]],
+    plan: Dict[str, Any],
+    transportation: Optional[str] = None
+) -> str:
+    """
+    LLM 없이 만드는 코스 설명 (fast 모드)
+
+    예: "1. 카페 A (카페, 약 50분) → 도보 약 8분 → 2. 식당 B (식당, 약 70분)"
+    """
+    selected = plan.get("selected_places") or []
+    if not selected:
+        return ""
+    legs = plan.get("travel_minutes") or []
+    dwell = plan.get("estimated_duration") or {}
+    move = transportation or "이동"
+    parts = []
+    for pos, i in enumerate(selected):
+        place = places[i]
+        parts.append(f"{pos + 1}. {place.get('name', 'Unknown')} ({place.get('category', '기타')}, 약 {dwell.get(str(pos), DEFAULT_DWELL_MINUTES)}분)")
+        if pos < len(legs):
+            parts.append(f"{move} 약 {max(1, int(round(legs[pos])))}분")
+    return " → ".join(parts)
@@ -0,0 +1,174 @@
+"""
+장소 추출 LLM 호출 마이크로 배칭
+동시에 검색 단계에 있는 여러 여행 요청(SearchAgent 실행)의 검색 결과를 짧은 시간 모아
+꽉 찬 크기의 배치 프롬프트로 묶고, 추출 결과를 source_url 기준으로 각 요청에 돌려줍니다.
+
+- 같은 키(지역)끼리만 묶음: 추출 프롬프트가 지역 필터링을 하므로 다른 지역 데이터는 섞지 않음
+- 창(window) 안에 처음 도착한 요청이 리더가 되어 창이 끝나면 모인 데이터를 배치로 나눠 처리
+- 여러 요청이 같은 검색 결과(url + 본문)를 보내면 한 번만 프롬프트에 넣고 결과는 모두에게 전달
+
+Flask 요청마다 별도 스레드/이벤트 루프에서 실행되므로 대기 중인 요청은 각자의 루프에 Future를 두고,
+리더는 loop.call_soon_threadsafe로 결과를 전달합니다.
+리더가 창을 기다리는 중에 취소되면 모인 요청에 오류를 전달하고, 대기 중인 요청은 result_timeout까지만 기다립니다.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# (배치 데이터, 배치 번호, 전체 배치 수) -> 추출 결과 리스트
+ProcessFn = Callable[[List[Dict[str, Any]], int, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def _deliver(future: asyncio.Future, results: Optional[List[Dict[str, Any]]], error: Optional[BaseException]) -> None:
+    """대기 중인 요청의 Future에 결과 전달 (해당 Future의 루프에서 실행)"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(results)
+
+
+class ExtractionBatcher:
+    """프로세스 전역 장소 추출 배처"""
+
+    def __init__(self, batch_size: int = 8, window_seconds: float = 0.3, result_timeout: float = 120.0):
+        """
+        Args:
+            batch_size: LLM 호출 1회에 넣을 검색 결과 수
+            window_seconds: 다른 요청의 데이터를 기다리는 시간 (초)
+            result_timeout: 추출 결과를 기다리는 최대 시간 (초)
+        """
+        self.batch_size = max(1, batch_size)
+        self.window_seconds = window_seconds
+        self.result_timeout = result_timeout
+        self._pending: Dict[str, List[Tuple[List[Dict[str, Any]], asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"submissions": 0, "items": 0, "deduplicated": 0, "llm_calls": 0, "shared_calls": 0}
+
+    async def submit(self, key: str, items: List[Dict[str, Any]], process: ProcessFn) -> List[Dict[str, Any]]:
+        """
+        검색 결과를 배처에 넣고 이 요청 몫의 추출 결과를 기다림
+
+        Args:
+            key: 묶음 키 (지역명)
+            items: 검색 결과 리스트 (url, title, snippet)
+            process: 배치 하나를 LLM으로 처리하는 함수 (리더가 된 경우에만 호출)
+
+        Returns:
+            이 요청의 검색 결과에서 추출된 장소 리스트 (name, category, source_url)
+        """
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            is_leader = key not in self._pending
+            self._pending.setdefault(key, []).append((items, loop, future))
+            self._stats["submissions"] += 1
+            self._stats["items"] += len(items)
+
+        if is_leader:
+            try:
+                await asyncio.sleep(self.window_seconds)
+            except BaseException as e:
+                # 창을 기다리는 중에 리더가 취소되면 모인 요청이 영원히 기다리지 않도록 오류 전달
+                with self._lock:
+                    entries = self._pending.pop(key, [])
+                for _, entry_loop, entry_future in entries:
+                    if entry_future is future:
+                        continue
+                    entry_loop.call_soon_threadsafe(
+                        _deliver, entry_future, None, RuntimeError(f"장소 추출 배치 리더 요청이 중단되었습니다: {e!r}")
+                    )
+                raise
+            with self._lock:
+                entries = self._pending.pop(key, [])
+            await self._run(key, entries, process)
+        try:
+            return await asyncio.wait_for(future, timeout=self.result_timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"장소 추출 배치 결과 대기 시간 초과 ({self.result_timeout:.0f}초)")
+
+    async def _run(
+        self,
+        key: str,
+        entries: List[Tuple[List[Dict[str, Any]], asyncio.AbstractEventLoop, asyncio.Future]],
+        process: ProcessFn
+    ) -> None:
+        """모인 데이터를 배치로 나눠 처리하고 결과를 요청별로 전달"""
+        # 같은 검색 결과는 한 번만 넣고, 어떤 요청들이 보냈는지 기록
+        unique: List[Dict[str, Any]] = []
+        owners: List[set] = []
+        index_by_item: Dict[Tuple[str, str], int] = {}
+        for owner, (items, _, _) in enumerate(entries):
+            for item in items:
+                item_key = (item.get("url", ""), item.get("snippet", ""))
+                index = index_by_item.get(item_key)
+                if index is None:
+                    index = len(unique)
+                    index_by_item[item_key] = index
+                    unique.append(item)
+                    owners.append(set())
+                owners[index].add(owner)
+
+        chunks = [list(range(i, min(i + self.batch_size, len(unique)))) for i in range(0, len(unique), self.batch_size)]
+        total_items = sum(len(items) for items, _, _ in entries)
+        if len(entries) > 1:
+            print(f"   📦 [추출 배처] {key}: 요청 {len(entries)}개의 데이터 {total_items}개 → "
+                  f"{len(unique)}개 ({len(chunks)}개 배치)로 묶어 처리")
+
+        results_by_owner: List[List[Dict[str, Any]]] = [[] for _ in entries]
+        error: Optional[BaseException] = None
+        try:
+            batch_results = await asyncio.gather(*(
+                process([unique[i] for i in chunk], n + 1, len(chunks)) for n, chunk in enumerate(chunks)
+            ))
+            for chunk, results in zip(chunks, batch_results):
+                chunk_owners = set().union(*(owners[i] for i in chunk))
+                url_owners: Dict[str, set] = {}
+                for i in chunk:
+                    url_owners.setdefault(unique[i].get("url", ""), set()).update(owners[i])
+                for result in results or []:
+                    # 출처 url을 보낸 요청에만 전달 (url이 데이터에 없으면 배치를 함께 쓴 요청 모두)
+                    for owner in url_owners.get(result.get("source_url", ""), chunk_owners):
+                        results_by_owner[owner].append(result)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                self._stats["deduplicated"] += total_items - len(unique)
+                self._stats["llm_calls"] += len(chunks)
+                if len(entries) > 1:
+                    self._stats["shared_calls"] += len(chunks)
+            for owner, (_, loop, future) in enumerate(entries):
+                if error is None:
+                    loop.call_soon_threadsafe(_deliver, future, results_by_owner[owner], None)
+                else:
+                    loop.call_soon_threadsafe(_deliver, future, None, RuntimeError(f"장소 추출 배치 처리 실패: {error}"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+
+_extraction_batcher: Optional[ExtractionBatcher] = None
+_extraction_batcher_lock = threading.Lock()
+
+
+def get_extraction_batcher() -> ExtractionBatcher:
+    """프로세스 전역 장소 추출 배처 반환"""
+    global _extraction_batcher
+    if _extraction_batcher is None:
+        with _extraction_batcher_lock:
+            if _extraction_batcher is None:
+                from config.config import Config
+                _extraction_batcher = ExtractionBatcher(
+                    batch_size=Config.EXTRACTION_BATCH_SIZE,
+                    window_seconds=Config.EXTRACTION_BATCH_WINDOW_MS / 1000.0,
+                    result_timeout=Config.EXTRACTION_BATCH_TIMEOUT_SECONDS,
+                )
+    return _extraction_batcher
@@ -0,0 +1,221 @@
+"""
+경로 지오메트리 유틸리티
+Google 인코딩 polyline을 NumPy 배열로 일괄 디코딩/인코딩하고,
+Douglas-Peucker 알고리즘(미터 단위 허용 오차)으로 경로를 단순화합니다.
+
+좌표 배열은 항상 (N, 2) 형태의 [lat, lng] float64 배열입니다.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+EARTH_RADIUS_M = 6371000.0
+# Google polyline 인코딩 정밀도 (소수점 5자리)
+POLYLINE_PRECISION = 1e5
+
+# 단순화 수준별 Douglas-Peucker 허용 오차 (미터)
+# full: 원본 유지, high: 상세, medium: 기본, low: 개략
+SIMPLIFY_LEVELS = {
+    "full": 0.0,
+    "high": 2.0,
+    "medium": 5.0,
+    "low": 15.0,
+}
+DEFAULT_SIMPLIFY_LEVEL = "medium"
+
+
+def decode_polyline(encoded: str) -> np.ndarray:
+    """
+    Google 인코딩 polyline을 (N, 2) [lat, lng] 배열로 일괄 디코딩
+
+    문자 단위 파이썬 루프 대신 바이트 배열 연산으로 모든 값을 한 번에 복원합니다.
+
+    Args:
+        encoded: 인코딩된 polyline 문자열
+
+    Returns:
+        (N, 2) float64 배열 (빈 문자열이면 (0, 2) 배열)
+    """
+    if not encoded:
+        return np.empty((0, 2), dtype=np.float64)
+
+    chunks = np.frombuffer(encoded.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    is_last = chunks < 0x20
+    ends = np.flatnonzero(is_last)
+    if ends.size == 0:
+        return np.empty((0, 2), dtype=np.float64)
+
+    # 끝이 잘린 값(마지막 청크 이후의 잔여 바이트)은 버림
+    chunks = chunks[:ends[-1] + 1]
+    starts = np.concatenate(([0], ends[:-1] + 1))
+
+    # 각 바이트가 속한 값의 번호와 값 내부 위치(5비트 단위 shift)
+    value_ids = np.repeat(np.arange(ends.size), ends - starts + 1)
+    positions = np.arange(chunks.size) - starts[value_ids]
+    parts = (chunks & 0x1f) << (5 * positions)
+    values = np.add.reduceat(parts, starts)
+
+    # zigzag 부호 복원
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+
+    # 위도/경도 쌍이 맞지 않는 마지막 값은 버림
+    if deltas.size % 2:
+        deltas = deltas[:-1]
+
+    coords = np.cumsum(deltas.reshape(-1, 2), axis=0) / POLYLINE_PRECISION
+    return coords.astype(np.float64)
+
+
+def encode_polyline(coords: Union[np.ndarray, Sequence[Sequence[float]]]) -> str:
+    """
+    (N, 2) [lat, lng] 좌표를 Google 인코딩 polyline 문자열로 변환
+
+    Args:
+        coords: (N, 2) 배열 또는 [[lat, lng], ...] 리스트
+
+    Returns:
+        인코딩된 polyline 문자열
+    """
+    arr = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if arr.shape[0] == 0:
+        return ""
+
+    scaled = np.round(arr * POLYLINE_PRECISION).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    out: List[str] = []
+    for value in zigzag.tolist():
+        while value >= 0x20:
+            out.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        out.append(chr(value + 63))
+    return "".join(out)
+
+
+def _project_to_meters(coords: np.ndarray) -> np.ndarray:
+    """위경도 배열을 경로 중심 기준 평면 좌표(미터)로 근사 변환 (등장방형 투영)"""
+    lat0 = np.radians(coords[:, 0].mean())
+    y = np.radians(coords[:, 0]) * EARTH_RADIUS_M
+    x = np.radians(coords[:, 1]) * EARTH_RADIUS_M * np.cos(lat0)
+    return np.column_stack((x, y))
+
+
+def douglas_peucker_mask(coords: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker 단순화에서 유지할 꼭짓점 마스크 계산
+
+    Args:
+        coords: (N, 2) [lat, lng] 배열
+        tolerance_m: 허용 오차 (미터). 이보다 가까운 꼭짓점은 제거됨
+
+    Returns:
+        (N,) bool 배열 (True = 유지)
+    """
+    n = coords.shape[0]
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    if n <= 2 or tolerance_m <= 0:
+        keep[:] = True
+        return keep
+
+    points = _project_to_meters(coords)
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = points[first]
+        segment = points[last] - start
+        inner = points[first + 1:last] - start
+        seg_len_sq = float(segment @ segment)
+        if seg_len_sq == 0.0:
+            dists = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            # 선분 위 최근접점까지의 거리 (선분 밖이면 양 끝점까지의 거리)
+            t = np.clip((inner @ segment) / seg_len_sq, 0.0, 1.0)
+            proj = np.outer(t, segment)
+            diff = inner - proj
+            dists = np.hypot(diff[:, 0], diff[:, 1])
+        idx = int(np.argmax(dists))
+        if dists[idx] > tolerance_m:
+            split = first + 1 + idx
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def simplify(
+    coords: np.ndarray,
+    tolerance_m: float = 5.0,
+    max_points: Optional[int] = None
+) -> np.ndarray:
+    """
+    Douglas-Peucker로 경로 단순화
+
+    max_points가 주어지면 꼭짓점 수가 그 이하가 될 때까지 허용 오차를 2배씩 늘립니다.
+    (균등 간격 샘플링과 달리 코너 등 형태를 결정하는 점은 유지됨)
+
+    Args:
+        coords: (N, 2) [lat, lng] 배열
+        tolerance_m: 시작 허용 오차 (미터)
+        max_points: 최대 꼭짓점 수 (None이면 제한 없음)
+
+    Returns:
+        단순화된 (M, 2) 배열
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if coords.shape[0] <= 2:
+        return coords
+
+    tolerance = max(float(tolerance_m), 0.0)
+    simplified = coords[douglas_peucker_mask(coords, tolerance)]
+    if max_points is None or simplified.shape[0] <= max_points:
+        return simplified
+
+    tolerance = max(tolerance, 1.0)
+    for _ in range(20):
+        tolerance *= 2
+        simplified = coords[douglas_peucker_mask(coords, tolerance)]
+        if simplified.shape[0] <= max_points:
+            return simplified
+
+    # 허용 오차를 충분히 늘려도 줄지 않으면 양 끝점만 유지
+    return coords[[0, -1]]
+
+
+def simplify_polyline(
+    encoded: str,
+    tolerance_m: float = 5.0,
+    max_points: Optional[int] = None
+) -> str:
+    """인코딩된 polyline을 디코딩 → 단순화 → 재인코딩"""
+    return encode_polyline(simplify(decode_polyline(encoded), tolerance_m, max_points))
+
+
+def resolve_simplify_tolerance(level: Optional[str]) -> float:
+    """단순화 수준 이름을 허용 오차(미터)로 변환 (알 수 없는 값은 기본 수준 사용)"""
+    key = (level or DEFAULT_SIMPLIFY_LEVEL).strip().lower()
+    return SIMPLIFY_LEVELS.get(key, SIMPLIFY_LEVELS[DEFAULT_SIMPLIFY_LEVEL])
+
+
+def to_latlng_dicts(coords: np.ndarray) -> List[Dict[str, float]]:
+    """(N, 2) 배열을 JSON 응답용 [{"lat", "lng"}, ...] 리스트로 변환"""
+    return [{"lat": lat, "lng": lng} for lat, lng in np.asarray(coords).reshape(-1, 2).tolist()]
+
+
+def from_latlng_dicts(points: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """[{"lat", "lng"}, ...] 리스트를 (N, 2) 배열로 변환 (좌표가 없는 항목은 제외)"""
+    pairs = [
+        (float(p["lat"]), float(p["lng"]))
+        for p in points or []
+        if isinstance(p, dict) and p.get("lat") is not None and p.get("lng") is not None
+    ]
+    if not pairs:
+        return np.empty((0, 2), dtype=np.float64)
+    return np.asarray(pairs, dtype=np.float64)
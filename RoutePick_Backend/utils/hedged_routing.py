@@ -0,0 +1,322 @@
+"""
+헤지(hedged) 구간 라우팅
+한국 내 도보/자동차 구간을 T Map으로 먼저 요청하고, 응답이 지연(p90 기반 임계값 초과)되거나
+실패하면 해당 구간만 Google Directions로 추가 요청합니다.
+먼저 도착한 유효한 응답을 사용하고 나머지 요청은 취소합니다.
+
+- 주 provider 지연 시간은 모드별 최근 샘플로 p90을 계산해 헤지 임계값으로 사용
+- 구간별 승자 provider를 direction["provider"]에 기록하고 누적 통계 제공
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+
+LegCall = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def is_valid_direction(direction: Any) -> bool:
+    """경로 안내로 사용할 수 있는 direction인지 확인 (오류 없음 + steps 존재)"""
+    return isinstance(direction, dict) and not direction.get("error") and bool(direction.get("steps"))
+
+
+class LatencyTracker:
+    """키(provider:mode)별 최근 응답 시간 샘플 보관 및 분위수 계산 (스레드 안전)"""
+
+    def __init__(self, window: int = 200):
+        self.window = int(window)
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        """응답 시간 샘플 추가"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[key] = samples
+            samples.append(float(seconds))
+
+    def quantile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """분위수 반환 (샘플이 min_samples보다 적으면 None)"""
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return float(np.quantile(samples, q))
+
+    def count(self, key: str) -> int:
+        """샘플 수 반환"""
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+
+class HedgedLegRouter:
+    """주/보조 provider를 구간 단위로 경쟁시키는 헤지 라우터"""
+
+    def __init__(
+        self,
+        primary: str = "tmap",
+        secondary: str = "google",
+        quantile: float = 0.9,
+        min_samples: int = 20,
+        default_delay: float = 3.0,
+        min_delay: float = 0.5,
+        max_delay: float = 10.0
+    ):
+        """
+        Args:
+            primary: 주 provider 이름
+            secondary: 보조(헤지) provider 이름
+            quantile: 헤지 임계값으로 사용할 주 provider 지연 분위수
+            min_samples: 분위수 계산에 필요한 최소 샘플 수 (부족하면 default_delay 사용)
+            default_delay: 샘플이 부족할 때의 헤지 임계값 (초)
+            min_delay: 헤지 임계값 하한 (초)
+            max_delay: 헤지 임계값 상한 (초)
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.quantile = float(quantile)
+        self.min_samples = int(min_samples)
+        self.default_delay = float(default_delay)
+        self.min_delay = float(min_delay)
+        self.max_delay = float(max_delay)
+
+        self.latency = LatencyTracker()
+        self._stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] = self._stats.get(name, 0) + 1
+
+    def hedge_delay(self, mode: str) -> float:
+        """모드별 헤지 임계값 (주 provider 지연 p90, 상/하한 적용)"""
+        observed = self.latency.quantile(f"{self.primary}:{mode}", self.quantile, self.min_samples)
+        delay = self.default_delay if observed is None else observed
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    async def route_leg(
+        self,
+        primary_call: LegCall,
+        secondary_call: LegCall,
+        mode: str,
+        hedge: bool = True
+    ) -> Dict[str, Any]:
+        """
+        한 구간을 헤지 방식으로 계산
+
+        Args:
+            primary_call: 주 provider 구간 요청 코루틴 팩토리
+            secondary_call: 보조 provider 구간 요청 코루틴 팩토리
+            mode: 이동 수단 (지연 통계 키)
+            hedge: False면 보조 provider를 호출하지 않음 (보조 provider 서킷 open 등)
+
+        Returns:
+            먼저 도착한 유효한 direction (둘 다 실패하면 주 provider의 실패 결과),
+            "provider" 필드에 승자 provider 기록
+        """
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary_call())
+        tasks: Dict[asyncio.Future, str] = {primary_task: self.primary}
+        failures: Dict[str, Dict[str, Any]] = {}
+        hedged = False
+
+        delay = self.hedge_delay(mode)
+        try:
+            done, pending = await asyncio.wait({primary_task}, timeout=delay)
+            while True:
+                for task in done:
+                    provider = tasks[task]
+                    result = self._task_result(task)
+                    elapsed = time.monotonic() - started
+                    if provider == self.primary and (is_valid_direction(result) or elapsed >= delay):
+                        # 정상 응답 또는 임계값을 넘긴(타임아웃성) 실패만 기록
+                        # (서킷 거부, 4xx 같은 즉시 실패를 기록하면 p90이 min_delay로 내려가 거의 모든 구간이 헤지됨)
+                        self.latency.record(f"{self.primary}:{mode}", elapsed)
+                    if is_valid_direction(result):
+                        if not primary_task.done():
+                            # 취소되는 주 provider 요청도 최소 지연 시간으로 기록 (p90이 과소 추정되지 않도록)
+                            self.latency.record(f"{self.primary}:{mode}", time.monotonic() - started)
+                        return await self._finish(result, provider, pending, hedged, mode)
+                    failures[provider] = result
+
+                if hedge and not hedged:
+                    # 주 provider가 임계값 안에 응답하지 않았거나(slow) 실패(error) → 보조 provider 요청
+                    hedged = True
+                    self._count(f"hedges_fired:{'slow' if pending else 'error'}")
+                    secondary_task = asyncio.ensure_future(secondary_call())
+                    tasks[secondary_task] = self.secondary
+                    pending = set(pending) | {secondary_task}
+
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            if not primary_task.done():
+                self.latency.record(f"{self.primary}:{mode}", time.monotonic() - started)
+            for task in tasks:
+                task.cancel()
+            raise
+
+        self._count(f"failed:{mode}")
+        result = failures.get(self.primary) or failures.get(self.secondary) or {"error": "경로를 찾을 수 없습니다"}
+        result["provider"] = None
+        return result
+
+    async def _finish(
+        self,
+        result: Dict[str, Any],
+        provider: str,
+        losers: set,
+        hedged: bool,
+        mode: str
+    ) -> Dict[str, Any]:
+        """승자 기록 및 남은 요청 취소"""
+        for task in losers:
+            if not task.done():
+                task.cancel()
+                self._count("cancelled")
+        if losers:
+            await asyncio.gather(*losers, return_exceptions=True)
+
+        self._count(f"wins:{mode}:{provider}")
+        if hedged:
+            self._count(f"hedged_wins:{provider}")
+        result["provider"] = provider
+        return result
+
+    @staticmethod
+    def _task_result(task: asyncio.Future) -> Dict[str, Any]:
+        """완료된 요청의 결과 (예외는 오류 direction으로 변환)"""
+        if task.cancelled():
+            return {"error": "요청이 취소되었습니다."}
+        exc = task.exception()
+        if exc is not None:
+            return {"error": str(exc)}
+        return task.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """provider별 승리 횟수, 헤지 발생 횟수 등 통계 반환"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["primary_samples"] = {
+            mode: self.latency.count(f"{self.primary}:{mode}") for mode in ("walking", "driving")
+        }
+        stats["hedge_delay"] = {mode: round(self.hedge_delay(mode), 3) for mode in ("walking", "driving")}
+        return stats
+
+
+async def route_course_hedged(
+    router: HedgedLegRouter,
+    tmap_tool: Any,
+    maps_tool: Any,
+    places: List[Dict[str, Any]],
+    mode: str,
+    preferred_modes: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    코스 전체를 구간별 헤지 라우팅으로 계산 (T Map 우선, 지연/실패 구간만 Google)
+
+    Args:
+        router: 헤지 라우터
+        tmap_tool: TMapTool 인스턴스
+        maps_tool: GoogleMapsTool 인스턴스
+        places: 순서대로 정렬된 장소 리스트
+        mode: 'walking' 또는 'driving'
+        preferred_modes: Google 헤지 요청 시 시도할 교통수단 우선순위
+
+    Returns:
+        TMapTool.execute와 같은 형식의 결과 딕셔너리
+    """
+    if len(places) < 2:
+        return {
+            "success": False,
+            "optimized_route": places,
+            "total_duration": 0,
+            "total_distance": 0,
+            "directions": [],
+            "error": "경로 안내를 위해 최소 2개의 장소가 필요합니다."
+        }
+
+    semaphore = asyncio.Semaphore(getattr(tmap_tool, "max_concurrent_legs", 4))
+
+    # 서킷이 열린 provider는 경쟁에서 제외
+    from utils.provider_health import get_provider_health
+    health = get_provider_health()
+    skip_primary = health.is_open(router.primary, tmap_tool.endpoint_for_mode(mode))
+    skip_secondary = health.is_open(router.secondary, "directions")
+
+    async def run_leg(i: int) -> Dict[str, Any]:
+        async with semaphore:
+            if skip_primary and not skip_secondary:
+                result = await maps_tool.get_leg_direction(places[i], places[i + 1], mode, preferred_modes=preferred_modes)
+                result["provider"] = router.secondary if is_valid_direction(result) else None
+                return result
+            return await router.route_leg(
+                lambda: tmap_tool.get_leg_direction(places[i], places[i + 1], mode),
+                lambda: maps_tool.get_leg_direction(places[i], places[i + 1], mode, preferred_modes=preferred_modes),
+                mode,
+                hedge=not skip_secondary
+            )
+
+    results = await asyncio.gather(*(run_leg(i) for i in range(len(places) - 1)), return_exceptions=True)
+
+    directions = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            result = {
+                "from": places[i].get("name", "Unknown"),
+                "to": places[i + 1].get("name", "Unknown"),
+                "duration": 0,
+                "distance": 0,
+                "steps": [],
+                "mode": mode,
+                "error": str(result),
+                "provider": None
+            }
+        directions.append(result)
+
+    winners = [d.get("provider") or "실패" for d in directions]
+    print(f"🏁 헤지 라우팅 구간별 provider: {', '.join(winners)}")
+
+    has_valid_directions = any(is_valid_direction(d) for d in directions)
+    error = None
+    if not has_valid_directions:
+        error_messages = [d.get("error", "알 수 없는 오류") for d in directions if d.get("error")]
+        error = f"모든 구간의 경로 계산에 실패했습니다. {'; '.join(error_messages[:3])}"
+
+    return {
+        "success": has_valid_directions,
+        "optimized_route": places,
+        "total_duration": sum(d.get("duration", 0) for d in directions),
+        "total_distance": sum(d.get("distance", 0) for d in directions),
+        "directions": directions,
+        "error": error
+    }
+
+
+_router: Optional[HedgedLegRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_hedged_router() -> HedgedLegRouter:
+    """프로세스 전역 헤지 라우터 반환 (지연 통계를 RoutingAgent와 check_routing이 공유)"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                from config.config import Config
+                _router = HedgedLegRouter(
+                    quantile=Config.HEDGE_QUANTILE,
+                    min_samples=Config.HEDGE_MIN_SAMPLES,
+                    default_delay=Config.HEDGE_DEFAULT_DELAY_SECONDS,
+                    min_delay=Config.HEDGE_MIN_DELAY_SECONDS,
+                    max_delay=Config.HEDGE_MAX_DELAY_SECONDS,
+                )
+    return _router
@@ -0,0 +1,194 @@
+"""
+공용 HTTP 클라이언트 레지스트리
+이벤트 루프마다 keep-alive aiohttp 세션을 하나씩 소유하고 재사용합니다.
+
+- 호스트별 동시 연결 제한, DNS 캐시, 설정 가능한 타임아웃
+- 루프 종료 전 세션 정리 (run_async / close_current_loop_sessions)
+- 프로세스 종료 시 남은 세션 정리 (close_all)
+
+TMapTool, 날씨 서비스 등 aiohttp 기반 provider는 세션을 직접 만들지 않고
+get_http_registry().get_session()을 주입받아 사용합니다.
+OpenAI 비동기 클라이언트(httpx 기반)도 같은 방식으로 루프마다 하나씩 만들어
+get_openai_client()로 공유합니다 (루프가 바뀌면 연결 풀을 재사용할 수 없음).
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Dict, Optional, Tuple, TypeVar
+
+import aiohttp
+
+
+T = TypeVar("T")
+
+
+class HttpClientRegistry:
+    """이벤트 루프별 aiohttp 세션 레지스트리 (스레드 안전)"""
+
+    def __init__(
+        self,
+        total_timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0
+    ):
+        """
+        Args:
+            total_timeout: 요청 전체 타임아웃 (초)
+            connect_timeout: 연결 타임아웃 (초)
+            limit: 세션 전체 동시 연결 수
+            limit_per_host: 호스트별 동시 연결 수
+            dns_cache_ttl: DNS 캐시 유효 시간 (초)
+            keepalive_timeout: 유휴 keep-alive 연결 유지 시간 (초)
+        """
+        self.total_timeout = float(total_timeout)
+        self.connect_timeout = float(connect_timeout)
+        self.limit = int(limit)
+        self.limit_per_host = int(limit_per_host)
+        self.dns_cache_ttl = int(dns_cache_ttl)
+        self.keepalive_timeout = float(keepalive_timeout)
+
+        # 이벤트 루프 id -> (루프, 세션)
+        self._sessions: Dict[int, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        # (이벤트 루프 id, API 키) -> (루프, AsyncOpenAI)
+        self._openai_clients: Dict[Tuple[int, Optional[str]], Tuple[asyncio.AbstractEventLoop, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """keep-alive 커넥터와 기본 타임아웃을 가진 세션 생성"""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.total_timeout, connect=self.connect_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        현재 실행 중인 이벤트 루프의 공용 세션 반환 (없으면 생성)
+
+        반드시 코루틴 안에서 호출해야 합니다.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # 이미 닫힌 루프의 세션 항목 정리 (루프와 함께 커넥터도 사용할 수 없음)
+            for loop_id, (old_loop, _) in list(self._sessions.items()):
+                if old_loop.is_closed():
+                    del self._sessions[loop_id]
+
+            entry = self._sessions.get(id(loop))
+            if entry and entry[0] is loop and not entry[1].closed:
+                return entry[1]
+
+            session = self._create_session()
+            self._sessions[id(loop)] = (loop, session)
+            return session
+
+    def get_openai_client(self, api_key: Optional[str] = None) -> Any:
+        """
+        현재 실행 중인 이벤트 루프의 공용 AsyncOpenAI 클라이언트 반환 (API 키별, 없으면 생성)
+
+        반드시 코루틴 안에서 호출해야 합니다.
+        """
+        import openai
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for key, (old_loop, _) in list(self._openai_clients.items()):
+                if old_loop.is_closed():
+                    del self._openai_clients[key]
+
+            entry = self._openai_clients.get((id(loop), api_key))
+            if entry and entry[0] is loop:
+                return entry[1]
+
+            # 429 재시도/대기는 LLM 스케줄러가 전담 (SDK 자체 재시도는 RPM/TPM 버킷을 우회하므로 끔)
+            client = openai.AsyncOpenAI(api_key=api_key, max_retries=0) if api_key else openai.AsyncOpenAI(max_retries=0)
+            self._openai_clients[(id(loop), api_key)] = (loop, client)
+            return client
+
+    async def close_current_loop_sessions(self) -> None:
+        """현재 이벤트 루프의 세션 종료 (asyncio.run 종료 직전에 호출)"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._sessions.pop(id(loop), None)
+            openai_clients = [
+                self._openai_clients.pop(key)[1] for key in list(self._openai_clients) if key[0] == id(loop)
+            ]
+        for client in openai_clients:
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"⚠️ OpenAI 클라이언트 종료 중 오류: {e}")
+        if entry and not entry[1].closed:
+            await entry[1].close()
+            # SSL 연결이 완전히 닫힐 시간을 줌 (aiohttp 권장)
+            await asyncio.sleep(0)
+
+    def close_all(self) -> None:
+        """
+        남아 있는 모든 세션 정리 (프로세스 종료 훅)
+        루프가 아직 살아 있으면 해당 루프에서 닫고, 이미 닫힌 루프의 세션은 항목만 제거합니다.
+        """
+        with self._lock:
+            entries = list(self._sessions.values())
+            self._sessions.clear()
+            self._openai_clients.clear()
+
+        for loop, session in entries:
+            if session.closed or loop.is_closed():
+                continue
+            try:
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(session.close(), loop)
+                else:
+                    loop.run_until_complete(session.close())
+            except Exception as e:
+                print(f"⚠️ HTTP 세션 종료 중 오류: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """현재 열린 세션 수 반환"""
+        with self._lock:
+            return {
+                "open_sessions": sum(1 for _, s in self._sessions.values() if not s.closed),
+                "openai_clients": len(self._openai_clients)
+            }
+
+
+_registry: Optional[HttpClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_http_registry() -> HttpClientRegistry:
+    """프로세스 전역 HTTP 클라이언트 레지스트리 반환"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from config.config import Config
+                _registry = HttpClientRegistry(
+                    total_timeout=Config.HTTP_TOTAL_TIMEOUT,
+                    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+                    limit=Config.HTTP_CONNECTION_LIMIT,
+                    limit_per_host=Config.HTTP_LIMIT_PER_HOST,
+                    dns_cache_ttl=Config.HTTP_DNS_CACHE_TTL,
+                )
+    return _registry
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    asyncio.run() 대체: 코루틴 실행 후 해당 루프의 공용 HTTP 세션을 정리합니다.
+    Flask 요청 스레드와 파이프라인 실행 스레드에서 사용합니다.
+    """
+    async def _runner():
+        try:
+            return await coro
+        finally:
+            await get_http_registry().close_current_loop_sessions()
+
+    return asyncio.run(_runner())
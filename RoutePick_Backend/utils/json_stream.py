@@ -0,0 +1,87 @@
+"""
+스트리밍 JSON 문자열 필드 파서
+LLM이 {"course_description": "..."} 형태의 JSON을 토큰 단위로 생성하는 동안
+지정한 문자열 필드의 값만 점진적으로 디코딩해 돌려줍니다.
+
+- 필드 키 앞의 마크다운 코드 블록(```json)이나 다른 텍스트는 무시
+- 이스케이프(\\n, \\", \\uXXXX, 서로게이트 쌍)가 조각 경계에서 잘리면 다음 조각이 올 때까지 보류
+- 닫는 따옴표를 만나면 done=True, 이후 조각은 무시
+
+사용 예:
+    parser = JSONStringFieldStreamer("course_description")
+    for chunk in chunks:
+        text = parser.feed(chunk)   # 이번 조각으로 새로 확정된 필드 텍스트
+"""
+
+import json
+import re
+
+
+class JSONStringFieldStreamer:
+    """JSON 응답 조각에서 문자열 필드 값을 점진적으로 추출"""
+
+    def __init__(self, field: str):
+        """
+        Args:
+            field: 추출할 최상위 문자열 필드 이름
+        """
+        self.field = field
+        self._key_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = None  # 필드 값에서 아직 디코딩하지 않은 위치 (키를 찾기 전이면 None)
+        self.text = ""
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        응답 조각 추가
+
+        Returns:
+            이번 조각으로 새로 확정된 필드 텍스트 (없으면 빈 문자열)
+        """
+        if self.done or not chunk:
+            return ""
+        self._buffer += chunk
+        if self._pos is None:
+            match = self._key_pattern.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        decoded = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            ch = buffer[pos]
+            if ch == '"':
+                self.done = True
+                pos += 1
+                break
+            if ch != "\\":
+                decoded.append(ch)
+                pos += 1
+                continue
+            # 이스케이프: 끝까지 도착하지 않았으면 다음 조각을 기다림
+            if pos + 1 >= len(buffer):
+                break
+            if buffer[pos + 1] != "u":
+                escape = buffer[pos:pos + 2]
+            else:
+                escape = buffer[pos:pos + 6]
+                if len(escape) < 6:
+                    break
+                if 0xD800 <= int(escape[2:], 16) <= 0xDBFF:
+                    # 상위 서로게이트는 하위 서로게이트와 함께 디코딩
+                    if len(buffer) < pos + 12:
+                        break
+                    escape = buffer[pos:pos + 12]
+            try:
+                decoded.append(json.loads(f'"{escape}"'))
+            except ValueError:
+                decoded.append(escape)
+            pos += len(escape)
+        self._pos = pos
+
+        text = "".join(decoded)
+        self.text += text
+        return text
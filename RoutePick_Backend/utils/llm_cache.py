@@ -0,0 +1,495 @@
+"""
+LLM 응답 캐시
+같은 모델/메시지/파라미터로 반복되는 chat.completions 호출 결과를 SQLite 파일에 저장해 재사용합니다.
+
+- 키: 모델 + 정규화한 메시지(줄 끝 공백, 들여쓰기 차이 무시) + 응답에 영향을 주는 파라미터
+- 온도가 LLM_CACHE_MAX_TEMPERATURE보다 높은 호출(챗봇 등)은 force=True일 때만 캐시
+- TTL, 최대 항목 수, 최대 바이트 수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+- 정상 종료(finish_reason == "stop")하고 내용이 비어 있지 않은 응답만 저장 (잘린 응답/빈 응답은 캐시하지 않음)
+- 호출 위치(call_site)별 hit/miss/bypass 횟수와 절약한 토큰 수를 집계
+- 실제 API 호출은 입력 토큰 중 provider 프롬프트 캐시로 처리된 토큰 수,
+  전체 프롬프트가 프롬프트 캐싱 최소 길이를 넘는지(prefix_eligible), 그때 고정 템플릿(첫 system 메시지)에서
+  캐시될 수 있는 토큰 수(128토큰 단위로 내림, cacheable_prefix_tokens)도 집계
+- streamed_chat_completion: 스트리밍 호출 (조각마다 콜백, 다 모인 응답은 같은 기준으로 캐시)
+
+사용 예:
+    response = await cached_chat_completion(self.client, "search.strategy", model=..., messages=[...])
+    response.choices[0].message.content
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.prompt_templates import PROMPT_VERSIONS
+
+
+# 응답 내용에 영향을 주는 파라미터만 키에 포함 (timeout 등은 제외)
+KEY_PARAMS = (
+    "temperature", "top_p", "max_tokens", "response_format", "seed", "stop",
+    "presence_penalty", "frequency_penalty", "n", "tools", "tool_choice",
+)
+
+# temperature 미지정 시 OpenAI 기본값
+DEFAULT_TEMPERATURE = 1.0
+
+# OpenAI 프롬프트 캐싱이 적용되는 최소 프롬프트 길이 (토큰)
+# 길이를 넘으면 이전 요청과 같은 가장 긴 앞부분이 PROMPT_CACHE_STEP_TOKENS 단위로 캐시됨
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP_TOKENS = 128
+
+
+def estimate_text_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 음절은 약 1토큰, 그 외 문자는 약 4글자당 1토큰)"""
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + (len(text) - hangul) // 4
+
+
+def _normalize_content(content: Any) -> Any:
+    """메시지 본문 정규화 (f-string 들여쓰기/줄 끝 공백 차이로 키가 달라지지 않도록)"""
+    if not isinstance(content, str):
+        return content
+    lines = [line.strip() for line in content.strip().splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def make_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    """모델 + 정규화 메시지 + 파라미터 해시 키"""
+    payload = {
+        "model": model,
+        "messages": [
+            {**message, "content": _normalize_content(message.get("content"))} for message in messages
+        ],
+        "params": {name: params[name] for name in KEY_PARAMS if params.get(name) is not None},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _response_to_record(response: Any) -> Dict[str, Any]:
+    """OpenAI 응답에서 저장할 필드만 추출"""
+    usage = getattr(response, "usage", None)
+    return {
+        "model": getattr(response, "model", None),
+        "choices": [
+            {
+                "content": choice.message.content,
+                "finish_reason": getattr(choice, "finish_reason", None),
+            }
+            for choice in response.choices
+        ],
+        "usage": {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        },
+    }
+
+
+def _is_complete(record: Dict[str, Any]) -> bool:
+    """캐시해도 되는 응답인지 (모든 choice가 정상 종료(stop)했고 내용이 비어 있지 않음)"""
+    choices = record.get("choices") or []
+    return bool(choices) and all(
+        choice.get("finish_reason") == "stop" and (choice.get("content") or "").strip()
+        for choice in choices
+    )
+
+
+def _record_to_response(record: Dict[str, Any]) -> SimpleNamespace:
+    """저장된 레코드를 OpenAI 응답과 같은 모양(response.choices[0].message.content)으로 복원"""
+    return SimpleNamespace(
+        model=record.get("model"),
+        choices=[
+            SimpleNamespace(
+                index=i,
+                message=SimpleNamespace(role="assistant", content=choice.get("content")),
+                finish_reason=choice.get("finish_reason"),
+            )
+            for i, choice in enumerate(record.get("choices", []))
+        ],
+        usage=SimpleNamespace(**record.get("usage", {})),
+        cached=True,
+    )
+
+
+class LLMResponseCache:
+    """SQLite 기반 LLM 응답 캐시 (스레드 안전, 프로세스 재시작 후에도 유지)"""
+
+    def __init__(
+        self,
+        path: str = "",
+        ttl_seconds: float = 86400,
+        max_entries: int = 5000,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_temperature: float = 0.3,
+    ):
+        """
+        Args:
+            path: SQLite 파일 경로 (빈 문자열이면 메모리에만 저장)
+            ttl_seconds: 항목 유지 시간 (초)
+            max_entries: 최대 항목 수
+            max_bytes: 저장된 응답 본문 합계 상한 (바이트)
+            max_temperature: 이 온도 이하 호출만 자동으로 캐시
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_temperature = max_temperature
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, call_site TEXT, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " tokens INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed)")
+        self._conn.commit()
+        self._purge_expired()
+
+    def should_cache(self, params: Dict[str, Any], force: bool = False) -> bool:
+        """캐시 대상 호출인지 (스트리밍 제외, 온도 기준 또는 강제)"""
+        if params.get("stream"):
+            return False
+        if force:
+            return True
+        temperature = params.get("temperature")
+        if temperature is None:
+            temperature = DEFAULT_TEMPERATURE
+        return temperature <= self.max_temperature
+
+    def _count(self, call_site: str, name: str, amount: int = 1) -> None:
+        site = self._stats.setdefault(call_site, {
+            "hits": 0, "misses": 0, "bypass": 0, "tokens_saved": 0,
+            "api_calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "prefix_eligible_calls": 0,
+            "cacheable_prefix_tokens": 0,
+        })
+        site[name] += amount
+
+    def record_bypass(self, call_site: str) -> None:
+        with self._lock:
+            self._count(call_site, "bypass")
+
+    def record_usage(self, call_site: str, messages: List[Dict[str, Any]], response: Any) -> None:
+        """실제 API 응답의 입력 토큰 / provider 프롬프트 캐시 토큰 / 고정 앞부분 캐싱 가능 여부 집계"""
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        # 캐싱 여부는 전체 프롬프트 길이로 판단 (고정 템플릿만으로 최소 길이를 넘을 필요는 없음)
+        # 응답에 사용량이 없으면 메시지 길이로 추정
+        total_tokens = prompt_tokens or sum(
+            estimate_text_tokens(message.get("content")) for message in messages
+            if isinstance(message.get("content"), str)
+        )
+        eligible = total_tokens >= PROMPT_CACHE_MIN_TOKENS
+        prefix = messages[0].get("content") if messages and messages[0].get("role") == "system" else ""
+        cacheable_prefix = 0
+        if eligible:
+            static_tokens = min(estimate_text_tokens(prefix or ""), total_tokens)
+            cacheable_prefix = static_tokens // PROMPT_CACHE_STEP_TOKENS * PROMPT_CACHE_STEP_TOKENS
+        with self._lock:
+            self._count(call_site, "api_calls")
+            self._count(call_site, "prompt_tokens", prompt_tokens)
+            self._count(call_site, "cached_prompt_tokens", getattr(details, "cached_tokens", 0) or 0)
+            self._count(call_site, "prefix_eligible_calls", int(eligible))
+            self._count(call_site, "cacheable_prefix_tokens", cacheable_prefix)
+
+    def get(self, key: str, call_site: str) -> Optional[Dict[str, Any]]:
+        """캐시된 응답 레코드 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, tokens, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self._count(call_site, "misses")
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._count(call_site, "hits")
+            self._count(call_site, "tokens_saved", row[1])
+        return json.loads(row[0])
+
+    def put(self, key: str, call_site: str, record: Dict[str, Any]) -> None:
+        """응답 레코드 저장 후 크기 제한 적용"""
+        value = json.dumps(record, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, call_site, value, size, tokens, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, call_site, value, size, record.get("usage", {}).get("total_tokens", 0), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """항목 수/바이트 상한을 넘으면 오래 사용하지 않은 항목부터 삭제 (락 안에서 호출)"""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed").fetchall()
+        removed = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            removed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", removed)
+
+    def _purge_expired(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._stats.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """전체 및 호출 위치별 캐시 통계"""
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+            per_site = {}
+            for call_site, site in self._stats.items():
+                lookups = site["hits"] + site["misses"]
+                per_site[call_site] = {
+                    **site,
+                    "hit_rate": site["hits"] / lookups if lookups else 0.0,
+                    "prompt_cache_rate": site["cached_prompt_tokens"] / site["prompt_tokens"] if site["prompt_tokens"] else 0.0,
+                    "prompt_version": PROMPT_VERSIONS.get(call_site),
+                }
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": sum(site["hits"] for site in per_site.values()),
+            "misses": sum(site["misses"] for site in per_site.values()),
+            "tokens_saved": sum(site["tokens_saved"] for site in per_site.values()),
+            "call_sites": per_site,
+        }
+
+
+async def _scheduled(client: Any, priority: str, params: Dict[str, Any]) -> Any:
+    """LLM 스케줄러(RPM/TPM 한도, 429 재시도)를 거쳐 실제 API 호출"""
+    from utils.llm_scheduler import estimate_tokens, get_llm_scheduler
+    tokens = estimate_tokens(params["messages"], params.get("max_tokens"))
+    return await get_llm_scheduler().run(lambda: client.chat.completions.create(**params), tokens, priority)
+
+
+async def _create(client: Any, call_site: str, priority: str, params: Dict[str, Any]) -> Tuple[Any, bool]:
+    """
+    API 호출 (지연 SLA를 넘기면 보조 모델로 헤지)
+
+    Returns:
+        (응답, 캐시 저장 여부) - 보조 모델 응답은 주 모델 키로 저장하지 않음
+    """
+    from config.config import Config
+    from utils.llm_tiering import get_llm_hedger
+    hedger = get_llm_hedger()
+    if hedger is None or params.get("stream") or Config.LLM_FALLBACK_MODEL == params["model"]:
+        # 보조 모델이 주 모델과 같으면 같은 요청을 중복으로 보내게 되므로 헤지하지 않음
+        return await _scheduled(client, priority, params), True
+    fallback_params = {**params, "model": Config.LLM_FALLBACK_MODEL}
+    response, winner = await hedger.run(
+        call_site,
+        lambda: _scheduled(client, priority, params),
+        lambda: _scheduled(client, priority, fallback_params)
+    )
+    return response, winner == "primary"
+
+
+def _create_sync(client: Any, priority: str, params: Dict[str, Any]) -> Any:
+    from utils.llm_scheduler import estimate_tokens, get_llm_scheduler
+    tokens = estimate_tokens(params["messages"], params.get("max_tokens"))
+    return get_llm_scheduler().run_sync(lambda: client.chat.completions.create(**params), tokens, priority)
+
+
+async def cached_chat_completion(
+    client: Any,
+    call_site: str,
+    force: bool = False,
+    priority: str = "normal",
+    **params
+) -> Any:
+    """
+    캐시를 거치는 client.chat.completions.create (AsyncOpenAI)
+    캐시에 없으면 LLM 스케줄러를 거쳐 호출합니다.
+
+    Args:
+        client: AsyncOpenAI 클라이언트
+        call_site: 통계용 호출 위치 이름 (예: "search.strategy")
+        force: 온도와 관계없이 캐시 (결정적으로 다뤄도 되는 호출)
+        priority: 스케줄러 우선순위 ('interactive', 'normal', 'background')
+        **params: chat.completions.create 인자 (model, messages 포함)
+
+    Returns:
+        OpenAI 응답 또는 같은 모양의 캐시 응답 (response.cached == True)
+    """
+    from utils.llm_tiering import model_for
+    params["model"] = model_for(call_site, params["model"])
+    cache = get_llm_cache()
+    if cache is None or not cache.should_cache(params, force):
+        if cache is not None:
+            cache.record_bypass(call_site)
+        response, _ = await _create(client, call_site, priority, params)
+        if cache is not None:
+            cache.record_usage(call_site, params["messages"], response)
+        return response
+
+    key = make_key(params["model"], params["messages"], params)
+    record = cache.get(key, call_site)
+    if record is not None:
+        print(f"💾 [LLM 캐시] {call_site} 캐시 응답 사용 (토큰 {record.get('usage', {}).get('total_tokens', 0)}개 절약)")
+        return _record_to_response(record)
+
+    response, cacheable = await _create(client, call_site, priority, params)
+    cache.record_usage(call_site, params["messages"], response)
+    record = _response_to_record(response)
+    if cacheable and _is_complete(record):
+        cache.put(key, call_site, record)
+    return response
+
+
+async def streamed_chat_completion(
+    client: Any,
+    call_site: str,
+    on_text: Callable[[str], None],
+    force: bool = False,
+    priority: str = "normal",
+    **params
+) -> Any:
+    """
+    스트리밍 client.chat.completions.create (AsyncOpenAI, 헤지하지 않음)
+    생성되는 텍스트 조각마다 on_text(조각)을 호출하고, 끝나면 cached_chat_completion과 같은 모양의 응답을 반환합니다.
+    캐시에 있으면 저장된 내용을 한 번에 on_text로 넘기고, 새로 받은 응답은 다 모인 뒤 캐시에 저장합니다.
+
+    Args:
+        client: AsyncOpenAI 클라이언트
+        call_site: 통계용 호출 위치 이름 (예: "course.description")
+        on_text: 텍스트 조각 콜백
+        force: 온도와 관계없이 캐시
+        priority: 스케줄러 우선순위
+        **params: chat.completions.create 인자 (stream 제외)
+    """
+    from utils.llm_tiering import model_for
+    params["model"] = model_for(call_site, params["model"])
+    cache = get_llm_cache()
+    key = None
+    if cache is not None and cache.should_cache(params, force):
+        key = make_key(params["model"], params["messages"], params)
+        record = cache.get(key, call_site)
+        if record is not None:
+            print(f"💾 [LLM 캐시] {call_site} 캐시 응답 사용 (토큰 {record.get('usage', {}).get('total_tokens', 0)}개 절약)")
+            response = _record_to_response(record)
+            on_text(response.choices[0].message.content or "")
+            return response
+    elif cache is not None:
+        cache.record_bypass(call_site)
+
+    started = time.monotonic()
+    first_token = None
+    stream = await _scheduled(client, priority, {**params, "stream": True, "stream_options": {"include_usage": True}})
+    parts: List[str] = []
+    model = None
+    finish_reason = None
+    usage = None
+    async for chunk in stream:
+        model = getattr(chunk, "model", None) or model
+        usage = getattr(chunk, "usage", None) or usage
+        for choice in getattr(chunk, "choices", None) or []:
+            delta = getattr(choice.delta, "content", None)
+            if delta:
+                if first_token is None:
+                    first_token = time.monotonic() - started
+                parts.append(delta)
+                on_text(delta)
+            finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+    if first_token is not None:
+        print(f"⚡ [LLM 스트리밍] {call_site}: 첫 토큰 {first_token:.2f}초, 전체 {time.monotonic() - started:.2f}초")
+
+    record = _response_to_record(SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(message=SimpleNamespace(content="".join(parts)), finish_reason=finish_reason)],
+        usage=usage,
+    ))
+    if cache is not None:
+        cache.record_usage(call_site, params["messages"], SimpleNamespace(usage=usage))
+        if key is not None and _is_complete(record):
+            cache.put(key, call_site, record)
+    response = _record_to_response(record)
+    response.cached = False
+    return response
+
+
+def cached_chat_completion_sync(
+    client: Any,
+    call_site: str,
+    force: bool = False,
+    priority: str = "normal",
+    **params
+) -> Any:
+    """cached_chat_completion의 동기 버전 (OpenAI 동기 클라이언트용, 호출 위치별 모델만 적용하고 헤지는 하지 않음)"""
+    from utils.llm_tiering import model_for
+    params["model"] = model_for(call_site, params["model"])
+    cache = get_llm_cache()
+    if cache is None or not cache.should_cache(params, force):
+        if cache is not None:
+            cache.record_bypass(call_site)
+        response = _create_sync(client, priority, params)
+        if cache is not None:
+            cache.record_usage(call_site, params["messages"], response)
+        return response
+
+    key = make_key(params["model"], params["messages"], params)
+    record = cache.get(key, call_site)
+    if record is not None:
+        print(f"💾 [LLM 캐시] {call_site} 캐시 응답 사용 (토큰 {record.get('usage', {}).get('total_tokens', 0)}개 절약)")
+        return _record_to_response(record)
+
+    response = _create_sync(client, priority, params)
+    cache.record_usage(call_site, params["messages"], response)
+    record = _response_to_record(response)
+    if _is_complete(record):
+        cache.put(key, call_site, record)
+    return response
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """프로세스 전역 LLM 응답 캐시 반환 (LLM_CACHE_ENABLED=false면 None)"""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                from config.config import Config
+                if not Config.LLM_CACHE_ENABLED:
+                    return None
+                _llm_cache = LLMResponseCache(
+                    path=Config.LLM_CACHE_PATH,
+                    ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+                    max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+                    max_bytes=Config.LLM_CACHE_MAX_BYTES,
+                    max_temperature=Config.LLM_CACHE_MAX_TEMPERATURE,
+                )
+    return _llm_cache
@@ -0,0 +1,275 @@
+"""
+LLM 호출 스케줄러
+OpenAI 계정의 분당 요청 수(RPM)와 분당 토큰 수(TPM) 한도 안에서 모든 LLM 호출을 순서대로 허용합니다.
+
+- 요청마다 입력 글자 수와 max_tokens로 토큰 사용량을 추정해 RPM/TPM 버킷에서 미리 차감
+- 응답의 실제 usage로 차감량을 보정 (추정이 크면 돌려주고, 작으면 더 차감)
+- 429 응답은 Retry-After(-ms) 헤더만큼 모든 호출을 멈춘 뒤 재시도
+- 우선순위: interactive(챗봇) > normal(코스 계획/설명/검색 전략) > background(검색 결과 추출 배치)
+  높은 우선순위 호출이 대기 중이면 낮은 우선순위 호출은 자리를 양보
+
+Flask 요청마다 별도 스레드/이벤트 루프에서 실행되므로 rate_limiter.TokenBucket과 같이
+threading.Lock으로 상태를 보호하고, 대기는 asyncio.sleep(동기 호출은 time.sleep)으로 처리합니다.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+PRIORITIES = {"interactive": 0, "normal": 1, "background": 2}
+
+# max_tokens 미지정 시 응답 토큰 추정값
+DEFAULT_COMPLETION_TOKENS = 1000
+# 한 번에 기다리는 최대 시간 (초), 우선순위 변화를 반영하기 위해 짧게 나눠 대기
+MAX_POLL_SECONDS = 0.5
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """
+    요청 토큰 사용량 추정 (입력 + 최대 응답)
+    한국어가 섞인 프롬프트 기준으로 약 2글자당 1토큰으로 계산합니다.
+    """
+    chars = sum(len(str(message.get("content") or "")) for message in messages)
+    return chars // 2 + 4 * len(messages) + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+def retry_after_seconds(error: Exception, default: float) -> float:
+    """429 오류의 Retry-After / retry-after-ms 헤더 값 (초), 없으면 default"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return default
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """OpenAI 429 (RateLimitError) 여부"""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+class LLMScheduler:
+    """RPM/TPM 버킷과 우선순위 대기열을 가진 프로세스 전역 LLM 호출 스케줄러"""
+
+    def __init__(
+        self,
+        rpm: float,
+        tpm: float,
+        max_retries: int = 3,
+        default_retry_after: float = 5.0,
+    ):
+        """
+        Args:
+            rpm: 분당 요청 수 한도
+            tpm: 분당 토큰 수 한도
+            max_retries: 429 응답 재시도 횟수
+            default_retry_after: Retry-After 헤더가 없을 때 대기 시간 (초)
+        """
+        self.rpm = max(float(rpm), 1.0)
+        self.tpm = max(float(tpm), 1.0)
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._requests = self.rpm
+        self._tokens = self.tpm
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = {level: 0 for level in PRIORITIES.values()}
+        self._lock = threading.Lock()
+        self._stats = {"admitted": 0, "waited_seconds": 0.0, "rate_limited": 0, "retries": 0}
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+        self._updated = now
+
+    def _try_admit(self, tokens: int, level: int) -> float:
+        """
+        허용되면 버킷에서 차감하고 0, 아니면 다시 확인할 때까지 기다릴 시간(초) 반환 (락 안에서 호출)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        if any(self._waiting[higher] for higher in range(level)):
+            # 우선순위가 높은 호출이 기다리는 중이면 양보
+            return 0.05
+        # 한도보다 큰 요청도 버킷이 가득 차면 허용 (영원히 대기하지 않도록)
+        cost = min(float(tokens), self.tpm)
+        if self._requests >= 1.0 and self._tokens >= cost:
+            self._requests -= 1.0
+            self._tokens -= cost
+            self._stats["admitted"] += 1
+            return 0.0
+        request_wait = max(0.0, 1.0 - self._requests) * 60.0 / self.rpm
+        token_wait = max(0.0, cost - self._tokens) * 60.0 / self.tpm
+        return max(request_wait, token_wait, 0.01)
+
+    async def acquire(self, tokens: int, priority: str = "normal") -> float:
+        """
+        호출 허용까지 대기 (async)
+
+        Returns:
+            대기한 시간 (초)
+        """
+        level = PRIORITIES.get(priority, PRIORITIES["normal"])
+        started = time.monotonic()
+        with self._lock:
+            self._waiting[level] += 1
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_admit(tokens, level)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            with self._lock:
+                self._waiting[level] -= 1
+        return self._record_wait(started)
+
+    def acquire_sync(self, tokens: int, priority: str = "normal") -> float:
+        """acquire의 동기 버전 (OpenAI 동기 클라이언트, LangChain 동기 호출용)"""
+        level = PRIORITIES.get(priority, PRIORITIES["normal"])
+        started = time.monotonic()
+        with self._lock:
+            self._waiting[level] += 1
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_admit(tokens, level)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            with self._lock:
+                self._waiting[level] -= 1
+        return self._record_wait(started)
+
+    def _record_wait(self, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._lock:
+            self._stats["waited_seconds"] += waited
+        return waited
+
+    def settle(self, estimated: int, response: Any) -> None:
+        """실제 usage.total_tokens로 TPM 차감량 보정"""
+        usage = getattr(response, "usage", None)
+        actual = getattr(usage, "total_tokens", None)
+        if not actual:
+            return
+        with self._lock:
+            self._tokens = min(self.tpm, self._tokens + min(float(estimated), self.tpm) - actual)
+
+    def pause(self, seconds: float) -> None:
+        """429 응답 후 모든 호출을 seconds 동안 멈춤"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["rate_limited"] += 1
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        tokens: int,
+        priority: str = "normal",
+    ) -> Any:
+        """
+        RPM/TPM 허용 후 call 실행, 429면 Retry-After만큼 멈춘 뒤 재시도
+
+        Args:
+            call: 인자 없는 코루틴 함수 (예: lambda: client.chat.completions.create(**params))
+            tokens: 추정 토큰 수 (estimate_tokens)
+            priority: 'interactive', 'normal', 'background'
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens, priority)
+            try:
+                response = await call()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = retry_after_seconds(e, self.default_retry_after)
+                print(f"⏳ [LLM 스케줄러] 429 응답: {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}, {priority})")
+                self.pause(delay)
+                with self._lock:
+                    self._stats["retries"] += 1
+                continue
+            self.settle(tokens, response)
+            return response
+
+    def run_sync(self, call: Callable[[], Any], tokens: int, priority: str = "normal") -> Any:
+        """run의 동기 버전"""
+        for attempt in range(self.max_retries + 1):
+            self.acquire_sync(tokens, priority)
+            try:
+                response = call()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = retry_after_seconds(e, self.default_retry_after)
+                print(f"⏳ [LLM 스케줄러] 429 응답: {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}, {priority})")
+                self.pause(delay)
+                with self._lock:
+                    self._stats["retries"] += 1
+                continue
+            self.settle(tokens, response)
+            return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                **self._stats,
+                "available_requests": self._requests,
+                "available_tokens": self._tokens,
+                "waiting": {name: self._waiting[level] for name, level in PRIORITIES.items()},
+            }
+
+
+def langchain_rate_limiter(priority: str = "normal", tokens: Optional[int] = None) -> Any:
+    """
+    ChatOpenAI(rate_limiter=...)에 넘길 LangChain rate limiter (호출마다 스케줄러 허용 대기)
+    LangChain은 요청 내용을 넘겨주지 않으므로 토큰 수는 LLM_AGENT_TOKEN_ESTIMATE로 고정 추정합니다.
+    """
+    from langchain_core.rate_limiters import BaseRateLimiter
+    from config.config import Config
+
+    scheduler = get_llm_scheduler()
+    cost = tokens or Config.LLM_AGENT_TOKEN_ESTIMATE
+
+    class SchedulerRateLimiter(BaseRateLimiter):
+        def acquire(self, *, blocking: bool = True) -> bool:
+            scheduler.acquire_sync(cost, priority)
+            return True
+
+        async def aacquire(self, *, blocking: bool = True) -> bool:
+            await scheduler.acquire(cost, priority)
+            return True
+
+    return SchedulerRateLimiter()
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """프로세스 전역 LLM 스케줄러 반환"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        with _llm_scheduler_lock:
+            if _llm_scheduler is None:
+                from config.config import Config
+                _llm_scheduler = LLMScheduler(
+                    rpm=Config.LLM_RPM,
+                    tpm=Config.LLM_TPM,
+                    max_retries=Config.LLM_RATE_LIMIT_RETRIES,
+                    default_retry_after=Config.LLM_DEFAULT_RETRY_AFTER_SECONDS,
+                )
+    return _llm_scheduler
@@ -0,0 +1,160 @@
+"""
+호출 위치별 LLM 모델 선택과 지연 SLA 헤지
+- 호출 위치(call_site)마다 모델을 따로 설정 (대량 추출은 빠르고 저렴한 모델, 계획은 더 강한 모델)
+- 호출 위치별 주 모델 응답 시간의 p95(상한: SLA 초)를 넘기면 보조(fallback) 모델로 같은 요청을 추가로 보내고
+  먼저 도착한 유효한 응답(내용이 비어 있지 않음)을 사용, 나머지 요청은 취소
+
+헤지 구조는 utils.hedged_routing(T Map → Google 구간 헤지)과 같고 지연 통계도 같은 LatencyTracker를 사용합니다.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.hedged_routing import LatencyTracker
+
+
+LLMCall = Callable[[], Awaitable[Any]]
+
+
+def model_for(call_site: str, default: str) -> str:
+    """호출 위치에 설정된 모델 (설정이 없으면 호출 위치가 넘긴 기본 모델)"""
+    from config.config import Config
+    return Config.LLM_CALL_SITE_MODELS.get(call_site) or default
+
+
+def is_valid_response(response: Any) -> bool:
+    """응답 내용이 비어 있지 않은지"""
+    try:
+        return bool((response.choices[0].message.content or "").strip())
+    except (AttributeError, IndexError, TypeError):
+        return False
+
+
+class LLMHedger:
+    """주 모델 / 보조 모델을 지연 SLA 기준으로 경쟁시키는 헤지 실행기"""
+
+    def __init__(
+        self,
+        sla_seconds: Dict[str, float],
+        quantile: float = 0.95,
+        min_samples: int = 20,
+        default_sla: float = 20.0,
+        min_delay: float = 1.0
+    ):
+        """
+        Args:
+            sla_seconds: 호출 위치별 지연 SLA (초), 헤지 임계값 상한
+            quantile: 헤지 임계값으로 사용할 주 모델 지연 분위수
+            min_samples: 분위수 계산에 필요한 최소 샘플 수 (부족하면 SLA 사용)
+            default_sla: SLA가 설정되지 않은 호출 위치의 SLA (초)
+            min_delay: 헤지 임계값 하한 (초)
+        """
+        self.sla_seconds = dict(sla_seconds)
+        self.quantile = float(quantile)
+        self.min_samples = int(min_samples)
+        self.default_sla = float(default_sla)
+        self.min_delay = float(min_delay)
+
+        self.latency = LatencyTracker()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, call_site: str, name: str) -> None:
+        with self._lock:
+            site = self._stats.setdefault(call_site, {"calls": 0, "hedged": 0, "primary_wins": 0, "fallback_wins": 0})
+            site[name] += 1
+
+    def hedge_delay(self, call_site: str) -> float:
+        """호출 위치별 헤지 임계값 (주 모델 지연 p95, SLA 상한 적용)"""
+        sla = self.sla_seconds.get(call_site, self.default_sla)
+        observed = self.latency.quantile(call_site, self.quantile, self.min_samples)
+        delay = sla if observed is None else min(observed, sla)
+        return max(delay, self.min_delay)
+
+    async def run(self, call_site: str, primary_call: LLMCall, fallback_call: LLMCall) -> Tuple[Any, str]:
+        """
+        주 모델로 호출하고, 임계값을 넘기거나 실패/빈 응답이면 보조 모델로 헤지
+
+        Returns:
+            (응답, "primary" 또는 "fallback")
+            둘 다 실패하면 주 모델의 예외를 다시 발생 (빈 응답만 있으면 그 응답 반환)
+        """
+        self._count(call_site, "calls")
+        started = time.monotonic()
+        primary = asyncio.ensure_future(primary_call())
+        tasks: Dict[asyncio.Future, str] = {primary: "primary"}
+        errors: Dict[str, BaseException] = {}
+        invalid: Dict[str, Any] = {}
+
+        def start_fallback(reason: str) -> None:
+            if "fallback" in tasks.values():
+                return
+            print(f"🪂 [LLM 헤지] {call_site}: {reason} → 보조 모델 요청 추가")
+            self._count(call_site, "hedged")
+            tasks[asyncio.ensure_future(fallback_call())] = "fallback"
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(call_site))
+            if not done:
+                start_fallback(f"{time.monotonic() - started:.1f}초 초과")
+            while True:
+                for task in done:
+                    label = tasks[task]
+                    if label == "primary":
+                        self.latency.record(call_site, time.monotonic() - started)
+                    if task.exception() is not None:
+                        errors[label] = task.exception()
+                    elif is_valid_response(task.result()):
+                        self._count(call_site, f"{label}_wins")
+                        return task.result(), label
+                    else:
+                        invalid[label] = task.result()
+                    if label == "primary":
+                        start_fallback("주 모델 실패/빈 응답")
+                pending = {task for task in tasks if not task.done()}
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task, label in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    if label == "primary":
+                        # 취소된 주 모델 요청도 최소 지연 시간으로 기록 (p95가 과소 추정되지 않도록)
+                        self.latency.record(call_site, time.monotonic() - started)
+
+        if "primary" in invalid:
+            return invalid["primary"], "primary"
+        if "fallback" in invalid:
+            return invalid["fallback"], "fallback"
+        raise errors.get("primary") or errors["fallback"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {call_site: dict(site) for call_site, site in self._stats.items()}
+        for call_site, site in stats.items():
+            site["hedge_delay"] = self.hedge_delay(call_site)
+        return stats
+
+
+_llm_hedger: Optional[LLMHedger] = None
+_llm_hedger_lock = threading.Lock()
+
+
+def get_llm_hedger() -> Optional[LLMHedger]:
+    """프로세스 전역 LLM 헤지 실행기 반환 (LLM_HEDGING=false거나 보조 모델이 없으면 None)"""
+    global _llm_hedger
+    if _llm_hedger is None:
+        with _llm_hedger_lock:
+            if _llm_hedger is None:
+                from config.config import Config
+                if not Config.LLM_HEDGING or not Config.LLM_FALLBACK_MODEL:
+                    return None
+                _llm_hedger = LLMHedger(
+                    sla_seconds=Config.LLM_CALL_SITE_SLA_SECONDS,
+                    quantile=Config.LLM_HEDGE_QUANTILE,
+                    min_samples=Config.LLM_HEDGE_MIN_SAMPLES,
+                )
+    return _llm_hedger
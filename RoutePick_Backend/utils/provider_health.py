@@ -0,0 +1,254 @@
+"""
+외부 provider 상태 레지스트리 (서킷 브레이커)
+T Map, Google Maps, Tavily 등 provider/엔드포인트별 오류율, 지연 시간 EWMA,
+인증 실패를 추적하고 서킷 브레이커(closed → open → half-open)로 장애 provider를 건너뜁니다.
+
+- 인증 실패(401/403, REQUEST_DENIED 등): provider 전체 서킷을 긴 쿨다운으로 open
+- 연속 실패 또는 오류율 EWMA 초과: 해당 엔드포인트 서킷 open
+- 쿨다운 경과 후 half-open 상태에서 probe 요청 1건만 허용, 성공하면 closed로 복귀
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 인증/권한 문제로 판단하는 오류 문자열 (재시도해도 해결되지 않음)
+_AUTH_ERROR_MARKERS = (
+    "REQUEST_DENIED",
+    "API key",
+    "API 키",
+    "Unauthorized",
+    "Forbidden",
+    "invalid api key",
+)
+
+
+class ProviderUnavailableError(RuntimeError):
+    """서킷 브레이커가 열려 provider 호출을 건너뛸 때 발생"""
+
+
+def is_auth_error(error: Any) -> bool:
+    """예외 또는 오류 메시지가 인증/권한 문제인지 확인"""
+    text = str(error or "")
+    lowered = text.lower()
+    return any(marker.lower() in lowered for marker in _AUTH_ERROR_MARKERS)
+
+
+class CircuitBreaker:
+    """provider 또는 provider:엔드포인트 단위 상태 및 서킷 브레이커"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.probe_started = 0.0
+        self.consecutive_failures = 0
+        self.error_rate = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.auth_failures = 0
+        self.last_error: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 상태 딕셔너리"""
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "auth_failures": self.auth_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class ProviderHealthRegistry:
+    """프로세스 전역 provider 상태 레지스트리 (스레드 안전)"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        min_requests: int = 10,
+        cooldown_seconds: float = 30.0,
+        auth_cooldown_seconds: float = 600.0,
+        ewma_alpha: float = 0.2
+    ):
+        """
+        Args:
+            failure_threshold: 엔드포인트 서킷을 여는 연속 실패 횟수
+            error_rate_threshold: 엔드포인트 서킷을 여는 오류율 EWMA
+            min_requests: 오류율 판단에 필요한 최소 요청 수
+            cooldown_seconds: 일반 장애 시 open 유지 시간 (초)
+            auth_cooldown_seconds: 인증 실패 시 open 유지 시간 (초)
+            ewma_alpha: 오류율/지연 EWMA 가중치
+        """
+        self.failure_threshold = int(failure_threshold)
+        self.error_rate_threshold = float(error_rate_threshold)
+        self.min_requests = int(min_requests)
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.auth_cooldown_seconds = float(auth_cooldown_seconds)
+        self.ewma_alpha = float(ewma_alpha)
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key)
+            self._breakers[key] = breaker
+        return breaker
+
+    @staticmethod
+    def _keys(provider: str, endpoint: Optional[str]):
+        return [provider] if not endpoint else [provider, f"{provider}:{endpoint}"]
+
+    def _allow_breaker(self, breaker: CircuitBreaker, now: float) -> bool:
+        if breaker.state == CLOSED:
+            return True
+        if breaker.state == OPEN:
+            if now - breaker.opened_at < breaker.cooldown:
+                return False
+            # 쿨다운 경과 → half-open: probe 요청 1건 허용
+            breaker.state = HALF_OPEN
+            breaker.probe_started = now
+            print(f"🟡 [{breaker.name}] 서킷 half-open: 상태 확인 요청을 보냅니다.")
+            return True
+        # HALF_OPEN: probe 결과를 기다리는 중 (응답 없이 쿨다운이 지나면 probe 재허용)
+        if now - breaker.probe_started >= max(breaker.cooldown, 1.0):
+            breaker.probe_started = now
+            return True
+        return False
+
+    def allow(self, provider: str, endpoint: Optional[str] = None) -> bool:
+        """
+        provider(및 엔드포인트) 호출 허용 여부
+
+        Returns:
+            서킷이 closed이거나 half-open probe가 허용되면 True
+        """
+        now = time.monotonic()
+        with self._lock:
+            return all(self._allow_breaker(self._breaker(key), now) for key in self._keys(provider, endpoint))
+
+    def is_open(self, provider: str, endpoint: Optional[str] = None) -> bool:
+        """서킷이 열려 있는지 확인 (상태를 바꾸지 않음)"""
+        now = time.monotonic()
+        with self._lock:
+            for key in self._keys(provider, endpoint):
+                breaker = self._breakers.get(key)
+                if breaker and breaker.state == OPEN and now - breaker.opened_at < breaker.cooldown:
+                    return True
+        return False
+
+    def _observe_latency(self, breaker: CircuitBreaker, latency: Optional[float]) -> None:
+        if latency is None:
+            return
+        if breaker.latency_ewma is None:
+            breaker.latency_ewma = float(latency)
+        else:
+            breaker.latency_ewma += self.ewma_alpha * (float(latency) - breaker.latency_ewma)
+
+    def record_success(self, provider: str, endpoint: Optional[str] = None, latency: Optional[float] = None) -> None:
+        """성공 응답 기록 (half-open이면 closed로 복귀)"""
+        with self._lock:
+            for key in self._keys(provider, endpoint):
+                breaker = self._breaker(key)
+                breaker.requests += 1
+                breaker.consecutive_failures = 0
+                breaker.error_rate -= self.ewma_alpha * breaker.error_rate
+                self._observe_latency(breaker, latency)
+                if breaker.state != CLOSED:
+                    print(f"🟢 [{breaker.name}] 서킷 closed: provider가 복구되었습니다.")
+                    breaker.state = CLOSED
+
+    def record_failure(
+        self,
+        provider: str,
+        endpoint: Optional[str] = None,
+        latency: Optional[float] = None,
+        error: Any = None,
+        auth: Optional[bool] = None
+    ) -> None:
+        """
+        실패 응답 기록
+
+        Args:
+            provider: provider 이름 ("tmap", "google", "tavily" 등)
+            endpoint: 엔드포인트 이름 ("pedestrian", "directions" 등)
+            latency: 응답 시간 (초)
+            error: 오류 메시지 또는 예외
+            auth: 인증 실패 여부 (None이면 오류 메시지로 판단)
+        """
+        if auth is None:
+            auth = is_auth_error(error)
+        now = time.monotonic()
+        with self._lock:
+            for key in self._keys(provider, endpoint):
+                breaker = self._breaker(key)
+                breaker.requests += 1
+                breaker.failures += 1
+                breaker.consecutive_failures += 1
+                breaker.error_rate += self.ewma_alpha * (1.0 - breaker.error_rate)
+                breaker.last_error = str(error)[:200] if error else None
+                self._observe_latency(breaker, latency)
+                if auth:
+                    breaker.auth_failures += 1
+
+                is_provider_level = key == provider
+                if auth:
+                    # 인증 실패는 provider 전체에 해당 → 긴 쿨다운
+                    self._open(breaker, now, self.auth_cooldown_seconds, "인증 실패")
+                elif is_provider_level:
+                    # provider 전체 서킷은 인증 실패로만 열림 (엔드포인트 장애는 엔드포인트 단위로 격리)
+                    if breaker.state == HALF_OPEN:
+                        self._open(breaker, now, breaker.cooldown or self.auth_cooldown_seconds, "상태 확인 실패")
+                elif breaker.state == HALF_OPEN:
+                    self._open(breaker, now, self.cooldown_seconds, "상태 확인 실패")
+                elif breaker.consecutive_failures >= self.failure_threshold:
+                    self._open(breaker, now, self.cooldown_seconds, f"연속 실패 {breaker.consecutive_failures}회")
+                elif breaker.requests >= self.min_requests and breaker.error_rate >= self.error_rate_threshold:
+                    self._open(breaker, now, self.cooldown_seconds, f"오류율 {breaker.error_rate:.0%}")
+
+    @staticmethod
+    def _open(breaker: CircuitBreaker, now: float, cooldown: float, reason: str) -> None:
+        if breaker.state != OPEN:
+            print(f"🔴 [{breaker.name}] 서킷 open ({reason}): {cooldown:.0f}초 동안 호출을 건너뜁니다.")
+        breaker.state = OPEN
+        breaker.opened_at = now
+        breaker.cooldown = cooldown
+
+    def get_stats(self) -> Dict[str, Any]:
+        """provider/엔드포인트별 상태 반환"""
+        with self._lock:
+            return {key: breaker.snapshot() for key, breaker in self._breakers.items()}
+
+
+_registry: Optional[ProviderHealthRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_health() -> ProviderHealthRegistry:
+    """프로세스 전역 provider 상태 레지스트리 반환"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from config.config import Config
+                _registry = ProviderHealthRegistry(
+                    failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                    error_rate_threshold=Config.CIRCUIT_ERROR_RATE_THRESHOLD,
+                    min_requests=Config.CIRCUIT_MIN_REQUESTS,
+                    cooldown_seconds=Config.CIRCUIT_COOLDOWN_SECONDS,
+                    auth_cooldown_seconds=Config.CIRCUIT_AUTH_COOLDOWN_SECONDS,
+                )
+    return _registry
@@ -0,0 +1,71 @@
+"""
+토큰 버킷 기반 요청 속도 제한기
+API 키별 QPS 제한에 맞춰 요청 간격을 조절합니다.
+
+Flask 요청마다 별도 스레드/이벤트 루프에서 실행되므로 asyncio.Lock 대신
+threading.Lock으로 토큰을 예약하고, 대기는 각 루프에서 asyncio.sleep으로 처리합니다.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """스레드/이벤트 루프 공용 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 초당 토큰 보충 속도 (= 허용 QPS)
+            capacity: 최대 버스트 크기 (None이면 rate와 동일)
+        """
+        self.rate = max(float(rate), 0.001)
+        self.capacity = max(float(capacity if capacity is not None else rate), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """
+        토큰을 예약하고 대기해야 할 시간(초)을 반환
+        토큰이 부족하면 잔량을 음수로 만들어 뒤따르는 요청이 순서대로 대기하도록 합니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        토큰 획득 (필요하면 대기)
+
+        Returns:
+            실제 대기한 시간 (초)
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: Optional[float] = None) -> TokenBucket:
+    """
+    이름별 프로세스 전역 토큰 버킷 반환
+    (같은 API 키를 쓰는 모든 요청이 하나의 버킷을 공유)
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _buckets[name] = bucket
+        return bucket
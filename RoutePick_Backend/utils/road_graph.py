@@ -0,0 +1,521 @@
+"""
+오프라인 도로/보행 그래프 라우팅 엔진
+전처리된 OSM 추출본(.npz)을 CSR(Compressed Sparse Row) 그래프로 불러와
+T Map / Google 없이 도보·자동차 소요 시간, 거리, 경로 지오메트리를 계산합니다.
+
+- 그래프: 노드 좌표 + CSR 인접 배열(indptr, indices) + 간선 길이/통행 가능 플래그/차량 속도
+- 탐색: A* + 랜드마크(ALT) 휴리스틱 (랜드마크가 없으면 직선 거리 / 최고 속도 휴리스틱)
+- 좌표 스냅: 격자 버킷 기반 최근접 노드 검색
+- 행렬: 출발지별 one-to-many Dijkstra (도착지가 모두 확정되면 조기 종료)
+
+numpy만 사용하며, 그래프 파일은 build_road_graph.py로 생성합니다.
+"""
+
+import heapq
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.geometry import EARTH_RADIUS_M
+
+
+# 간선 통행 가능 플래그 (비트 마스크)
+WALK = 1
+DRIVE = 2
+MODE_FLAGS = {"walking": WALK, "driving": DRIVE}
+
+DEFAULT_WALK_SPEED_MPS = 4.5 / 3.6
+# 스냅 격자 셀 크기 (도 단위, 약 550m)
+DEFAULT_SNAP_CELL_DEG = 0.005
+
+
+def _haversine(lat1, lng1, lat2, lng2):
+    """haversine 거리 (미터, 배열 브로드캐스팅 지원)"""
+    lat1, lng1, lat2, lng2 = (np.radians(v) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class RoadGraph:
+    """CSR 형식의 도로/보행 그래프와 A*(ALT) 경로 탐색"""
+
+    def __init__(
+        self,
+        node_lat: np.ndarray,
+        node_lng: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        length_m: np.ndarray,
+        flags: np.ndarray,
+        drive_speed: np.ndarray,
+        landmarks: Optional[Dict[str, np.ndarray]] = None,
+        walk_speed: float = DEFAULT_WALK_SPEED_MPS,
+        landmark_walk_speed: Optional[float] = None,
+        max_snap_m: float = 300.0,
+        snap_cell_deg: float = DEFAULT_SNAP_CELL_DEG
+    ):
+        """
+        Args:
+            node_lat, node_lng: (N,) 노드 위도/경도
+            indptr: (N+1,) CSR 행 포인터 (노드 i의 간선은 indptr[i]:indptr[i+1])
+            indices: (E,) 간선 도착 노드
+            length_m: (E,) 간선 길이 (미터)
+            flags: (E,) 통행 가능 플래그 (WALK | DRIVE)
+            drive_speed: (E,) 차량 주행 속도 (m/s)
+            landmarks: {"nodes": (K,), "walking_from": (K,N), "walking_to": (K,N),
+                        "driving_from": (K,N), "driving_to": (K,N)} (초 단위, 선택)
+            walk_speed: 보행 속도 (m/s)
+            landmark_walk_speed: 랜드마크 보행 소요 시간을 계산할 때의 보행 속도 (m/s, None이면 walk_speed)
+            max_snap_m: 좌표를 그래프 노드에 붙일 수 있는 최대 거리 (미터)
+            snap_cell_deg: 스냅 격자 셀 크기 (도)
+        """
+        self.node_lat = np.asarray(node_lat, dtype=np.float64)
+        self.node_lng = np.asarray(node_lng, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.length_m = np.asarray(length_m, dtype=np.float64)
+        self.flags = np.asarray(flags, dtype=np.uint8)
+        self.drive_speed = np.asarray(drive_speed, dtype=np.float64)
+        self.walk_speed = float(walk_speed)
+        self.landmark_walk_speed = float(landmark_walk_speed or walk_speed)
+        self.max_snap_m = float(max_snap_m)
+        self.snap_cell_deg = float(snap_cell_deg)
+        self.landmarks = landmarks or {}
+
+        # 간선 출발 노드 (경로 복원용)
+        self._edge_src = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+
+        # 모드별 간선 비용 (초, 통행 불가 간선은 inf)
+        self._cost: Dict[str, np.ndarray] = {}
+        self._max_speed: Dict[str, float] = {}
+        for mode, flag in MODE_FLAGS.items():
+            allowed = (self.flags & flag) != 0
+            speed = np.full(self.num_edges, self.walk_speed) if mode == "walking" else np.maximum(self.drive_speed, 0.1)
+            self._cost[mode] = np.where(allowed, self.length_m / speed, np.inf)
+            self._max_speed[mode] = float(speed[allowed].max()) if allowed.any() else self.walk_speed
+
+        self._snap_index: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def num_nodes(self) -> int:
+        return int(self.node_lat.shape[0])
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.indices.shape[0])
+
+    # ------------------------------------------------------------------
+    # 생성 / 저장
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_edges(
+        cls,
+        node_lat: Sequence[float],
+        node_lng: Sequence[float],
+        edge_u: Sequence[int],
+        edge_v: Sequence[int],
+        flags: Sequence[int],
+        drive_speed: Optional[Sequence[float]] = None,
+        length_m: Optional[Sequence[float]] = None,
+        **kwargs
+    ) -> "RoadGraph":
+        """
+        방향 간선 리스트로 그래프 생성
+
+        Args:
+            node_lat, node_lng: 노드 좌표
+            edge_u, edge_v: 간선 출발/도착 노드 인덱스
+            flags: 간선 통행 가능 플래그
+            drive_speed: 간선 차량 속도 (m/s, None이면 30km/h)
+            length_m: 간선 길이 (None이면 노드 간 haversine 거리)
+        """
+        node_lat = np.asarray(node_lat, dtype=np.float64)
+        node_lng = np.asarray(node_lng, dtype=np.float64)
+        edge_u = np.asarray(edge_u, dtype=np.int64)
+        edge_v = np.asarray(edge_v, dtype=np.int64)
+        flags = np.asarray(flags, dtype=np.uint8)
+        if drive_speed is None:
+            drive_speed = np.full(edge_u.shape[0], 30 / 3.6)
+        drive_speed = np.asarray(drive_speed, dtype=np.float64)
+        if length_m is None:
+            length_m = _haversine(node_lat[edge_u], node_lng[edge_u], node_lat[edge_v], node_lng[edge_v])
+        length_m = np.asarray(length_m, dtype=np.float64)
+
+        order = np.argsort(edge_u, kind="stable")
+        counts = np.bincount(edge_u, minlength=node_lat.shape[0])
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return cls(
+            node_lat, node_lng, indptr, edge_v[order],
+            length_m[order], flags[order], drive_speed[order],
+            **kwargs
+        )
+
+    def save(self, path: str) -> None:
+        """그래프(및 랜드마크)를 압축 .npz 파일로 저장"""
+        arrays = {
+            "node_lat": self.node_lat,
+            "node_lng": self.node_lng,
+            "indptr": self.indptr,
+            "indices": self.indices.astype(np.int32),
+            "length_m": self.length_m.astype(np.float32),
+            "flags": self.flags,
+            "drive_speed": self.drive_speed.astype(np.float32),
+        }
+        for key, value in self.landmarks.items():
+            arrays[f"landmark_{key}"] = value
+        if self.landmarks:
+            # 불러올 때 보행 속도가 다르면 랜드마크 보행 시간을 비율대로 보정
+            arrays["walk_speed"] = np.float64(self.landmark_walk_speed)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "RoadGraph":
+        """build_road_graph.py로 만든 .npz 파일에서 그래프 로드"""
+        with np.load(path, allow_pickle=False) as data:
+            landmarks = {
+                key[len("landmark_"):]: data[key]
+                for key in data.files if key.startswith("landmark_")
+            }
+            # 보행 속도가 저장되지 않은 이전 파일은 기본 보행 속도로 전처리됨
+            landmark_walk_speed = float(data["walk_speed"]) if "walk_speed" in data.files else DEFAULT_WALK_SPEED_MPS
+            return cls(
+                data["node_lat"], data["node_lng"], data["indptr"], data["indices"],
+                data["length_m"], data["flags"], data["drive_speed"],
+                landmarks=landmarks or None,
+                landmark_walk_speed=landmark_walk_speed,
+                **kwargs
+            )
+
+    # ------------------------------------------------------------------
+    # 좌표 스냅
+    # ------------------------------------------------------------------
+    def _cell_keys(self, lat, lng) -> np.ndarray:
+        row = np.floor(np.asarray(lat) / self.snap_cell_deg).astype(np.int64)
+        col = np.floor(np.asarray(lng) / self.snap_cell_deg).astype(np.int64)
+        return row * 1_000_003 + col
+
+    def _get_snap_index(self, mode: str) -> Tuple[np.ndarray, np.ndarray]:
+        """모드별 격자 인덱스 (해당 모드 간선이 있는 노드만, 셀 키 순으로 정렬)"""
+        index = self._snap_index.get(mode)
+        if index is None:
+            with self._lock:
+                index = self._snap_index.get(mode)
+                if index is None:
+                    allowed = np.isfinite(self._cost[mode])
+                    usable = np.zeros(self.num_nodes, dtype=bool)
+                    usable[self._edge_src[allowed]] = True
+                    usable[self.indices[allowed]] = True
+                    nodes = np.flatnonzero(usable)
+                    keys = self._cell_keys(self.node_lat[nodes], self.node_lng[nodes])
+                    order = np.argsort(keys, kind="stable")
+                    index = (keys[order], nodes[order])
+                    self._snap_index[mode] = index
+        return index
+
+    def nearest_node(self, lat: float, lng: float, mode: str) -> Tuple[Optional[int], float]:
+        """
+        좌표에서 가장 가까운 노드 (해당 모드로 통행 가능한 노드만)
+
+        Returns:
+            (노드 인덱스, 거리 m) — max_snap_m 안에 노드가 없으면 (None, inf)
+        """
+        keys, nodes = self._get_snap_index(mode)
+        if nodes.size == 0:
+            return None, float("inf")
+
+        row = int(np.floor(lat / self.snap_cell_deg))
+        col = int(np.floor(lng / self.snap_cell_deg))
+        cell_m = self.snap_cell_deg * 111000.0 * max(np.cos(np.radians(lat)), 0.1)
+        max_ring = max(1, int(np.ceil(self.max_snap_m / cell_m)))
+
+        # 주변 셀(ring)을 넓혀 가며 후보 검색
+        for ring in range(1, max_ring + 1):
+            cell_keys = [
+                (row + dr) * 1_000_003 + (col + dc)
+                for dr in range(-ring, ring + 1)
+                for dc in range(-ring, ring + 1)
+            ]
+            cell_keys = np.asarray(cell_keys, dtype=np.int64)
+            starts = np.searchsorted(keys, cell_keys, side="left")
+            ends = np.searchsorted(keys, cell_keys, side="right")
+            if not np.any(ends > starts):
+                continue
+            candidates = np.concatenate([nodes[s:e] for s, e in zip(starts, ends) if e > s])
+            distances = _haversine(lat, lng, self.node_lat[candidates], self.node_lng[candidates])
+            best = int(np.argmin(distances))
+            # ring 안에서 찾은 최근접 노드가 ring 반경보다 멀면 바깥 ring에 더 가까운 노드가 있을 수 있음
+            if distances[best] <= ring * cell_m or ring == max_ring:
+                if distances[best] > self.max_snap_m:
+                    return None, float("inf")
+                return int(candidates[best]), float(distances[best])
+        return None, float("inf")
+
+    # ------------------------------------------------------------------
+    # 탐색
+    # ------------------------------------------------------------------
+    def _heuristic(self, target: int, mode: str) -> np.ndarray:
+        """모든 노드에서 target까지의 소요 시간 하한 (초)"""
+        bound = _haversine(
+            self.node_lat, self.node_lng, self.node_lat[target], self.node_lng[target]
+        ) / self._max_speed[mode]
+
+        lm_from = self.landmarks.get(f"{mode}_from")
+        lm_to = self.landmarks.get(f"{mode}_to")
+        if lm_from is not None and lm_to is not None:
+            # 삼각 부등식: d(v,t) >= d(L,t) - d(L,v), d(v,t) >= d(v,L) - d(t,L)
+            with np.errstate(invalid="ignore"):
+                forward = lm_from[:, target:target + 1] - lm_from
+                backward = lm_to - lm_to[:, target:target + 1]
+                alt = np.nan_to_num(np.maximum(forward, backward).max(axis=0), nan=0.0, posinf=np.inf, neginf=0.0)
+            if mode == "walking":
+                # 보행 간선 비용은 모두 속도에 반비례하므로 전처리 속도와의 비율로 보정 (하한 유지)
+                alt = alt * (self.landmark_walk_speed / self.walk_speed)
+            bound = np.maximum(bound, alt)
+        return bound
+
+    def _search(
+        self,
+        source: int,
+        mode: str,
+        target: Optional[int] = None,
+        targets: Optional[Sequence[int]] = None,
+        reverse_csr: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        A*(target 지정) 또는 Dijkstra(targets 전부 확정 시 종료, 없으면 전체) 탐색
+
+        Returns:
+            (소요 시간 배열, 거리 배열, 직전 간선 배열)
+        """
+        if reverse_csr is not None:
+            indptr, indices, edge_ids = reverse_csr
+        else:
+            indptr, indices, edge_ids = self.indptr, self.indices, None
+        cost = self._cost[mode]
+        length = self.length_m
+
+        heuristic = self._heuristic(target, mode) if target is not None else None
+        remaining = set(int(t) for t in targets) if targets is not None else None
+
+        time_to = np.full(self.num_nodes, np.inf)
+        dist_to = np.full(self.num_nodes, np.inf)
+        prev_edge = np.full(self.num_nodes, -1, dtype=np.int64)
+        settled = np.zeros(self.num_nodes, dtype=bool)
+        time_to[source] = 0.0
+        dist_to[source] = 0.0
+        heap = [(0.0, source)]
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if settled[node]:
+                continue
+            settled[node] = True
+            if node == target:
+                break
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+
+            start, end = indptr[node], indptr[node + 1]
+            if start == end:
+                continue
+            edges = np.arange(start, end) if edge_ids is None else edge_ids[start:end]
+            neighbors = indices[start:end]
+            candidate = time_to[node] + cost[edges]
+            improved = candidate < time_to[neighbors]
+            if not improved.any():
+                continue
+            neighbors = neighbors[improved]
+            edges = edges[improved]
+            candidate = candidate[improved]
+            if neighbors.size > 1:
+                # 평행 간선(같은 도착 노드)이 있으면 배열 대입은 마지막 값이 남으므로 최소 비용 간선만 사용
+                order = np.argsort(candidate, kind="stable")
+                _, first = np.unique(neighbors[order], return_index=True)
+                keep = order[first]
+                neighbors, edges, candidate = neighbors[keep], edges[keep], candidate[keep]
+            time_to[neighbors] = candidate
+            dist_to[neighbors] = dist_to[node] + length[edges]
+            prev_edge[neighbors] = edges
+            priority = candidate + heuristic[neighbors] if heuristic is not None else candidate
+            for p, n in zip(priority.tolist(), neighbors.tolist()):
+                heapq.heappush(heap, (p, n))
+
+        return time_to, dist_to, prev_edge
+
+    def _path_nodes(self, prev_edge: np.ndarray, source: int, target: int) -> np.ndarray:
+        """직전 간선 배열로 source → target 노드 경로 복원"""
+        path = [target]
+        node = target
+        while node != source:
+            edge = prev_edge[node]
+            if edge < 0:
+                return np.empty(0, dtype=np.int64)
+            node = int(self._edge_src[edge])
+            path.append(node)
+        return np.asarray(path[::-1], dtype=np.int64)
+
+    def route(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        mode: str = "walking"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        두 좌표 사이 경로 계산
+
+        출발/도착 좌표와 스냅된 노드 사이 구간은 보행 속도 직선 이동으로 더합니다.
+
+        Args:
+            origin: (lat, lng)
+            destination: (lat, lng)
+            mode: 'walking' 또는 'driving'
+
+        Returns:
+            {"duration": 초, "distance": 미터, "coords": (N, 2) [lat, lng] 배열}
+            또는 None (스냅 실패 / 경로 없음 / 지원하지 않는 모드)
+        """
+        if mode not in MODE_FLAGS:
+            return None
+        source, source_gap = self.nearest_node(origin[0], origin[1], mode)
+        target, target_gap = self.nearest_node(destination[0], destination[1], mode)
+        if source is None or target is None:
+            return None
+
+        time_to, dist_to, prev_edge = self._search(source, mode, target=target)
+        if not np.isfinite(time_to[target]):
+            return None
+
+        path = self._path_nodes(prev_edge, source, target)
+        coords = np.column_stack((self.node_lat[path], self.node_lng[path]))
+        coords = np.vstack(([origin], coords, [destination]))
+        gap = source_gap + target_gap
+        return {
+            "duration": int(round(time_to[target] + gap / self.walk_speed)),
+            "distance": int(round(dist_to[target] + gap)),
+            "coords": coords,
+        }
+
+    def matrix(
+        self,
+        origins: Sequence[Tuple[float, float]],
+        destinations: Sequence[Tuple[float, float]],
+        mode: str = "walking"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        소요 시간 / 거리 행렬 계산 (출발지별 one-to-many Dijkstra)
+
+        Returns:
+            (durations, distances) — (len(origins), len(destinations)) float 배열,
+            경로가 없거나 스냅에 실패한 셀은 nan
+        """
+        durations = np.full((len(origins), len(destinations)), np.nan)
+        distances = np.full((len(origins), len(destinations)), np.nan)
+        if mode not in MODE_FLAGS:
+            return durations, distances
+
+        dest_snaps = [self.nearest_node(lat, lng, mode) for lat, lng in destinations]
+        valid_cols = [j for j, (node, _) in enumerate(dest_snaps) if node is not None]
+        if not valid_cols:
+            return durations, distances
+        target_nodes = np.asarray([dest_snaps[j][0] for j in valid_cols], dtype=np.int64)
+        target_gaps = np.asarray([dest_snaps[j][1] for j in valid_cols])
+
+        for i, (lat, lng) in enumerate(origins):
+            source, source_gap = self.nearest_node(lat, lng, mode)
+            if source is None:
+                continue
+            time_to, dist_to, _ = self._search(source, mode, targets=target_nodes)
+            gap = source_gap + target_gaps
+            durations[i, valid_cols] = time_to[target_nodes] + gap / self.walk_speed
+            distances[i, valid_cols] = dist_to[target_nodes] + gap
+
+        durations[~np.isfinite(durations)] = np.nan
+        distances[~np.isfinite(distances)] = np.nan
+        return durations, distances
+
+    # ------------------------------------------------------------------
+    # 전처리 (랜드마크)
+    # ------------------------------------------------------------------
+    def _reverse_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """역방향 CSR (도착 노드 기준 정렬, 원래 간선 번호 유지)"""
+        order = np.argsort(self.indices, kind="stable")
+        counts = np.bincount(self.indices, minlength=self.num_nodes)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return indptr, self._edge_src[order], order
+
+    def build_landmarks(self, count: int = 8, seed_node: int = 0) -> None:
+        """
+        ALT 휴리스틱용 랜드마크 선택 및 모드별 양방향 소요 시간 계산
+
+        최원점(farthest-point) 방식으로 보행 그래프에서 서로 멀리 떨어진 노드를 고르고,
+        각 랜드마크에서 모든 노드까지(from) / 모든 노드에서 랜드마크까지(to) 시간을 저장합니다.
+        그래프 크기에 비례해 오래 걸리므로 build_road_graph.py 전처리 단계에서만 호출합니다.
+        """
+        if self.num_nodes == 0 or count <= 0:
+            self.landmarks = {}
+            return
+
+        reverse = self._reverse_csr()
+        chosen: List[int] = []
+        min_time = np.full(self.num_nodes, np.inf)
+        candidate = int(seed_node)
+        for _ in range(min(count, self.num_nodes)):
+            time_from, _, _ = self._search(candidate, "walking")
+            if not chosen:
+                # 시드 노드 자체는 랜드마크로 쓰지 않고 가장 먼 노드에서 시작
+                reachable = np.where(np.isfinite(time_from), time_from, -1.0)
+                candidate = int(np.argmax(reachable))
+                time_from, _, _ = self._search(candidate, "walking")
+            chosen.append(candidate)
+            min_time = np.minimum(min_time, time_from)
+            reachable = np.where(np.isfinite(min_time), min_time, -1.0)
+            candidate = int(np.argmax(reachable))
+            if reachable[candidate] <= 0:
+                break
+
+        landmarks: Dict[str, np.ndarray] = {"nodes": np.asarray(chosen, dtype=np.int64)}
+        for mode in MODE_FLAGS:
+            landmarks[f"{mode}_from"] = np.vstack(
+                [self._search(node, mode)[0] for node in chosen]
+            ).astype(np.float32)
+            landmarks[f"{mode}_to"] = np.vstack(
+                [self._search(node, mode, reverse_csr=reverse)[0] for node in chosen]
+            ).astype(np.float32)
+        self.landmarks = landmarks
+        self.landmark_walk_speed = self.walk_speed
+
+
+_graph: Optional[RoadGraph] = None
+_graph_loaded = False
+_graph_lock = threading.Lock()
+
+
+def get_road_graph() -> Optional[RoadGraph]:
+    """
+    프로세스 전역 오프라인 그래프 반환
+
+    Config.OFFLINE_GRAPH_PATH가 비어 있거나 로드에 실패하면 None (한 번만 시도)
+    """
+    global _graph, _graph_loaded
+    if not _graph_loaded:
+        with _graph_lock:
+            if not _graph_loaded:
+                from config.config import Config
+                path = Config.OFFLINE_GRAPH_PATH
+                if path:
+                    try:
+                        _graph = RoadGraph.load(
+                            path,
+                            walk_speed=Config.OFFLINE_WALK_SPEED_KMH / 3.6,
+                            max_snap_m=Config.OFFLINE_MAX_SNAP_METERS,
+                        )
+                        print(f"🧭 오프라인 도로 그래프 로드: 노드 {_graph.num_nodes:,}개, 간선 {_graph.num_edges:,}개 ({path})")
+                    except Exception as e:
+                        print(f"⚠️ 오프라인 도로 그래프 로드 실패 ({path}): {e}")
+                        _graph = None
+                _graph_loaded = True
+    return _graph
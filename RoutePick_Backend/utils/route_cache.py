@@ -0,0 +1,347 @@
+"""
+구간(leg) 단위 경로 캐시
+출발/도착 좌표(약 10m 단위 반올림), 이동 수단, 출발 시간 버킷을 키로
+소요 시간/거리/인코딩된 polyline을 저장합니다.
+
+- 대중교통(transit): 요일 구분(평일/주말) + 30분 슬롯 단위로 버킷을 나눔
+- 도보/자전거: 출발 시간과 무관 (버킷 없음)
+- 자동차: 출발 시간이 지정된 경우에만 버킷을 나눔 (교통 상황 반영)
+
+캐시 인스턴스는 두 개입니다.
+- get_leg_cache(): 실제 provider(Google/T Map) 응답만 저장 (경로 안내, 비용 행렬, 학습 샘플 기록)
+- get_planning_leg_cache(): check_routing 구간 결과 (오프라인 그래프/학습 모델 추정값과 실패 구간 포함)
+"""
+
+import json
+import sys
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+# 좌표 반올림 자릿수 (소수점 4자리 ≈ 11m)
+COORD_PRECISION = 4
+# 출발 시간 슬롯 크기 (분)
+TIME_SLOT_MINUTES = 30
+
+# 출발 시간에 따라 소요 시간이 달라지는 이동 수단
+_TIME_DEPENDENT_MODES = {"transit"}
+# 출발 시간이 주어졌을 때만 시간 의존적인 이동 수단
+_OPTIONAL_TIME_DEPENDENT_MODES = {"driving"}
+
+
+def round_coord(lat: float, lng: float) -> Tuple[float, float]:
+    """좌표를 캐시 키 정밀도(약 10m)로 반올림"""
+    return (round(float(lat), COORD_PRECISION), round(float(lng), COORD_PRECISION))
+
+
+def parse_coord_string(value: Any) -> Optional[Tuple[float, float]]:
+    """
+    "lat,lng" 형식의 문자열 또는 (lat, lng) 튜플을 좌표로 변환
+
+    Returns:
+        (lat, lng) 또는 좌표로 해석할 수 없으면 None (주소 문자열 등)
+    """
+    if isinstance(value, (tuple, list)) and len(value) == 2:
+        try:
+            return (float(value[0]), float(value[1]))
+        except (TypeError, ValueError):
+            return None
+    if not isinstance(value, str) or "," not in value:
+        return None
+    parts = value.split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        return (float(parts[0].strip()), float(parts[1].strip()))
+    except ValueError:
+        return None
+
+
+def departure_hour(departure_time: Optional[datetime] = None) -> int:
+    """출발 시각(없으면 현재 시각)의 시(0~23)"""
+    if departure_time is None:
+        departure_time = datetime.now()
+    elif isinstance(departure_time, (int, float)):
+        departure_time = datetime.fromtimestamp(departure_time)
+    return departure_time.hour
+
+
+def departure_bucket(mode: str, departure_time: Optional[datetime] = None) -> Optional[str]:
+    """
+    이동 수단과 출발 시간으로 시간 버킷 문자열 생성
+
+    Args:
+        mode: 이동 수단 (transit, walking, driving, bicycling)
+        departure_time: 출발 시간 (None이면 transit은 현재 시각 기준)
+
+    Returns:
+        "weekday:28" 같은 버킷 문자열, 시간과 무관한 경우 None
+    """
+    mode = (mode or "").lower()
+    if mode in _OPTIONAL_TIME_DEPENDENT_MODES and departure_time is None:
+        return None
+    if mode not in _TIME_DEPENDENT_MODES and mode not in _OPTIONAL_TIME_DEPENDENT_MODES:
+        return None
+
+    if departure_time is None:
+        departure_time = datetime.now()
+    elif isinstance(departure_time, (int, float)):
+        departure_time = datetime.fromtimestamp(departure_time)
+
+    day_class = "weekend" if departure_time.weekday() >= 5 else "weekday"
+    slot = (departure_time.hour * 60 + departure_time.minute) // TIME_SLOT_MINUTES
+    return f"{day_class}:{slot}"
+
+
+class LegCache:
+    """
+    구간 단위 경로 캐시 (스레드 안전, LRU + TTL)
+
+    Flask 요청마다 별도 스레드에서 asyncio.run()으로 에이전트가 실행되므로
+    threading.Lock으로 보호합니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl_seconds: float = 6 * 3600,
+        sample_log_path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        error_ttl_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            max_entries: 최대 저장 구간 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+            ttl_seconds: 항목 유효 시간 (초)
+            sample_log_path: 저장되는 구간을 JSONL로 기록할 파일 (소요 시간 모델 학습용, None이면 기록 안 함)
+            max_bytes: 추정 메모리 상한 (바이트, 초과 시 LRU 제거, None이면 개수 제한만 사용)
+            error_ttl_seconds: 실패 구간 항목 유효 시간 (초, None이면 ttl_seconds)
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.sample_log_path = sample_log_path or None
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.error_ttl_seconds = float(error_ttl_seconds) if error_ttl_seconds is not None else self.ttl_seconds
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(key: Tuple, value: Dict[str, Any]) -> int:
+        """항목 하나의 대략적인 메모리 크기 (바이트, 키/값 컨테이너와 원소 크기 합)"""
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        for item in key:
+            size += sys.getsizeof(item)
+        for item in value.values():
+            size += sys.getsizeof(item)
+        return size
+
+    def _remove(self, key: Tuple) -> None:
+        """항목 제거 (락을 잡은 상태에서 호출)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+    @staticmethod
+    def make_key(
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        mode: str,
+        departure_time: Optional[datetime] = None
+    ) -> Tuple:
+        """캐시 키 생성: (출발 좌표, 도착 좌표, 이동 수단, 시간 버킷)"""
+        return (
+            round_coord(*origin),
+            round_coord(*destination),
+            (mode or "").lower(),
+            departure_bucket(mode, departure_time),
+        )
+
+    def get(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        mode: str,
+        departure_time: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 구간 정보 조회
+
+        Returns:
+            {"duration", "distance", "duration_text", "distance_text", "polyline"} 또는 None
+        """
+        key = self.make_key(origin, destination, mode, departure_time)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            ttl = self.error_ttl_seconds if entry["value"].get("error") else self.ttl_seconds
+            if now - entry["stored_at"] > ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry["value"])
+
+    def put(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        mode: str,
+        duration: int,
+        distance: int,
+        departure_time: Optional[datetime] = None,
+        duration_text: str = "",
+        distance_text: str = "",
+        polyline: Optional[str] = None,
+        error: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        구간 정보 저장
+
+        이미 polyline이 저장되어 있고 새 값에 polyline이 없으면 기존 polyline을 유지합니다.
+        (Distance Matrix 결과는 polyline이 없기 때문)
+
+        Args:
+            error: 경로 계산 실패 메시지 (실패 구간은 error_ttl_seconds 동안만 유지)
+            extra: 함께 저장할 추가 필드 (예: {"mode": "walking", "estimated": True})
+        """
+        key = self.make_key(origin, destination, mode, departure_time)
+        value = {
+            "duration": int(duration),
+            "distance": int(distance),
+            "duration_text": duration_text or "",
+            "distance_text": distance_text or "",
+            "polyline": polyline,
+        }
+        if error:
+            value["error"] = error
+        if extra:
+            value.update(extra)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous and not polyline and previous["value"].get("polyline"):
+                value["polyline"] = previous["value"]["polyline"]
+            if previous is not None:
+                self._remove(key)
+            size = self._entry_size(key, value)
+            self._entries[key] = {"value": value, "stored_at": time.time(), "size": size}
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        
+        # 실패 구간과 추정값은 학습 샘플로 기록하지 않음
+        if error or value.get("estimated"):
+            return
+        if self.sample_log_path and (previous is None or previous["value"]["duration"] != value["duration"]):
+            self._log_sample(origin, destination, mode, value["duration"], value["distance"], departure_time)
+    
+    def _log_sample(
+        self,
+        origin: Tuple[float, float],
+        destination: Tuple[float, float],
+        mode: str,
+        duration: int,
+        distance: int,
+        departure_time: Optional[datetime] = None
+    ) -> None:
+        """실제 provider 응답 구간을 학습 샘플로 기록 (실패해도 캐시 동작에는 영향 없음)"""
+        sample = {
+            "origin": [float(origin[0]), float(origin[1])],
+            "destination": [float(destination[0]), float(destination[1])],
+            "mode": (mode or "").lower(),
+            "hour": departure_hour(departure_time),
+            "duration": int(duration),
+            "distance": int(distance),
+            "logged_at": time.time(),
+        }
+        try:
+            with self._log_lock:
+                with open(self.sample_log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(sample) + "\n")
+        except OSError as e:
+            print(f"⚠️ 구간 학습 샘플 기록 실패: {e}")
+
+    def clear(self) -> None:
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_shared_leg_cache: Optional[LegCache] = None
+_shared_leg_cache_lock = threading.Lock()
+
+
+def get_leg_cache() -> LegCache:
+    """
+    프로세스 전역 구간 캐시 반환
+    check_routing(코스 생성)과 /api/route-guide가 같은 캐시를 공유하도록 합니다.
+    """
+    global _shared_leg_cache
+    if _shared_leg_cache is None:
+        with _shared_leg_cache_lock:
+            if _shared_leg_cache is None:
+                from config.config import Config
+                _shared_leg_cache = LegCache(
+                    max_entries=Config.ROUTE_CACHE_MAX_ENTRIES,
+                    ttl_seconds=Config.ROUTE_CACHE_TTL_SECONDS,
+                    sample_log_path=Config.TRAVEL_SAMPLE_LOG_PATH,
+                )
+    return _shared_leg_cache
+
+
+_planning_leg_cache: Optional[LegCache] = None
+_planning_leg_cache_lock = threading.Lock()
+
+
+def get_planning_leg_cache() -> LegCache:
+    """
+    프로세스 전역 check_routing 구간 캐시 반환
+    코스 후보마다 겹치는 구간을 재사용하며, 추정값이 섞이므로 provider 캐시와 분리합니다.
+    """
+    global _planning_leg_cache
+    if _planning_leg_cache is None:
+        with _planning_leg_cache_lock:
+            if _planning_leg_cache is None:
+                from config.config import Config
+                _planning_leg_cache = LegCache(
+                    max_entries=Config.PLANNING_LEG_CACHE_MAX_ENTRIES,
+                    ttl_seconds=Config.ROUTE_CACHE_TTL_SECONDS,
+                    max_bytes=Config.PLANNING_LEG_CACHE_MAX_BYTES,
+                    error_ttl_seconds=Config.PLANNING_LEG_CACHE_ERROR_TTL_SECONDS,
+                )
+    return _planning_leg_cache
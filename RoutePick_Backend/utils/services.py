@@ -0,0 +1,117 @@
+"""
+서비스 컨테이너
+외부 API 클라이언트, Tool, Agent를 프로세스당 한 번만 만들어 재사용합니다.
+
+요청마다 Agent/Tool을 새로 만들면 googlemaps.Client 연결 풀, GoogleMapsTool 지오코딩 캐시,
+Tavily 클라이언트 등이 매번 버려집니다. app.py 라우트와 파이프라인은 get_services()에서
+필요한 객체를 꺼내 쓰고, Agent는 생성자 인자로 Tool/클라이언트를 주입받습니다.
+
+동시 사용:
+- Agent와 Tool은 요청별 상태를 인스턴스에 저장하지 않으므로 여러 요청 스레드에서 공유합니다.
+- 이벤트 루프에 묶이는 클라이언트(aiohttp 세션, AsyncOpenAI)는 여기서 보관하지 않고
+  utils.http_client 레지스트리가 루프별로 관리합니다.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class ServiceContainer:
+    """프로세스 전역 클라이언트/Tool/Agent 컨테이너 (처음 요청할 때 생성, 스레드 안전)"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: Agent/Tool 공용 설정 (None이면 Config.get_agent_config())
+        """
+        if config is None:
+            from config.config import Config
+            config = Config.get_agent_config()
+        self.config = config
+        self._instances: Dict[str, Any] = {}
+        # 생성 함수 안에서 다른 서비스를 요청하므로 재진입 가능한 락 사용
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    # --- Tool ---
+
+    def maps_tool(self):
+        """GoogleMapsTool (지오코딩/구간 캐시 공유)"""
+        from tools.google_maps_tool import GoogleMapsTool
+        return self._get("maps_tool", lambda: GoogleMapsTool(config=self.config))
+
+    def tmap_tool(self):
+        """TMapTool"""
+        from tools.tmap_tool import TMapTool
+        return self._get("tmap_tool", lambda: TMapTool(config=self.config))
+
+    def offline_tool(self):
+        """OfflineRoutingTool"""
+        from tools.offline_routing_tool import OfflineRoutingTool
+        return self._get("offline_tool", lambda: OfflineRoutingTool(config=self.config))
+
+    def tavily_tool(self):
+        """TavilySearchTool"""
+        from tools.tavily_search_tool import TavilySearchTool
+        return self._get("tavily_tool", lambda: TavilySearchTool(config=self.config))
+
+    def course_tool(self):
+        """CourseCreationTool"""
+        from tools.course_creation_tool import CourseCreationTool
+        return self._get("course_tool", lambda: CourseCreationTool(config=self.config))
+
+    def gmaps_client(self):
+        """googlemaps.Client (GoogleMapsTool과 같은 인스턴스, API 키가 없으면 None)"""
+        return self.maps_tool().client
+
+    # --- Agent ---
+
+    def search_agent(self):
+        """SearchAgent"""
+        from agents.search_agent import SearchAgent
+        return self._get("search_agent", lambda: SearchAgent(
+            config=self.config,
+            search_tool=self.tavily_tool(),
+            gmaps=self.gmaps_client()
+        ))
+
+    def planning_agent(self):
+        """PlanningAgent"""
+        from agents.planning_agent import PlanningAgent
+        return self._get("planning_agent", lambda: PlanningAgent(
+            config=self.config,
+            course_tool=self.course_tool()
+        ))
+
+    def routing_agent(self):
+        """RoutingAgent"""
+        from agents.routing_agent import RoutingAgent
+        return self._get("routing_agent", lambda: RoutingAgent(
+            config=self.config,
+            maps_tool=self.maps_tool(),
+            tmap_tool=self.tmap_tool(),
+            offline_tool=self.offline_tool()
+        ))
+
+
+_services: Optional[ServiceContainer] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> ServiceContainer:
+    """프로세스 전역 서비스 컨테이너 반환"""
+    global _services
+    if _services is None:
+        with _services_lock:
+            if _services is None:
+                _services = ServiceContainer()
+    return _services
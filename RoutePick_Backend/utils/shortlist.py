@@ -0,0 +1,130 @@
+"""
+후보 장소 1차 선별 (계층형 계획의 수치 단계)
+수백 개 후보를 프롬프트/플래너에 들어갈 크기로 줄입니다.
+LLM 또는 빔 서치 플래너는 이 shortlist 위에서만 코스를 계획합니다.
+
+선별 기준:
+1. 공간 군집: 이동 수단별 반경 안 trust_score 합이 가장 큰 지점(저장된 장소가 있으면 그 중심)을 기준점으로 사용
+2. 기준점에서의 예상 이동 시간 (학습 모델, 없으면 직선 거리 추정)
+3. 카테고리 커버리지: SearchAgent와 같은 비율의 카테고리별 최소 자리
+4. 저장된 장소는 항상 포함
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.cost_matrix import HAVERSINE_PROFILES, haversine_matrix, place_points
+
+
+# 기준점 탐색 반경 (미터): 이 반경 안 후보 점수 합이 가장 큰 곳을 코스 중심으로 봄
+CLUSTER_RADIUS_M = {"walking": 1500.0, "transit": 6000.0, "driving": 10000.0}
+
+# 카테고리 비율 (SearchAgent 20개 쿼터 기준, 선별 크기에 맞춰 비례 조정)
+CATEGORY_SHARES = {"식당": 5, "카페": 5, "활동": 4, "관광지": 4, "쇼핑": 2}
+
+
+def _minutes_from_anchor(
+    anchor: np.ndarray,
+    points: np.ndarray,
+    mode: str,
+    hour: Optional[int]
+) -> np.ndarray:
+    """기준점 → 각 후보 예상 이동 시간 (분)"""
+    from utils.travel_time_model import get_travel_time_model
+    model = get_travel_time_model()
+    if model is not None and model.has_mode(mode):
+        durations, _ = model.predict(mode, np.repeat(anchor[None, :], len(points), axis=0), points, hour)
+        return durations / 60.0
+    speed_kmh, detour, fixed_minutes = HAVERSINE_PROFILES.get(mode, HAVERSINE_PROFILES["walking"])
+    straight = haversine_matrix(np.vstack([anchor[None, :], points]))[0, 1:]
+    return straight * detour / (speed_kmh / 3.6) / 60.0 + fixed_minutes
+
+
+def category_quotas(limit: int) -> Dict[str, int]:
+    """선별 크기에 맞춘 카테고리별 최소 자리 수"""
+    total = sum(CATEGORY_SHARES.values())
+    return {category: max(1, share * limit // total) for category, share in CATEGORY_SHARES.items()}
+
+
+def shortlist_places(
+    places: Sequence[Dict[str, Any]],
+    limit: int,
+    mode: str = "walking",
+    hour: Optional[int] = None,
+    travel_weight: float = 0.05,
+    max_minutes: float = 45.0
+) -> List[Dict[str, Any]]:
+    """
+    후보 장소를 limit개로 선별
+
+    Args:
+        places: 후보 장소 리스트 (개수 제한 없음)
+        limit: 선별할 장소 수
+        mode: 이동 수단 ('walking', 'driving', 'transit')
+        hour: 출발 시 (학습 모델 시간대 효과용)
+        travel_weight: 기준점에서 이동 1분당 점수 페널티
+        max_minutes: 기준점에서 이보다 먼 후보는 자리가 남을 때만 포함
+
+    Returns:
+        선별된 장소 리스트 (저장된 장소 먼저, 이후 보정 점수 순)
+    """
+    m = len(places)
+    if m <= limit:
+        return list(places)
+
+    scores = np.array([float(p.get("trust_score") or p.get("rating") or 0.0) for p in places])
+    saved = np.array([bool(p.get("is_saved_place")) for p in places])
+    points, valid = place_points(places)
+    adjusted = scores.copy()
+    far = ~valid
+
+    idx = np.flatnonzero(valid)
+    if idx.size:
+        # 1. 기준점: 저장된 장소 중심, 없으면 반경 안 점수 합이 가장 큰 후보
+        saved_with_coords = np.flatnonzero(valid & saved)
+        if saved_with_coords.size:
+            anchor = points[saved_with_coords].mean(axis=0)
+        else:
+            radius = CLUSTER_RADIUS_M.get(mode, CLUSTER_RADIUS_M["walking"])
+            density = (haversine_matrix(points[idx]) <= radius) @ scores[idx]
+            anchor = points[idx[int(np.argmax(density))]]
+        # 2. 기준점에서 멀수록 점수 감점
+        minutes = _minutes_from_anchor(anchor, points[idx], mode, hour)
+        adjusted[idx] -= travel_weight * minutes
+        far[idx] = minutes > max_minutes
+
+    # 좌표 없는 장소와 먼 장소는 자리가 남을 때만 (경로 계산 불가 / 코스 반경 밖)
+    order = sorted(range(m), key=lambda i: (far[i], -adjusted[i]))
+    selected = [i for i in range(m) if saved[i]][:limit]
+    chosen = set(selected)
+
+    # 3. 카테고리별 최소 자리 채우기
+    quotas = category_quotas(limit)
+    counts = {category: 0 for category in quotas}
+    for i in selected:
+        category = places[i].get("category")
+        if category in counts:
+            counts[category] += 1
+    for i in order:
+        if len(selected) >= limit:
+            break
+        category = places[i].get("category")
+        if i not in chosen and not far[i] and category in quotas and counts[category] < quotas[category]:
+            selected.append(i)
+            chosen.add(i)
+            counts[category] += 1
+
+    # 4. 남은 자리는 보정 점수 순
+    for i in order:
+        if len(selected) >= limit:
+            break
+        if i not in chosen:
+            selected.append(i)
+            chosen.add(i)
+
+    rank = {i: r for r, i in enumerate(order)}
+    selected = [i for i in selected if saved[i]] + sorted((i for i in selected if not saved[i]), key=rank.get)
+    print(f"🔎 후보 1차 선별: {m}개 → {len(selected)}개 ({mode}, 저장된 장소 {int(saved.sum())}개, "
+          f"반경 밖/좌표 없음 {int(far.sum())}개)")
+    return [places[i] for i in selected]
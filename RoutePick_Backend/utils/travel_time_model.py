@@ -0,0 +1,343 @@
+"""
+학습형 구간 소요 시간 추정 모델
+실제 Distance Matrix / Directions 응답(구간 캐시 샘플 로그)으로 이동 수단별 모델을 학습해
+코스 계획 중 후보 구간 비용을 API 호출 없이 추정합니다.
+
+모델: log(소요 시간), log(도로 거리)에 대한 릿지 회귀
+- 직선 거리: log 거리 + 거리 구간 경계(knot)별 hinge 항 (구간별 선형, piecewise-linear)
+- 방위각: sin/cos (1, 2차 고조파)
+- 시간대: 시(hour)의 sin/cos (1, 2차 고조파)
+- 지역(district): 출발/도착 격자 셀 one-hot (샘플이 충분한 셀만)
+
+예측은 (N, 2) 좌표 배열을 한 번에 처리하며, 후보 장소 전체의 행렬도 한 번에 계산합니다.
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.geometry import EARTH_RADIUS_M
+
+
+# 지역(district) 격자 셀 크기 (도 단위, 약 2km)
+DISTRICT_CELL_DEG = 0.02
+# 직선 거리 구간 경계 (미터)
+DISTANCE_KNOTS_M = (200.0, 500.0, 1000.0, 2000.0, 5000.0, 10000.0, 20000.0)
+# 이보다 가까운 구간은 0초로 간주 (check_routing의 10m 직접 경로와 동일)
+MIN_LEG_METERS = 10.0
+
+
+def _haversine_and_bearing(origins: np.ndarray, destinations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, 2) [lat, lng] 배열 쌍의 haversine 거리(미터)와 방위각(라디안)"""
+    lat1, lng1 = np.radians(origins[:, 0]), np.radians(origins[:, 1])
+    lat2, lng2 = np.radians(destinations[:, 0]), np.radians(destinations[:, 1])
+    dlat, dlng = lat2 - lat1, lng2 - lng1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    bearing = np.arctan2(
+        np.sin(dlng) * np.cos(lat2),
+        np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlng)
+    )
+    return distance, bearing
+
+
+def district_keys(coords: np.ndarray) -> np.ndarray:
+    """좌표 배열의 지역 격자 셀 키"""
+    row = np.floor(coords[:, 0] / DISTRICT_CELL_DEG).astype(np.int64)
+    col = np.floor(coords[:, 1] / DISTRICT_CELL_DEG).astype(np.int64)
+    return row * 100_003 + col
+
+
+class TravelTimeModel:
+    """이동 수단별 구간 소요 시간/거리 추정 모델"""
+
+    def __init__(self, modes: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            modes: {mode: {"districts": (K,) 셀 키, "duration_coef": (F,), "distance_coef": (F,),
+                           "duration_sigma": float, "samples": int}}
+        """
+        self.modes = modes or {}
+
+    def has_mode(self, mode: str) -> bool:
+        return mode in self.modes
+
+    @staticmethod
+    def _base_features(
+        origins: np.ndarray,
+        destinations: np.ndarray,
+        hours: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """지역 항을 제외한 특징 행렬과 직선 거리"""
+        distance, bearing = _haversine_and_bearing(origins, destinations)
+        log_d = np.log(np.maximum(distance, MIN_LEG_METERS))
+        columns = [np.ones_like(log_d), log_d]
+        columns += [np.maximum(log_d - np.log(knot), 0.0) for knot in DISTANCE_KNOTS_M]
+        columns += [np.sin(bearing), np.cos(bearing), np.sin(2 * bearing), np.cos(2 * bearing)]
+
+        # 시각을 모르면(nan) 시간대 항은 0 (평균 효과)
+        known = np.isfinite(hours)
+        angle = np.where(known, hours, 0.0) * (2 * np.pi / 24)
+        for harmonic in (1, 2):
+            columns.append(np.where(known, np.sin(harmonic * angle), 0.0))
+            columns.append(np.where(known, np.cos(harmonic * angle), 0.0))
+        return np.column_stack(columns), distance
+
+    @staticmethod
+    def _district_features(
+        origins: np.ndarray,
+        destinations: np.ndarray,
+        districts: np.ndarray
+    ) -> np.ndarray:
+        """출발/도착 지역 one-hot (각 0.5, 학습에 없던 지역은 0)"""
+        features = np.zeros((origins.shape[0], districts.shape[0]))
+        if districts.size == 0:
+            return features
+        rows = np.arange(origins.shape[0])
+        for coords in (origins, destinations):
+            keys = district_keys(coords)
+            pos = np.clip(np.searchsorted(districts, keys), 0, districts.size - 1)
+            found = districts[pos] == keys
+            np.add.at(features, (rows[found], pos[found]), 0.5)
+        return features
+
+    @staticmethod
+    def _as_arrays(origins, destinations, hours) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+        if hours is None:
+            hours = np.full(origins.shape[0], np.nan)
+        else:
+            hours = np.broadcast_to(np.asarray(hours, dtype=np.float64), (origins.shape[0],))
+        return origins, destinations, hours
+
+    def predict(
+        self,
+        mode: str,
+        origins: Sequence[Sequence[float]],
+        destinations: Sequence[Sequence[float]],
+        hours: Any = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        구간 소요 시간/거리 일괄 추정
+
+        Args:
+            mode: 이동 수단
+            origins: (N, 2) [lat, lng]
+            destinations: (N, 2) [lat, lng]
+            hours: 출발 시(0~23), 스칼라 또는 (N,) (None이면 시간대 효과 제외)
+
+        Returns:
+            (durations 초, distances 미터) (N,) 배열 또는 None (해당 모드 모델 없음)
+        """
+        params = self.modes.get(mode)
+        if params is None:
+            return None
+        origins, destinations, hours = self._as_arrays(origins, destinations, hours)
+        base, straight = self._base_features(origins, destinations, hours)
+        features = np.hstack((base, self._district_features(origins, destinations, params["districts"])))
+
+        durations = np.exp(features @ params["duration_coef"])
+        distances = np.maximum(np.exp(features @ params["distance_coef"]), straight)
+        close = straight < MIN_LEG_METERS
+        durations[close] = 0.0
+        distances[close] = straight[close]
+        return durations, distances
+
+    def predict_matrix(
+        self,
+        mode: str,
+        points: Sequence[Sequence[float]],
+        hour: Optional[float] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        후보 장소 전체의 소요 시간/거리 행렬 (M, M) 일괄 추정
+
+        Returns:
+            (durations, distances) 또는 None (해당 모드 모델 없음)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        m = points.shape[0]
+        origins = np.repeat(points, m, axis=0)
+        destinations = np.tile(points, (m, 1))
+        predicted = self.predict(mode, origins, destinations, hour)
+        if predicted is None:
+            return None
+        durations, distances = predicted
+        return durations.reshape(m, m), distances.reshape(m, m)
+
+    # ------------------------------------------------------------------
+    # 학습 / 저장
+    # ------------------------------------------------------------------
+    @classmethod
+    def fit(
+        cls,
+        samples: Iterable[Dict[str, Any]],
+        ridge: float = 1.0,
+        min_samples: int = 30,
+        min_district_samples: int = 20
+    ) -> "TravelTimeModel":
+        """
+        구간 샘플로 이동 수단별 모델 학습
+
+        Args:
+            samples: {"origin": [lat, lng], "destination": [lat, lng], "mode", "hour", "duration", "distance"}
+                     (utils.route_cache.LegCache 샘플 로그 형식)
+            ridge: 릿지 정규화 강도 (절편 제외)
+            min_samples: 모드별 최소 샘플 수 (부족하면 해당 모드는 학습하지 않음)
+            min_district_samples: one-hot 항을 만들 지역의 최소 샘플 수
+        """
+        by_mode: Dict[str, List[Dict[str, Any]]] = {}
+        for sample in samples:
+            if sample.get("duration", 0) <= 0 or sample.get("distance", 0) <= 0:
+                continue
+            by_mode.setdefault(sample.get("mode", ""), []).append(sample)
+
+        modes: Dict[str, Dict[str, Any]] = {}
+        for mode, rows in by_mode.items():
+            if len(rows) < min_samples:
+                continue
+            origins = np.array([row["origin"] for row in rows], dtype=np.float64)
+            destinations = np.array([row["destination"] for row in rows], dtype=np.float64)
+            hours = np.array([row.get("hour", np.nan) for row in rows], dtype=np.float64)
+            durations = np.array([row["duration"] for row in rows], dtype=np.float64)
+            distances = np.array([row["distance"] for row in rows], dtype=np.float64)
+
+            keys, counts = np.unique(np.concatenate((district_keys(origins), district_keys(destinations))), return_counts=True)
+            districts = keys[counts >= min_district_samples]
+
+            base, _ = cls._base_features(origins, destinations, hours)
+            features = np.hstack((base, cls._district_features(origins, destinations, districts)))
+            penalty = np.full(features.shape[1], float(ridge))
+            penalty[0] = 0.0
+            gram = features.T @ features + np.diag(penalty)
+
+            duration_coef = np.linalg.solve(gram, features.T @ np.log(durations))
+            distance_coef = np.linalg.solve(gram, features.T @ np.log(distances))
+            residual = np.log(durations) - features @ duration_coef
+            modes[mode] = {
+                "districts": districts,
+                "duration_coef": duration_coef,
+                "distance_coef": distance_coef,
+                "duration_sigma": float(residual.std()),
+                "samples": len(rows),
+            }
+        return cls(modes)
+
+    def save(self, path: str) -> None:
+        """모델을 .npz 파일로 저장"""
+        arrays = {}
+        for mode, params in self.modes.items():
+            arrays[f"{mode}__districts"] = params["districts"]
+            arrays[f"{mode}__duration_coef"] = params["duration_coef"]
+            arrays[f"{mode}__distance_coef"] = params["distance_coef"]
+            arrays[f"{mode}__stats"] = np.array([params["duration_sigma"], params["samples"]], dtype=np.float64)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "TravelTimeModel":
+        """train_travel_time_model.py로 만든 .npz 파일에서 모델 로드"""
+        modes: Dict[str, Dict[str, Any]] = {}
+        with np.load(path, allow_pickle=False) as data:
+            for key in data.files:
+                mode, field = key.split("__", 1)
+                params = modes.setdefault(mode, {})
+                if field == "stats":
+                    params["duration_sigma"] = float(data[key][0])
+                    params["samples"] = int(data[key][1])
+                else:
+                    params[field] = data[key]
+        return cls(modes)
+
+
+def load_samples(paths: Sequence[str]) -> List[Dict[str, Any]]:
+    """구간 캐시 샘플 로그(JSONL) 읽기 (깨진 줄은 건너뜀)"""
+    samples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    samples.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return samples
+
+
+def estimate_course(
+    model: TravelTimeModel,
+    places: List[Dict[str, Any]],
+    mode: str,
+    hour: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    장소 순서대로 구간 소요 시간 추정 (check_routing 요약 형식)
+
+    Returns:
+        {"success", "total_duration", "total_distance", "directions", "estimated": True}
+        또는 None (모델 없음 / 좌표 없는 장소 포함)
+    """
+    if len(places) < 2 or not model.has_mode(mode):
+        return None
+    coords = []
+    for place in places:
+        c = place.get("coordinates") or {}
+        try:
+            coords.append((float(c["lat"]), float(c["lng"])))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    points = np.asarray(coords)
+    durations, distances = model.predict(mode, points[:-1], points[1:], hour)
+
+    directions = []
+    for i, (duration, distance) in enumerate(zip(durations.tolist(), distances.tolist())):
+        duration, distance = int(round(duration)), int(round(distance))
+        directions.append({
+            "from": places[i].get("name", "Unknown"),
+            "to": places[i + 1].get("name", "Unknown"),
+            "duration": duration,
+            "distance": distance,
+            "duration_text": f"약 {max(1, round(duration / 60))}분",
+            "distance_text": f"약 {distance}m" if distance < 1000 else f"약 {distance/1000:.1f}km",
+            "mode": mode,
+            "error": None
+        })
+    return {
+        "success": True,
+        "total_duration": sum(d["duration"] for d in directions),
+        "total_distance": sum(d["distance"] for d in directions),
+        "directions": directions,
+        "estimated": True,
+        "error": None
+    }
+
+
+_model: Optional[TravelTimeModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_travel_time_model() -> Optional[TravelTimeModel]:
+    """
+    프로세스 전역 소요 시간 모델 반환
+
+    Config.TRAVEL_TIME_MODEL_PATH가 비어 있거나 로드에 실패하면 None (한 번만 시도)
+    """
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                from config.config import Config
+                path = Config.TRAVEL_TIME_MODEL_PATH
+                if path:
+                    try:
+                        _model = TravelTimeModel.load(path)
+                        summary = ", ".join(f"{mode} {p['samples']}건" for mode, p in _model.modes.items())
+                        print(f"⏱️ 구간 소요 시간 모델 로드: {summary} ({path})")
+                    except Exception as e:
+                        print(f"⚠️ 구간 소요 시간 모델 로드 실패 ({path}): {e}")
+                        _model = None
+                _model_loaded = True
+    return _model
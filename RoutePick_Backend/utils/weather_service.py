@@ -0,0 +1,327 @@
+"""
+날씨 조회 서비스
+좌표를 약 5km 격자 셀로 묶어 OpenWeather 응답(현재 날씨/5일 예보)을 셀 단위로 캐시합니다.
+
+- 같은 셀의 (셀, 날짜) 요청은 캐시된 예보 응답에서 바로 답변
+- 같은 셀에 대한 동시 요청은 하나의 API 호출로 합침 (coalescing)
+- 공용 HTTP 레지스트리의 keep-alive 세션을 재사용
+"""
+
+import asyncio
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from utils.http_client import HttpClientRegistry, get_http_registry
+
+OPENWEATHER_CURRENT_URL = "https://api.openweathermap.org/data/2.5/weather"
+OPENWEATHER_FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+
+# 위도 1도 ≈ 111km
+_KM_PER_DEGREE = 111.0
+
+
+def empty_weather(date: Optional[str] = None, description: str = "날씨 정보를 가져올 수 없습니다.") -> Dict[str, Any]:
+    """날씨 정보를 가져올 수 없을 때 반환하는 기본 딕셔너리"""
+    return {
+        "temperature": None,
+        "condition": "정보 없음",
+        "description": description,
+        "humidity": None,
+        "wind_speed": None,
+        "icon": None,
+        "icon_type": None,
+        "date": date or datetime.now().strftime("%Y-%m-%d")
+    }
+
+
+def parse_target_date(date: Optional[str]) -> datetime:
+    """
+    방문 날짜 문자열을 datetime으로 변환
+    날짜만 있고 시간이 없으므로 오후 시간(14시)으로 설정 (일반적인 여행 시간)
+    """
+    if not date:
+        return datetime.now()
+    try:
+        return datetime.strptime(date, "%Y-%m-%d").replace(hour=14, minute=0, second=0)
+    except (TypeError, ValueError):
+        try:
+            return datetime.strptime(date.split()[0], "%Y-%m-%d").replace(hour=14, minute=0, second=0)
+        except (AttributeError, IndexError, ValueError):
+            return datetime.now()
+
+
+def _format_weather_item(item: Dict[str, Any], target_date: datetime) -> Dict[str, Any]:
+    """OpenWeather 응답 항목(현재 날씨 또는 예보 1건)을 응답 형식으로 변환"""
+    weather_list = item.get("weather", []) or []
+    first_weather = weather_list[0] if weather_list else {}
+    main_data = item.get("main", {}) or {}
+    temp = main_data.get("temp")
+    humidity = main_data.get("humidity")
+    wind_speed = (item.get("wind", {}) or {}).get("speed")
+    description = first_weather.get("description", "")
+    condition = first_weather.get("main", "")
+    icon = first_weather.get("icon", "")
+
+    return {
+        "temperature": round(float(temp), 1) if temp is not None else None,
+        "condition": condition or "정보 없음",
+        "description": description or condition or "정보 없음",
+        "humidity": int(humidity) if humidity is not None else None,
+        "wind_speed": round(float(wind_speed), 1) if wind_speed is not None else None,
+        "icon": icon,
+        "icon_type": "openweather",
+        "date": target_date.strftime("%Y-%m-%d")
+    }
+
+
+def select_forecast_item(forecast_list: Any, target_date: datetime) -> Optional[Dict[str, Any]]:
+    """
+    5일/3시간 예보 목록에서 목표 날짜에 가장 적합한 항목 선택
+    해당 날짜의 예보 중 가장 가까운 시간대(오후 12~18시 우선),
+    없으면 5일 이내에서 가장 가까운 날짜의 예보를 사용합니다.
+    """
+    if not forecast_list:
+        return None
+
+    target_date_only = target_date.date()
+    parsed = []
+    for forecast_item in forecast_list:
+        dt_txt = forecast_item.get("dt_txt", "")
+        if not dt_txt:
+            continue
+        try:
+            parsed.append((datetime.strptime(dt_txt, "%Y-%m-%d %H:%M:%S"), forecast_item))
+        except ValueError:
+            continue
+
+    best_match = None
+    min_time_diff = None
+
+    # 먼저 정확히 일치하는 날짜의 예보 찾기
+    for forecast_datetime, forecast_item in parsed:
+        if forecast_datetime.date() != target_date_only:
+            continue
+        time_diff = abs((forecast_datetime - target_date).total_seconds())
+        # 오후 시간대(12~18시)에 가중치 부여
+        if 12 <= forecast_datetime.hour <= 18:
+            time_diff = time_diff * 0.5
+        if min_time_diff is None or time_diff < min_time_diff:
+            min_time_diff = time_diff
+            best_match = forecast_item
+
+    # 해당 날짜의 예보가 없으면 가장 가까운 날짜 찾기
+    if best_match is None:
+        for forecast_datetime, forecast_item in parsed:
+            date_diff = abs((forecast_datetime.date() - target_date_only).days)
+            if date_diff <= 5:  # 5일 이내
+                date_diff_seconds = date_diff * 86400
+                if min_time_diff is None or date_diff_seconds < min_time_diff:
+                    min_time_diff = date_diff_seconds
+                    best_match = forecast_item
+
+    return best_match
+
+
+class WeatherService:
+    """격자 셀 단위 캐시를 사용하는 OpenWeather 조회 서비스"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        cell_size_km: float = 5.0,
+        forecast_ttl_seconds: float = 1800,
+        current_ttl_seconds: float = 600,
+        timeout_seconds: float = 10.0,
+        http_registry: Optional[HttpClientRegistry] = None
+    ):
+        """
+        Args:
+            api_key: OpenWeather API 키
+            cell_size_km: 격자 셀 크기 (km)
+            forecast_ttl_seconds: 예보 응답 캐시 유효 시간 (초)
+            current_ttl_seconds: 현재 날씨 응답 캐시 유효 시간 (초)
+            timeout_seconds: HTTP 요청 타임아웃 (초)
+            http_registry: 공용 HTTP 세션 레지스트리 (None이면 프로세스 전역 레지스트리 사용)
+        """
+        self.api_key = api_key
+        self.cell_size_km = max(0.1, float(cell_size_km))
+        self.ttl_seconds = {
+            "forecast": float(forecast_ttl_seconds),
+            "current": float(current_ttl_seconds),
+        }
+        self.timeout_seconds = float(timeout_seconds)
+        self._http = http_registry or get_http_registry()
+
+        # (kind, cell) -> (저장 시각, 응답 payload)
+        self._cache: Dict[Tuple[str, Tuple[int, int]], Tuple[float, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        # (이벤트 루프 id, kind, cell) -> 진행 중인 요청 Future
+        self._inflight: Dict[Tuple[int, str, Tuple[int, int]], asyncio.Future] = {}
+
+        self.api_calls = 0
+        self.cache_hits = 0
+
+    # ------------------------------------------------------------------
+    # 격자 셀
+    # ------------------------------------------------------------------
+    def get_cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        """좌표를 격자 셀 인덱스로 변환 (경도 간격은 위도에 따라 보정)"""
+        lat_step = self.cell_size_km / _KM_PER_DEGREE
+        lat_idx = math.floor(float(lat) / lat_step)
+        center_lat = (lat_idx + 0.5) * lat_step
+        lng_step = lat_step / max(math.cos(math.radians(center_lat)), 0.01)
+        lng_idx = math.floor(float(lng) / lng_step)
+        return (lat_idx, lng_idx)
+
+    def get_cell_center(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        """격자 셀 중심 좌표 (API 요청에 사용)"""
+        lat_step = self.cell_size_km / _KM_PER_DEGREE
+        center_lat = (cell[0] + 0.5) * lat_step
+        lng_step = lat_step / max(math.cos(math.radians(center_lat)), 0.01)
+        center_lng = (cell[1] + 0.5) * lng_step
+        return (round(center_lat, 4), round(center_lng, 4))
+
+    # ------------------------------------------------------------------
+    # 요청
+    # ------------------------------------------------------------------
+    async def _request(self, kind: str, cell: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """OpenWeather API 호출 (셀 중심 좌표 기준)"""
+        lat, lng = self.get_cell_center(cell)
+        url = OPENWEATHER_FORECAST_URL if kind == "forecast" else OPENWEATHER_CURRENT_URL
+        params = {
+            "lat": lat,
+            "lon": lng,
+            "appid": self.api_key,
+            "units": "metric",
+            "lang": "kr"
+        }
+        self.api_calls += 1
+        try:
+            session = self._http.get_session()
+            timeout = aiohttp.ClientTimeout(total=self.timeout_seconds)
+            async with session.get(url, params=params, timeout=timeout) as response:
+                if response.status != 200:
+                    print(f"⚠️ OpenWeather {kind} API 응답 오류: HTTP {response.status}")
+                    return None
+                return await response.json()
+        except Exception as e:
+            print(f"⚠️ OpenWeather {kind} API 호출 중 오류: {e}")
+            return None
+
+    async def _get_payload(self, kind: str, cell: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """
+        셀 단위 응답 payload 조회
+        캐시 → 진행 중인 요청 대기 → 신규 요청 순으로 처리합니다.
+        """
+        now = time.time()
+        with self._cache_lock:
+            cached = self._cache.get((kind, cell))
+            if cached and now - cached[0] <= self.ttl_seconds[kind]:
+                self.cache_hits += 1
+                return cached[1]
+
+        loop = asyncio.get_running_loop()
+        inflight_key = (id(loop), kind, cell)
+        pending = self._inflight.get(inflight_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._inflight[inflight_key] = future
+        try:
+            payload = await self._request(kind, cell)
+            if payload:
+                with self._cache_lock:
+                    self._cache[(kind, cell)] = (time.time(), payload)
+            future.set_result(payload)
+            return payload
+        except BaseException:
+            if not future.done():
+                future.set_result(None)
+            raise
+        finally:
+            self._inflight.pop(inflight_key, None)
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    async def get_weather(self, lat: float, lng: float, date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        특정 위치와 날짜의 날씨 정보 조회
+
+        Args:
+            lat: 위도
+            lng: 경도
+            date: 날짜 (YYYY-MM-DD 형식, None이면 오늘)
+
+        Returns:
+            GoogleMapsTool.get_weather_info와 동일한 형식의 날씨 딕셔너리
+        """
+        if not self.api_key:
+            print("⚠️ OpenWeather API 키가 설정되지 않았습니다.")
+            return empty_weather(date)
+
+        if lat is None or lng is None:
+            error_msg = f"위도/경도 값이 없습니다. lat={lat}, lng={lng}"
+            print(f"❌ {error_msg}")
+            return empty_weather(date, f"날씨 정보를 가져올 수 없습니다: {error_msg}")
+
+        try:
+            target_date = parse_target_date(date)
+            is_today = target_date.date() == datetime.now().date()
+            cell = self.get_cell(lat, lng)
+
+            # 오늘 날짜면 현재 날씨 API 사용, 미래 날짜면 예보 API 사용
+            if not is_today:
+                forecast = await self._get_payload("forecast", cell)
+                best_match = select_forecast_item((forecast or {}).get("list", []), target_date)
+                if best_match:
+                    return _format_weather_item(best_match, target_date)
+                print(f"⚠️ {target_date.strftime('%Y-%m-%d')} 예보 정보가 없어 현재 날씨로 폴백합니다.")
+
+            current = await self._get_payload("current", cell)
+            if current:
+                return _format_weather_item(current, target_date)
+
+            return empty_weather(target_date.strftime("%Y-%m-%d"))
+        except Exception as e:
+            print(f"⚠️ 날씨 정보 가져오기 실패: {e}")
+            return empty_weather(date)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._cache_lock:
+            return {
+                "cached_cells": len(self._cache),
+                "api_calls": self.api_calls,
+                "cache_hits": self.cache_hits,
+            }
+
+
+_weather_services: Dict[str, WeatherService] = {}
+_weather_services_lock = threading.Lock()
+
+
+def get_weather_service(api_key: Optional[str]) -> WeatherService:
+    """
+    API 키별 프로세스 전역 WeatherService 반환
+    코스 생성(CourseCreationTool)과 경로 계산이 같은 셀 캐시를 공유하도록 합니다.
+    """
+    key = api_key or ""
+    with _weather_services_lock:
+        service = _weather_services.get(key)
+        if service is None:
+            from config.config import Config
+            service = WeatherService(
+                api_key,
+                cell_size_km=Config.WEATHER_GRID_KM,
+                forecast_ttl_seconds=Config.WEATHER_FORECAST_TTL_SECONDS,
+                current_ttl_seconds=Config.WEATHER_CURRENT_TTL_SECONDS,
+            )
+            _weather_services[key] = service
+        return service
@@ -361,6 +361,7 @@ const TripPlanner: React.FC<TripPlannerProps> = ({ isOpen, onClose }) => {
   const [currentLog, setCurrentLog] = useState("여행 생성 요청 중..."); // 현재 표시할 메시지
   const [showLog, setShowLog] = useState(false); // 알림창 보임/숨김 여부
   const lastLogRef = useRef(""); // 중복 메시지 깜빡임 방지용
+  const [descriptionPreview, setDescriptionPreview] = useState(""); // 생성 중인 코스 설명 (스트리밍)
 
   // Calendar State
   const [currentMonth, setCurrentMonth] = useState(new Date());
@@ -458,6 +459,7 @@ const handleNext = async () => {
         // 마지막 단계: 로딩 시작
         setIsLoading(true);
         setShowLog(true); // 로딩 시작되자마자 알림창 띄우기
+        setDescriptionPreview("");
       try {
         // 1. Flask 서버에 데이터 전송
         const response = await fetch('http://127.0.0.1:5000/api/create-trip', {
@@ -475,11 +477,8 @@ const handleNext = async () => {
         const data = await response.json();
         const { taskId } = data;
 
-        // 2. 상태 확인 폴링 (1초 간격으로 변경하여 반응 속도 향상)
-        const pollStatus = setInterval(async () => {
-          try {
-            const statusResponse = await fetch(`http://127.0.0.1:5000/status/${taskId}`);
-            const statusData = await statusResponse.json();
+        // 2. 상태 처리 (이벤트 스트림 / 폴링 공용)
+        const handleStatus = (statusData: { done: boolean; success: boolean; error?: string; message: string }) => {
             if (statusData.message && statusData.message !== lastLogRef.current) {
                 lastLogRef.current = statusData.message;
                 
@@ -491,7 +490,6 @@ const handleNext = async () => {
             }
 
             if (statusData.done) {
-              clearInterval(pollStatus); // 폴링 중단
               setIsLoading(false); // 로딩 끝 
 
               if (statusData.success) {
@@ -502,11 +500,38 @@ const handleNext = async () => {
                 onClose();
               }
             }
-          } catch (error) {
-            // 에러 발생 시에도 계속 시도 (네트워크 일시적 끊김 대비)
-            console.warn("Polling error, retrying...", error);
-          }
-        }, 1000); // 1초마다 확인
+        };
+
+        // 3. 이벤트 스트림 구독 (진행 메시지 + 생성 중인 코스 설명을 서버가 바로 전달)
+        const events = new EventSource(`http://127.0.0.1:5000/events/${taskId}`);
+        events.addEventListener('description', (event) => {
+            const data = JSON.parse((event as MessageEvent).data);
+            if (data.final) {
+                setDescriptionPreview(data.text || '');
+            } else {
+                setDescriptionPreview(prev => prev + (data.delta || ''));
+            }
+        });
+        events.addEventListener('status', (event) => {
+            const statusData = JSON.parse((event as MessageEvent).data);
+            if (statusData.done) events.close();
+            handleStatus(statusData);
+        });
+        events.onerror = () => {
+            // 스트림이 끊기면 기존 방식(1초 간격 상태 폴링)으로 전환
+            events.close();
+            const pollStatus = setInterval(async () => {
+              try {
+                const statusResponse = await fetch(`http://127.0.0.1:5000/status/${taskId}`);
+                const statusData = await statusResponse.json();
+                if (statusData.done) clearInterval(pollStatus); // 폴링 중단
+                handleStatus(statusData);
+              } catch (error) {
+                // 에러 발생 시에도 계속 시도 (네트워크 일시적 끊김 대비)
+                console.warn("Polling error, retrying...", error);
+              }
+            }, 1000); // 1초마다 확인
+        };
 
       } catch (error) {
         setIsLoading(false);
@@ -749,6 +774,18 @@ const handleNext = async () => {
                 </div>
                 {/* ▲▲▲ [추가 완료] ▲▲▲ */}                
                 
+                {/* 생성 중인 코스 설명 (이벤트 스트림으로 실시간 표시) */}
+                {descriptionPreview && (
+                    <div className="absolute bottom-4 left-4 right-4 md:left-6 md:right-6 z-30">
+                        <div className="bg-white/90 backdrop-blur-md rounded-[20px] p-4 shadow-[0_8px_30px_rgba(0,0,0,0.12)] border border-white/50 max-w-2xl mx-auto">
+                            <h3 className="text-[13px] font-bold text-black tracking-tight mb-1">📝 코스 설명</h3>
+                            <p className="text-[12px] text-gray-800 leading-relaxed whitespace-pre-line max-h-32 overflow-y-auto">
+                                {descriptionPreview}
+                            </p>
+                        </div>
+                    </div>
+                )}
+                
                 {/* Screen Content */}
                 <div className="absolute inset-0 pt-10 bg-gray-100 overflow-hidden">
                     {gameMode ? (